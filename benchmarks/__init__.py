@@ -0,0 +1,7 @@
+"""
+Django Orbit benchmarks.
+
+Not shipped with the package. Run from a checkout:
+
+    python -m benchmarks.overhead --help
+"""
@@ -0,0 +1,547 @@
+"""
+Synthetic Orbit data for the read-path benchmark.
+
+Fills ``OrbitEntry`` with request families shaped like a busy JSON API:
+
+- each request has child queries, a few cache operations and sometimes a log line;
+- some requests repeat one query per row (N+1), some have a slow query;
+- a few fail with a 404, or with a 500 and an exception from one of a fixed set of
+  groups, so fingerprints repeat the way they do in production;
+- background jobs run their own queries, and failed jobs record an exception.
+
+Families are spread uniformly over ``days`` and written in time order through the
+same path as the writers (masking, promoted columns, search text, interning), with
+stats rollups built alongside. Generation is seeded, so runs are repeatable.
+
+Run standalone to pre-fill the benchmark database::
+
+    python -m benchmarks.dataset --rows 1m --days 7
+"""
+
+import argparse
+import random
+import sys
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+RESOURCES = (
+    "products",
+    "orders",
+    "customers",
+    "invoices",
+    "carts",
+    "reviews",
+    "shipments",
+    "coupons",
+)
+
+JOBS = (
+    "shop.tasks.send_receipt",
+    "shop.tasks.sync_inventory",
+    "shop.tasks.charge_invoice",
+    "shop.tasks.rebuild_search_index",
+    "shop.tasks.expire_carts",
+    "shop.tasks.export_report",
+)
+
+# (exception type, module, raising function) for each exception group
+EXCEPTIONS = (
+    ("KeyError", "builtins", "serialize_line"),
+    ("ValueError", "builtins", "parse_quantity"),
+    ("TypeError", "builtins", "apply_discount"),
+    ("AttributeError", "builtins", "resolve_owner"),
+    ("DoesNotExist", "shop.models", "get_object"),
+    ("IntegrityError", "django.db.utils", "save_order"),
+    ("OperationalError", "django.db.utils", "lock_rows"),
+    ("ValidationError", "django.core.exceptions", "clean_address"),
+    ("PermissionDenied", "django.core.exceptions", "check_owner"),
+    ("TimeoutError", "builtins", "call_payment_gateway"),
+    ("ConnectionError", "requests.exceptions", "fetch_rates"),
+    ("ZeroDivisionError", "builtins", "average_rating"),
+)
+
+IDS = 200  # Distinct object ids per resource in detail paths
+FAMILY_SIZE = 10  # Average entries per family
+
+
+def parse_count(value: str) -> int:
+    """Parse ``10k`` / ``1m`` / ``2500`` style counts."""
+    text = str(value).strip().lower()
+    multiplier = 1
+    if text.endswith("k"):
+        multiplier, text = 1_000, text[:-1]
+    elif text.endswith("m"):
+        multiplier, text = 1_000_000, text[:-1]
+    return int(float(text) * multiplier)
+
+
+def _table(resource: str) -> str:
+    return f'"shop_{resource[:-1]}"'
+
+
+def _statements(resource: str) -> Dict[str, str]:
+    table = _table(resource)
+    columns = ", ".join(
+        f'{table}."{column}"'
+        for column in ("id", "name", "status", "owner_id", "created_at", "updated_at")
+    )
+    items = f'"shop_{resource[:-1]}item"'
+    return {
+        "list": f'SELECT {columns} FROM {table} ORDER BY {table}."created_at" DESC '
+        "LIMIT 21",
+        "count": f'SELECT COUNT(*) AS "__count" FROM {table}',
+        "detail": f'SELECT {columns} FROM {table} WHERE {table}."id" = %s LIMIT 21',
+        "items": f'SELECT {items}."id", {items}."parent_id", {items}."sku", '
+        f'{items}."quantity" FROM {items} WHERE {items}."parent_id" = %s',
+        "owner": 'SELECT "auth_user"."id", "auth_user"."username", "auth_user"."email" '
+        'FROM "auth_user" WHERE "auth_user"."id" = %s LIMIT 21',
+        "insert": f'INSERT INTO {table} ("name", "status", "owner_id", '
+        '"created_at", "updated_at") VALUES (%s, %s, %s, %s, %s) RETURNING '
+        f'{table}."id"',
+        "update": f'UPDATE {table} SET "status" = %s, "updated_at" = %s '
+        f'WHERE {table}."id" = %s',
+        "session": 'SELECT "django_session"."session_key", '
+        '"django_session"."session_data" FROM "django_session" WHERE '
+        '("django_session"."expire_date" > %s AND "django_session"."session_key" = %s) '
+        "LIMIT 21",
+    }
+
+
+def _traceback(exc_type: str, module: str, function: str) -> Tuple[list, str]:
+    """Frames and the traceback text up to the message, for one exception group."""
+    frames = [
+        {
+            "filename": "/srv/app/django/core/handlers/base.py",
+            "lineno": 197,
+            "name": "_get_response",
+            "line": "response = wrapped_callback(request, *callback_args, **callback_kwargs)",
+        },
+        {
+            "filename": "/srv/app/shop/views.py",
+            "lineno": 88,
+            "name": "dispatch",
+            "line": "return handler(request, *args, **kwargs)",
+        },
+        {
+            "filename": f"/srv/app/shop/{function.split('_')[0]}.py",
+            "lineno": 41,
+            "name": function,
+            "line": f"raise {exc_type}(message)",
+        },
+    ]
+    text = "Traceback (most recent call last):\n" + "".join(
+        f'  File "{frame["filename"]}", line {frame["lineno"]}, in {frame["name"]}\n'
+        f"    {frame['line']}\n"
+        for frame in frames
+    )
+    qualified = exc_type if module == "builtins" else f"{module}.{exc_type}"
+    return frames, f"{text}{qualified}: "
+
+
+class FamilyFactory:
+    """Builds unsaved ``OrbitEntry`` families from a seeded random source."""
+
+    def __init__(self, seed: int = 0):
+        from orbit.conf import get_config
+        from orbit.sql import fingerprint_sql
+        from orbit.utils import compute_exception_fingerprint
+
+        self.rng = random.Random(seed)
+        self.slow_ms = float(get_config().get("SLOW_QUERY_THRESHOLD_MS", 500))
+        self.statements = {resource: _statements(resource) for resource in RESOURCES}
+        self.fingerprints = {
+            sql: fingerprint_sql(sql)
+            for statements in self.statements.values()
+            for sql in statements.values()
+        }
+        self.exceptions = []
+        for exc_type, module, function in EXCEPTIONS:
+            frames, text = _traceback(exc_type, module, function)
+            info = {"exception_type": exc_type, "traceback": frames}
+            self.exceptions.append(
+                (exc_type, module, frames, text, compute_exception_fingerprint(info))
+            )
+
+    def family(self, started_at) -> List:
+        """One request (or, now and then, one job) with everything it recorded."""
+        if self.rng.random() < 0.05:
+            return self._job(started_at)
+        return self._request(started_at)
+
+    def _entry(self, entry_type, family_hash, created_at, payload, **fields):
+        from orbit.models import OrbitEntry
+
+        return OrbitEntry(
+            type=entry_type,
+            family_hash=family_hash,
+            created_at=created_at,
+            payload=payload,
+            **fields,
+        )
+
+    def _query(self, family_hash, at, offset_ms, resource, kind, params, seen):
+        sql = self.statements[resource][kind]
+        fingerprint = self.fingerprints[sql]
+        seen[fingerprint] = seen.get(fingerprint, 0) + 1
+        duration_ms = round(self.rng.lognormvariate(0.0, 0.9), 3)
+        if self.rng.random() < 0.01:
+            duration_ms = round(self.slow_ms * self.rng.uniform(1.1, 6.0), 3)
+        payload = {
+            "sql": sql,
+            "params": params,
+            "duration_ms": duration_ms,
+            "is_slow": duration_ms > self.slow_ms,
+            "is_duplicate": seen[fingerprint] > 1,
+            "duplicate_count": seen[fingerprint],
+            "fingerprint": fingerprint,
+            "database": "default",
+            "caller": {},
+            "start_offset_ms": round(offset_ms, 3),
+        }
+        return self._entry(
+            "query",
+            family_hash,
+            at + timedelta(milliseconds=offset_ms),
+            payload,
+            fingerprint=fingerprint,
+            duration_ms=duration_ms,
+        )
+
+    def _queries(self, family_hash, at, resource, detail, write) -> Tuple[list, int]:
+        rng = self.rng
+        object_id = rng.randint(1, IDS)
+        plan = [("session", ["2026-01-01 00:00:00", uuid.UUID(int=object_id).hex])]
+        if detail:
+            plan.append(("detail", [object_id]))
+            plan.append(("owner", [rng.randint(1, 5000)]))
+        else:
+            plan.append(("count", []))
+            plan.append(("list", []))
+        if write:
+            plan.append(("update" if detail else "insert", ["paid", object_id]))
+        # N+1: one items query per listed row
+        repeats = rng.randint(15, 40) if rng.random() < 0.05 else rng.randint(0, 3)
+        plan.extend(("items", [rng.randint(1, 10_000)]) for _ in range(repeats))
+
+        seen: Dict[str, int] = {}
+        entries = []
+        offset = rng.uniform(0.5, 2.0)
+        for kind, params in plan:
+            entry = self._query(family_hash, at, offset, resource, kind, params, seen)
+            entries.append(entry)
+            offset += entry.duration_ms + rng.uniform(0.05, 0.5)
+        duplicates = sum(count - 1 for count in seen.values() if count > 1)
+        return entries, duplicates
+
+    def _cache(self, family_hash, at, resource) -> list:
+        entries = []
+        for _ in range(self.rng.randint(0, 6)):
+            key = f"{resource}:{self.rng.randint(1, IDS)}"
+            operation = self.rng.choice(("get", "get", "get", "set", "delete"))
+            payload = {
+                "operation": operation,
+                "key": key,
+                "backend": "default",
+                "backend_type": "RedisCache",
+            }
+            if operation == "get":
+                payload["hit"] = self.rng.random() < 0.7
+            elif operation == "set":
+                payload["ttl"] = 300
+            offset = timedelta(milliseconds=self.rng.uniform(0.1, 20.0))
+            entries.append(
+                self._entry(
+                    "cache",
+                    family_hash,
+                    at + offset,
+                    payload,
+                    duration_ms=round(self.rng.uniform(0.05, 1.5), 3),
+                )
+            )
+        return entries
+
+    def _exception(self, family_hash, at, method=None, path=None) -> Tuple[list, dict]:
+        exc_type, module, frames, text, fingerprint = self.rng.choice(self.exceptions)
+        message = f"{exc_type.lower()} for id {self.rng.randint(1, IDS)}"
+        payload = {
+            "exception_type": exc_type,
+            "exception_module": module,
+            "message": message,
+            "traceback": frames,
+            "traceback_string": f"{text}{message}\n",
+            "fingerprint": fingerprint,
+            "request_method": method,
+            "request_path": path,
+            "request_host": "shop.example.com" if path else None,
+        }
+        log = {
+            "level": "ERROR",
+            "logger": "django.request",
+            "message": f"Internal Server Error: {path}" if path else message,
+            "pathname": "/srv/app/django/utils/log.py",
+            "lineno": 241,
+            "funcName": "log_response",
+        }
+        return [
+            self._entry("exception", family_hash, at, payload, fingerprint=fingerprint),
+            self._entry("log", family_hash, at, log),
+        ], payload
+
+    def _request(self, started_at) -> list:
+        rng = self.rng
+        family_hash = uuid.UUID(int=rng.getrandbits(128)).hex
+        resource = rng.choice(RESOURCES)
+        detail = rng.random() < 0.6
+        method = rng.choice(
+            ("GET",) * 8 + (("PATCH", "DELETE") if detail else ("POST",))
+        )
+        path = f"/api/{resource}/" + (f"{rng.randint(1, IDS)}/" if detail else "")
+
+        queries, duplicates = self._queries(
+            family_hash, started_at, resource, detail, method != "GET"
+        )
+        entries = queries + self._cache(family_hash, started_at, resource)
+        query_ms = sum(entry.duration_ms for entry in queries)
+        duration_ms = round(query_ms + rng.lognormvariate(2.5, 0.6), 3)
+
+        status_code, exception = 200 if method != "POST" else 201, None
+        roll = rng.random()
+        if roll < 0.02:
+            status_code = 500
+            at = started_at + timedelta(milliseconds=duration_ms)
+            extra, exception = self._exception(family_hash, at, method, path)
+            entries.extend(extra)
+        elif roll < 0.06:
+            status_code = 404
+        elif roll < 0.12:
+            entries.append(
+                self._entry(
+                    "log",
+                    family_hash,
+                    started_at + timedelta(milliseconds=duration_ms / 2),
+                    {
+                        "level": "WARNING",
+                        "logger": f"shop.{resource}",
+                        "message": f"Slow upstream for {resource}",
+                        "pathname": f"/srv/app/shop/{resource}.py",
+                        "lineno": 57,
+                        "funcName": "fetch",
+                    },
+                )
+            )
+
+        payload = {
+            "method": method,
+            "path": path,
+            "full_path": path,
+            "host": "shop.example.com",
+            "scheme": "https",
+            "client_ip": f"10.0.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+            "user": str(rng.randint(1, 5000)) if rng.random() < 0.7 else None,
+            "headers": {
+                "Accept": "application/json",
+                "User-Agent": "shop-mobile/4.2 (iOS 17.5)",
+                "Accept-Language": "en-US",
+                "Cookie": "***HIDDEN***",
+            },
+            "query_params": {} if detail else {"page": str(rng.randint(1, 20))},
+            "body": {"status": "paid"} if method in ("PATCH", "POST") else None,
+            "duration_ms": duration_ms,
+            "query_count": len(queries),
+            "duplicate_query_count": duplicates,
+            "status_code": status_code,
+            "reason_phrase": {200: "OK", 201: "Created", 404: "Not Found"}.get(
+                status_code, "Internal Server Error"
+            ),
+            "response_headers": {"Content-Type": "application/json"},
+            "content_type": "application/json",
+            "content_length": rng.randint(120, 24_000),
+            "had_exception": exception is not None,
+        }
+        if exception is not None:
+            payload["exception_type"] = exception["exception_type"]
+            payload["exception_message"] = exception["message"]
+        entries.append(
+            self._entry(
+                "request", family_hash, started_at, payload, duration_ms=duration_ms
+            )
+        )
+        return entries
+
+    def _job(self, started_at) -> list:
+        rng = self.rng
+        family_hash = uuid.UUID(int=rng.getrandbits(128)).hex
+        resource = rng.choice(RESOURCES)
+        queries, _ = self._queries(family_hash, started_at, resource, True, True)
+        entries = list(queries)
+        failed = rng.random() < 0.08
+        duration_ms = round(
+            sum(q.duration_ms for q in queries) + rng.uniform(5, 900), 3
+        )
+        payload = {
+            "task_id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "name": rng.choice(JOBS),
+            "status": "failure" if failed else "success",
+            "queue": "celery",
+            "args": f"({rng.randint(1, IDS)},)",
+            "kwargs": "{}",
+        }
+        if failed:
+            extra, exception = self._exception(
+                family_hash, started_at + timedelta(milliseconds=duration_ms)
+            )
+            entries.extend(extra)
+            payload["error"] = exception["message"]
+        entries.append(
+            self._entry(
+                "job", family_hash, started_at, payload, duration_ms=duration_ms
+            )
+        )
+        return entries
+
+
+@contextmanager
+def recording_suspended():
+    """
+    Keep Orbit's watchers from recording what the benchmark itself does (rollup saves,
+    transactions, request signals), so storage holds only the generated data.
+    """
+    from orbit import watchers
+
+    suspended, watchers._recording_suspended = watchers._recording_suspended, True
+    try:
+        yield
+    finally:
+        watchers._recording_suspended = suspended
+
+
+def _start_times(count: int, days: float, rng, now) -> Iterator:
+    """``count`` uniformly spread start times over the last ``days``, oldest first."""
+    span = days * 86400.0
+    offsets = sorted(rng.uniform(0.0, span) for _ in range(count))
+    start = now - timedelta(seconds=span)
+    for offset in offsets:
+        yield start + timedelta(seconds=offset)
+
+
+def generate(
+    rows: int,
+    days: float = 7,
+    seed: int = 0,
+    batch_size: int = 5000,
+    now=None,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Write about ``rows`` entries (whole families, so slightly more) and return the
+    number written. Rollups for them are merged into ``OrbitRollup``.
+    """
+    from django.utils import timezone
+
+    if rows <= 0:
+        return 0
+    if now is None:
+        now = timezone.now()
+    with recording_suspended():
+        return _generate(rows, days, seed, batch_size, now, progress)
+
+
+def _generate(rows, days, seed, batch_size, now, progress) -> int:
+    from orbit.rollups import RollupAccumulator
+    from orbit.writer import _bulk_insert
+
+    factory = FamilyFactory(seed)
+    accumulator = RollupAccumulator()
+    written = 0
+    batch: list = []
+
+    def write(batch):
+        _bulk_insert(batch)
+        for entry in batch:
+            accumulator.observe(
+                entry.type, entry.payload, entry.duration_ms, entry.created_at
+            )
+        accumulator.flush()
+        if progress is not None:
+            progress(written + len(batch))
+
+    # Families average about ten entries; another pass tops up any shortfall
+    while written + len(batch) < rows:
+        families = max(1, (rows - written - len(batch)) // FAMILY_SIZE)
+        for started_at in _start_times(families, days, factory.rng, now):
+            batch.extend(factory.family(started_at))
+            if len(batch) >= batch_size:
+                write(batch)
+                written += len(batch)
+                batch = []
+            if written + len(batch) >= rows:
+                break
+    if batch:
+        write(batch)
+        written += len(batch)
+    return written
+
+
+def reset_storage() -> None:
+    """Delete every entry, interned text and rollup."""
+    from orbit.models import OrbitEntry, OrbitRollup, OrbitText
+    from orbit.rollups import accumulator
+
+    for model in (OrbitEntry, OrbitText, OrbitRollup):
+        model.objects.all()._raw_delete(model.objects.db)
+    accumulator.clear()
+
+
+def grow_to(rows: int, **kwargs) -> int:
+    """Add entries until storage holds at least ``rows``. Returns rows written."""
+    from orbit.models import OrbitEntry
+
+    existing = OrbitEntry.objects.count()
+    if existing >= rows:
+        return 0
+    # A different seed per starting size, so topped-up data doesn't repeat itself
+    kwargs.setdefault("seed", existing)
+    return generate(rows - existing, **kwargs)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fill Orbit storage with test data")
+    parser.add_argument(
+        "--rows", default="100k", help="Entries to hold, e.g. 10k or 1m (default: 100k)"
+    )
+    parser.add_argument(
+        "--days", type=float, default=7, help="Spread entries over this many days"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=5000, help="Entries per bulk insert"
+    )
+    parser.add_argument(
+        "--fresh", action="store_true", help="Delete existing entries first"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    from benchmarks.overhead import setup_django
+
+    args = parse_args(argv)
+    setup_django(reset=False)
+    if args.fresh:
+        reset_storage()
+    grow_to(
+        parse_count(args.rows),
+        days=args.days,
+        batch_size=args.batch_size,
+        progress=lambda count: print(f"\r{count} entries written", end="", flush=True),
+    )
+
+    from orbit.models import OrbitEntry
+
+    print(f"\nStorage holds {OrbitEntry.objects.count()} entries")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
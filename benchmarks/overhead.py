@@ -0,0 +1,414 @@
+"""
+Recording-path overhead benchmark.
+
+Drives a synthetic view through ``OrbitMiddleware`` and reports, per scenario, what
+Orbit adds to each request:
+
+- latency p50 / p99, and the difference to the ``disabled`` scenario;
+- Orbit ``INSERT`` statements and stored entries per request;
+- process CPU time per request (including writer threads);
+- peak memory allocated per request (``tracemalloc``, on a separate short pass).
+
+Scenarios: Orbit disabled, the configured defaults, requests only, and requests plus
+one ``RECORD_*`` flag at a time, so each watcher's own cost is the difference to
+``requests only``.
+
+Run standalone (SQLite in the temp directory, or ``ORBIT_BENCH_DB=postgres``)::
+
+    python -m benchmarks.overhead --requests 500 --queries 10 --cache 20
+    python -m benchmarks.overhead --save baseline.json
+    python -m benchmarks.overhead --baseline baseline.json --max-regression 20
+
+With ``--baseline`` the run exits with status 1 when a scenario's added latency,
+added CPU or inserts per request grew by more than ``--max-regression`` percent (plus
+``--min-delta-ms`` of slack for timer noise), so changes to ``orbit/recorders.py``
+and ``orbit/watchers.py`` can be checked before they ship.
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Watchers the workload exercises, each measured on its own
+WATCHED_FLAGS = (
+    "RECORD_QUERIES",
+    "RECORD_CACHE",
+    "RECORD_LOGS",
+    "RECORD_SIGNALS",
+    "RECORD_MODELS",
+    "RECORD_TRANSACTIONS",
+)
+
+# Metrics compared against a baseline
+REGRESSION_METRICS = (
+    "added_p50_ms",
+    "added_p99_ms",
+    "added_cpu_ms",
+    "inserts_per_request",
+)
+
+PATH = "/bench/"
+
+logger = logging.getLogger("benchmarks.workload")
+
+
+class Workload:
+    """A synthetic view doing a configurable mix of the work Orbit watches."""
+
+    def __init__(self, queries=5, cache=10, logs=2, signals=2, saves=1):
+        from django.dispatch import Signal
+
+        self.queries = queries
+        self.cache = cache
+        self.logs = logs
+        self.signals = signals
+        self.saves = saves
+        self.signal = Signal()
+        self._names = itertools.count()
+
+    def describe(self) -> Dict[str, int]:
+        return {
+            "queries": self.queries,
+            "cache": self.cache,
+            "logs": self.logs,
+            "signals": self.signals,
+            "saves": self.saves,
+        }
+
+    def view(self, request):
+        from django.contrib.auth.models import Group
+        from django.core.cache import cache
+        from django.http import HttpResponse
+
+        for i in range(self.queries):
+            Group.objects.filter(name=f"bench-{i % 3}").first()
+        for i in range(self.cache):
+            if i % 2:
+                cache.get(f"bench:{i}")
+            else:
+                cache.set(f"bench:{i}", i, 60)
+        for i in range(self.logs):
+            logger.warning("benchmark log line %s", i)
+        for i in range(self.signals):
+            self.signal.send(sender=Workload, index=i)
+        for _ in range(self.saves):
+            Group.objects.create(name=f"bench-save-{next(self._names)}")
+        return HttpResponse("ok")
+
+
+def scenarios(flags: Sequence[str] = WATCHED_FLAGS) -> Iterator[Tuple[str, Dict]]:
+    """
+    Yield ``(name, ORBIT_CONFIG overrides)`` for every scenario. ``flags`` picks the
+    single-watcher scenarios; ``requests only`` turns every watched flag off.
+    """
+    yield "disabled", {"ENABLED": False}
+    yield "default", {}
+    only_requests = {flag: False for flag in (*WATCHED_FLAGS, *flags)}
+    yield "requests only", only_requests
+    for flag in flags:
+        yield flag, {**only_requests, flag: True}
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of ``values`` (``q`` in 0-100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class _InsertCounter:
+    """Execute wrapper counting Orbit's own ``INSERT`` statements."""
+
+    def __init__(self):
+        self.inserts = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip()[:6].upper() == "INSERT" and "orbit_" in sql:
+            self.inserts += 1
+        return execute(sql, params, many, context)
+
+
+def _reset_storage() -> None:
+    from django.contrib.auth.models import Group
+
+    from orbit.models import OrbitEntry
+    from orbit.rollups import accumulator
+
+    OrbitEntry.objects.all()._raw_delete(OrbitEntry.objects.db)
+    Group.objects.filter(name__startswith="bench-save-")._raw_delete(Group.objects.db)
+    accumulator.clear()
+
+
+def run_scenario(
+    name: str,
+    overrides: Dict[str, Any],
+    workload: Workload,
+    requests: int = 200,
+    warmup: int = 20,
+    alloc_requests: int = 20,
+    base_config: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Measure one scenario and return its raw numbers."""
+    from django.conf import settings
+    from django.db import connection
+    from django.test import RequestFactory, override_settings
+
+    from orbit.middleware import OrbitMiddleware
+    from orbit.models import OrbitEntry
+    from orbit.rollups import accumulator
+    from orbit.writer import flush_writes
+
+    if base_config is None:
+        base_config = getattr(settings, "ORBIT_CONFIG", {})
+    factory = RequestFactory()
+
+    with override_settings(ORBIT_CONFIG={**base_config, **overrides}):
+        middleware = OrbitMiddleware(workload.view)
+        for _ in range(warmup):
+            middleware(factory.get(PATH))
+        flush_writes()
+        _reset_storage()
+
+        counter = _InsertCounter()
+        latencies: List[float] = []
+        cpu_started = time.process_time()
+        with connection.execute_wrapper(counter):
+            for _ in range(requests):
+                request = factory.get(PATH)
+                started = time.perf_counter()
+                middleware(request)
+                latencies.append((time.perf_counter() - started) * 1000)
+            flush_writes()
+            accumulator.flush()
+        cpu_ms = (time.process_time() - cpu_started) * 1000
+        entries = OrbitEntry.objects.count()
+
+        peaks: List[int] = []
+        if alloc_requests:
+            tracemalloc.start()
+            try:
+                for _ in range(alloc_requests):
+                    request = factory.get(PATH)
+                    tracemalloc.reset_peak()
+                    current = tracemalloc.get_traced_memory()[0]
+                    middleware(request)
+                    peaks.append(tracemalloc.get_traced_memory()[1] - current)
+            finally:
+                tracemalloc.stop()
+            flush_writes()
+        _reset_storage()
+
+    return {
+        "scenario": name,
+        "requests": requests,
+        "p50_ms": round(percentile(latencies, 50), 4),
+        "p99_ms": round(percentile(latencies, 99), 4),
+        "cpu_ms_per_request": round(cpu_ms / requests, 4),
+        "inserts_per_request": round(counter.inserts / requests, 3),
+        "entries_per_request": round(entries / requests, 3),
+        "alloc_kb_per_request": (
+            round(percentile(peaks, 50) / 1024, 2) if peaks else None
+        ),
+    }
+
+
+def run_overhead(
+    workload: Optional[Workload] = None,
+    requests: int = 200,
+    warmup: int = 20,
+    alloc_requests: int = 20,
+    flags: Sequence[str] = WATCHED_FLAGS,
+) -> List[Dict[str, Any]]:
+    """Run every scenario; ``added_*`` values are relative to ``disabled``."""
+    if workload is None:
+        workload = Workload()
+    results = [
+        run_scenario(name, overrides, workload, requests, warmup, alloc_requests)
+        for name, overrides in scenarios(flags)
+    ]
+    base = results[0]
+    for result in results:
+        result["added_p50_ms"] = round(result["p50_ms"] - base["p50_ms"], 4)
+        result["added_p99_ms"] = round(result["p99_ms"] - base["p99_ms"], 4)
+        result["added_cpu_ms"] = round(
+            result["cpu_ms_per_request"] - base["cpu_ms_per_request"], 4
+        )
+    return results
+
+
+def check_regressions(
+    results: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    max_regression: float = 20.0,
+    min_delta_ms: float = 0.05,
+) -> List[str]:
+    """Return a message for every metric that grew beyond the allowed margin."""
+    previous = {row["scenario"]: row for row in baseline}
+    failures = []
+    for result in results:
+        before = previous.get(result["scenario"])
+        if before is None:
+            continue
+        for metric in REGRESSION_METRICS:
+            old, new = before.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            slack = min_delta_ms if metric.endswith("_ms") else 0.0
+            allowed = max(old, 0.0) * (1 + max_regression / 100) + slack
+            if new > allowed:
+                failures.append(
+                    f"{result['scenario']}: {metric} {new} > {allowed:.4f} "
+                    f"(baseline {old})"
+                )
+    return failures
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    columns = (
+        ("scenario", "scenario", 20),
+        ("p50_ms", "p50 ms", 9),
+        ("p99_ms", "p99 ms", 9),
+        ("added_p50_ms", "+p50 ms", 9),
+        ("added_p99_ms", "+p99 ms", 9),
+        ("added_cpu_ms", "+cpu ms", 9),
+        ("inserts_per_request", "inserts", 9),
+        ("entries_per_request", "entries", 9),
+        ("alloc_kb_per_request", "alloc KB", 9),
+    )
+    lines = [
+        "".join(
+            title.rjust(width) if i else title.ljust(width)
+            for i, (_, title, width) in enumerate(columns)
+        )
+    ]
+    for row in results:
+        cells = []
+        for i, (key, _, width) in enumerate(columns):
+            value = row.get(key)
+            text = "-" if value is None else str(value)
+            cells.append(text.rjust(width) if i else text.ljust(width))
+        lines.append("".join(cells))
+    return "\n".join(lines)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure Orbit's per-request overhead")
+    parser.add_argument(
+        "--requests", type=int, default=300, help="Measured requests per scenario"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=30, help="Unmeasured requests per scenario"
+    )
+    parser.add_argument(
+        "--alloc-requests",
+        type=int,
+        default=30,
+        help="Requests traced for allocations (0 = skip)",
+    )
+    for option, default, what in (
+        ("--queries", 5, "SQL queries"),
+        ("--cache", 10, "Cache operations"),
+        ("--logs", 2, "Log records"),
+        ("--signals", 2, "Signals sent"),
+        ("--saves", 1, "Model saves"),
+    ):
+        parser.add_argument(
+            option,
+            type=int,
+            default=default,
+            help=f"{what} per request (default: {default})",
+        )
+    parser.add_argument(
+        "--flag",
+        action="append",
+        dest="flags",
+        metavar="RECORD_X",
+        help="Measure only these RECORD_* flags (repeatable)",
+    )
+    parser.add_argument("--save", metavar="PATH", help="Write the results as JSON")
+    parser.add_argument(
+        "--baseline", metavar="PATH", help="Compare against a saved run"
+    )
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=20.0,
+        help="Allowed growth in percent before a metric fails (default: 20)",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=0.05,
+        help="Extra slack for timing metrics, for timer noise (default: 0.05)",
+    )
+    return parser.parse_args(argv)
+
+
+def setup_django(reset: bool = True) -> None:
+    """
+    Configure Django with ``benchmarks.settings`` unless settings are already set, and
+    create the tables. ``reset`` empties the entries a previous run left behind.
+    """
+    import django
+    from django.core.management import call_command
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+    django.setup()
+    call_command("migrate", run_syncdb=True, verbosity=0)
+    if reset:
+        _reset_storage()
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    setup_django()
+    workload = Workload(
+        queries=args.queries,
+        cache=args.cache,
+        logs=args.logs,
+        signals=args.signals,
+        saves=args.saves,
+    )
+    results = run_overhead(
+        workload,
+        requests=args.requests,
+        warmup=args.warmup,
+        alloc_requests=args.alloc_requests,
+        flags=tuple(args.flags or WATCHED_FLAGS),
+    )
+    print(f"Workload per request: {workload.describe()}")
+    print(format_table(results))
+
+    if args.save:
+        with open(args.save, "w") as handle:
+            json.dump(
+                {"workload": workload.describe(), "results": results}, handle, indent=2
+            )
+        print(f"Saved results to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        if baseline.get("workload") != workload.describe():
+            print("Warning: the baseline was recorded with a different workload")
+        failures = check_regressions(
+            results, baseline["results"], args.max_regression, args.min_delta_ms
+        )
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            return 1
+        print("No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
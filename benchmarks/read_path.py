@@ -0,0 +1,505 @@
+"""
+Read-path benchmark.
+
+Grows Orbit storage through a series of sizes (10k, 100k, 1M and 10M entries by
+default) with ``benchmarks.dataset`` and, at each size, times everything that reads
+it:
+
+- every view in ``orbit/urls.py``, through the test client (with a few filter
+  variants of the feed);
+- every public function in ``orbit/stats.py``;
+- every tool in ``orbit.agentic.HIGH_LEVEL_TOOLS``.
+
+Each target reports its median time, the number of queries it ran, and its slowest
+query; with ``--plans`` that query's ``EXPLAIN`` output is kept in the saved JSON.
+The ``scaling`` column is the exponent of time against rows since the previous
+size: about 0 for a target that reads a bounded window, 1 for one that scans
+everything. Targets at or above ``--cliff-exponent`` are listed as scaling cliffs.
+
+Run standalone (SQLite in the temp directory, or ``ORBIT_BENCH_DB=postgres``)::
+
+    python -m benchmarks.read_path --levels 10k,100k,1m
+    python -m benchmarks.read_path --levels 1m --target stats --plans --save run.json
+
+Data is kept between runs, so a later run with bigger levels only adds the
+difference. ``--fresh`` starts from empty storage.
+"""
+
+import argparse
+import inspect
+import json
+import math
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_LEVELS = "10k,100k,1m,10m"
+
+# Views that aren't timed, and why
+SKIPPED_VIEWS = {
+    "clear": "deletes every entry",
+    "stream": "long-lived event stream",
+}
+
+Target = Tuple[str, str, Callable[[], Any]]
+
+
+def pick_samples() -> Dict[str, Any]:
+    """Entries and values for targets that need an id, family, path or fingerprint."""
+    from orbit.models import OrbitEntry
+
+    newest = OrbitEntry.objects.order_by("-created_at")
+    request = (
+        newest.filter(type=OrbitEntry.TYPE_REQUEST, status_code=500).first()
+        or newest.filter(type=OrbitEntry.TYPE_REQUEST).first()
+    )
+    if request is None:
+        raise RuntimeError("No request entries to benchmark; generate data first")
+    family = newest.filter(family_hash=request.family_hash)
+    query = (
+        family.filter(type=OrbitEntry.TYPE_QUERY).first()
+        or newest.filter(type=OrbitEntry.TYPE_QUERY).first()
+    )
+    exception = (
+        family.filter(type=OrbitEntry.TYPE_EXCEPTION).first()
+        or newest.filter(type=OrbitEntry.TYPE_EXCEPTION).first()
+    )
+    return {
+        "request_id": request.id,
+        "family_hash": request.family_hash,
+        "path": request.path,
+        "method": request.method,
+        "query_id": query.id if query else request.id,
+        "exception_id": exception.id if exception else request.id,
+        "fingerprint": exception.fingerprint if exception else "",
+        "exception_type": (
+            exception.payload.get("exception_type", "") if exception else "error"
+        ),
+    }
+
+
+def view_cases(
+    samples: Dict[str, Any], time_range: str
+) -> List[Tuple[str, dict, dict]]:
+    """``(url name, url kwargs, query string)`` for every timed view request."""
+    from orbit.views import OrbitStatsSectionView
+
+    cases = [
+        ("dashboard", {}, {}),
+        ("feed", {}, {}),
+        ("feed", {}, {"type": "request"}),
+        ("feed", {}, {"type": "query"}),
+        ("feed", {}, {"type": "exception"}),
+        ("feed", {}, {"family": samples["family_hash"]}),
+        ("feed", {}, {"q": samples["exception_type"] or "error"}),
+        ("feed", {}, {"page": 40}),
+        ("detail", {"entry_id": samples["request_id"]}, {}),
+        ("agent_prompt", {"entry_id": samples["exception_id"]}, {}),
+        ("explain", {"entry_id": samples["query_id"]}, {}),
+        ("export", {"entry_id": samples["request_id"]}, {}),
+        ("export_all", {}, {"family": samples["family_hash"]}),
+        ("export_all", {}, {}),
+        ("stats", {}, {"range": time_range}),
+    ]
+    cases.extend(
+        ("stats_section", {"section": section}, {"range": time_range})
+        for section in OrbitStatsSectionView.SECTIONS
+    )
+    cases.append(("health", {}, {}))
+    cases.append(("metrics", {}, {}))
+    return cases
+
+
+def tool_arguments(samples: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Keyword arguments for each agentic tool."""
+    request = {"source_type": "family_hash", "source_value": samples["family_hash"]}
+    group = {"source_type": "fingerprint", "source_value": samples["fingerprint"]}
+    endpoint = {"path": samples["path"], "method": samples["method"]}
+    return {
+        "audit_mcp_exposure": {},
+        "investigate_request": {"family_hash": samples["family_hash"]},
+        "investigate_exception_group": {"fingerprint": samples["fingerprint"]},
+        "create_incident_bundle": request,
+        "preview_masked_entry": {"entry_id": str(samples["request_id"])},
+        "find_sensitive_payload_risks": {},
+        "list_agent_safe_fields": {"entry_type": "request"},
+        "build_debug_brief": {"query": samples["exception_type"] or "error"},
+        "investigate_endpoint": endpoint,
+        "compare_endpoint_windows": endpoint,
+        "find_n_plus_one_candidates": {},
+        "summarize_exception_groups": {},
+        "daily_health_brief": {},
+        "generate_release_risk_brief": {},
+        "generate_pr_context": group,
+        "propose_fix_hypotheses": group,
+        "propose_test_plan": request,
+    }
+
+
+def _missing(message: str) -> Callable[[], Any]:
+    def fail():
+        raise LookupError(message)
+
+    return fail
+
+
+def view_targets(samples: Dict[str, Any], time_range: str = "24h") -> List[Target]:
+    from urllib.parse import urlencode
+
+    from django.test import Client
+    from django.urls import reverse
+
+    from orbit.urls import urlpatterns
+
+    client = Client()
+
+    def fetch(url):
+        def run():
+            response = client.get(url)
+            if getattr(response, "streaming", False):
+                for _ in response.streaming_content:
+                    pass
+            if response.status_code >= 400:
+                raise RuntimeError(f"HTTP {response.status_code}")
+
+        return run
+
+    targets = []
+    covered = set()
+    for name, kwargs, query in view_cases(samples, time_range):
+        covered.add(name)
+        url = reverse(f"orbit:{name}", kwargs=kwargs)
+        if query:
+            url = f"{url}?{urlencode(query)}"
+        # Sample ids and hashes change between runs; keep labels comparable
+        label = name + "".join(
+            f" {key}={value}" for key, value in kwargs.items() if key != "entry_id"
+        )
+        label += "".join(
+            f" {key}={'<sample>' if key in ('family', 'q') else value}"
+            for key, value in query.items()
+        )
+        targets.append(("view", label, fetch(url)))
+    for pattern in urlpatterns:
+        if pattern.name not in covered and pattern.name not in SKIPPED_VIEWS:
+            targets.append(
+                ("view", pattern.name, _missing("no benchmark case for this view"))
+            )
+    return targets
+
+
+def stats_targets(time_range: str = "24h") -> List[Target]:
+    from orbit import stats
+
+    targets = []
+    for name, func in inspect.getmembers(stats, inspect.isfunction):
+        if name.startswith("_") or func.__module__ != stats.__name__:
+            continue
+        parameters = inspect.signature(func).parameters
+        if "time_range" in parameters:
+            call = (lambda func: lambda: func(time_range=time_range))(func)
+        elif "range_key" in parameters:
+            call = (lambda func: lambda: func(time_range))(func)
+        else:
+            call = func
+        targets.append(("stats", name, call))
+    return targets
+
+
+def tool_targets(samples: Dict[str, Any]) -> List[Target]:
+    from orbit import agentic
+
+    arguments = tool_arguments(samples)
+    targets = []
+    for name in agentic.HIGH_LEVEL_TOOLS:
+        func = getattr(agentic, name, None)
+        if func is None or name not in arguments:
+            call = _missing("no benchmark arguments for this tool")
+        else:
+            call = (lambda func, kwargs: lambda: func(**kwargs))(func, arguments[name])
+        targets.append(("tool", name, call))
+    return targets
+
+
+def all_targets(time_range: str = "24h") -> List[Target]:
+    samples = pick_samples()
+    return (
+        view_targets(samples, time_range)
+        + stats_targets(time_range)
+        + tool_targets(samples)
+    )
+
+
+def measure(
+    call: Callable[[], Any], repeat: int = 3, plans: bool = False
+) -> Dict[str, Any]:
+    """Time ``call`` and report the queries of its last run. Never raises."""
+    from django.db import connections
+    from django.test.utils import CaptureQueriesContext
+
+    from orbit.backends import get_storage_db_alias
+    from orbit.explain import explain_query
+
+    alias = get_storage_db_alias()
+    timings: List[float] = []
+    error = None
+    captured: list = []
+    for _ in range(max(1, repeat)):
+        with CaptureQueriesContext(connections[alias]) as context:
+            started = time.perf_counter()
+            try:
+                call()
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+            timings.append((time.perf_counter() - started) * 1000)
+        captured = context.captured_queries
+        if error is not None:
+            break
+
+    slowest = max(captured, key=lambda query: float(query["time"]), default=None)
+    result = {
+        "ms": round(sorted(timings)[len(timings) // 2], 3),
+        "queries": len(captured),
+        "query_ms": round(sum(float(query["time"]) for query in captured) * 1000, 3),
+        "slowest_query_ms": (
+            round(float(slowest["time"]) * 1000, 3) if slowest is not None else None
+        ),
+        "slowest_sql": slowest["sql"] if slowest is not None else None,
+        "error": error,
+    }
+    if plans and slowest is not None:
+        explained = explain_query(slowest["sql"], using=alias)
+        result["plan"] = explained.get("plan") or explained.get("error")
+    return result
+
+
+def run_level(
+    targets: Iterable[Target],
+    rows: int,
+    repeat: int = 3,
+    plans: bool = False,
+    skip: Optional[Dict[str, str]] = None,
+) -> List[Dict[str, Any]]:
+    """Measure every target against the current storage (holding ``rows`` entries)."""
+    skip = skip or {}
+    results = []
+    for group, name, call in targets:
+        target = f"{group}:{name}"
+        row: Dict[str, Any] = {"rows": rows, "target": target}
+        if target in skip:
+            row["skipped"] = skip[target]
+        else:
+            row.update(measure(call, repeat, plans))
+        results.append(row)
+    return results
+
+
+def add_scaling(results: List[Dict[str, Any]]) -> None:
+    """Set each row's ``scaling``: d log(time) / d log(rows) since the last size."""
+    previous: Dict[str, Dict[str, Any]] = {}
+    for row in results:
+        before = previous.get(row["target"])
+        row["scaling"] = None
+        if (
+            before is not None
+            and before.get("ms")
+            and row.get("ms")
+            and row["rows"] > before["rows"]
+        ):
+            row["scaling"] = round(
+                math.log(row["ms"] / before["ms"])
+                / math.log(row["rows"] / before["rows"]),
+                2,
+            )
+        if row.get("ms") is not None:
+            previous[row["target"]] = row
+
+
+def find_cliffs(
+    results: List[Dict[str, Any]], max_exponent: float = 0.5, min_ms: float = 50.0
+) -> List[str]:
+    """Targets that grow with storage and are already slow enough to notice."""
+    cliffs = []
+    for row in results:
+        scaling = row.get("scaling")
+        if scaling is not None and scaling >= max_exponent and row["ms"] >= min_ms:
+            cliffs.append(
+                f"{row['target']}: {row['ms']} ms at {row['rows']} rows "
+                f"(scaling {scaling})"
+            )
+    return cliffs
+
+
+def run_read_path(
+    levels: Sequence[int],
+    days: float = 7,
+    repeat: int = 3,
+    plans: bool = False,
+    time_range: str = "24h",
+    max_seconds: Optional[float] = 60.0,
+    only: Sequence[str] = (),
+    progress: Optional[Callable[[str], None]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Grow storage to each of ``levels`` in turn and measure every target there. A
+    target slower than ``max_seconds`` is skipped at the bigger sizes.
+    """
+    from benchmarks.dataset import grow_to, recording_suspended
+    from orbit.models import OrbitEntry
+
+    results: List[Dict[str, Any]] = []
+    skip: Dict[str, str] = {}
+    for level in sorted(levels):
+        if progress is not None:
+            progress(f"Growing storage to {level} entries")
+        grow_to(level, days=days)
+        rows = OrbitEntry.objects.count()
+        targets = [
+            target
+            for target in all_targets(time_range)
+            if not only or any(text in f"{target[0]}:{target[1]}" for text in only)
+        ]
+        if progress is not None:
+            progress(f"Measuring {len(targets)} targets at {rows} entries")
+        with recording_suspended():
+            level_results = run_level(targets, rows, repeat, plans, skip)
+        for row in level_results:
+            if max_seconds and (row.get("ms") or 0) > max_seconds * 1000:
+                skip[row["target"]] = f"over {max_seconds:g}s at {rows} rows"
+        results.extend(level_results)
+    add_scaling(results)
+    return results
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    columns = (
+        ("rows", "rows", 10),
+        ("target", "target", 50),
+        ("ms", "ms", 11),
+        ("queries", "queries", 9),
+        ("slowest_query_ms", "slowest ms", 12),
+        ("scaling", "scaling", 9),
+    )
+    lines = [
+        " ".join(
+            title.ljust(width) if key == "target" else title.rjust(width)
+            for key, title, width in columns
+        )
+    ]
+    for row in results:
+        cells = []
+        for key, _, width in columns:
+            value = row.get(key)
+            text = "-" if value is None else str(value)
+            cells.append(text.ljust(width) if key == "target" else text.rjust(width))
+        note = row.get("error") or row.get("skipped")
+        lines.append(" ".join(cells) + (f"  {note}" if note else ""))
+    return "\n".join(lines)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Time Orbit's views, stats and agent tools as storage grows"
+    )
+    parser.add_argument(
+        "--levels",
+        default=DEFAULT_LEVELS,
+        help=f"Comma-separated storage sizes (default: {DEFAULT_LEVELS})",
+    )
+    parser.add_argument(
+        "--days", type=float, default=7, help="Spread entries over this many days"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Timed runs per target (median is kept)"
+    )
+    parser.add_argument(
+        "--range",
+        dest="time_range",
+        default="24h",
+        choices=("1h", "6h", "24h", "7d"),
+        help="Time range for stats functions and views (default: 24h)",
+    )
+    parser.add_argument(
+        "--target",
+        action="append",
+        dest="only",
+        metavar="TEXT",
+        help="Only targets whose name contains TEXT, e.g. stats or view:feed "
+        "(repeatable)",
+    )
+    parser.add_argument(
+        "--plans",
+        action="store_true",
+        help="EXPLAIN each target's slowest query (kept in --save output)",
+    )
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=60.0,
+        help="Skip a target at bigger sizes once it takes longer (default: 60)",
+    )
+    parser.add_argument(
+        "--cliff-exponent",
+        type=float,
+        default=0.5,
+        help="Report targets whose scaling reaches this (default: 0.5)",
+    )
+    parser.add_argument(
+        "--cliff-min-ms",
+        type=float,
+        default=50.0,
+        help="Ignore cliffs in targets faster than this (default: 50)",
+    )
+    parser.add_argument(
+        "--fail-on-cliff",
+        action="store_true",
+        help="Exit with status 1 when a scaling cliff is found",
+    )
+    parser.add_argument(
+        "--fresh", action="store_true", help="Delete existing entries first"
+    )
+    parser.add_argument("--save", metavar="PATH", help="Write the results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    from benchmarks.dataset import parse_count, reset_storage
+    from benchmarks.overhead import setup_django
+
+    args = parse_args(argv)
+    setup_django(reset=False)
+    if args.fresh:
+        reset_storage()
+    levels = [parse_count(level) for level in args.levels.split(",") if level.strip()]
+    results = run_read_path(
+        levels,
+        days=args.days,
+        repeat=args.repeat,
+        plans=args.plans,
+        time_range=args.time_range,
+        max_seconds=args.max_seconds,
+        only=args.only or (),
+        progress=print,
+    )
+    print(format_table(results))
+
+    if args.save:
+        with open(args.save, "w") as handle:
+            json.dump(
+                {"days": args.days, "time_range": args.time_range, "results": results},
+                handle,
+                indent=2,
+                default=str,
+            )
+        print(f"Saved results to {args.save}")
+
+    cliffs = find_cliffs(results, args.cliff_exponent, args.cliff_min_ms)
+    for cliff in cliffs:
+        print(f"CLIFF {cliff}")
+    if cliffs and args.fail_on_cliff:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Settings for running the benchmarks standalone.
+
+SQLite by default (a file in the temp directory, so the writer threads share it). Set
+``ORBIT_BENCH_DB=postgres`` to use a local PostgreSQL; the connection is read from the
+usual ``PGHOST``/``PGPORT``/``PGUSER``/``PGPASSWORD``/``PGDATABASE`` variables.
+"""
+
+import os
+import tempfile
+
+SECRET_KEY = "django-orbit-benchmarks-not-for-production"
+DEBUG = False
+USE_TZ = True
+ALLOWED_HOSTS = ["*"]
+
+INSTALLED_APPS = [
+    "django.contrib.contenttypes",
+    "django.contrib.auth",
+    "orbit",
+]
+
+if os.environ.get("ORBIT_BENCH_DB") == "postgres":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("PGDATABASE", "orbit_bench"),
+            "USER": os.environ.get("PGUSER", ""),
+            "PASSWORD": os.environ.get("PGPASSWORD", ""),
+            "HOST": os.environ.get("PGHOST", "localhost"),
+            "PORT": os.environ.get("PGPORT", "5432"),
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get(
+                "ORBIT_BENCH_SQLITE",
+                os.path.join(tempfile.gettempdir(), "orbit_bench.sqlite3"),
+            ),
+        }
+    }
+
+# The read-path benchmark requests Orbit's own views
+ROOT_URLCONF = "benchmarks.urls"
+STATIC_URL = "static/"
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "APP_DIRS": True,
+        "OPTIONS": {
+            "context_processors": ["django.template.context_processors.request"],
+        },
+    },
+]
+
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+LOGGING = {}
+
+# Every watcher the workload exercises is installed; scenarios switch them per run
+ORBIT_CONFIG = {
+    "ENABLED": True,
+    "AUTH_CHECK": None,
+    "RECORD_SIGNALS": True,
+    "RECORD_TRANSACTIONS": True,
+    "RETENTION_SCHEDULER": None,
+    "STORAGE_LIMIT": None,
+}
@@ -0,0 +1,7 @@
+"""URLs for the read-path benchmark."""
+
+from django.urls import include, path
+
+urlpatterns = [
+    path("orbit/", include("orbit.urls")),
+]
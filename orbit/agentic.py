@@ -12,11 +12,12 @@ import json
 from collections import Counter
 from typing import Any, Iterable
 
-from django.db.models import Avg, Count, Max, Min, Q
+from django.db.models import Avg, Count, Max, Min, Q, Sum
 from django.utils import timezone
 
 from orbit.conf import get_config
 from orbit.models import OrbitEntry
+from orbit.sketch import DDSketch
 from orbit.utils import mask_sensitive_data, parse_tags, serialize_for_json
 
 HIGH_LEVEL_TOOLS = [
@@ -259,22 +260,62 @@ def _query_analysis(entries: list[OrbitEntry]) -> dict[str, Any]:
     top_slow = sorted(queries, key=lambda entry: entry.duration_ms or 0, reverse=True)[
         :5
     ]
-    duplicate_signatures = Counter(
-        (entry.payload.get("sql") or "")[:180] for entry in duplicate
-    )
+    # Group by SQL fingerprint so repeats with different literals/IN-list sizes match
+    duplicate_signatures = Counter()
+    previews = {}
+    for entry in duplicate:
+        sql = entry.payload.get("sql") or ""
+        key = entry.fingerprint or sql[:180]
+        duplicate_signatures[key] += 1
+        previews.setdefault(key, sql[:180])
     return {
         "total": len(queries),
         "slow_count": len(slow),
         "duplicate_count": len(duplicate),
         "top_slow": _serialize_entries(top_slow, limit=5),
         "duplicate_signatures": [
-            {"sql_preview": sql, "count": count}
-            for sql, count in duplicate_signatures.most_common(5)
-            if sql
+            {"fingerprint": key, "sql_preview": previews[key], "count": count}
+            for key, count in duplicate_signatures.most_common(5)
+            if previews[key]
         ],
     }
 
 
+def duplicate_query_signatures(
+    family_hash: str, limit: int = 5
+) -> list[dict[str, Any]]:
+    """
+    Repeated query executions in a request family, grouped by fingerprint in the DB.
+
+    Shared by ``find_n_plus_one_candidates`` and the MCP ``get_n1_patterns`` tool.
+    """
+    queries = OrbitEntry.objects.queries().filter(family_hash=family_hash)
+    rows = (
+        queries.filter(is_duplicate=True)
+        .exclude(fingerprint="")
+        .values("fingerprint")
+        # Interned statements come from the small OrbitText table in the same query
+        .annotate(count=Count("id"), interned_sql=Max("text__text"))
+        .order_by("-count")[:limit]
+    )
+    signatures = []
+    for row in rows:
+        sql = row["interned_sql"]
+        if not sql:
+            sample = (
+                queries.filter(fingerprint=row["fingerprint"]).only("payload").first()
+            )
+            sql = (sample.payload.get("sql") or "") if sample is not None else ""
+        signatures.append(
+            {
+                "fingerprint": row["fingerprint"],
+                "sql_preview": sql[:180],
+                "count": row["count"],
+            }
+        )
+    return signatures
+
+
 def _timeline(entries: list[OrbitEntry]) -> list[dict[str, Any]]:
     ordered = sorted(entries, key=lambda entry: entry.created_at)
     first = ordered[0].created_at if ordered else None
@@ -334,7 +375,7 @@ def audit_mcp_exposure() -> dict[str, Any]:
 
 
 def _sensitive_key_fragments() -> list[str]:
-    return [str(key).lower() for key in get_config().get("MASK_KEYS", [])]
+    return list(get_config().mask_keys)
 
 
 def _key_looks_sensitive(key: Any) -> bool:
@@ -482,13 +523,11 @@ def _affected_paths_for_families(family_hashes: list[str]) -> list[dict[str, Any
         OrbitEntry.objects.filter(
             type=OrbitEntry.TYPE_REQUEST, family_hash__in=family_hashes
         )
-        .values("payload__path")
+        .values("path")
         .annotate(count=Count("id"))
         .order_by("-count")[:10]
     )
-    return [
-        {"path": row.get("payload__path") or "?", "count": row["count"]} for row in rows
-    ]
+    return [{"path": row.get("path") or "?", "count": row["count"]} for row in rows]
 
 
 def investigate_exception_group(
@@ -847,9 +886,12 @@ def _search_terms(query: str) -> list[str]:
 
 
 def _build_search_q(terms: list[str]) -> Q:
+    from orbit.search import search_q
+
+    # search_text covers payload keys/values and tags
     condition = Q()
     for term in terms:
-        condition |= Q(payload__icontains=term) | Q(tags__icontains=term)
+        condition |= search_q(term)
     return condition
 
 
@@ -926,9 +968,13 @@ def _window_start(hours: int) -> Any:
 
 
 def _request_filter(path: str, method: str | None = None) -> Q:
-    condition = Q(payload__path=path) | Q(payload__full_path=path)
+    # Only the path (not the query string) has an indexed column
+    if "?" in path:
+        condition = Q(payload__full_path=path)
+    else:
+        condition = Q(path=path[:255])
     if method:
-        condition &= Q(payload__method=str(method).upper())
+        condition &= Q(method=str(method).upper()[:10])
     return condition
 
 
@@ -1048,40 +1094,70 @@ def investigate_endpoint(
     }
 
 
-def _endpoint_window_metrics(requests: list[OrbitEntry]) -> dict[str, Any]:
-    request_count = len(requests)
-    error_count = sum(1 for request in requests if request.is_error)
-    durations = sorted(
-        float(request.duration_ms)
-        for request in requests
-        if request.duration_ms is not None
+def _endpoint_window_sketch(
+    requests, timed_count: int, path: str, method: str | None, start, end
+) -> DDSketch:
+    """
+    Duration sketch of one endpoint window, merged from the per-endpoint rollups.
+
+    Raw durations are streamed only when the rollups don't cover every timed request
+    in the window: a path with a query string, pruned or capped rollup rows, or
+    totals still pending in another process.
+    """
+    from orbit import rollups
+
+    if "?" not in path:
+        totals = rollups.window_totals(
+            OrbitEntry.TYPE_REQUEST,
+            start,
+            end,
+            method=str(method).upper()[:10] if method else None,
+            endpoint=path[:255],
+        )
+        if totals["sketch"].count == timed_count:
+            return totals["sketch"]
+    return DDSketch().extend(
+        requests.filter(duration_ms__isnull=False)
+        .values_list("duration_ms", flat=True)
+        .iterator()
     )
-    avg_duration = round(sum(durations) / len(durations), 1) if durations else None
-    p95_duration = None
-    if durations:
-        index = max(0, min(len(durations) - 1, int(len(durations) * 0.95) - 1))
-        p95_duration = round(durations[index], 1)
-    duplicate_query_count = sum(
-        int(request.payload.get("duplicate_query_count") or 0) for request in requests
+
+
+def _endpoint_window_metrics(
+    requests, path: str, method: str | None, start, end
+) -> dict[str, Any]:
+    """Aggregate one endpoint window in the database; p95 comes from the rollups."""
+    requests = requests.order_by()
+    totals = requests.aggregate(
+        request_count=Count("id"),
+        timed_count=Count("duration_ms"),
+        error_count=Count("id", filter=Q(status_code__gte=400)),
+        avg_duration=Avg("duration_ms"),
+        duplicate_query_count=Sum("duplicate_query_count"),
     )
-    family_hashes = _request_family_hashes(requests)
-    exception_fingerprints = []
-    if family_hashes:
-        exception_fingerprints = [
-            fingerprint
-            for fingerprint in OrbitEntry.objects.exceptions()
-            .filter(family_hash__in=family_hashes)
-            .exclude(fingerprint="")
-            .values_list("fingerprint", flat=True)
-            .distinct()
-        ]
+    request_count = totals["request_count"]
+    error_count = totals["error_count"]
+    avg_duration = totals["avg_duration"]
+    p95_duration = None
+    if totals["timed_count"]:
+        p95_duration = _endpoint_window_sketch(
+            requests, totals["timed_count"], path, method, start, end
+        ).quantile(0.95)
+    exception_fingerprints = [
+        fingerprint
+        for fingerprint in OrbitEntry.objects.exceptions()
+        .filter(family_hash__in=requests.exclude(family_hash="").values("family_hash"))
+        .exclude(fingerprint="")
+        .values_list("fingerprint", flat=True)
+        .distinct()
+    ]
     return {
         "request_count": request_count,
         "error_count": error_count,
         "error_rate_pct": _percent(error_count, request_count),
-        "avg_duration_ms": avg_duration,
-        "p95_duration_ms": p95_duration,
-        "duplicate_query_count": duplicate_query_count,
+        "avg_duration_ms": round(avg_duration, 1) if avg_duration is not None else None,
+        "p95_duration_ms": round(p95_duration, 1) if p95_duration is not None else None,
+        "duplicate_query_count": totals["duplicate_query_count"] or 0,
         "exception_fingerprints": sorted(exception_fingerprints),
     }
 
@@ -1145,23 +1221,28 @@ def compare_endpoint_windows(
         safe_baseline_hours = 24
 
     now = timezone.now()
-    current_start = now - timezone.timedelta(hours=safe_current_hours)
+    # Windows start on a minute so they line up with the rollup buckets
+    current_start = (now - timezone.timedelta(hours=safe_current_hours)).replace(
+        second=0, microsecond=0
+    )
     baseline_start = current_start - timezone.timedelta(hours=safe_baseline_hours)
     condition = _request_filter(path, method)
-    current_requests = list(
+    current_requests = (
         OrbitEntry.objects.requests()
         .filter(created_at__gte=current_start, created_at__lte=now)
         .filter(condition)
-        .order_by("-created_at")
     )
-    baseline_requests = list(
+    baseline_requests = (
         OrbitEntry.objects.requests()
         .filter(created_at__gte=baseline_start, created_at__lt=current_start)
         .filter(condition)
-        .order_by("-created_at")
     )
-    current_metrics = _endpoint_window_metrics(current_requests)
-    baseline_metrics = _endpoint_window_metrics(baseline_requests)
+    current_metrics = _endpoint_window_metrics(
+        current_requests, path, method, current_start, now
+    )
+    baseline_metrics = _endpoint_window_metrics(
+        baseline_requests, path, method, baseline_start, current_start
+    )
     new_fingerprints = sorted(
         set(current_metrics["exception_fingerprints"])
         - set(baseline_metrics["exception_fingerprints"])
@@ -1215,17 +1296,11 @@ def find_n_plus_one_candidates(
     since = _window_start(hours)
     requests = list(
         OrbitEntry.objects.requests()
-        .filter(created_at__gte=since, payload__duplicate_query_count__gt=0)
-        .order_by("-payload__duplicate_query_count", "-duration_ms")[:safe_limit]
+        .filter(created_at__gte=since, duplicate_query_count__gt=0)
+        .order_by("-duplicate_query_count", "-duration_ms")[:safe_limit]
     )
     candidates = []
     for request in requests:
-        related = list(
-            OrbitEntry.objects.filter(family_hash=request.family_hash).order_by(
-                "created_at"
-            )
-        )
-        query_analysis = _query_analysis(related)
         candidates.append(
             {
                 "entry_id": str(request.id),
@@ -1237,7 +1312,7 @@ def find_n_plus_one_candidates(
                     "duplicate_query_count", 0
                 ),
                 "query_count": request.payload.get("query_count"),
-                "duplicate_signatures": query_analysis["duplicate_signatures"],
+                "duplicate_signatures": duplicate_query_signatures(request.family_hash),
                 "request": agent_safe_serialize_entry(request, include_payload=False),
                 "suggested_tools": [
                     {
@@ -1315,11 +1390,7 @@ def _failed_jobs_since(since: Any):
     return (
         OrbitEntry.objects.jobs()
         .filter(created_at__gte=since)
-        .filter(
-            Q(payload__status="failed")
-            | Q(payload__status="error")
-            | Q(payload__success=False)
-        )
+        .filter(Q(outcome__in=["failed", "error"]) | Q(payload__success=False))
     )
 
 
@@ -1329,19 +1400,20 @@ def daily_health_brief(hours: int = 24, limit: int | None = None) -> dict[str, A
     since = _window_start(hours)
     base = OrbitEntry.objects.filter(created_at__gte=since)
     requests = base.filter(type=OrbitEntry.TYPE_REQUEST)
-    error_requests = [entry for entry in requests if entry.is_error]
+    error_requests = list(requests.filter(has_error=True)[:safe_limit])
+    error_request_count = requests.filter(has_error=True).count()
     exceptions = list(
         base.filter(type=OrbitEntry.TYPE_EXCEPTION).order_by("-created_at")[:safe_limit]
     )
     slow_queries = list(
-        base.filter(type=OrbitEntry.TYPE_QUERY, payload__is_slow=True).order_by(
-            "-duration_ms"
-        )[:safe_limit]
+        base.filter(type=OrbitEntry.TYPE_QUERY, is_slow=True).order_by("-duration_ms")[
+            :safe_limit
+        ]
     )
     duplicate_requests = list(
-        requests.filter(payload__duplicate_query_count__gt=0).order_by(
-            "-payload__duplicate_query_count"
-        )[:safe_limit]
+        requests.filter(duplicate_query_count__gt=0).order_by("-duplicate_query_count")[
+            :safe_limit
+        ]
     )
     failed_jobs = list(_failed_jobs_since(since).order_by("-created_at")[:safe_limit])
     warning_logs = list(
@@ -1400,13 +1472,13 @@ def daily_health_brief(hours: int = 24, limit: int | None = None) -> dict[str, A
         "hours": hours,
         "summary": {
             "requests": requests.count(),
-            "error_requests": len(error_requests),
+            "error_requests": error_request_count,
             "exceptions": base.filter(type=OrbitEntry.TYPE_EXCEPTION).count(),
             "slow_queries": base.filter(
-                type=OrbitEntry.TYPE_QUERY, payload__is_slow=True
+                type=OrbitEntry.TYPE_QUERY, is_slow=True
             ).count(),
             "n_plus_one_candidates": requests.filter(
-                payload__duplicate_query_count__gt=0
+                duplicate_query_count__gt=0
             ).count(),
             "failed_jobs": _failed_jobs_since(since).count(),
             "warning_logs": base.filter(
@@ -1439,22 +1511,21 @@ def generate_release_risk_brief(
     safe_limit = _safe_limit(limit, 10)
     since = _window_start(hours)
     base = OrbitEntry.objects.filter(created_at__gte=since)
-    requests = list(base.filter(type=OrbitEntry.TYPE_REQUEST))
-    error_requests = [entry for entry in requests if entry.is_error]
+    error_requests = base.filter(type=OrbitEntry.TYPE_REQUEST, has_error=True)
     exceptions = list(
         base.filter(type=OrbitEntry.TYPE_EXCEPTION).order_by("-created_at")[:safe_limit]
     )
     slow_queries = list(
-        base.filter(type=OrbitEntry.TYPE_QUERY, payload__is_slow=True).order_by(
-            "-duration_ms"
-        )[:safe_limit]
+        base.filter(type=OrbitEntry.TYPE_QUERY, is_slow=True).order_by("-duration_ms")[
+            :safe_limit
+        ]
     )
     failed_jobs = list(_failed_jobs_since(since).order_by("-created_at")[:safe_limit])
     blockers: list[str] = []
     cautions: list[str] = []
     if exceptions:
         blockers.append("exception_groups")
-    if error_requests:
+    if error_requests.exists():
         blockers.append("error_requests")
     if failed_jobs:
         blockers.append("failed_jobs")
@@ -1479,8 +1550,10 @@ def generate_release_risk_brief(
         "cautions": cautions,
         "checks": {
             "error_requests": {
-                "count": len(error_requests),
-                "examples": _serialize_entries(error_requests, limit=safe_limit),
+                "count": error_requests.count(),
+                "examples": _serialize_entries(
+                    list(error_requests[:safe_limit]), limit=safe_limit
+                ),
             },
             "exception_groups": {
                 "count": len(exceptions),
@@ -0,0 +1,301 @@
+"""
+Django Orbit Aggregate Recording
+
+Cache gets, Redis commands and signals fire many times per request, and one row per
+event multiplies the size of the entry table. Entry types listed in
+``AGGREGATE_EVENTS`` are counted here instead of being written one by one. Events are
+grouped (the cache operation and key prefix, the Redis command, the signal name) and
+each group keeps its count, hits and misses, errors, total and maximum duration and a
+latency sketch (``orbit.sketch``).
+
+- During a request handled by ``OrbitMiddleware`` the groups live on the request's
+  ``OrbitContext``. ``flush_context()`` turns them into one summary entry per type,
+  written with the rest of the request family.
+- Anywhere else (tasks, commands, threads) the groups accumulate per process and are
+  written as one summary entry per type every ``AGGREGATE_BUCKET_SECONDS`` by a
+  background thread, and at exit. The thread runs only while groups are pending, so
+  recording an event never writes to the database itself.
+
+A summary entry keeps the type of the events it counts. Its payload has
+``"aggregate": True``, the number of operations and one dict per group, busiest
+first, at most ``AGGREGATE_MAX_GROUPS`` (the rest are folded into ``"(other)"``).
+Every event is still counted in the stats rollups, so stats and hit rates don't
+change; the rollups skip the summary entries themselves.
+"""
+
+import atexit
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from orbit.conf import get_config
+from orbit.context import get_context
+from orbit.sketch import DDSketch
+
+OTHER = "(other)"
+
+_SEPARATOR = re.compile(r"[:./|]")
+_DIGITS = re.compile(r"\d+")
+
+
+def key_prefix(key: Optional[str]) -> str:
+    """Group name for a cache key: its first segment, ``user:42:x`` -> ``user:*``."""
+    if not key:
+        return ""
+    key = str(key)
+    match = _SEPARATOR.search(key)
+    if match is None:
+        return _DIGITS.sub("#", key)[:100]
+    return key[: match.end()][:100] + "*"
+
+
+def aggregating(entry_type: str, config=None) -> bool:
+    """Whether events of ``entry_type`` are recorded as aggregates."""
+    if config is None:
+        config = get_config()
+    return entry_type in (config.get("AGGREGATE_EVENTS") or ())
+
+
+def _empty_group() -> Dict[str, Any]:
+    return {
+        "count": 0,
+        "hits": 0,
+        "misses": 0,
+        "errors": 0,
+        "duration_count": 0,
+        "duration_sum": 0.0,
+        "duration_max": 0.0,
+        "sketch": DDSketch(),
+    }
+
+
+def _add_to(
+    groups: Dict[Tuple[str, str], Dict[str, Any]],
+    key: Tuple[str, str],
+    duration_ms: Optional[float],
+    hit: Optional[bool],
+    error: bool,
+) -> None:
+    group = groups.get(key)
+    if group is None:
+        group = groups[key] = _empty_group()
+    group["count"] += 1
+    group["hits"] += hit is True
+    group["misses"] += hit is False
+    group["errors"] += error
+    if duration_ms is not None:
+        group["duration_count"] += 1
+        group["duration_sum"] += duration_ms
+        if duration_ms > group["duration_max"]:
+            group["duration_max"] = duration_ms
+        group["sketch"].add(duration_ms)
+
+
+_SUMMED = ("count", "hits", "misses", "errors", "duration_count", "duration_sum")
+
+
+def _merge_group(into: Dict[str, Any], other: Dict[str, Any]) -> None:
+    for field in _SUMMED:
+        into[field] += other[field]
+    into["duration_max"] = max(into["duration_max"], other["duration_max"])
+    into["sketch"].merge(other["sketch"])
+
+
+def _group_payload(name: str, group: Dict[str, Any]) -> Dict[str, Any]:
+    sketch = group["sketch"]
+    timed = group["duration_count"]
+    summary = {
+        "group": name,
+        "count": group["count"],
+        "hits": group["hits"],
+        "misses": group["misses"],
+        "errors": group["errors"],
+    }
+    if timed:
+        summary["duration_ms"] = {
+            "total": round(group["duration_sum"], 3),
+            "avg": round(group["duration_sum"] / timed, 3),
+            "p50": round(sketch.quantile(0.5) or 0.0, 3),
+            "p95": round(sketch.quantile(0.95) or 0.0, 3),
+            "max": round(group["duration_max"], 3),
+        }
+        summary["sketch"] = sketch.to_dict()
+    return summary
+
+
+def build_entries(
+    groups: Dict[Tuple[str, str], Dict[str, Any]],
+    started_at=None,
+    ended_at=None,
+    config=None,
+) -> List[Any]:
+    """One unsaved summary OrbitEntry per entry type in ``groups``."""
+    from orbit.models import OrbitEntry
+
+    if config is None:
+        config = get_config()
+    max_groups = config.get("AGGREGATE_MAX_GROUPS", 100)
+
+    by_type: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+    for (entry_type, name), group in groups.items():
+        by_type.setdefault(entry_type, []).append((name, group))
+
+    entries = []
+    for entry_type, named in by_type.items():
+        named.sort(key=lambda item: item[1]["count"], reverse=True)
+        if max_groups and len(named) > max_groups:
+            other = _empty_group()
+            for _, group in named[max_groups - 1 :]:
+                _merge_group(other, group)
+            named = named[: max_groups - 1] + [(OTHER, other)]
+
+        payload: Dict[str, Any] = {
+            "aggregate": True,
+            "operations": sum(group["count"] for _, group in named),
+            "groups": [_group_payload(name, group) for name, group in named],
+        }
+        if started_at is not None:
+            payload["window"] = {
+                "start": started_at.isoformat(),
+                "end": (ended_at or started_at).isoformat(),
+            }
+        total_ms = sum(group["duration_sum"] for _, group in named)
+        entries.append(
+            OrbitEntry(
+                type=entry_type,
+                payload=payload,
+                duration_ms=round(total_ms, 3) if total_ms else None,
+                **({"created_at": ended_at} if ended_at is not None else {}),
+            )
+        )
+    return entries
+
+
+class AggregateBucket:
+    """Groups recorded outside a request, written once per time bucket."""
+
+    # Longest nap of the flusher thread, so it notices a shorter bucket setting
+    MAX_SLEEP = 1.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._groups: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._started = time.monotonic()
+        self._started_at = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+
+    def add(self, key, duration_ms, hit, error, config) -> None:
+        from django.utils import timezone
+
+        with self._lock:
+            if not self._groups:
+                self._started = time.monotonic()
+                self._started_at = timezone.now()
+            _add_to(self._groups, key, duration_ms, hit, error)
+            # A forked worker doesn't inherit the parent's thread
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = None
+            # Cleared by the thread under this lock when it stops, so pending groups
+            # always have a thread to write them
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="orbit-aggregates", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            seconds = get_config().get("AGGREGATE_BUCKET_SECONDS", 60)
+            with self._lock:
+                if not self._groups:
+                    self._thread = None
+                    return
+                wait = self._started + max(0.0, float(seconds)) - time.monotonic()
+            if wait > 0:
+                time.sleep(min(wait, self.MAX_SLEEP))
+                continue
+            self.flush()
+            self._release_connection()
+
+    @staticmethod
+    def _release_connection() -> None:
+        try:
+            from django.db import connections
+
+            from orbit.backends import get_storage_db_alias
+
+            connections[get_storage_db_alias()].close_if_unusable_or_obsolete()
+        except Exception:
+            pass
+
+    def flush(self) -> None:
+        """Write the pending groups as summary entries. Never raises."""
+        from django.utils import timezone
+
+        with self._lock:
+            groups, self._groups = self._groups, {}
+            started_at = self._started_at
+        if not groups:
+            return
+        try:
+            from orbit.writer import write_entries
+
+            write_entries(build_entries(groups, started_at, timezone.now()))
+        except Exception:
+            pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._groups = {}
+
+
+bucket = AggregateBucket()
+
+
+def add(
+    entry_type: str,
+    group: str,
+    duration_ms: Optional[float] = None,
+    hit: Optional[bool] = None,
+    error: bool = False,
+    config=None,
+) -> None:
+    """Count one event of ``entry_type`` in ``group``. Never raises."""
+    try:
+        from orbit.rollups import accumulator
+
+        if config is None:
+            config = get_config()
+        accumulator.observe(entry_type, {"hit": hit}, duration_ms, config=config)
+
+        key = (entry_type, group[:200])
+        context = get_context()
+        if context is not None and context.active and context.buffer is not None:
+            if context.aggregates is None:
+                context.aggregates = {}
+            _add_to(context.aggregates, key, duration_ms, hit, error)
+        else:
+            bucket.add(key, duration_ms, hit, error, config)
+    except Exception:
+        pass
+
+
+def flush_context(context) -> None:
+    """Write the summary entries of a request's context. Never raises."""
+    try:
+        groups, context.aggregates = context.aggregates, None
+        if groups:
+            from django.utils import timezone
+
+            from orbit.writer import write_entries
+
+            write_entries(build_entries(groups, ended_at=timezone.now()))
+    except Exception:
+        pass
+
+
+atexit.register(bucket.flush)
@@ -52,3 +52,21 @@ class OrbitConfig(AppConfig):
                 logging.getLogger(__name__).error(
                     "Django Orbit: storage backend setup failed: %s", exc
                 )
+
+        # Async requests record their queries through a wrapper on every
+        # connection (orbit.recorders.context_query_recorder)
+        from django.db.backends.signals import connection_created
+
+        from orbit.recorders import install_context_query_recorder
+
+        connection_created.connect(
+            install_context_query_recorder, dispatch_uid="orbit_context_query_recorder"
+        )
+
+        # SQLite rebuilds a table when a later migration alters it, dropping the
+        # search-index triggers with it; put them back after every migrate.
+        from django.db.models.signals import post_migrate
+
+        from orbit.search import restore_triggers
+
+        post_migrate.connect(restore_triggers, sender=self)
@@ -22,3 +22,21 @@ class BaseOrbitBackend:
         OrbitEntry.objects._db to redirect ORM calls to a dedicated database.
         """
         pass
+
+    def maintain(self) -> None:
+        """
+        Periodic housekeeping, run by the retention commands.
+
+        Override to e.g. create upcoming storage partitions. Must not raise.
+        """
+        pass
+
+    def drop_partitions_before(self, cutoff) -> int:
+        """
+        Remove whole storage partitions that only hold entries older than ``cutoff``.
+
+        Returns the number of entries removed. Callers still delete the remaining
+        rows older than ``cutoff`` themselves, so the default (no partitions, 0)
+        is always correct.
+        """
+        return 0
@@ -20,6 +20,8 @@ class DatabaseBackend(BaseOrbitBackend):
     def setup(self) -> None:
         # Ensure the manager uses the default database (resets any previous
         # value that might have been set during testing).
-        from orbit.models import OrbitEntry
+        from orbit.models import OrbitEntry, OrbitRollup, OrbitText
 
         OrbitEntry.objects._db = None
+        OrbitRollup.objects._db = None
+        OrbitText.objects._db = None
@@ -39,7 +39,7 @@ class DjangoDBBackend(BaseOrbitBackend):
     def setup(self) -> None:
         from django.conf import settings
 
-        from orbit.models import OrbitEntry
+        from orbit.models import OrbitEntry, OrbitRollup, OrbitText
 
         alias = self.get_db_alias()
         if alias not in settings.DATABASES:
@@ -52,3 +52,5 @@ class DjangoDBBackend(BaseOrbitBackend):
         # Django's Manager.get_queryset() passes self._db to QuerySet(using=…),
         # so every .create(), .filter(), .bulk_create(), etc. uses this alias.
         OrbitEntry.objects._db = alias
+        OrbitRollup.objects._db = alias
+        OrbitText.objects._db = alias
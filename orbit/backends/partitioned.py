@@ -0,0 +1,283 @@
+"""
+Time-partitioned Orbit storage — retention drops whole days instead of deleting rows.
+
+On PostgreSQL (11+) the entry table is converted once into a native
+``PARTITION BY RANGE (created_at)`` table with one partition per UTC day::
+
+    ORBIT_CONFIG = {
+        "STORAGE_BACKEND": "orbit.backends.partitioned.PartitionedBackend",
+    }
+
+    python manage.py orbit_partitions --convert
+
+``orbit_prune`` and the storage-limit cleanup then ``DROP`` every partition that lies
+entirely before the cutoff — constant time regardless of how many rows it holds — and
+only delete rows in the partially expired day. Upcoming partitions are created
+``PARTITION_PREMAKE_DAYS`` ahead by ``maintain()``; rows outside every daily range land
+in a default partition and are pruned row by row.
+
+Other databases have no native partitioning that fits a Django model table (MySQL
+partitioned tables can't carry the ``FULLTEXT`` search index). There the backend
+expires whole days with the same batched range deletes along the ``created_at`` index
+as row-level retention (``RETENTION_BATCH_SIZE`` rows per short transaction) instead of
+one long delete over the whole table.
+"""
+
+from datetime import datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from typing import List, Optional, Tuple
+
+from django.db import NotSupportedError, connections, transaction
+
+from orbit.backends.database import DatabaseBackend
+from orbit.backends.django_db import DjangoDBBackend
+
+DEFAULT_SUFFIX = "_pdefault"
+DAY_FORMAT = "%Y%m%d"
+
+
+def partition_name(table: str, day) -> str:
+    """Return the name of the partition holding ``day`` (a date) for ``table``."""
+    return f"{table}_p{day.strftime(DAY_FORMAT)}"
+
+
+def partition_day(table: str, name: str):
+    """Return the date a partition named by ``partition_name`` covers, or None."""
+    prefix = f"{table}_p"
+    if not name.startswith(prefix):
+        return None
+    try:
+        return datetime.strptime(name[len(prefix) :], DAY_FORMAT).date()
+    except ValueError:
+        return None
+
+
+def day_bounds(day) -> Tuple[datetime, datetime]:
+    """Return the ``[start, end)`` UTC datetimes of ``day``."""
+    start = datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=dt_timezone.utc)
+    return value.astimezone(dt_timezone.utc)
+
+
+class PartitionedMixin:
+    """Partition management shared by the partitioned backends."""
+
+    def _connection(self):
+        return connections[self.get_db_alias()]
+
+    def _table(self) -> str:
+        from orbit.models import OrbitEntry
+
+        return OrbitEntry._meta.db_table
+
+    def is_partitioned(self) -> bool:
+        """Whether the entry table is a native partitioned table."""
+        connection = self._connection()
+        if connection.vendor != "postgresql":
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)",
+                [self._table()],
+            )
+            row = cursor.fetchone()
+        return bool(row) and row[0] == "p"
+
+    def list_partitions(self) -> List[Tuple[str, Optional[object], int]]:
+        """Return ``(name, day, estimated_rows)`` per partition, oldest first."""
+        if not self.is_partitioned():
+            return []
+        table = self._table()
+        with self._connection().cursor() as cursor:
+            cursor.execute(
+                "SELECT c.relname, c.reltuples FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(%s)",
+                [table],
+            )
+            rows = cursor.fetchall()
+        partitions = [
+            (name, partition_day(table, name), max(int(tuples), 0))
+            for name, tuples in rows
+        ]
+        # The default partition (no day) sorts first
+        return sorted(partitions, key=lambda p: (p[1] is not None, p[1] or 0, p[0]))
+
+    def ensure_partitions(
+        self, days_ahead: Optional[int] = None, start=None
+    ) -> List[str]:
+        """
+        Create the daily partitions from ``start`` (default today) through
+        ``days_ahead`` days later. Returns the names created.
+
+        A day whose rows already sit in the default partition can't be split off and
+        is skipped; those rows are pruned row by row instead.
+        """
+        if not self.is_partitioned():
+            return []
+        from orbit.conf import get_config
+
+        if days_ahead is None:
+            days_ahead = get_config().get("PARTITION_PREMAKE_DAYS", 3)
+        connection = self._connection()
+        qn = connection.ops.quote_name
+        table = self._table()
+        existing = {name for name, _, _ in self.list_partitions()}
+        first = start or datetime.now(dt_timezone.utc).date()
+        created = []
+        for offset in range(
+            (datetime.now(dt_timezone.utc).date() - first).days + days_ahead + 1
+        ):
+            day = first + timedelta(days=offset)
+            name = partition_name(table, day)
+            if name in existing:
+                continue
+            lower, upper = day_bounds(day)
+            try:
+                with (
+                    transaction.atomic(using=connection.alias),
+                    connection.cursor() as cursor,
+                ):
+                    cursor.execute(
+                        f"CREATE TABLE {qn(name)} PARTITION OF {qn(table)} "
+                        f"FOR VALUES FROM (%s) TO (%s)",
+                        [lower, upper],
+                    )
+            except Exception:
+                continue
+            created.append(name)
+        return created
+
+    def partition_table(self, copy: bool = True) -> bool:
+        """
+        Convert the entry table into a daily-partitioned table (PostgreSQL only).
+
+        The table is renamed to ``<table>_unpartitioned`` and recreated with the same
+        columns, checks and indexes, partitioned by ``created_at``. The primary key
+        becomes ``(id, created_at)`` because PostgreSQL requires the partition key in
+        every unique constraint; ids are UUIDs, so they stay unique. With ``copy`` the
+        existing rows are moved across and the old table dropped, all in one
+        transaction. Returns False if the table was already partitioned.
+        """
+        connection = self._connection()
+        if connection.vendor != "postgresql":
+            raise NotSupportedError(
+                "Native partitioning is only available on PostgreSQL; "
+                f"'{connection.vendor}' expires entries by day instead."
+            )
+        if self.is_partitioned():
+            return False
+        qn = connection.ops.quote_name
+        table = self._table()
+        legacy = f"{table}_unpartitioned"
+
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexname, indexdef FROM pg_indexes "
+                "WHERE schemaname = current_schema() AND tablename = %s",
+                [table],
+            )
+            indexes = [
+                (name, definition)
+                for name, definition in cursor.fetchall()
+                if not definition.startswith("CREATE UNIQUE")
+            ]
+            cursor.execute(
+                "SELECT conname FROM pg_constraint "
+                "WHERE conrelid = to_regclass(%s) AND contype = 'p'",
+                [table],
+            )
+            primary_key = cursor.fetchone()
+
+            cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}")
+            if primary_key:
+                cursor.execute(
+                    f"ALTER TABLE {qn(legacy)} RENAME CONSTRAINT {qn(primary_key[0])} "
+                    f"TO {qn(legacy + '_pkey')}"
+                )
+            # Free the index names so the new table keeps the ones migrations refer to
+            for name, _ in indexes:
+                cursor.execute(
+                    f"ALTER INDEX {qn(name)} RENAME TO {qn(name[:55] + '_old')}"
+                )
+
+            cursor.execute(
+                f"CREATE TABLE {qn(table)} "
+                f"(LIKE {qn(legacy)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+                f"PARTITION BY RANGE (created_at)"
+            )
+            cursor.execute(
+                f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(table + '_pkey')} "
+                f"PRIMARY KEY (id, created_at)"
+            )
+            # The definitions were read under the original table name, which is now
+            # the partitioned table's
+            for _, definition in indexes:
+                cursor.execute(definition)
+            cursor.execute(
+                f"CREATE TABLE {qn(table + DEFAULT_SUFFIX)} PARTITION OF {qn(table)} DEFAULT"
+            )
+
+            first = None
+            if copy:
+                cursor.execute(f"SELECT MIN(created_at) FROM {qn(legacy)}")
+                oldest = cursor.fetchone()[0]
+                if oldest is not None:
+                    first = _utc(oldest).date()
+            self.ensure_partitions(start=first)
+
+            if copy:
+                cursor.execute(f"INSERT INTO {qn(table)} SELECT * FROM {qn(legacy)}")
+                cursor.execute(f"DROP TABLE {qn(legacy)}")
+        return True
+
+    def maintain(self) -> None:
+        try:
+            self.ensure_partitions()
+        except Exception:
+            pass
+
+    def drop_partitions_before(self, cutoff) -> int:
+        cutoff = _utc(cutoff)
+        if self.is_partitioned():
+            return self._drop_native(cutoff)
+        return self._delete_days(cutoff)
+
+    def _drop_native(self, cutoff: datetime) -> int:
+        connection = self._connection()
+        qn = connection.ops.quote_name
+        removed = 0
+        for name, day, rows in self.list_partitions():
+            if day is None or day_bounds(day)[1] > cutoff:
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {qn(name)}")
+            removed += rows
+        return removed
+
+    def _delete_days(self, cutoff: datetime) -> int:
+        from orbit.conf import get_config
+        from orbit.models import OrbitEntry
+        from orbit.retention import delete_in_batches
+
+        # Only whole days go here; the rest of the cutoff day is left to the
+        # row-level pruning of the caller.
+        start_of_day = day_bounds(cutoff.date())[0]
+        batch_size = max(1, int(get_config().get("RETENTION_BATCH_SIZE", 1000)))
+        expired = OrbitEntry.objects.using(self.get_db_alias()).filter(
+            created_at__lt=start_of_day
+        )
+        return delete_in_batches(expired, batch_size)
+
+
+class PartitionedBackend(PartitionedMixin, DatabaseBackend):
+    """Day-partitioned storage in Django's ``default`` database."""
+
+
+class PartitionedDjangoDBBackend(PartitionedMixin, DjangoDBBackend):
+    """Day-partitioned storage in the ``STORAGE_DB_ALIAS`` database."""
@@ -4,7 +4,14 @@ Django Orbit Configuration
 Provides default configuration and allows user overrides via Django settings.
 """
 
+import re
+from collections.abc import Mapping
+from typing import Optional
+
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
 
 # Default configuration
 DEFAULTS = {
@@ -12,6 +19,9 @@ DEFAULTS = {
     # Authentication check (callable or path to function)
     "AUTH_CHECK": None,
     "SLOW_QUERY_THRESHOLD_MS": 500,
+    # Which SQL queries get caller attribution (file/line/function that ran them):
+    # "always", "slow_or_duplicate" or "never".
+    "QUERY_CALLER_MODE": "always",
     "IGNORE_PATHS": ["/orbit/", "/static/", "/admin/jsi18n/", "/favicon.ico"],
     "HIDE_REQUEST_HEADERS": ["Authorization", "Cookie", "X-CSRFToken"],
     "HIDE_REQUEST_BODY_KEYS": ["password", "token", "secret", "api_key"],
@@ -50,7 +60,16 @@ DEFAULTS = {
     "ENABLE_EXPLAIN": True,
     "EXPLAIN_ANALYZE": False,
     "MAX_BODY_SIZE": 65536,  # 64KB
-    "STORAGE_LIMIT": 1000,  # Max entries to keep
+    "STORAGE_LIMIT": 1000,  # Max entries to keep (None = no limit)
+    # Retention (orbit.retention). "thread" trims storage from a background thread
+    # every RETENTION_INTERVAL seconds; None leaves it to `orbit_retention --daemon`
+    # or a Celery beat task calling orbit.retention.run_retention.
+    "RETENTION_SCHEDULER": "thread",
+    "RETENTION_INTERVAL": 60,  # seconds between passes
+    "RETENTION_BATCH_SIZE": 1000,  # rows per DELETE
+    "RETENTION_HOURS": None,  # max age of entries without a policy (None = keep)
+    # entry type -> hours, e.g. {"exception": 720, "query": 1}
+    "RETENTION_POLICIES": {},
     # Original watchers
     "RECORD_REQUESTS": True,
     "RECORD_QUERIES": True,
@@ -96,27 +115,198 @@ DEFAULTS = {
     # Storage backend (v0.8.0+)
     "STORAGE_BACKEND": "orbit.backends.database.DatabaseBackend",
     "STORAGE_DB_ALIAS": "orbit",  # only used by DjangoDBBackend
+    # Opt-in: store each distinct SQL statement / traceback once in OrbitText and
+    # keep only its hash on query and exception entries (orbit.interning)
+    "INTERN_TEXT": False,
+    # Compact payload storage (orbit.payloads). "zlib" or "zstd" (needs the
+    # zstandard package) moves the PAYLOAD_COLD_KEYS of new entries into a
+    # compressed blob column; None stores the whole payload as JSON.
+    "PAYLOAD_COMPRESSION": None,
+    "PAYLOAD_COLD_KEYS": [
+        "headers",
+        "body",
+        "response_headers",
+        "traceback",
+        "traceback_string",
+        "output",
+        "html_body",
+        "stack_info",
+    ],
+    # Daily partitions created ahead of time by the partitioned backends
+    "PARTITION_PREMAKE_DAYS": 3,
     # bulk_create batch size for query recording (v0.9.0+)
     # None = single INSERT (original behaviour).
     # Set to a positive integer (e.g. 500) to split large requests into
     # multiple smaller INSERTs, avoiding MySQL's max_allowed_packet limit.
     "BULK_CREATE_BATCH_SIZE": None,
+    # Write pipeline. "orbit.writer.SyncWriter" inserts on the request thread (original
+    # behaviour); "orbit.writer.BufferedWriter" queues entries and inserts them in
+    # batches from a background thread.
+    "WRITER": "orbit.writer.SyncWriter",
+    "WRITE_QUEUE_SIZE": 10000,
+    "WRITE_BATCH_SIZE": 500,
+    "WRITE_FLUSH_INTERVAL": 1.0,  # seconds
+    "WRITE_OVERFLOW_POLICY": "drop_oldest",  # or "sample"
+    "WRITE_SHUTDOWN_TIMEOUT": 5.0,  # seconds to drain the queue at exit
+    # Collect all entries recorded during a request and write them as one batch when
+    # the response is ready. Buffers larger than REQUEST_BUFFER_MAX_ENTRIES are handed
+    # to the writer early.
+    "BUFFER_REQUEST_EVENTS": True,
+    "REQUEST_BUFFER_MAX_ENTRIES": 5000,
+    # Head sampling: decided when the request starts. SAMPLE_PATH_RATES maps path
+    # prefixes to their own rate (longest prefix wins); SAMPLE_PATH_LIMITS caps how many
+    # requests per second are recorded for a prefix.
+    "SAMPLE_RATE": 1.0,
+    "SAMPLE_PATH_RATES": {},
+    "SAMPLE_PATH_LIMITS": {},
+    # Tail sampling: decided when the response is ready. Only requests matching one of
+    # the TAIL_KEEP_* rules are kept, plus a TAIL_SAMPLE_RATE fraction of the rest.
+    "TAIL_SAMPLING": False,
+    "TAIL_KEEP_STATUS": 500,  # keep responses with this status or higher
+    "TAIL_KEEP_SLOWER_THAN_MS": 1000,
+    "TAIL_KEEP_DUPLICATE_QUERIES": 3,  # 0 disables the rule
+    "TAIL_KEEP_TAGS": [],
+    "TAIL_SAMPLE_RATE": 0.0,
+    # Stats rollups: per-minute and per-hour totals the stats dashboard reads instead
+    # of raw entries. A background thread merges totals into the database every
+    # ROLLUP_FLUSH_INTERVAL seconds (None: only when stats are read and at exit);
+    # ROLLUP_MAX_ENDPOINTS caps the per-path request rows kept per minute.
+    "ROLLUP_FLUSH_INTERVAL": 10,
+    "ROLLUP_MAX_ENDPOINTS": 500,
+    "ROLLUP_MINUTE_RETENTION_HOURS": 48,
+    "ROLLUP_HOUR_RETENTION_DAYS": 90,
+    # Live feed streaming (Server-Sent Events). "asgi" streams only to requests served
+    # by ASGI; WSGI dashboards keep polling, since each open stream would hold a worker
+    # (True streams under WSGI too, False always polls). Each response is closed after
+    # LIVE_STREAM_MAX_DURATION seconds and the browser reconnects.
+    # LIVE_STREAM_POLL_INTERVAL is how often one thread per process reads rows written
+    # by other processes (0 streams local writes only).
+    "LIVE_STREAM": "asgi",
+    "LIVE_STREAM_HEARTBEAT": 15,  # seconds between keep-alive comments
+    "LIVE_STREAM_MAX_DURATION": 300,  # seconds
+    "LIVE_STREAM_POLL_INTERVAL": 2,  # seconds
+    "LIVE_STREAM_MAX_PENDING": 500,  # unread entries per client before it must reload
+    # Free-text search: characters of flattened payload text indexed per entry
+    "SEARCH_TEXT_MAX_CHARS": 8192,
+    # Self-metrics: time Orbit spends in its own watchers, serialization and inserts,
+    # events recorded and dropped. Shown on the health page and at /orbit/metrics/.
+    "SELF_METRICS": True,
+    # Overhead governor: when Orbit adds more than OVERHEAD_BUDGET_PERCENT of request
+    # time (or OVERHEAD_BUDGET_MS per request, whichever allows more) over a window of
+    # OVERHEAD_WINDOW seconds, recording degrades one step per window: no SQL caller
+    # lookup, no cache/signal events, OVERHEAD_SAMPLE_RATE of requests, errors only.
+    # It steps back up once overhead stays low.
+    "OVERHEAD_GOVERNOR": False,
+    "OVERHEAD_BUDGET_PERCENT": 2.0,
+    "OVERHEAD_BUDGET_MS": 1.0,
+    "OVERHEAD_WINDOW": 10,  # seconds
+    "OVERHEAD_SAMPLE_RATE": 0.1,
+    # Aggregate recording: entry types listed in AGGREGATE_EVENTS ("cache", "redis",
+    # "signal") are counted per group (cache operation and key prefix, Redis command,
+    # signal and sender) instead of stored one row per event. A request writes one
+    # summary entry per type with its family; events outside requests are summarised
+    # every AGGREGATE_BUCKET_SECONDS by a background thread. AGGREGATE_MAX_GROUPS caps
+    # groups per summary.
+    "AGGREGATE_EVENTS": [],
+    "AGGREGATE_BUCKET_SECONDS": 60,
+    "AGGREGATE_MAX_GROUPS": 100,
 }
 
 
+class OrbitConfig(Mapping):
+    """
+    Read-only view of the merged Orbit configuration.
+
+    Behaves like the dict ``get_config()`` used to return (``config.get(...)``,
+    ``config[...]``, ``{**config}``) and additionally carries structures derived once
+    from the raw settings, so hot paths don't rebuild them on every event:
+
+    - ``ignore_paths_re``: compiled prefix regex for ``IGNORE_PATHS`` (or ``None``)
+    - ``mask_keys``: lowercased ``MASK_KEYS``
+    - ``ignore_signals``: ``IGNORE_SIGNALS`` as a frozenset
+    - ``tag_callback``: ``TAG_CALLBACK`` resolved to a callable (or ``None``)
+    """
+
+    def __init__(self, data):
+        self._data = dict(data)
+
+        ignore_paths = [p for p in (self._data.get("IGNORE_PATHS") or []) if p]
+        if ignore_paths:
+            # Longest prefixes first so the alternation never stops at a shorter match
+            ordered = sorted(ignore_paths, key=len, reverse=True)
+            self.ignore_paths_re = re.compile("|".join(re.escape(p) for p in ordered))
+        else:
+            self.ignore_paths_re = None
+
+        self.mask_keys = tuple(
+            str(key).lower() for key in (self._data.get("MASK_KEYS") or [])
+        )
+        self.ignore_signals = frozenset(self._data.get("IGNORE_SIGNALS") or [])
+        self.tag_callback = resolve_callable(self._data.get("TAG_CALLBACK"))
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f"OrbitConfig({self._data!r})"
+
+
+def resolve_callable(value):
+    """Return ``value`` as a callable, importing it when given as a dotted path."""
+    if not value:
+        return None
+    if isinstance(value, str):
+        try:
+            value = import_string(value)
+        except Exception:
+            return None
+    return value if callable(value) else None
+
+
+_config: Optional[OrbitConfig] = None
+
+
 def get_config():
     """
     Get the Orbit configuration, merging defaults with user settings.
 
+    The result is built once and cached until the ``ORBIT`` / ``ORBIT_CONFIG``
+    setting changes (Django's ``setting_changed`` signal, sent by
+    ``override_settings`` and the pytest-django ``settings`` fixture). Code that
+    mutates the settings dict in place must call ``reload_config()``.
+
     Returns:
-        dict: Complete configuration dictionary
+        OrbitConfig: Complete, read-only configuration mapping
     """
+    config = _config
+    if config is None:
+        config = reload_config()
+    return config
+
+
+def reload_config():
+    """Rebuild the cached configuration from the current settings and return it."""
+    global _config
     user_config = getattr(settings, "ORBIT", {}) or getattr(
         settings, "ORBIT_CONFIG", {}
     )
-    config = DEFAULTS.copy()
-    config.update(user_config)
-    return config
+    merged = DEFAULTS.copy()
+    merged.update(user_config)
+    _config = OrbitConfig(merged)
+    return _config
+
+
+@receiver(setting_changed)
+def _on_setting_changed(setting, **kwargs):
+    global _config
+    if setting in ("ORBIT", "ORBIT_CONFIG"):
+        _config = None
 
 
 def is_enabled():
@@ -134,10 +324,5 @@ def should_ignore_path(path):
     Returns:
         bool: True if path should be ignored
     """
-    config = get_config()
-    ignore_paths = config.get("IGNORE_PATHS", [])
-
-    for ignore_path in ignore_paths:
-        if path.startswith(ignore_path):
-            return True
-    return False
+    pattern = get_config().ignore_paths_re
+    return pattern is not None and pattern.match(path) is not None
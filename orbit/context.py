@@ -0,0 +1,241 @@
+"""
+Django Orbit Context
+
+One ``OrbitContext`` per unit of work being recorded — a request handled by
+``OrbitMiddleware``, a Celery task, or a block wrapped in ``orbit_context`` — held in
+a single ``ContextVar``. It carries the family hash, the start time, the head-sampling
+decision, the request's event buffer and its query list, so every recorder reads the
+same state with one lookup.
+
+Propagation:
+
+- asyncio tasks and ``sync_to_async`` copy context variables, so they see the context
+  of the code that started them;
+- plain threads start with an empty context: wrap their target with ``bind()``;
+- Celery tasks get the family hash of the request that queued them through a message
+  header (``orbit.watchers.install_celery_watcher``).
+
+While a request is being processed, every entry recorded through ``orbit.writer`` is
+appended to the context's ``RequestBuffer`` instead of being written straight away.
+The middleware hands the whole family to the writer once, in its ``finally`` block, so
+a request costs one batch of inserts rather than one per event. Work that outlives its
+request (a background task, a thread) writes directly, still with the family hash.
+"""
+
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Dict, List, Optional
+
+
+class RequestBuffer:
+    """
+    Unsaved OrbitEntry instances recorded during one request.
+
+    Every collected entry without a ``family_hash`` inherits the buffer's, which links
+    watcher events (cache, models, signals, HTTP client, ...) to the request that
+    caused them. A ``discard`` buffer belongs to a request that head sampling dropped:
+    it swallows everything recorded during that request.
+    """
+
+    def __init__(
+        self,
+        family_hash: Optional[str],
+        max_entries: Optional[int] = None,
+        discard: bool = False,
+    ):
+        self.family_hash = family_hash
+        self.max_entries = max_entries
+        self.discard = discard
+        self.entries: List = []
+        # Set once part of the family has been handed to the writer early
+        self.flushed_early = False
+
+    def add(self, entry) -> None:
+        if self.discard:
+            from orbit import metrics
+
+            metrics.count("dropped", "sampled")
+            return
+        if not entry.family_hash:
+            entry.family_hash = self.family_hash
+        self.entries.append(entry)
+
+    def is_full(self) -> bool:
+        return bool(self.max_entries) and len(self.entries) >= self.max_entries
+
+    def drain(self) -> list:
+        entries, self.entries = self.entries, []
+        return entries
+
+    def drain_early(self) -> list:
+        """Take the entries collected so far because the buffer is full."""
+        self.flushed_early = True
+        return self.drain()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class OrbitContext:
+    """Recording state shared by everything that runs on behalf of one unit of work."""
+
+    __slots__ = (
+        "family_hash",
+        "started_at",
+        "sampled",
+        "buffer",
+        "queries",
+        "query_wrapper",
+        "active",
+        "overhead",
+        "aggregates",
+    )
+
+    def __init__(
+        self,
+        family_hash: Optional[str] = None,
+        started_at: Optional[float] = None,
+        sampled: bool = True,
+        buffer: Optional[RequestBuffer] = None,
+    ):
+        self.family_hash = family_hash
+        # perf_counter() when the work started
+        self.started_at = started_at
+        # False when head sampling dropped the request
+        self.sampled = sampled
+        self.buffer = buffer
+        self.queries: List[Dict[str, Any]] = []
+        # Where async requests send their queries (orbit.recorders.context_query_recorder)
+        self.query_wrapper = None
+        # Cleared when the work ends; tasks and threads still holding the context
+        # then write directly instead of into a buffer nobody will drain
+        self.active = True
+        # Seconds Orbit spent recording this work (orbit.metrics.charge)
+        self.overhead = 0.0
+        # Event groups waiting for a summary entry (orbit.aggregates)
+        self.aggregates: Optional[Dict] = None
+
+
+_context: ContextVar[Optional[OrbitContext]] = ContextVar("orbit_context", default=None)
+
+
+def get_context() -> Optional[OrbitContext]:
+    """Return the context of the work being recorded, if any."""
+    return _context.get()
+
+
+def current_family_hash() -> Optional[str]:
+    """Family hash of the current context, or None."""
+    context = _context.get()
+    return context.family_hash if context is not None else None
+
+
+def set_family_hash(family_hash: Optional[str]) -> None:
+    """Set the current family hash, starting a context when there is none."""
+    context = _context.get()
+    if context is not None:
+        context.family_hash = family_hash
+    elif family_hash is not None:
+        _context.set(OrbitContext(family_hash))
+
+
+def clear_context() -> None:
+    """Detach the current context, without closing it for tasks that still hold it."""
+    _context.set(None)
+
+
+def start_context(
+    family_hash: Optional[str] = None,
+    started_at: Optional[float] = None,
+    sampled: bool = True,
+    buffer: Optional[RequestBuffer] = None,
+) -> Token:
+    """Make a new context current. Returns a token for ``end_context``."""
+    return _context.set(
+        OrbitContext(family_hash, started_at=started_at, sampled=sampled, buffer=buffer)
+    )
+
+
+def end_context(token: Token) -> Optional[OrbitContext]:
+    """Close the context started with ``token`` and restore the previous one."""
+    context = _context.get()
+    if context is not None:
+        context.active = False
+    try:
+        _context.reset(token)
+    except ValueError:
+        # Token created in a different context (e.g. the response finished in another
+        # task); fall back to clearing the variable.
+        _context.set(None)
+    return context
+
+
+@contextmanager
+def orbit_context(family_hash: Optional[str] = None):
+    """
+    Record everything in the block under ``family_hash`` (a new one if omitted).
+
+    Entries are written as they are recorded, not buffered.
+    """
+    if family_hash is None:
+        from orbit.utils import generate_family_hash
+
+        family_hash = generate_family_hash()
+    token = start_context(family_hash)
+    try:
+        yield get_context()
+    finally:
+        end_context(token)
+
+
+def bind(func: Callable) -> Callable:
+    """
+    Return ``func`` wrapped to run in the current context.
+
+    Threads don't inherit context variables, so pass ``bind(target)`` to
+    ``threading.Thread`` or an executor to link what they record to the request.
+    """
+    context = _context.get()
+    if context is None:
+        return func
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        token = _context.set(context)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _context.reset(token)
+
+    return run
+
+
+def get_request_buffer() -> Optional[RequestBuffer]:
+    """Return the buffer of the request being processed, if any."""
+    context = _context.get()
+    if context is None or not context.active:
+        return None
+    return context.buffer
+
+
+def start_request_buffer(
+    family_hash: Optional[str],
+    max_entries: Optional[int] = None,
+    discard: bool = False,
+) -> Token:
+    """
+    Start a context collecting entries for ``family_hash``. Returns a token for
+    ``end_request_buffer``.
+    """
+    return start_context(
+        family_hash,
+        sampled=not discard,
+        buffer=RequestBuffer(family_hash, max_entries=max_entries, discard=discard),
+    )
+
+
+def end_request_buffer(token: Token) -> Optional[RequestBuffer]:
+    """End the context started by ``start_request_buffer`` and return its buffer."""
+    context = end_context(token)
+    return context.buffer if context is not None else None
@@ -0,0 +1,179 @@
+"""
+Django Orbit Overhead Governor
+
+Keeps Orbit's own cost within a budget so it is safe to leave on during traffic
+spikes. ``OrbitMiddleware`` reports every request it sees with the time Orbit spent
+on it: the watchers and the SQL wrapper during the view (charged to the request's
+``OrbitContext`` by ``orbit.metrics``), request extraction, and writing the family
+afterwards. Requests that sampling dropped count with no overhead.
+
+Every ``OVERHEAD_WINDOW`` seconds the window is checked against the budget: Orbit may
+add ``OVERHEAD_BUDGET_PERCENT`` of request time or ``OVERHEAD_BUDGET_MS`` per request,
+whichever allows more. A window over budget degrades recording one level:
+
+1. ``no_callers``: SQL caller attribution is skipped;
+2. ``no_cache_signals``: cache, Redis and signal events are no longer recorded;
+3. ``sampled``: only ``OVERHEAD_SAMPLE_RATE`` of requests are recorded;
+4. ``errors_only``: no request is recorded, but exceptions are still saved.
+
+Each level includes the ones before it. Requests that are not recorded still count in
+the stats rollups, as with head sampling. After ``RECOVER_WINDOWS`` windows in a row
+below half the budget, recording steps back up one level. The level is per process.
+"""
+
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from orbit.conf import get_config
+
+LEVELS = ("full", "no_callers", "no_cache_signals", "sampled", "errors_only")
+FULL, NO_CALLERS, NO_CACHE_SIGNALS, SAMPLED, ERRORS_ONLY = range(len(LEVELS))
+
+# Fewer requests than this in a window is too little to judge; the window continues
+MIN_WINDOW_REQUESTS = 10
+# Calm windows in a row needed to step back up, and what counts as calm
+RECOVER_WINDOWS = 3
+RECOVER_FRACTION = 0.5
+
+
+class OverheadGovernor:
+    """Tracks recording overhead per window and sets the degradation level."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.level = FULL
+        self.changes = 0
+        self.last_change = None
+        self.last_window: Optional[Dict[str, Any]] = None
+        self._start_window(time.monotonic())
+        self._calm = 0
+
+    def _start_window(self, now: float) -> None:
+        self._window_started = now
+        self._requests = 0
+        self._request_seconds = 0.0
+        self._overhead_seconds = 0.0
+
+    # -- checks on the recording path ------------------------------------------
+
+    def allows_callers(self) -> bool:
+        """Whether SQL caller attribution may run."""
+        return self.level < NO_CALLERS
+
+    def allows_cache_signals(self) -> bool:
+        """Whether cache, Redis and signal events may be recorded."""
+        return self.level < NO_CACHE_SIGNALS
+
+    def sample(self, config=None) -> bool:
+        """Whether to record a request that head sampling kept."""
+        if self.level < SAMPLED:
+            return True
+        if self.level >= ERRORS_ONLY:
+            return False
+        if config is None:
+            config = get_config()
+        return random.random() < config.get("OVERHEAD_SAMPLE_RATE", 0.1)
+
+    def errors_only(self) -> bool:
+        """Whether exceptions of requests that were not recorded are still saved."""
+        return self.level >= ERRORS_ONLY
+
+    # -- measurement --------------------------------------------------------------
+
+    def record_request(
+        self, request_seconds: float, overhead_seconds: float, config=None
+    ) -> None:
+        """Count one request and the time Orbit spent on it. Never raises."""
+        try:
+            if config is None:
+                config = get_config()
+            if not config.get("OVERHEAD_GOVERNOR", False):
+                if self.level != FULL:
+                    self._set_level(FULL)
+                return
+            now = time.monotonic()
+            with self._lock:
+                self._requests += 1
+                self._request_seconds += request_seconds
+                self._overhead_seconds += overhead_seconds
+                if (
+                    self._requests >= MIN_WINDOW_REQUESTS
+                    and now - self._window_started >= config.get("OVERHEAD_WINDOW", 10)
+                ):
+                    self._close_window(now, config)
+        except Exception:
+            pass
+
+    def _allowance(self, config) -> Optional[float]:
+        """Overhead in seconds the current window may add, or None for no budget."""
+        percent = config.get("OVERHEAD_BUDGET_PERCENT")
+        per_request_ms = config.get("OVERHEAD_BUDGET_MS")
+        if percent is None and per_request_ms is None:
+            return None
+        return max(
+            self._request_seconds * (percent or 0) / 100,
+            self._requests * (per_request_ms or 0) / 1000,
+        )
+
+    def _close_window(self, now: float, config) -> None:
+        allowance = self._allowance(config)
+        self.last_window = {
+            "requests": self._requests,
+            "overhead_ms_per_request": round(
+                self._overhead_seconds * 1000 / self._requests, 4
+            ),
+            "overhead_percent": (
+                round(self._overhead_seconds * 100 / self._request_seconds, 3)
+                if self._request_seconds
+                else 0.0
+            ),
+            "within_budget": allowance is None or self._overhead_seconds <= allowance,
+        }
+        if allowance is not None:
+            if self._overhead_seconds > allowance:
+                self._calm = 0
+                if self.level < ERRORS_ONLY:
+                    self._set_level(self.level + 1)
+            elif self._overhead_seconds <= allowance * RECOVER_FRACTION:
+                self._calm += 1
+                if self._calm >= RECOVER_WINDOWS and self.level > FULL:
+                    self._calm = 0
+                    self._set_level(self.level - 1)
+            else:
+                self._calm = 0
+        self._start_window(now)
+
+    def _set_level(self, level: int) -> None:
+        from django.utils import timezone
+
+        self.level = level
+        self.changes += 1
+        self.last_change = timezone.now()
+
+    def get_stats(self) -> Dict[str, Any]:
+        config = get_config()
+        return {
+            "enabled": bool(config.get("OVERHEAD_GOVERNOR", False)),
+            "level": self.level,
+            "state": LEVELS[self.level],
+            "budget_percent": config.get("OVERHEAD_BUDGET_PERCENT"),
+            "budget_ms": config.get("OVERHEAD_BUDGET_MS"),
+            "changes": self.changes,
+            "last_change": self.last_change,
+            "last_window": self.last_window,
+        }
+
+    def reset(self) -> None:
+        """Return to full recording and forget the current window (for tests)."""
+        with self._lock:
+            self.level = FULL
+            self.changes = 0
+            self.last_change = None
+            self.last_window = None
+            self._calm = 0
+            self._start_window(time.monotonic())
+
+
+governor = OverheadGovernor()
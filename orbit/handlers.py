@@ -5,24 +5,28 @@ Custom Python logging handler that captures logs to OrbitEntry.
 """
 
 import logging
-import threading
 from typing import Optional
 
+from orbit import metrics
 from orbit.conf import get_config
-from orbit.watchers import cachalot_disabled
-
-# Thread-local storage for current family hash
-_local = threading.local()
+from orbit.context import (
+    current_family_hash,
+    end_context,
+    get_context,
+    set_family_hash,
+    start_context,
+)
+from orbit.writer import write_entry
 
 
 def get_current_family_hash() -> Optional[str]:
     """Get the family hash for the current request context."""
-    return getattr(_local, "family_hash", None)
+    return current_family_hash()
 
 
 def set_current_family_hash(family_hash: Optional[str]) -> None:
     """Set the family hash for the current request context."""
-    _local.family_hash = family_hash
+    set_family_hash(family_hash)
 
 
 class OrbitLogHandler(logging.Handler):
@@ -37,6 +41,7 @@ class OrbitLogHandler(logging.Handler):
         super().__init__(level)
         self._enabled = True
 
+    @metrics.timed("watcher.log")
     def emit(self, record: logging.LogRecord) -> None:
         """
         Emit a log record to Orbit.
@@ -144,15 +149,11 @@ class OrbitLogHandler(logging.Handler):
         family_hash = get_current_family_hash()
 
         # Create entry
-        try:
-            with cachalot_disabled():
-                OrbitEntry.objects.create(
-                    type=OrbitEntry.TYPE_LOG,
-                    family_hash=family_hash,
-                    payload=payload,
-                )
-        except Exception:
-            pass
+        write_entry(
+            type=OrbitEntry.TYPE_LOG,
+            family_hash=family_hash,
+            payload=payload,
+        )
 
 
 class OrbitLogContext:
@@ -166,13 +167,18 @@ class OrbitLogContext:
 
     def __init__(self, family_hash: str):
         self.family_hash = family_hash
-        self.previous_hash = None
+        self._token = None
 
     def __enter__(self):
-        self.previous_hash = get_current_family_hash()
-        set_current_family_hash(self.family_hash)
+        # Entries still join the enclosing request's buffer, under this family hash
+        parent = get_context()
+        self._token = start_context(
+            self.family_hash,
+            sampled=parent.sampled if parent is not None else True,
+            buffer=parent.buffer if parent is not None else None,
+        )
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        set_current_family_hash(self.previous_hash)
+        end_context(self._token)
         return False
@@ -9,6 +9,7 @@ import traceback
 from typing import Any, Optional
 
 from orbit.conf import get_config
+from orbit.writer import write_entry
 
 
 def dump(*args, **kwargs) -> None:
@@ -93,7 +94,7 @@ def dump(*args, **kwargs) -> None:
         "count": len(values),
     }
 
-    OrbitEntry.objects.create(
+    write_entry(
         type=OrbitEntry.TYPE_DUMP if hasattr(OrbitEntry, "TYPE_DUMP") else "dump",
         payload=payload,
     )
@@ -220,7 +221,7 @@ def log(message: str, level: str = "INFO", **context) -> None:
         "caller": caller_info,
     }
 
-    OrbitEntry.objects.create(
+    write_entry(
         type=OrbitEntry.TYPE_LOG,
         payload=payload,
     )
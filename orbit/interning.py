@@ -0,0 +1,190 @@
+"""
+Django Orbit Text Interning
+
+Query rows repeat the same SQL text thousands of times an hour, and every occurrence
+of an exception repeats its traceback. With ``INTERN_TEXT`` on (it is off by
+default), each distinct text is stored once in ``OrbitText``, keyed by its SHA-1, and
+entries keep only the key in ``OrbitEntry.text``. The payload keeps the
+per-occurrence data (params, duration, caller, offset).
+
+Interned keys are restored into ``entry.payload`` when it is read, so callers are
+unchanged. Querysets look texts up in one query per chunk of rows, and a per-process
+LRU cache serves the rest. Payload JSON lookups such as ``payload__sql`` no longer
+match interned rows; filter on ``text`` (or ``text__text``) instead. Interned texts
+stay out of ``search_text`` too; ``orbit.search`` matches them in ``OrbitText``.
+
+Texts are written with ``INSERT ... ON CONFLICT DO NOTHING`` before the entries
+that reference them, and a text that already existed has its ``created_at`` moved up
+to the time of the write. Texts nothing refers to any more are deleted by the
+retention scheduler, but only once nothing has written them for ``ORPHAN_GRACE``
+seconds: other processes may still hold the hash in their cache of stored texts and
+point new entries at it without writing the text again.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from orbit.conf import get_config
+
+# Payload key interned for each entry type
+INTERNED_KEYS = {"query": "sql", "exception": "traceback_string"}
+
+CACHE_SIZE = 2048
+# Hashes this process wrote recently are not re-sent for this long (seconds)
+KNOWN_TTL = 60.0
+# Orphans written more recently than this are kept; twice KNOWN_TTL leaves room for
+# clock skew between processes
+ORPHAN_GRACE = 2 * KNOWN_TTL
+
+_lock = threading.Lock()
+_texts: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()  # hash -> (key, text)
+_known: Dict[str, float] = {}  # hash -> time last stored
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def interned_text(entry_type: str, payload, config=None) -> Optional[Tuple[str, str]]:
+    """Return ``(key, text)`` to intern for an entry, or None."""
+    if config is None:
+        config = get_config()
+    key = INTERNED_KEYS.get(entry_type)
+    if (
+        key is None
+        or not config.get("INTERN_TEXT", False)
+        or not isinstance(payload, dict)
+    ):
+        return None
+    text = payload.get(key)
+    if not isinstance(text, str) or not text:
+        return None
+    return key, text
+
+
+def _remember(digest: str, key: str, text: str) -> None:
+    with _lock:
+        _texts[digest] = (key, text)
+        _texts.move_to_end(digest)
+        while len(_texts) > CACHE_SIZE:
+            _texts.popitem(last=False)
+
+
+def store_texts(entries: Iterable, using: Optional[str] = None) -> None:
+    """Insert the texts ``entries`` refer to that aren't stored yet."""
+    from django.utils import timezone
+
+    from orbit.models import OrbitText
+
+    now = time.monotonic()
+    stored_at = timezone.now()
+    pending = {}
+    for entry in entries:
+        digest = entry.text_id
+        if (
+            not digest
+            or digest in pending
+            or now - _known.get(digest, -KNOWN_TTL) < KNOWN_TTL
+        ):
+            continue
+        found = interned_text(entry.type, entry.payload)
+        if found is not None:
+            pending[digest] = OrbitText(
+                hash=digest, kind=found[0], text=found[1], created_at=stored_at
+            )
+    if not pending:
+        return
+    manager = OrbitText.objects if using is None else OrbitText.objects.using(using)
+    manager.bulk_create(list(pending.values()), ignore_conflicts=True)
+    # Texts that were already there count as written now, so delete_orphans leaves
+    # them alone while this process treats them as stored
+    manager.filter(hash__in=list(pending), created_at__lt=stored_at).update(
+        created_at=stored_at
+    )
+    with _lock:
+        for digest, text in pending.items():
+            _known[digest] = now
+            if len(_known) > CACHE_SIZE * 4:
+                _known.clear()
+    for digest, text in pending.items():
+        _remember(digest, text.kind, text.text)
+
+
+def prefetch(entries: Iterable, using: Optional[str] = None) -> None:
+    """Load the texts of ``entries`` missing from the cache in one query. Never raises."""
+    try:
+        from orbit.models import OrbitText
+
+        wanted = (
+            {entry.__dict__.get("text_id") for entry in entries}
+            - {None, ""}
+            - set(_texts)
+        )
+        if not wanted:
+            return
+        manager = OrbitText.objects if using is None else OrbitText.objects.using(using)
+        for digest, key, text in manager.filter(hash__in=wanted).values_list(
+            "hash", "kind", "text"
+        ):
+            _remember(digest, key, text)
+    except Exception:
+        pass
+
+
+def restore(payload: dict, digest: str, using: Optional[str] = None) -> None:
+    """Put the interned text ``digest`` back into ``payload`` if it is missing. Never raises."""
+    cached = _texts.get(digest)
+    if cached is None:
+        try:
+            from orbit.models import OrbitText
+
+            manager = (
+                OrbitText.objects if using is None else OrbitText.objects.using(using)
+            )
+            row = manager.filter(hash=digest).values_list("kind", "text").first()
+        except Exception:
+            return
+        if row is None:
+            return
+        _remember(digest, *row)
+        cached = row
+    key, text = cached
+    payload.setdefault(key, text)
+
+
+def delete_orphans(batch_size: int = 1000) -> int:
+    """
+    Delete texts no entry refers to and nothing has written for ``ORPHAN_GRACE``
+    seconds. Returns rows deleted.
+    """
+    from datetime import timedelta
+
+    from django.db.models import Exists, OuterRef
+    from django.utils import timezone
+
+    from orbit.models import OrbitEntry, OrbitText
+
+    deleted = 0
+    orphans = OrbitText.objects.filter(
+        ~Exists(OrbitEntry.objects.filter(text=OuterRef("pk"))),
+        created_at__lt=timezone.now() - timedelta(seconds=ORPHAN_GRACE),
+    )
+    while True:
+        hashes = list(orphans.values_list("hash", flat=True)[:batch_size])
+        if not hashes:
+            return deleted
+        deleted += OrbitText.objects.filter(hash__in=hashes)._raw_delete(orphans.db)
+        with _lock:
+            for digest in hashes:
+                _known.pop(digest, None)
+        if len(hashes) < batch_size:
+            return deleted
+
+
+def clear_cache() -> None:
+    with _lock:
+        _texts.clear()
+        _known.clear()
@@ -0,0 +1,248 @@
+"""
+Django Orbit Live Stream
+
+In-process fan-out of newly written entries to dashboard tabs connected to the
+``stream/`` Server-Sent Events endpoint.
+
+The writer publishes every batch it inserts (``publish``). Each connected tab holds a
+``Subscription``: a bounded queue that its streaming response drains, from a thread
+under WSGI or from the event loop under ASGI. Publishing with nobody connected is a
+single attribute check.
+
+Other worker processes insert rows this process never sees, so while anyone is
+subscribed a single tail thread per process also reads rows inserted since the last
+poll every ``LIVE_STREAM_POLL_INTERVAL`` seconds and publishes those it hasn't already
+seen. That is one query per process per interval no matter how many tabs are open,
+instead of one per tab every three seconds. The tail pages forward on
+``(inserted_at, id)`` from the last row it read, so rows a buffered writer inserts
+late (with an old ``created_at``) are still picked up, and a burst larger than one
+page is read over several pages rather than re-reading the same rows.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Iterable, List, Optional
+
+from orbit.conf import get_config
+
+logger = logging.getLogger(__name__)
+
+# Entry ids remembered to avoid publishing the same row twice
+SEEN_IDS_MAX = 5000
+
+# Rows read per tail query, and pages read per poll before waiting for the next one
+TAIL_PAGE_SIZE = 500
+TAIL_MAX_PAGES = 20
+
+
+class Subscription:
+    """
+    One connected client's queue of published entries.
+
+    ``get()`` blocks a thread; ``aget()`` awaits on the loop the subscription was
+    created on. When more than ``max_pending`` entries pile up unread the oldest are
+    dropped and ``overflowed`` is set so the client can reload instead.
+    """
+
+    def __init__(
+        self, broker: "LiveBroker", entry_type: str = "all", max_pending: int = 500
+    ):
+        self.broker = broker
+        self.entry_type = entry_type
+        self.overflowed = False
+        self._pending: deque = deque(maxlen=max(1, max_pending))
+        self._cond = threading.Condition()
+        try:
+            self._loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+            self._wakeup: Optional[asyncio.Event] = asyncio.Event()
+        except RuntimeError:
+            self._loop = self._wakeup = None
+
+    def wants(self, entry) -> bool:
+        return self.entry_type in ("", "all") or entry.type == self.entry_type
+
+    def put(self, entries: List[Any]) -> None:
+        with self._cond:
+            for entry in entries:
+                if len(self._pending) == self._pending.maxlen:
+                    self.overflowed = True
+                self._pending.append(entry)
+            self._cond.notify()
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass  # loop closed; the subscription is about to go away
+
+    def _take(self) -> List[Any]:
+        with self._cond:
+            entries = list(self._pending)
+            self._pending.clear()
+            return entries
+
+    def get(self, timeout: float) -> List[Any]:
+        """Wait up to ``timeout`` seconds for entries and return everything pending."""
+        with self._cond:
+            if not self._pending:
+                self._cond.wait(timeout)
+        return self._take()
+
+    async def aget(self, timeout: float) -> List[Any]:
+        """Async ``get()``; must be awaited on the loop that created the subscription."""
+        if not self._pending:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._wakeup.clear()
+        return self._take()
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class LiveBroker:
+    """Fans published entries out to subscriptions and tails the table for other processes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions: List[Subscription] = []
+        self._seen: "OrderedDict[Any, None]" = OrderedDict()
+        self._tail_thread: Optional[threading.Thread] = None
+        # (inserted_at, id) of the last row the tail read
+        self._tail_key = None
+        self.published = 0
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscriptions)
+
+    def subscribe(self, entry_type: str = "all") -> Subscription:
+        from django.utils import timezone
+
+        config = get_config()
+        subscription = Subscription(
+            self, entry_type, config.get("LIVE_STREAM_MAX_PENDING", 500)
+        )
+        with self._lock:
+            if not self._subscriptions:
+                # The tail starts from now, not from wherever the last viewer left it
+                self._tail_key = (timezone.now(), uuid.UUID(int=0))
+            self._subscriptions = self._subscriptions + [subscription]
+        self._ensure_tail(config)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions = [
+                s for s in self._subscriptions if s is not subscription
+            ]
+
+    def publish(self, entries: Iterable[Any]) -> None:
+        """Hand written entries to every interested subscription. Never raises."""
+        subscriptions = self._subscriptions
+        if not subscriptions:
+            return
+        try:
+            with self._lock:
+                fresh = []
+                for entry in entries:
+                    if entry.id in self._seen:
+                        continue
+                    self._seen[entry.id] = None
+                    fresh.append(entry)
+                while len(self._seen) > SEEN_IDS_MAX:
+                    self._seen.popitem(last=False)
+            if not fresh:
+                return
+            self.published += len(fresh)
+            for subscription in subscriptions:
+                wanted = [entry for entry in fresh if subscription.wants(entry)]
+                if wanted:
+                    subscription.put(wanted)
+        except Exception:
+            pass
+
+    # -- tailing other processes' writes ----------------------------------------
+
+    def _ensure_tail(self, config) -> None:
+        if not config.get("LIVE_STREAM_POLL_INTERVAL"):
+            return
+        with self._lock:
+            if self._tail_thread is not None and self._tail_thread.is_alive():
+                return
+            self._tail_thread = threading.Thread(
+                target=self._run_tail, name="orbit-live-tail", daemon=True
+            )
+            self._tail_thread.start()
+
+    def _run_tail(self) -> None:
+        try:
+            while self._subscriptions:
+                time.sleep(get_config().get("LIVE_STREAM_POLL_INTERVAL") or 2)
+                self.poll_once()
+        finally:
+            self._release_connection()
+
+    def poll_once(self) -> int:
+        """Publish rows inserted since the last poll (by any process). Returns rows read."""
+        from django.db.models import Q
+
+        from orbit.models import OrbitEntry
+
+        rows = OrbitEntry.objects.filter(inserted_at__isnull=False).only(
+            "id", "type", "payload", "text", "duration_ms", "created_at", "inserted_at"
+        )
+        read = 0
+        for _ in range(TAIL_MAX_PAGES):
+            page = rows
+            if self._tail_key is not None:
+                inserted_at, entry_id = self._tail_key
+                page = rows.filter(
+                    Q(inserted_at__gt=inserted_at)
+                    | Q(inserted_at=inserted_at, id__gt=entry_id)
+                )
+            try:
+                entries = list(page.order_by("inserted_at", "id")[:TAIL_PAGE_SIZE])
+            except Exception as exc:
+                logger.debug("Orbit live tail failed: %s", exc)
+                break
+            if not entries:
+                break
+            self._tail_key = (entries[-1].inserted_at, entries[-1].id)
+            self.publish(entries)
+            read += len(entries)
+            if len(entries) < TAIL_PAGE_SIZE:
+                break
+        return read
+
+    @staticmethod
+    def _release_connection() -> None:
+        try:
+            from django.db import connections
+
+            from orbit.backends import get_storage_db_alias
+
+            connections[get_storage_db_alias()].close()
+        except Exception:
+            pass
+
+    def get_stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscriptions),
+            "published": self.published,
+            "tailing": bool(self._tail_thread and self._tail_thread.is_alive()),
+        }
+
+
+broker = LiveBroker()
+
+
+def publish(entries: Iterable[Any]) -> None:
+    """Called by the writer after inserting ``entries``. Never raises."""
+    if broker.has_subscribers:
+        broker.publish(entries)
@@ -15,6 +15,7 @@ import json
 import time
 from typing import Any, Callable
 
+from orbit import metrics
 from orbit.conf import get_config
 from orbit.utils import mask_sensitive_data, normalize_tags, serialize_for_json
 
@@ -198,6 +199,7 @@ def _build_payload(
     return serialize_for_json(payload)
 
 
+@metrics.timed("watcher.llm")
 def record_llm_call(
     *,
     provider: str,
@@ -221,7 +223,7 @@ def record_llm_call(
 
     from orbit.handlers import get_current_family_hash
     from orbit.models import OrbitEntry
-    from orbit.watchers import cachalot_disabled
+    from orbit.writer import write_entry
 
     payload = _build_payload(
         provider=provider,
@@ -235,17 +237,13 @@ def record_llm_call(
         metadata=metadata,
     )
 
-    try:
-        with cachalot_disabled():
-            OrbitEntry.objects.create(
-                type=OrbitEntry.TYPE_LLM,
-                family_hash=get_current_family_hash(),
-                payload=payload,
-                duration_ms=duration_ms,
-                tags=normalize_tags(["llm", provider]),
-            )
-    except Exception:
-        pass
+    write_entry(
+        type=OrbitEntry.TYPE_LLM,
+        family_hash=get_current_family_hash(),
+        payload=payload,
+        duration_ms=duration_ms,
+        tags=normalize_tags(["llm", provider]),
+    )
 
 
 def _patch_method(owner: Any, method_name: str, provider: str, operation: str) -> bool:
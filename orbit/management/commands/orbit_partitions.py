@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from orbit.backends import get_backend
+from orbit.backends.partitioned import PartitionedMixin
+
+
+class Command(BaseCommand):
+    help = (
+        "Manage the daily partitions of the Orbit entry table. Without options, "
+        "creates upcoming partitions and lists the existing ones. Requires a "
+        "partitioned STORAGE_BACKEND."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--convert",
+            action="store_true",
+            help="Convert the entry table into a partitioned table (PostgreSQL only)",
+        )
+        parser.add_argument(
+            "--no-copy",
+            action="store_true",
+            help="With --convert, leave existing rows in <table>_unpartitioned",
+        )
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        if not isinstance(backend, PartitionedMixin):
+            raise CommandError(
+                "STORAGE_BACKEND is not partitioned. Set it to "
+                "'orbit.backends.partitioned.PartitionedBackend' (or "
+                "'orbit.backends.partitioned.PartitionedDjangoDBBackend')."
+            )
+
+        if options["convert"]:
+            try:
+                converted = backend.partition_table(copy=not options["no_copy"])
+            except Exception as exc:
+                raise CommandError(str(exc))
+            if converted:
+                self.stdout.write(
+                    self.style.SUCCESS("Converted the entry table to daily partitions.")
+                )
+            else:
+                self.stdout.write("The entry table is already partitioned.")
+
+        if not backend.is_partitioned():
+            self.stdout.write(
+                "The entry table is not natively partitioned; retention expires "
+                "whole days in batched deletes."
+            )
+            return
+
+        for name in backend.ensure_partitions():
+            self.stdout.write(f"Created {name}")
+        for name, day, rows in backend.list_partitions():
+            label = day.isoformat() if day else "default"
+            self.stdout.write(f"{name}\t{label}\t~{rows} rows")
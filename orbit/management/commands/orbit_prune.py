@@ -1,12 +1,22 @@
-
+import time
 from datetime import timedelta
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
+
+from orbit.backends import get_backend
+from orbit.interning import delete_orphans
 from orbit.models import OrbitEntry
+from orbit.retention import delete_in_batches, estimate_count
+
 
 class Command(BaseCommand):
-    help = "Prune old Orbit entries (requests, queries, etc.)"
+    help = (
+        "Prune old Orbit entries (requests, queries, etc.) in small batches. "
+        "Safe to interrupt: running it again continues with the oldest rows left."
+    )
+
+    PROGRESS_INTERVAL = 5.0  # seconds between progress lines
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -20,28 +30,129 @@ class Command(BaseCommand):
             action="store_true",
             help="Keep exceptions and logs with level ERROR or higher",
         )
+        parser.add_argument(
+            "--policy",
+            action="append",
+            default=[],
+            metavar="TYPE=HOURS",
+            help="Hours to keep for one entry type, overriding --hours (repeatable)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows deleted per statement (default: 1000)",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.0,
+            help="Seconds to pause between batches (default: 0)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many entries each rule would delete",
+        )
 
     def handle(self, *args, **options):
         hours = options["hours"]
         keep_important = options["keep_important"]
-        
-        cutoff = timezone.now() - timedelta(hours=hours)
-        
+        batch_size = max(1, options["batch_size"])
+        self.verbosity = options["verbosity"]
+        policies = self._parse_policies(options["policy"])
+
+        now = timezone.now()
+        cutoff = now - timedelta(hours=hours)
+        rules = [
+            (entry_type, now - timedelta(hours=type_hours))
+            for entry_type, type_hours in policies.items()
+        ]
+
         # Base query: older than cutoff
         qs = OrbitEntry.objects.filter(created_at__lt=cutoff)
-        
+        if policies:
+            qs = qs.exclude(type__in=list(policies))
+        queries = [(f"older than {hours}h", qs)] + [
+            (
+                f"{entry_type} older than {policies[entry_type]}h",
+                OrbitEntry.objects.filter(type=entry_type, created_at__lt=type_cutoff),
+            )
+            for entry_type, type_cutoff in rules
+        ]
+
         if keep_important:
-            # Exclude exceptions
-            qs = qs.exclude(type=OrbitEntry.TYPE_EXCEPTION)
-            # Exclude error logs (payload__level="ERROR" or "CRITICAL")
-            # Note: payload is JSON field, so we query it directly
-            qs = qs.exclude(
-                type=OrbitEntry.TYPE_LOG,
-                payload__level__in=["ERROR", "CRITICAL"]
+            # Exclude exceptions and error logs (payload is a JSON field, so we
+            # query it directly)
+            queries = [
+                (
+                    label,
+                    query.exclude(type=OrbitEntry.TYPE_EXCEPTION).exclude(
+                        type=OrbitEntry.TYPE_LOG,
+                        payload__level__in=["ERROR", "CRITICAL"],
+                    ),
+                )
+                for label, query in queries
+            ]
+
+        if options["dry_run"]:
+            total = 0
+            for label, query in queries:
+                estimate = estimate_count(query)
+                total += estimate
+                self.stdout.write(f"Would delete ~{estimate} entries {label}.")
+            self.stdout.write(
+                self.style.SUCCESS(f"Dry run: ~{total} Orbit entries would be pruned.")
+            )
+            return
+
+        started = time.monotonic()
+        backend = get_backend()
+        backend.maintain()
+        count = 0
+        if not keep_important:
+            # Partitioned storage drops whole days every rule has expired; the rest
+            # is deleted below
+            count += backend.drop_partitions_before(
+                min([cutoff] + [c for _, c in rules])
             )
-            
-        count, _ = qs.delete()
-        
+
+        for label, query in queries:
+            count += self._prune(label, query, batch_size, options["sleep"])
+        delete_orphans(batch_size)
+
+        elapsed = time.monotonic() - started
+        rate = count / elapsed if elapsed else 0
         self.stdout.write(
-            self.style.SUCCESS(f"Successfully pruned {count} Orbit entries older than {hours} hours.")
+            self.style.SUCCESS(
+                f"Successfully pruned {count} Orbit entries older than {hours} hours "
+                f"in {elapsed:.1f}s ({rate:.0f} rows/s)."
+            )
         )
+
+    def _prune(self, label, query, batch_size, pause):
+        started = last_report = time.monotonic()
+
+        def progress(deleted):
+            nonlocal last_report
+            now = time.monotonic()
+            if now - last_report >= self.PROGRESS_INTERVAL:
+                last_report = now
+                rate = deleted / (now - started)
+                self.stdout.write(f"  {label}: {deleted} deleted ({rate:.0f} rows/s)")
+
+        deleted = delete_in_batches(query, batch_size, pause=pause, progress=progress)
+        if self.verbosity >= 2:
+            self.stdout.write(f"  {label}: {deleted} deleted")
+        return deleted
+
+    @staticmethod
+    def _parse_policies(values):
+        policies = {}
+        for value in values:
+            entry_type, _, type_hours = value.partition("=")
+            entry_type = entry_type.strip()
+            if not entry_type or not type_hours.strip().isdigit():
+                raise CommandError(f"Invalid --policy '{value}', expected TYPE=HOURS")
+            policies[entry_type] = int(type_hours)
+        return policies
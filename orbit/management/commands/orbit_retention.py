@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from orbit.conf import get_config
+from orbit.retention import scheduler
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply Orbit's retention settings (RETENTION_POLICIES, RETENTION_HOURS, "
+        "STORAGE_LIMIT) once, or repeatedly with --daemon. Use with "
+        "RETENTION_SCHEDULER = None to keep retention out of web workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--daemon",
+            action="store_true",
+            help="Keep running, one pass every RETENTION_INTERVAL seconds",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            skipped = scheduler.skipped
+            deleted = scheduler.run_once()
+            stats = scheduler.get_stats()
+            if stats["last_error"]:
+                self.stderr.write(f"Retention pass failed: {stats['last_error']}")
+            elif stats["skipped"] > skipped:
+                self.stdout.write("Skipped: another process is running retention.")
+            else:
+                self.stdout.write(
+                    f"Deleted {deleted} Orbit entries "
+                    f"({stats['rows_per_second'] or 0} rows/s overall)."
+                )
+            if not options["daemon"]:
+                return
+            time.sleep(max(1.0, float(get_config().get("RETENTION_INTERVAL", 60))))
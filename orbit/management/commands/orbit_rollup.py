@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from orbit import rollups
+from orbit.models import OrbitEntry, OrbitRollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the stats rollups from stored Orbit entries. Use after upgrading, "
+        "or after importing entries. Requests that sampling kept out of storage "
+        "cannot be recovered and are not counted in rebuilt buckets."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=24 * 7,
+            help="Number of hours of entries to roll up (default: 168)",
+        )
+
+    def handle(self, *args, **options):
+        hours = options["hours"]
+        # Whole hours, so rebuilt hour buckets are never partial
+        start = (timezone.now() - timedelta(hours=hours)).replace(
+            minute=0, second=0, microsecond=0
+        )
+
+        rollups.accumulator.flush()
+        OrbitRollup.objects.filter(bucket__gte=start).delete()
+
+        accumulator = rollups.RollupAccumulator()
+        entries = (
+            OrbitEntry.objects.filter(created_at__gte=start)
+            .only("type", "payload", "duration_ms", "created_at")
+            .order_by("created_at")
+        )
+        count = 0
+        for entry in entries.iterator(chunk_size=2000):
+            accumulator.observe(
+                entry.type, entry.payload, entry.duration_ms, entry.created_at
+            )
+            count += 1
+        accumulator.flush()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rolled up {count} Orbit entries from the last {hours} hours."
+            )
+        )
@@ -154,9 +154,10 @@ def create_mcp_server():
         if not get_config().get("MCP_ENABLED", True):
             return _mcp_disabled_output()
 
-        from django.utils import timezone
         from datetime import timedelta
 
+        from django.utils import timezone
+
         limit = min(limit, 100)
         since = timezone.now() - timedelta(hours=hours)
 
@@ -193,12 +194,19 @@ def create_mcp_server():
         # Requests where Orbit detected duplicate queries
         entries = (
             OrbitEntry.objects.requests()
-            .filter(payload__duplicate_query_count__gt=0)
-            .order_by("-payload__duplicate_query_count")[:limit]
+            .filter(duplicate_query_count__gt=0)
+            .order_by("-duplicate_query_count")[:limit]
         )
 
+        from orbit.agentic import duplicate_query_signatures
+
         results = []
         for entry in entries:
+            signatures = (
+                duplicate_query_signatures(entry.family_hash, limit=1)
+                if entry.family_hash
+                else []
+            )
             results.append(
                 {
                     "id": str(entry.id),
@@ -208,6 +216,7 @@ def create_mcp_server():
                     "duplicate_query_count": entry.payload.get(
                         "duplicate_query_count", 0
                     ),
+                    "most_duplicated": signatures[0] if signatures else None,
                     "family_hash": entry.family_hash,
                     "created_at": entry.created_at.isoformat(),
                 }
@@ -242,11 +251,11 @@ def create_mcp_server():
         if entry_type:
             qs = qs.filter(type=entry_type)
 
-        # Search in summary (computed) via payload JSON fields
-        # Use icontains on the payload cast â€” works on SQLite and PostgreSQL
-        from django.db.models import Q
+        # Full-text search over payload keys/values and tags (orbit.search)
+        from orbit.search import search
 
-        qs = qs.filter(Q(payload__icontains=query)).order_by("-created_at")[:limit]
+        types = [entry_type] if entry_type else None
+        qs = search(qs, query, types).order_by("-created_at")[:limit]
 
         result = [_serialize_entry(e) for e in qs]
         return _format_output(
@@ -316,9 +325,10 @@ def create_mcp_server():
         if not get_config().get("MCP_ENABLED", True):
             return _mcp_disabled_output()
 
-        from django.utils import timezone
         from datetime import timedelta
+
         from django.db.models import Avg, Count
+        from django.utils import timezone
 
         since = timezone.now() - timedelta(hours=hours)
         base = OrbitEntry.objects.filter(created_at__gte=since)
@@ -326,7 +336,7 @@ def create_mcp_server():
         # Requests
         requests = base.filter(type=OrbitEntry.TYPE_REQUEST)
         total_requests = requests.count()
-        error_requests = requests.filter(payload__status_code__gte=400).count()
+        error_requests = requests.filter(status_code__gte=400).count()
         avg_duration = requests.filter(duration_ms__isnull=False).aggregate(
             avg=Avg("duration_ms")
         )["avg"]
@@ -343,15 +353,15 @@ def create_mcp_server():
         # Cache
         cache_ops = base.filter(type=OrbitEntry.TYPE_CACHE)
         total_cache = cache_ops.count()
-        cache_hits = cache_ops.filter(payload__hit=True).count()
+        cache_hits = cache_ops.filter(cache_hit=True).count()
         cache_hit_rate = (
             round(cache_hits / total_cache * 100, 1) if total_cache else None
         )
 
         # Top error paths
         top_errors = (
-            requests.filter(payload__status_code__gte=400)
-            .values("payload__path", "payload__status_code")
+            requests.filter(status_code__gte=400)
+            .values("path", "status_code")
             .annotate(count=Count("id"))
             .order_by("-count")[:5]
         )
@@ -0,0 +1,359 @@
+"""
+Django Orbit Self-Metrics
+
+Orbit measures its own cost, so when p99 latency regresses it is quick to tell whether
+Orbit is the cause. Recorded per process:
+
+- ``watcher.<name>``: time spent in each watcher's recording code, on top of the
+  operation it watches (``watcher.query`` is the SQL wrapper's own work);
+- ``request.extract`` and ``request.finish``: the middleware's work before and after
+  the view;
+- ``entry.prepare``: serialization and masking of each entry at write time;
+- ``write.insert``: insert latency, per ``bulk_create`` batch or single row;
+- events handed to the writer, by entry type, and dropped events, by reason;
+- the writer's queue depth, read when a snapshot is taken.
+
+Timings are histograms with fixed buckets. Recording touches only the calling thread's
+counters, so it takes no lock; a snapshot adds up every thread's counters. Counters of
+finished threads are folded into a shared total.
+
+Exposed on the health page, in ``ModuleRegistry`` status, and at the ``metrics/``
+endpoint as JSON or Prometheus text. ``SELF_METRICS = False`` turns recording off.
+
+Time spent inside a unit of work (watchers, the SQL wrapper, request extraction) is
+also charged to its ``OrbitContext``, whatever ``SELF_METRICS`` says, so the overhead
+governor (``orbit.governor``) can weigh it against the request's duration.
+"""
+
+import bisect
+import functools
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from orbit.conf import get_config
+from orbit.context import get_context
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    1.0,
+)
+
+# Event rates are measured over about this many seconds of snapshots
+RATE_WINDOW = 60.0
+
+# Timings charged to the current OrbitContext as overhead of its unit of work
+CHARGED = ("watcher.", "request.extract")
+
+_started = time.monotonic()
+_local = threading.local()
+_lock = threading.Lock()
+
+
+class _Shard:
+    """One thread's counters."""
+
+    __slots__ = ("timings", "counts", "thread")
+
+    def __init__(self, thread: Optional[threading.Thread] = None):
+        # name -> [count, total seconds, max seconds, bucket counts...]
+        self.timings: Dict[str, List[float]] = {}
+        # (counter, label) -> count
+        self.counts: Dict[Tuple[str, str], int] = {}
+        self.thread = thread
+
+    def merge(self, other: "_Shard") -> None:
+        for name, values in list(other.timings.items()):
+            mine = self.timings.get(name)
+            if mine is None:
+                self.timings[name] = list(values)
+                continue
+            mine[0] += values[0]
+            mine[1] += values[1]
+            mine[2] = max(mine[2], values[2])
+            for i in range(3, len(values)):
+                mine[i] += values[i]
+        for key, value in list(other.counts.items()):
+            self.counts[key] = self.counts.get(key, 0) + value
+
+
+_shards: List[_Shard] = []
+_retired = _Shard()
+_rates: deque = deque()  # (monotonic time, events by type) per snapshot
+
+
+def _shard() -> _Shard:
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _local.shard = _Shard(threading.current_thread())
+        with _lock:
+            _retire_finished()
+            _shards.append(shard)
+    return shard
+
+
+def _retire_finished() -> None:
+    """Fold finished threads' counters into ``_retired``. The caller holds the lock."""
+    alive = []
+    for shard in _shards:
+        if shard.thread is not None and not shard.thread.is_alive():
+            _retired.merge(shard)
+        else:
+            alive.append(shard)
+    _shards[:] = alive
+
+
+def enabled() -> bool:
+    return bool(get_config().get("SELF_METRICS", True))
+
+
+def observe(name: str, seconds: float) -> None:
+    """Add one timing to the ``name`` histogram. Never raises."""
+    try:
+        if not enabled():
+            return
+        timings = _shard().timings
+        values = timings.get(name)
+        if values is None:
+            values = timings[name] = [0, 0.0, 0.0] + [0] * (len(BUCKETS) + 1)
+        values[0] += 1
+        values[1] += seconds
+        if seconds > values[2]:
+            values[2] = seconds
+        values[3 + bisect.bisect_left(BUCKETS, seconds)] += 1
+    except Exception:
+        pass
+
+
+def count(name: str, label: str = "", amount: int = 1) -> None:
+    """Add ``amount`` to the ``name`` counter for ``label``. Never raises."""
+    try:
+        if not amount or not enabled():
+            return
+        counts = _shard().counts
+        key = (name, label)
+        counts[key] = counts.get(key, 0) + amount
+    except Exception:
+        pass
+
+
+def charge(seconds: float) -> None:
+    """Add ``seconds`` to the overhead of the current unit of work, if any."""
+    context = get_context()
+    if context is not None:
+        context.overhead += seconds
+
+
+def timed(name: str) -> Callable:
+    """Decorator recording the time spent in the decorated function as ``name``."""
+    charged = name.startswith(CHARGED)
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                if charged:
+                    charge(elapsed)
+                observe(name, elapsed)
+
+        return wrapper
+
+    return decorator
+
+
+def _collect() -> _Shard:
+    total = _Shard()
+    with _lock:
+        _retire_finished()
+        shards = [_retired, *_shards]
+    for shard in shards:
+        total.merge(shard)
+    return total
+
+
+def _quantile(values: List[float], q: float) -> float:
+    """Upper bound of the bucket holding the ``q`` quantile (the max for the last)."""
+    rank = q * values[0]
+    seen = 0
+    for i, bound in enumerate(BUCKETS):
+        seen += values[3 + i]
+        if seen >= rank:
+            return min(bound, values[2])
+    return values[2]
+
+
+def _timing_summary(values: List[float]) -> Dict[str, Any]:
+    calls = int(values[0])
+    return {
+        "count": calls,
+        "total_ms": round(values[1] * 1000, 3),
+        "avg_ms": round(values[1] * 1000 / calls, 4) if calls else 0.0,
+        "p50_ms": round(_quantile(values, 0.5) * 1000, 4) if calls else 0.0,
+        "p99_ms": round(_quantile(values, 0.99) * 1000, 4) if calls else 0.0,
+        "max_ms": round(values[2] * 1000, 4),
+    }
+
+
+def _event_rates(events: Dict[str, int], now: float) -> Dict[str, float]:
+    """Events per second since the oldest snapshot in the window, or since start."""
+    with _lock:
+        _rates.append((now, events))
+        while len(_rates) > 1 and now - _rates[0][0] > RATE_WINDOW:
+            _rates.popleft()
+        since, before = _rates[0]
+    if now - since < 1.0:
+        since, before = _started, {}
+    elapsed = max(now - since, 1e-9)
+    return {
+        entry_type: round((total - before.get(entry_type, 0)) / elapsed, 3)
+        for entry_type, total in events.items()
+    }
+
+
+def _writer_stats() -> Dict[str, Any]:
+    try:
+        from orbit.writer import get_writer
+
+        return get_writer().get_stats()
+    except Exception:
+        return {}
+
+
+def _governor_stats() -> Dict[str, Any]:
+    try:
+        from orbit.governor import governor
+
+        return governor.get_stats()
+    except Exception:
+        return {}
+
+
+def _dropped(totals: _Shard, writer: Dict[str, Any]) -> Dict[str, int]:
+    dropped = {
+        key: value for (name, key), value in totals.counts.items() if name == "dropped"
+    }
+    # The buffered writer keeps its own queue counters
+    for reason, stat in (("queue_full", "dropped"), ("insert_failed", "failed")):
+        if writer.get(stat):
+            dropped[reason] = dropped.get(reason, 0) + writer[stat]
+    return dict(sorted(dropped.items()))
+
+
+def snapshot() -> Dict[str, Any]:
+    """Every self-metric of this process, as plain data."""
+    totals = _collect()
+    now = time.monotonic()
+    events = {
+        key: value for (name, key), value in totals.counts.items() if name == "events"
+    }
+    rates = _event_rates(events, now)
+    writer = _writer_stats()
+    dropped = _dropped(totals, writer)
+    return {
+        "enabled": enabled(),
+        "uptime_seconds": round(now - _started, 1),
+        "timings": {
+            name: _timing_summary(values)
+            for name, values in sorted(totals.timings.items())
+        },
+        "events": {
+            entry_type: {"total": total, "per_second": rates.get(entry_type, 0.0)}
+            for entry_type, total in sorted(events.items())
+        },
+        "events_per_second": round(sum(rates.values()), 3),
+        "dropped": dropped,
+        "dropped_total": sum(dropped.values()),
+        "queue_depth": writer.get("queue_depth", 0),
+        "writer": writer,
+        "governor": _governor_stats(),
+    }
+
+
+def timing(name: str) -> Optional[Dict[str, Any]]:
+    """Summary of one timing, or None if nothing was recorded under ``name``."""
+    values = _collect().timings.get(name)
+    return _timing_summary(values) if values else None
+
+
+def _label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus() -> str:
+    """The self-metrics in the Prometheus text exposition format."""
+    totals = _collect()
+    lines = [
+        "# HELP orbit_overhead_seconds Time spent in Orbit's own code.",
+        "# TYPE orbit_overhead_seconds histogram",
+    ]
+    for name, values in sorted(totals.timings.items()):
+        operation = f'operation="{_label(name)}"'
+        cumulative = 0
+        for i, bound in enumerate(BUCKETS):
+            cumulative += int(values[3 + i])
+            bucket = f'{operation},le="{bound}"'
+            lines.append(f"orbit_overhead_seconds_bucket{{{bucket}}} {cumulative}")
+        lines.append(
+            f'orbit_overhead_seconds_bucket{{{operation},le="+Inf"}} {int(values[0])}'
+        )
+        lines.append(f"orbit_overhead_seconds_sum{{{operation}}} {values[1]}")
+        lines.append(f"orbit_overhead_seconds_count{{{operation}}} {int(values[0])}")
+
+    counters = (
+        ("events", "orbit_events_total", "type", "Entries handed to the writer."),
+        ("dropped", "orbit_dropped_events_total", "reason", "Entries not stored."),
+    )
+    writer = _writer_stats()
+    for counter, metric, label, help_text in counters:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        if counter == "dropped":
+            values = _dropped(totals, writer)
+        else:
+            values = {
+                key: value
+                for (name, key), value in totals.counts.items()
+                if name == counter
+            }
+        for key, value in sorted(values.items()):
+            lines.append(f'{metric}{{{label}="{_label(key)}"}} {value}')
+
+    lines.append("# HELP orbit_write_queue_depth Entries waiting in the writer queue.")
+    lines.append("# TYPE orbit_write_queue_depth gauge")
+    lines.append(f"orbit_write_queue_depth {writer.get('queue_depth', 0)}")
+    lines.append(
+        "# HELP orbit_governor_level Recording degradation level (0 = full recording)."
+    )
+    lines.append("# TYPE orbit_governor_level gauge")
+    lines.append(f"orbit_governor_level {_governor_stats().get('level', 0)}")
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    """Forget every recorded value (for tests)."""
+    global _retired
+    with _lock:
+        for shard in _shards:
+            shard.timings.clear()
+            shard.counts.clear()
+        _retired = _Shard()
+        _rates.clear()
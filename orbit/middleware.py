@@ -11,12 +11,22 @@ from typing import Callable, Optional
 from django.db import connection
 from django.http import HttpRequest, HttpResponse
 
+from asgiref.sync import sync_to_async
+
+from orbit import aggregates, metrics
 from orbit.conf import get_config, should_ignore_path
-from orbit.handlers import set_current_family_hash
-from orbit.recorders import (
-    OrbitQueryWrapper,
-    clear_current_context,
+from orbit.context import (
+    RequestBuffer,
+    end_context,
+    end_request_buffer,
+    get_context,
+    start_context,
+    start_request_buffer,
 )
+from orbit.governor import governor
+from orbit.recorders import OrbitQueryWrapper, record_context_queries
+from orbit.retention import scheduler as retention_scheduler
+from orbit.sampling import head_sample, record_sampled_out, tail_keep
 from orbit.utils import (
     compute_exception_fingerprint,
     extract_client_ip,
@@ -28,7 +38,28 @@ from orbit.utils import (
     sanitize_headers,
     serialize_for_json,
 )
-from orbit.watchers import cachalot_disabled
+from orbit.writer import write_entries, write_entry
+
+try:
+    from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+except ImportError:  # asgiref < 3.6 (Django 4.0 / 4.1)
+    import asyncio
+    from asyncio import iscoroutinefunction
+
+    def markcoroutinefunction(func):
+        func._is_coroutine = asyncio.coroutines._is_coroutine
+        return func
+
+
+class _Capture:
+    """State of one request being recorded, handed from the start of capture to the end."""
+
+    def __init__(self, family_hash, context_token, start_time, query_wrapper):
+        self.family_hash = family_hash
+        self.context_token = context_token
+        self.start_time = start_time
+        self.query_wrapper = query_wrapper
+        self.request_data = {}
 
 
 class OrbitMiddleware:
@@ -41,102 +72,290 @@ class OrbitMiddleware:
     - Captures response details and timing
     - Handles uncaught exceptions
     - Links all events via family_hash
+
+    It runs natively in both modes: under ASGI with an async handler chain Django
+    calls ``__acall__`` directly, without a thread hop per request. Per-request state
+    lives in context variables, so concurrent requests on one event loop stay apart.
+    Reading ``request.user``, which may touch the database, runs through
+    ``sync_to_async``. The request family is built and handed to the writer on the
+    event loop, in the request's own context; the writer moves the insert itself
+    off the loop.
     """
 
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request: HttpRequest) -> HttpResponse:
         """
         Process the request through Orbit's capture pipeline.
         """
+        if self.async_mode:
+            return self.__acall__(request)
+
+        config = get_config()
+        mode = self._capture_mode(request, config)
+        if mode is None:
+            return self.get_response(request)
+        if mode == "sampled_out":
+            return self._process_sampled_out(request)
+
+        capture = self._start_capture(request, config)
+        capture.request_data = self._extract_request_data(request, config)
+
+        response = None
+        exception = None
+        try:
+            with connection.execute_wrapper(capture.query_wrapper):
+                response = self.get_response(request)
+        except Exception as e:
+            exception = e
+            raise
+        finally:
+            self._finish_capture(capture, request, response, exception, config)
+
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        """Async twin of ``__call__`` for ASGI deployments."""
         config = get_config()
+        mode = self._capture_mode(request, config)
+        if mode is None:
+            return await self.get_response(request)
+        if mode == "sampled_out":
+            return await self._aprocess_sampled_out(request)
+
+        capture = self._start_capture(request, config)
+        # Reading request.user may load the session and user from the database
+        capture.request_data = await sync_to_async(self._extract_request_data)(
+            request, config
+        )
 
+        response = None
+        exception = None
+        try:
+            # ORM calls run on sync_to_async worker threads, which carry this
+            # context over to the recorder installed on their connections
+            with record_context_queries(capture.query_wrapper):
+                response = await self.get_response(request)
+        except Exception as e:
+            exception = e
+            raise
+        finally:
+            # In this coroutine, so end_context resets this request's own context
+            self._finish_capture(capture, request, response, exception, config)
+
+        return response
+
+    def _capture_mode(self, request: HttpRequest, config) -> Optional[str]:
+        """Return ``"capture"``, ``"sampled_out"``, or None to pass the request through."""
         # Check if Orbit is enabled
         if not config.get("ENABLED", True):
-            return self.get_response(request)
+            return None
+
+        # Retention runs on its own thread, never inside the request
+        retention_scheduler.ensure_started(config)
 
         # Check if we should ignore this path
         if should_ignore_path(request.path):
-            return self.get_response(request)
+            return None
 
+        # Head sampling: decide before doing any capture work
+        if not head_sample(request.path, config) or not governor.sample(config):
+            return "sampled_out"
+        return "capture"
+
+    def _start_capture(self, request: HttpRequest, config) -> _Capture:
+        """Set up the request context. Cheap and free of I/O, so safe on the event loop."""
         # Generate family hash for this request
         family_hash = generate_family_hash()
 
         # Store family_hash on request for process_exception hook
         request._orbit_family_hash = family_hash
 
-        # Clear any previous context
-        clear_current_context()
-
-        # Set up logging context
-        set_current_family_hash(family_hash)
-
         # Record start time
         start_time = time.perf_counter()
 
-        # Extract request data before processing
-        request_data = self._extract_request_data(request, config)
+        # Everything recorded while the request runs — in this thread, in asyncio
+        # tasks, in bound threads — reads the family hash from this context, and
+        # joins its buffer so the whole family is written in one batch at the end
+        # (tail sampling needs the whole family)
+        buffer = None
+        if config.get("TAIL_SAMPLING", False) or config.get(
+            "BUFFER_REQUEST_EVENTS", True
+        ):
+            buffer = RequestBuffer(
+                family_hash, max_entries=config.get("REQUEST_BUFFER_MAX_ENTRIES")
+            )
+        context_token = start_context(family_hash, started_at=start_time, buffer=buffer)
 
         # Create query wrapper (pass request start so each query gets an accurate
         # offset for the request waterfall — B4)
         query_wrapper = OrbitQueryWrapper(
             family_hash=family_hash, request_start=start_time
         )
+        return _Capture(family_hash, context_token, start_time, query_wrapper)
 
-        # Process request with query recording
-        response = None
-        exception_info = None
+    @metrics.timed("request.finish")
+    def _finish_capture(
+        self,
+        capture: _Capture,
+        request: HttpRequest,
+        response: Optional[HttpResponse],
+        exception: Optional[Exception],
+        config,
+    ) -> None:
+        """Save the request family and clear the request context."""
+        family_hash = capture.family_hash
+        query_wrapper = capture.query_wrapper
+        tail_sampling = config.get("TAIL_SAMPLING", False)
 
-        try:
-            with connection.execute_wrapper(query_wrapper):
-                response = self.get_response(request)
-        except Exception as e:
+        # Calculate duration
+        finish_started = time.perf_counter()
+        duration_ms = (finish_started - capture.start_time) * 1000
+
+        exception_info = None
+        if exception is not None:
             # Capture exception info
-            exception_info = get_exception_info(e)
+            exception_info = get_exception_info(exception)
 
             # Save exception entry
             if config.get("RECORD_EXCEPTIONS", True):
-                self._save_exception(e, family_hash, request_data)
+                self._save_exception(exception, family_hash, capture.request_data)
 
-            # Re-raise the exception
-            raise
-        finally:
-            # Calculate duration
-            duration_ms = (time.perf_counter() - start_time) * 1000
-
-            # Save SQL queries
-            if config.get("RECORD_QUERIES", True) and query_wrapper.queries:
-                self._save_queries(query_wrapper.queries, family_hash)
-
-            # Save request entry
-            if config.get("RECORD_REQUESTS", True):
-                # Check for duplicates across all queries in this request
-                duplicate_query_count = sum(
-                    count - 1
-                    for count in query_wrapper.query_hashes.values()
-                    if count > 1
-                )
+        # Check for duplicates across all queries in this request
+        duplicate_query_count = sum(
+            count - 1 for count in query_wrapper.query_hashes.values() if count > 1
+        )
+
+        # Save SQL queries
+        if config.get("RECORD_QUERIES", True) and query_wrapper.queries:
+            self._save_queries(query_wrapper.queries, family_hash)
+
+        # Save request entry
+        if config.get("RECORD_REQUESTS", True):
+            self._save_request(
+                request_data=capture.request_data,
+                response=response,
+                family_hash=family_hash,
+                duration_ms=duration_ms,
+                query_count=len(query_wrapper.queries),
+                duplicate_query_count=duplicate_query_count,
+                exception_info=exception_info,
+            )
 
-                self._save_request(
-                    request_data=request_data,
-                    response=response,
-                    family_hash=family_hash,
+        # Summaries of events recorded as aggregates join the family
+        context = get_context()
+        if context is not None and context.aggregates:
+            aggregates.flush_context(context)
+
+        # Write the request family in one batch, unless tail sampling drops it
+        context = end_context(capture.context_token)
+        buffer = context.buffer if context is not None else None
+        if buffer is not None:
+            entries = buffer.drain()
+            status_code = response.status_code if response is not None else 500
+            if (
+                not tail_sampling
+                or buffer.flushed_early
+                or tail_keep(
+                    entries,
+                    status_code=status_code,
                     duration_ms=duration_ms,
-                    query_count=len(query_wrapper.queries),
                     duplicate_query_count=duplicate_query_count,
-                    exception_info=exception_info,
+                    config=config,
+                )
+            ):
+                write_entries(entries)
+            else:
+                metrics.count("dropped", "tail_sampled", len(entries))
+                record_sampled_out(
+                    duration_ms, status_code, request.method, request.path
                 )
 
-            # Clean up old entries if needed
-            self._cleanup_if_needed(config)
+        finished = time.perf_counter()
+        overhead = context.overhead if context is not None else 0.0
+        governor.record_request(
+            finished - capture.start_time,
+            overhead + finished - finish_started,
+            config,
+        )
 
-            # Clear context
-            set_current_family_hash(None)
-            clear_current_context()
+    def _process_sampled_out(self, request: HttpRequest) -> HttpResponse:
+        """
+        Run a request that head sampling dropped.
 
-        return response
+        Nothing is extracted or captured and anything watchers record during the request
+        is discarded; only its duration and status feed the stats rollups.
+        """
+        request._orbit_sampled_out = True
+        buffer_token = start_request_buffer(None, discard=True)
+        start_time = time.perf_counter()
+        status_code = 500
+        try:
+            response = self.get_response(request)
+            status_code = response.status_code
+            return response
+        except Exception as e:
+            request._orbit_exception = e
+            raise
+        finally:
+            end_request_buffer(buffer_token)
+            duration = time.perf_counter() - start_time
+            record_sampled_out(
+                duration * 1000, status_code, request.method, request.path
+            )
+            governor.record_request(duration, 0.0)
+            self._save_governed_exception(request)
 
+    async def _aprocess_sampled_out(self, request: HttpRequest) -> HttpResponse:
+        """Async twin of ``_process_sampled_out``."""
+        request._orbit_sampled_out = True
+        buffer_token = start_request_buffer(None, discard=True)
+        start_time = time.perf_counter()
+        status_code = 500
+        try:
+            response = await self.get_response(request)
+            status_code = response.status_code
+            return response
+        except Exception as e:
+            request._orbit_exception = e
+            raise
+        finally:
+            end_request_buffer(buffer_token)
+            duration = time.perf_counter() - start_time
+            record_sampled_out(
+                duration * 1000, status_code, request.method, request.path
+            )
+            governor.record_request(duration, 0.0)
+            self._save_governed_exception(request)
+
+    def _save_governed_exception(self, request: HttpRequest) -> None:
+        """
+        Save the exception of a request that was not recorded, if the overhead
+        governor is keeping errors only. Never raises.
+        """
+        exception = getattr(request, "_orbit_exception", None)
+        if exception is None or not governor.errors_only():
+            return
+        if not get_config().get("RECORD_EXCEPTIONS", True):
+            return
+        try:
+            request_data = {
+                "method": request.method,
+                "path": request.path,
+                "host": request.get_host(),
+            }
+            self._save_exception(exception, generate_family_hash(), request_data)
+        except Exception:
+            pass
+
+    @metrics.timed("request.extract")
     def _extract_request_data(self, request: HttpRequest, config: dict) -> dict:
         """
         Extract data from the incoming request.
@@ -232,16 +451,12 @@ class OrbitMiddleware:
             payload["had_exception"] = False
 
         # Create entry
-        try:
-            with cachalot_disabled():
-                OrbitEntry.objects.create(
-                    type=OrbitEntry.TYPE_REQUEST,
-                    family_hash=family_hash,
-                    payload=payload,
-                    duration_ms=duration_ms,
-                )
-        except Exception:
-            pass
+        write_entry(
+            type=OrbitEntry.TYPE_REQUEST,
+            family_hash=family_hash,
+            payload=payload,
+            duration_ms=duration_ms,
+        )
 
     def _save_queries(self, queries: list, family_hash: str) -> None:
         """
@@ -254,18 +469,13 @@ class OrbitMiddleware:
             entry = OrbitEntry(
                 type=OrbitEntry.TYPE_QUERY,
                 family_hash=family_hash,
-                payload=OrbitEntry.prepare_payload_for_storage(query),
+                fingerprint=query.get("fingerprint", ""),
+                payload=query,
                 duration_ms=query.get("duration_ms"),
             )
             entries.append(entry)
 
-        if entries:
-            try:
-                batch_size = get_config().get("BULK_CREATE_BATCH_SIZE")
-                with cachalot_disabled():
-                    OrbitEntry.objects.bulk_create(entries, batch_size=batch_size)
-            except Exception:
-                pass
+        write_entries(entries)
 
     def _save_exception(
         self,
@@ -289,34 +499,12 @@ class OrbitMiddleware:
             "request_host": request_data.get("host"),
         }
 
-        try:
-            with cachalot_disabled():
-                OrbitEntry.objects.create(
-                    type=OrbitEntry.TYPE_EXCEPTION,
-                    family_hash=family_hash,
-                    fingerprint=fingerprint,
-                    payload=payload,
-                )
-        except Exception:
-            pass
-
-    def _cleanup_if_needed(self, config: dict) -> None:
-        """
-        Clean up old entries if we've exceeded the storage limit.
-        """
-        from orbit.models import OrbitEntry
-
-        limit = config.get("STORAGE_LIMIT", 1000)
-
-        # Only check periodically (roughly every 10 requests)
-        import random
-
-        if random.random() < 0.1:
-            try:
-                with cachalot_disabled():
-                    OrbitEntry.objects.cleanup_old_entries(limit=limit)
-            except Exception:
-                pass
+        write_entry(
+            type=OrbitEntry.TYPE_EXCEPTION,
+            family_hash=family_hash,
+            fingerprint=fingerprint,
+            payload=payload,
+        )
 
     def process_exception(self, request: HttpRequest, exception: Exception) -> None:
         """
@@ -336,6 +524,11 @@ class OrbitMiddleware:
         if not config.get("RECORD_EXCEPTIONS", True):
             return None
 
+        if getattr(request, "_orbit_sampled_out", False):
+            # Saved once the request ends if the overhead governor keeps errors
+            request._orbit_exception = exception
+            return None
+
         # Get family_hash from request if available
         family_hash = getattr(request, "_orbit_family_hash", None)
         if not family_hash:
@@ -0,0 +1,17 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orbit', '0007_orbitentry_tags'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='orbitentry',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, help_text='When this entry was created'),
+        ),
+    ]
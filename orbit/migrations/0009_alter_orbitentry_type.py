@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 00:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orbit', '0008_alter_orbitentry_created_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='orbitentry',
+            name='type',
+            field=models.CharField(choices=[('request', 'HTTP Request'), ('query', 'SQL Query'), ('log', 'Log Entry'), ('exception', 'Exception'), ('job', 'Background Job'), ('command', 'Command'), ('cache', 'Cache'), ('model', 'Model Event'), ('http_client', 'HTTP Client'), ('dump', 'Dump'), ('mail', 'Mail'), ('signal', 'Signal'), ('redis', 'Redis'), ('gate', 'Gate/Policy'), ('transaction', 'Transaction'), ('storage', 'Storage'), ('llm', 'AI/LLM Call')], db_index=True, help_text='Type of telemetry entry', max_length=20),
+        ),
+    ]
@@ -0,0 +1,55 @@
+"""
+Fingerprint SQL query entries recorded before query fingerprinting existed.
+
+Batched with ``iterator()`` + ``bulk_update`` like 0006. The normalizer is imported
+rather than inlined: it is self-contained and versioned with the fingerprints it
+produces, and new rows are fingerprinted by the same function.
+"""
+
+from django.db import migrations, models
+
+
+def backfill(apps, schema_editor):
+    from orbit.sql import fingerprint_sql
+
+    OrbitEntry = apps.get_model("orbit", "OrbitEntry")
+    qs = OrbitEntry.objects.filter(type="query", fingerprint="").only("id", "payload")
+
+    batch = []
+    for entry in qs.iterator(chunk_size=500):
+        payload = entry.payload if isinstance(entry.payload, dict) else {}
+        entry.fingerprint = fingerprint_sql(payload.get("sql") or "")
+        if not entry.fingerprint:
+            continue
+        batch.append(entry)
+        if len(batch) >= 500:
+            OrbitEntry.objects.bulk_update(batch, ["fingerprint"])
+            batch = []
+    if batch:
+        OrbitEntry.objects.bulk_update(batch, ["fingerprint"])
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orbit", "0009_alter_orbitentry_type"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="orbitentry",
+            name="fingerprint",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                default="",
+                help_text="Stable hash used to group identical events (e.g. exceptions, queries)",
+                max_length=32,
+            ),
+        ),
+        migrations.RunPython(backfill, noop),
+    ]
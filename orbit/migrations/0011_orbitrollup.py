@@ -0,0 +1,43 @@
+# Generated by Django 5.0.14 on 2026-10-18 00:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orbit', '0010_backfill_query_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrbitRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('minute', 'Minute'), ('hour', 'Hour')], max_length=6)),
+                ('bucket', models.DateTimeField(help_text='Start of the minute or hour covered')),
+                ('type', models.CharField(help_text='OrbitEntry type', max_length=20)),
+                ('method', models.CharField(blank=True, default='', max_length=10)),
+                ('endpoint', models.CharField(blank=True, default='', help_text='Request path; empty for the all-endpoints row', max_length=255)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('error_count', models.PositiveIntegerField(default=0, help_text='5xx responses, exceptions, ERROR/CRITICAL logs, failed jobs')),
+                ('slow_count', models.PositiveIntegerField(default=0, help_text='Slow queries')),
+                ('duplicate_count', models.PositiveIntegerField(default=0, help_text='Duplicate queries (per request for request rows)')),
+                ('hit_count', models.PositiveIntegerField(default=0, help_text='Cache hits, granted gates, successful jobs, committed transactions')),
+                ('miss_count', models.PositiveIntegerField(default=0, help_text='Cache misses, denied gates, failed jobs, rolled back transactions')),
+                ('duration_count', models.PositiveIntegerField(default=0, help_text='Entries that reported a duration')),
+                ('duration_sum', models.FloatField(default=0)),
+                ('duration_max', models.FloatField(default=0)),
+                ('sketch', models.JSONField(default=dict, help_text='Mergeable duration sketch (orbit.sketch.DDSketch.to_dict)')),
+            ],
+            options={
+                'verbose_name': 'Orbit Rollup',
+                'verbose_name_plural': 'Orbit Rollups',
+                'ordering': ['-bucket'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='orbitrollup',
+            constraint=models.UniqueConstraint(fields=('resolution', 'type', 'method', 'endpoint', 'bucket'), name='orbit_rollup_unique_bucket'),
+        ),
+    ]
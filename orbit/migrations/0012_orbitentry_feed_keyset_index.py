@@ -0,0 +1,17 @@
+# Generated by Django 5.0.14 on 2026-10-18 01:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orbit', '0011_orbitrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='orbitentry',
+            index=models.Index(fields=['type', '-created_at', '-id'], name='orbit_orbit_type_0d5a55_idx'),
+        ),
+    ]
@@ -0,0 +1,152 @@
+"""
+Add the denormalized ``search_text`` column, fill it for existing entries, then build
+the vendor's full-text index over it (see ``orbit.search``). Only the historical model
+is used; the backfill and the index DDL are inlined rather than imported.
+
+Batched with ``iterator()`` + ``bulk_update`` like 0006 and 0010. The index is created
+after the backfill so it is built once rather than updated row by row. The flattening
+is a frozen copy of ``orbit.search.build_search_text`` as of this migration (full
+payload, default ``SEARCH_TEXT_MAX_CHARS``), so later changes to it can't break it.
+"""
+
+from django.db import migrations, models
+
+MAX_CHARS = 8192
+
+
+def _flatten(value):
+    if value is None:
+        return
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield str(key)
+            yield from _flatten(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _flatten(item)
+    elif isinstance(value, bool):
+        yield "true" if value else "false"
+    else:
+        yield str(value)
+
+
+def _search_text(entry):
+    parts = [entry.type or ""]
+    if entry.tags:
+        parts.append(entry.tags.strip(",").replace(",", " "))
+    size = sum(len(part) + 1 for part in parts)
+    for part in _flatten(entry.payload):
+        if size >= MAX_CHARS:
+            break
+        parts.append(part)
+        size += len(part) + 1
+    return " ".join(parts)[:MAX_CHARS]
+
+
+def backfill(apps, schema_editor):
+    OrbitEntry = apps.get_model("orbit", "OrbitEntry")
+    qs = OrbitEntry.objects.only("id", "type", "tags", "payload")
+
+    batch = []
+    for entry in qs.iterator(chunk_size=500):
+        entry.search_text = _search_text(entry)
+        batch.append(entry)
+        if len(batch) >= 500:
+            OrbitEntry.objects.bulk_update(batch, ["search_text"])
+            batch = []
+    if batch:
+        OrbitEntry.objects.bulk_update(batch, ["search_text"])
+
+
+# Index names as of this migration; orbit.search queries the same ones
+FTS_TABLE = "orbit_orbitentry_fts"
+PG_INDEX = "orbit_entry_search_gin"
+MYSQL_INDEX = "orbit_entry_search_ft"
+
+
+def _table(apps, schema_editor):
+    OrbitEntry = apps.get_model("orbit", "OrbitEntry")
+    return schema_editor.connection.ops.quote_name(OrbitEntry._meta.db_table)
+
+
+def install_index(apps, schema_editor):
+    """Create the vendor's search index, populated from the backfilled column."""
+    vendor = schema_editor.connection.vendor
+    table = _table(apps, schema_editor)
+    if vendor == "postgresql":
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON {table} "
+            f"USING GIN (to_tsvector('simple', search_text))"
+        )
+    elif vendor == "mysql":
+        schema_editor.execute(
+            f"CREATE FULLTEXT INDEX {MYSQL_INDEX} ON {table} (search_text)"
+        )
+    elif vendor == "sqlite":
+        try:
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                f"USING fts5(entry_id, search_text, tokenize='trigram')"
+            )
+        except Exception:
+            # SQLite built without FTS5 or older than 3.34: keep the fallback
+            return
+        delete = (
+            f"DELETE FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH "
+            f"'entry_id : \"' || old.id || '\"';"
+        )
+        insert = (
+            f"INSERT INTO {FTS_TABLE} (entry_id, search_text) "
+            f"VALUES (new.id, new.search_text);"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {table} "
+            f"BEGIN {insert} END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {table} "
+            f"BEGIN {delete} END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF search_text "
+            f"ON {table} BEGIN {delete} {insert} END"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (entry_id, search_text) "
+            f"SELECT id, search_text FROM {table}"
+        )
+
+
+def uninstall_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {PG_INDEX}")
+    elif vendor == "mysql":
+        schema_editor.execute(
+            f"DROP INDEX {MYSQL_INDEX} ON {_table(apps, schema_editor)}"
+        )
+    elif vendor == "sqlite":
+        for suffix in ("ai", "ad", "au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orbit', '0012_orbitentry_feed_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orbitentry',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Denormalized text used by the full-text search index'),
+        ),
+        migrations.RunPython(backfill, noop),
+        migrations.RunPython(install_index, uninstall_index),
+    ]
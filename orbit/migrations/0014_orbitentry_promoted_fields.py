@@ -0,0 +1,119 @@
+"""
+Add typed columns for the payload keys dashboards filter on, fill them for existing
+entries, then index them.
+
+Batched with ``iterator()`` + ``bulk_update`` like 0006, 0010 and 0014. The indexes
+are added after the backfill so they are built once.
+"""
+
+from django.db import migrations, models
+
+PROMOTED = [
+    "status_code",
+    "method",
+    "path",
+    "has_error",
+    "is_slow",
+    "is_duplicate",
+    "cache_hit",
+    "outcome",
+    "duplicate_query_count",
+]
+
+
+def backfill(apps, schema_editor):
+    from orbit.models import promoted_fields
+
+    OrbitEntry = apps.get_model("orbit", "OrbitEntry")
+    qs = OrbitEntry.objects.only("id", "type", "payload")
+
+    batch = []
+    for entry in qs.iterator(chunk_size=500):
+        for field, value in promoted_fields(entry.type, entry.payload).items():
+            setattr(entry, field, value)
+        batch.append(entry)
+        if len(batch) >= 500:
+            OrbitEntry.objects.bulk_update(batch, PROMOTED)
+            batch = []
+    if batch:
+        OrbitEntry.objects.bulk_update(batch, PROMOTED)
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orbit', '0013_orbitentry_search_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orbitentry',
+            name='cache_hit',
+            field=models.BooleanField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='orbitentry',
+            name='duplicate_query_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='orbitentry',
+            name='has_error',
+            field=models.BooleanField(default=False, help_text='Exception, 4xx/5xx request or ERROR/CRITICAL log'),
+        ),
+        migrations.AddField(
+            model_name='orbitentry',
+            name='is_duplicate',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='orbitentry',
+            name='is_slow',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='orbitentry',
+            name='method',
+            field=models.CharField(blank=True, default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='orbitentry',
+            name='outcome',
+            field=models.CharField(blank=True, default='', help_text='Job/transaction status or gate result', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='orbitentry',
+            name='path',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='orbitentry',
+            name='status_code',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='HTTP status (requests and HTTP client calls)', null=True),
+        ),
+        migrations.RunPython(backfill, noop),
+        migrations.AddIndex(
+            model_name='orbitentry',
+            index=models.Index(fields=['type', 'status_code', '-created_at'], name='orbit_orbit_type_efb90a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orbitentry',
+            index=models.Index(fields=['path', 'method', '-created_at'], name='orbit_orbit_path_f0da98_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orbitentry',
+            index=models.Index(fields=['type', 'has_error', '-created_at'], name='orbit_orbit_type_b438c6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orbitentry',
+            index=models.Index(fields=['type', 'is_slow', '-duration_ms'], name='orbit_orbit_type_0bb125_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orbitentry',
+            index=models.Index(fields=['type', '-duplicate_query_count'], name='orbit_orbit_type_2dba20_idx'),
+        ),
+    ]
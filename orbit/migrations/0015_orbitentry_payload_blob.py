@@ -0,0 +1,24 @@
+# Generated by Django 5.0.14 on 2026-10-18 01:23
+
+import orbit.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orbit', '0014_orbitentry_promoted_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orbitentry',
+            name='payload_blob',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='orbitentry',
+            name='payload',
+            field=orbit.models.PayloadField(default=dict, help_text='JSON payload containing event-specific data'),
+        ),
+    ]
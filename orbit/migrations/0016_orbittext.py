@@ -0,0 +1,33 @@
+# Generated by Django 5.0.14 on 2026-10-18 01:26
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orbit', '0015_orbitentry_payload_blob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrbitText',
+            fields=[
+                ('hash', models.CharField(help_text='SHA-1 of text', max_length=40, primary_key=True, serialize=False)),
+                ('kind', models.CharField(help_text='Payload key the text belongs to', max_length=30)),
+                ('text', models.TextField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Orbit Text',
+                'verbose_name_plural': 'Orbit Texts',
+            },
+        ),
+        migrations.AddField(
+            model_name='orbitentry',
+            name='text',
+            field=models.ForeignKey(blank=True, db_constraint=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='orbit.orbittext'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.14 on 2026-10-18 02:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orbit', '0016_orbittext'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orbitentry',
+            name='inserted_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When this entry was inserted', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='orbitentry',
+            index=models.Index(fields=['inserted_at', 'id'], name='orbit_orbit_inserte_20084f_idx'),
+        ),
+    ]
@@ -7,11 +7,142 @@ Central model for storing all telemetry events.
 import uuid
 
 from django.db import models
+from django.db.models.query import ModelIterable
+from django.db.models.query_utils import DeferredAttribute
+from django.utils import timezone
+
+from orbit import metrics
+
+
+def _is_error(entry_type, payload):
+    if entry_type == "exception":
+        return True
+    if entry_type == "request":
+        status_code = payload.get("status_code")
+        return isinstance(status_code, int) and status_code >= 400
+    if entry_type == "log":
+        return payload.get("level", "") in ("ERROR", "CRITICAL")
+    return False
+
+
+class _PayloadDescriptor(DeferredAttribute):
+    """Restores the interned text (``orbit.interning``) when the payload is read."""
+
+    def __get__(self, instance, cls=None):
+        value = super().__get__(instance, cls)
+        if instance is not None and isinstance(value, dict):
+            digest = instance.__dict__.get("text_id")
+            if digest:
+                from orbit.interning import INTERNED_KEYS, restore
+
+                if INTERNED_KEYS.get(instance.__dict__.get("type")) not in value:
+                    restore(value, digest, instance._state.db)
+        return value
+
+    def __set__(self, instance, value):
+        # A data descriptor, so reads of a loaded payload come through __get__ too
+        instance.__dict__[self.field.attname] = value
+
+
+class PayloadField(models.JSONField):
+    """
+    JSONField that writes only the hot part of the payload.
+
+    The interned text (``orbit.interning``) is left out, and the cold part is
+    compressed into the model's ``payload_blob`` (``orbit.payloads``) on the way out;
+    ``payload_blob`` is declared after ``payload``, so it is read after this runs.
+    """
+
+    descriptor_class = _PayloadDescriptor
+
+    def pre_save(self, model_instance, add):
+        from orbit.interning import INTERNED_KEYS
+        from orbit.payloads import encode_cold, split_payload
+
+        value = super().pre_save(model_instance, add)
+        key = INTERNED_KEYS.get(model_instance.type)
+        if model_instance.text_id and isinstance(value, dict) and key in value:
+            value = {k: v for k, v in value.items() if k != key}
+        hot, cold = split_payload(value)
+        model_instance.payload_blob = encode_cold(cold)
+        return hot
+
+
+class _InterningIterable(ModelIterable):
+    """Loads the interned texts of each chunk of entries with one query."""
+
+    CHUNK = 100
+
+    def __iter__(self):
+        from orbit.interning import prefetch
+
+        chunk = []
+        for entry in super().__iter__():
+            chunk.append(entry)
+            if len(chunk) >= self.CHUNK:
+                prefetch(chunk, self.queryset.db)
+                yield from chunk
+                chunk = []
+        if chunk:
+            prefetch(chunk, self.queryset.db)
+            yield from chunk
+
+
+PROMOTED_FIELDS = (
+    "status_code",
+    "method",
+    "path",
+    "has_error",
+    "is_slow",
+    "is_duplicate",
+    "cache_hit",
+    "outcome",
+    "duplicate_query_count",
+)
+
+# Payload key holding each type's outcome (job status, gate result, ...)
+_OUTCOME_KEYS = {"job": "status", "transaction": "status", "gate": "result"}
+
+
+def promoted_fields(entry_type, payload):
+    """
+    Column values for the payload keys that dashboards filter on.
+
+    Kept in indexed columns so those filters don't go through JSON path lookups.
+    Used at write time by ``OrbitEntry.prepare_for_insert`` and by migration 0014.
+    """
+    payload = payload if isinstance(payload, dict) else {}
+    status_code = payload.get("status_code")
+    if isinstance(status_code, bool) or not isinstance(status_code, int):
+        status_code = None
+    elif not 0 <= status_code < 1000:
+        status_code = None
+    hit = payload.get("hit") if entry_type == "cache" else None
+    try:
+        duplicate_query_count = max(0, int(payload.get("duplicate_query_count") or 0))
+    except (TypeError, ValueError):
+        duplicate_query_count = 0
+    return {
+        "status_code": status_code,
+        "method": str(payload.get("method") or "")[:10],
+        "path": str(payload.get("path") or "")[:255],
+        "has_error": _is_error(entry_type, payload),
+        "is_slow": bool(payload.get("is_slow")),
+        "is_duplicate": bool(payload.get("is_duplicate")),
+        "cache_hit": hit if isinstance(hit, bool) else None,
+        "outcome": str(payload.get(_OUTCOME_KEYS.get(entry_type, ""), "") or "")[:20],
+        "duplicate_query_count": duplicate_query_count,
+    }
 
 
 class OrbitEntryManager(models.Manager):
     """Custom manager for OrbitEntry with useful query methods."""
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        queryset._iterable_class = _InterningIterable
+        return queryset
+
     def requests(self):
         """Get all request entries."""
         return self.filter(type=OrbitEntry.TYPE_REQUEST)
@@ -127,8 +258,68 @@ class OrbitEntryManager(models.Manager):
         return self.filter(type=OrbitEntry.TYPE_LLM)
 
     def slow_queries(self):
-        """Get all slow queries (marked in payload)."""
-        return self.filter(type=OrbitEntry.TYPE_QUERY, payload__is_slow=True)
+        """Get all slow queries."""
+        return self.filter(type=OrbitEntry.TYPE_QUERY, is_slow=True)
+
+    def duplicate_query_groups(self, family_hash=None):
+        """
+        Repeated queries grouped by SQL fingerprint, most executions first.
+
+        Returns ``fingerprint``, ``count`` and ``last_seen`` rows for fingerprints seen
+        more than once (within ``family_hash`` when given). Counting is done by the DB.
+        """
+        from django.db.models import Count, Max
+
+        qs = self.filter(type=OrbitEntry.TYPE_QUERY).exclude(fingerprint="")
+        if family_hash is not None:
+            qs = qs.filter(family_hash=family_hash)
+        return (
+            qs.values("fingerprint")
+            .annotate(count=Count("id"), last_seen=Max("created_at"))
+            .filter(count__gt=1)
+            .order_by("-count", "-last_seen")
+        )
+
+    def dashboard_counts(self, last_hour, last_day):
+        """
+        Totals for the dashboard shell in one grouped query.
+
+        Returns ``{type: row}`` where each row holds ``total`` plus the conditional
+        counts the sidebar and header stats need (``errors``, ``slow``,
+        ``duplicates``, ``hits``/``misses``, ``granted``/``denied``,
+        ``succeeded``/``failed``) and the ``last_hour``, ``last_hour_avg`` and
+        ``last_day`` window figures. Types with no entries are absent.
+        """
+        from django.db.models import Avg, Count, Q
+
+        T = OrbitEntry
+
+        def _count(*conditions, **lookups):
+            return Count("id", filter=Q(*conditions, **lookups))
+
+        rows = (
+            self.values("type")
+            .annotate(
+                total=Count("id"),
+                errors=_count(
+                    Q(type=T.TYPE_EXCEPTION)
+                    | Q(type=T.TYPE_REQUEST, status_code__gte=400)
+                ),
+                slow=_count(type=T.TYPE_QUERY, is_slow=True),
+                duplicates=_count(type=T.TYPE_QUERY, is_duplicate=True),
+                hits=_count(type=T.TYPE_CACHE, cache_hit=True),
+                misses=_count(type=T.TYPE_CACHE, cache_hit=False),
+                granted=_count(type=T.TYPE_GATE, outcome="granted"),
+                denied=_count(type=T.TYPE_GATE, outcome="denied"),
+                succeeded=_count(type=T.TYPE_JOB, outcome="success"),
+                failed=_count(type=T.TYPE_JOB, outcome="failed"),
+                last_hour=_count(created_at__gte=last_hour),
+                last_hour_avg=Avg("duration_ms", filter=Q(created_at__gte=last_hour)),
+                last_day=_count(created_at__gte=last_day),
+            )
+            .order_by()
+        )
+        return {row.pop("type"): row for row in rows}
 
     def for_family(self, family_hash):
         """Get all entries for a specific request family."""
@@ -140,11 +331,25 @@ class OrbitEntryManager(models.Manager):
         """
         count = self.count()
         if count > limit:
+            from orbit.backends import get_backend
+
+            backend = get_backend()
+            backend.maintain()
+            # Let a partitioned backend drop the days before the oldest kept entry
+            # wholesale; whatever remains is deleted row by row below
+            watermark = (
+                self.order_by("-created_at").values_list("created_at", flat=True)[
+                    limit - 1
+                ]
+                if limit > 0
+                else None
+            )
+            deleted = backend.drop_partitions_before(watermark) if watermark else 0
             # Get IDs of entries to keep
             keep_ids = self.order_by("-created_at").values_list("id", flat=True)[:limit]
             # Delete entries not in keep list
-            deleted, _ = self.exclude(id__in=list(keep_ids)).delete()
-            return deleted
+            removed, _ = self.exclude(id__in=list(keep_ids)).delete()
+            return deleted + removed
         return 0
 
 
@@ -265,14 +470,15 @@ class OrbitEntry(models.Model):
         help_text="Hash to group related entries (e.g., all queries for one request)",
     )
 
-    # Grouping fingerprint (e.g. exception type + raise location) for deduplicating
-    # repeated events. Indexed so grouping/counting happens in the DB, not in Python.
+    # Grouping fingerprint (exception type + raise location, or a SQL statement's
+    # normalized shape) for deduplicating repeated events. Indexed so grouping/counting
+    # happens in the DB, not in Python.
     fingerprint = models.CharField(
         max_length=32,
         blank=True,
         default="",
         db_index=True,
-        help_text="Stable hash used to group identical events (e.g. exceptions)",
+        help_text="Stable hash used to group identical events (e.g. exceptions, queries)",
     )
 
     # Searchable tags, stored comma-wrapped (",slow,checkout,") so a single indexed
@@ -285,14 +491,66 @@ class OrbitEntry(models.Model):
         help_text="Comma-wrapped tags for filtering (e.g. ',slow,checkout,')",
     )
 
+    # Hot payload keys copied into typed, indexed columns at write time
+    # (see ``promoted_fields``). The payload stays the source of truth.
+    status_code = models.PositiveSmallIntegerField(
+        null=True, blank=True, help_text="HTTP status (requests and HTTP client calls)"
+    )
+    method = models.CharField(max_length=10, blank=True, default="")
+    path = models.CharField(max_length=255, blank=True, default="")
+    has_error = models.BooleanField(
+        default=False, help_text="Exception, 4xx/5xx request or ERROR/CRITICAL log"
+    )
+    is_slow = models.BooleanField(default=False)
+    is_duplicate = models.BooleanField(default=False)
+    cache_hit = models.BooleanField(null=True, blank=True)
+    outcome = models.CharField(
+        max_length=20,
+        blank=True,
+        default="",
+        help_text="Job/transaction status or gate result",
+    )
+    duplicate_query_count = models.PositiveIntegerField(default=0)
+
+    # Flattened payload values, tags and type for free-text search (``orbit.search``).
+    # Indexed per vendor by migration 0013 rather than through Meta.indexes.
+    search_text = models.TextField(
+        blank=True,
+        default="",
+        editable=False,
+        help_text="Denormalized text used by the full-text search index",
+    )
+
     # Flexible payload storage
-    payload = models.JSONField(
+    payload = PayloadField(
         default=dict, help_text="JSON payload containing event-specific data"
     )
+    # Compressed cold payload keys, when PAYLOAD_COMPRESSION is on (``orbit.payloads``)
+    payload_blob = models.BinaryField(null=True, blank=True, editable=False)
+    # Shared SQL text / traceback, left out of the payload (``orbit.interning``)
+    text = models.ForeignKey(
+        "OrbitText",
+        null=True,
+        blank=True,
+        editable=False,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
 
-    # Timestamps
+    # Timestamps. Stamped when the entry object is built (not at INSERT time) so
+    # entries written later by a buffered writer keep the time the event happened.
     created_at = models.DateTimeField(
-        auto_now_add=True, db_index=True, help_text="When this entry was created"
+        default=timezone.now, db_index=True, help_text="When this entry was created"
+    )
+    # Stamped by prepare_for_insert just before the INSERT, so a row a buffered writer
+    # inserts late still sorts after everything inserted before it. The live feed and
+    # the stream's tail poll page on it; feed pages keep paging on created_at.
+    inserted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="When this entry was inserted",
     )
 
     # Performance metric
@@ -314,6 +572,16 @@ class OrbitEntry(models.Model):
             models.Index(fields=["family_hash", "created_at"]),
             # Backs exception grouping: filter by type, group by fingerprint
             models.Index(fields=["type", "fingerprint", "-created_at"]),
+            # Backs the per-type feed's keyset pages
+            models.Index(fields=["type", "-created_at", "-id"]),
+            # Backs live-poll deltas and the stream's tail poll
+            models.Index(fields=["inserted_at", "id"]),
+            # Promoted payload fields
+            models.Index(fields=["type", "status_code", "-created_at"]),
+            models.Index(fields=["path", "method", "-created_at"]),
+            models.Index(fields=["type", "has_error", "-created_at"]),
+            models.Index(fields=["type", "is_slow", "-duration_ms"]),
+            models.Index(fields=["type", "-duplicate_query_count"]),
         ]
 
     @staticmethod
@@ -332,43 +600,128 @@ class OrbitEntry(models.Model):
             pass
         return payload
 
-    def save(self, *args, **kwargs):
-        # On insert only, and never allowed to break recording.
-        if self._state.adding:
-            try:
+    @metrics.timed("entry.prepare")
+    def prepare_for_insert(self, config=None):
+        """
+        Apply write-time processing to a new entry. Never raises.
+
+        Called by save() and by the bulk write paths (which bypass save()), so an entry
+        is masked and tagged the same way however it reaches the database.
+        """
+        try:
+            self.inserted_at = timezone.now()
+            if config is None:
                 from orbit.conf import get_config
 
                 config = get_config()
-                # B5: optional defense-in-depth masking of the whole payload.
-                self.payload = self.prepare_payload_for_storage(self.payload)
+            if self.type == self.TYPE_QUERY:
+                # Query callers are captured without their source line to keep the
+                # query wrapper cheap; read it here, once per stored row.
+                from orbit.recorders import resolve_caller_line
+
+                resolve_caller_line(self.payload)
+
+                # Queries recorded outside OrbitQueryWrapper still get grouped
+                if not self.fingerprint and isinstance(self.payload, dict):
+                    from orbit.sql import fingerprint_sql
+
+                    self.fingerprint = fingerprint_sql(self.payload.get("sql") or "")
 
-                # B1: auto-tagging via a user-supplied callback (Telescope-style).
-                self._apply_tag_callback(config)
-            except Exception:
-                pass
+            # B5: optional defense-in-depth masking of the whole payload.
+            self.payload = self.prepare_payload_for_storage(self.payload)
+
+            # B1: auto-tagging via a user-supplied callback (Telescope-style).
+            self._apply_tag_callback(config)
+
+            # Last, so masked values are never indexed and tags are searchable
+            self._sync_payload_columns(config)
+        except Exception:
+            pass
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Put compressed cold keys back, unless the blob was deferred
+        fields = instance.__dict__
+        if fields.get("payload_blob") and "payload" in fields:
+            from orbit.payloads import merge_payload
+
+            fields["payload"] = merge_payload(fields["payload"], fields["payload_blob"])
+        return instance
+
+    def save(self, *args, **kwargs):
+        # On insert only, and never allowed to break recording.
+        if self._state.adding:
+            self.prepare_for_insert()
+            self.store_interned_text()
+        else:
+            # Columns derived from the payload follow it when it is saved again
+            update_fields = kwargs.get("update_fields")
+            if update_fields is None or "payload" in update_fields:
+                self._sync_payload_columns()
+                self.store_interned_text()
+                if update_fields is not None:
+                    derived = [*PROMOTED_FIELDS, "search_text", "text"]
+                    # A deferred blob was never merged in, so it must not be rewritten
+                    if "payload_blob" not in self.get_deferred_fields():
+                        derived.append("payload_blob")
+                    kwargs["update_fields"] = {*update_fields, *derived}
         super().save(*args, **kwargs)
 
-    def _apply_tag_callback(self, config):
-        """Merge tags returned by the optional TAG_CALLBACK into self.tags."""
-        callback = config.get("TAG_CALLBACK")
-        if not callback:
+    def _sync_payload_columns(self, config=None):
+        """Refresh the promoted columns, ``search_text`` and ``text`` from the payload."""
+        from orbit.interning import interned_text, text_hash
+        from orbit.search import build_search_text
+
+        for field, value in promoted_fields(self.type, self.payload).items():
+            setattr(self, field, value)
+        found = interned_text(self.type, self.payload, config)
+        self.text_id = text_hash(found[1]) if found else None
+        self.search_text = build_search_text(self, config)
+
+    def store_interned_text(self):
+        """Write this entry's interned text, or keep it inline if that fails. Never raises."""
+        if not self.text_id:
             return
-        if isinstance(callback, str):
-            from django.utils.module_loading import import_string
+        from orbit.interning import store_texts
 
-            try:
-                callback = import_string(callback)
-            except Exception:
-                return
         try:
-            extra = callback(self) or []
+            store_texts([self], self._state.db or type(self).objects.db)
         except Exception:
+            self.keep_text_inline()
+
+    def keep_text_inline(self):
+        """Store the text in the payload after all, and index it with the entry."""
+        from orbit.search import build_search_text
+
+        self.text_id = None
+        self.search_text = build_search_text(self)
+
+    def _apply_tag_callback(self, config):
+        """Merge tags returned by the optional TAG_CALLBACK into self.tags."""
+        extra = self.get_callback_tags(config)
+        if not extra:
             return
         from orbit.utils import normalize_tags, parse_tags
 
         merged = parse_tags(self.tags) + list(extra)
         self.tags = normalize_tags(merged)
 
+    def get_callback_tags(self, config):
+        """Return the tags TAG_CALLBACK assigns to this entry, without storing them."""
+        from orbit.conf import OrbitConfig, resolve_callable
+
+        if isinstance(config, OrbitConfig):
+            callback = config.tag_callback
+        else:
+            callback = resolve_callable(config.get("TAG_CALLBACK"))
+        if callback is None:
+            return []
+        try:
+            return list(callback(self) or [])
+        except Exception:
+            return []
+
     def __str__(self):
         return f"[{self.type.upper()}] {self.created_at.strftime('%H:%M:%S')}"
 
@@ -394,6 +747,13 @@ class OrbitEntry(models.Model):
         """Get a human-readable summary of this entry."""
         payload = self.payload or {}
 
+        if payload.get("aggregate"):
+            groups = payload.get("groups") or []
+            return (
+                f"{payload.get('operations', 0)} {self.type} operations "
+                f"in {len(groups)} group{'s' if len(groups) != 1 else ''}"
+            )
+
         if self.type == self.TYPE_REQUEST:
             method = payload.get("method", "?")
             path = payload.get("path", "?")
@@ -539,15 +899,7 @@ class OrbitEntry(models.Model):
     @property
     def is_error(self):
         """Check if this entry represents an error state."""
-        if self.type == self.TYPE_EXCEPTION:
-            return True
-        if self.type == self.TYPE_REQUEST:
-            status = self.payload.get("status_code", 200)
-            return status >= 400
-        if self.type == self.TYPE_LOG:
-            level = self.payload.get("level", "")
-            return level in ("ERROR", "CRITICAL")
-        return False
+        return _is_error(self.type, self.payload)
 
     @property
     def is_warning(self):
@@ -557,3 +909,95 @@ class OrbitEntry(models.Model):
         if self.type == self.TYPE_LOG:
             return self.payload.get("level") == "WARNING"
         return False
+
+
+class OrbitRollup(models.Model):
+    """
+    Pre-aggregated totals for one entry type over one minute or one hour.
+
+    Rows are maintained incrementally by ``orbit.rollups`` as entries are written (and
+    as sampled-out requests are counted), so the stats dashboard reads a handful of
+    buckets instead of scanning raw OrbitEntry rows. The row with an empty ``method``
+    and ``endpoint`` holds the totals for the whole type; request rows are additionally
+    kept per method and path.
+    """
+
+    RESOLUTION_MINUTE = "minute"
+    RESOLUTION_HOUR = "hour"
+    RESOLUTION_CHOICES = [
+        (RESOLUTION_MINUTE, "Minute"),
+        (RESOLUTION_HOUR, "Hour"),
+    ]
+
+    resolution = models.CharField(max_length=6, choices=RESOLUTION_CHOICES)
+    bucket = models.DateTimeField(help_text="Start of the minute or hour covered")
+    type = models.CharField(max_length=20, help_text="OrbitEntry type")
+    method = models.CharField(max_length=10, blank=True, default="")
+    endpoint = models.CharField(
+        max_length=255,
+        blank=True,
+        default="",
+        help_text="Request path; empty for the all-endpoints row",
+    )
+    count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(
+        default=0,
+        help_text="5xx responses, exceptions, ERROR/CRITICAL logs, failed jobs",
+    )
+    slow_count = models.PositiveIntegerField(default=0, help_text="Slow queries")
+    duplicate_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Duplicate queries (per request for request rows)",
+    )
+    hit_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Cache hits, granted gates, successful jobs, committed transactions",
+    )
+    miss_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Cache misses, denied gates, failed jobs, rolled back transactions",
+    )
+    duration_count = models.PositiveIntegerField(
+        default=0, help_text="Entries that reported a duration"
+    )
+    duration_sum = models.FloatField(default=0)
+    duration_max = models.FloatField(default=0)
+    sketch = models.JSONField(
+        default=dict,
+        help_text="Mergeable duration sketch (orbit.sketch.DDSketch.to_dict)",
+    )
+
+    class Meta:
+        verbose_name = "Orbit Rollup"
+        verbose_name_plural = "Orbit Rollups"
+        ordering = ["-bucket"]
+        constraints = [
+            models.UniqueConstraint(
+                # Column order doubles as the index for window reads
+                fields=["resolution", "type", "method", "endpoint", "bucket"],
+                name="orbit_rollup_unique_bucket",
+            ),
+        ]
+
+    def __str__(self):
+        label = f"{self.method} {self.endpoint}".strip() or self.type
+        return f"{self.bucket:%Y-%m-%d %H:%M} {self.resolution} {label} ({self.count})"
+
+
+class OrbitText(models.Model):
+    """
+    A SQL statement or traceback shared by many entries, stored once (``orbit.interning``).
+    """
+
+    hash = models.CharField(max_length=40, primary_key=True, help_text="SHA-1 of text")
+    kind = models.CharField(max_length=30, help_text="Payload key the text belongs to")
+    text = models.TextField()
+    # Moved up each time a process writes the text again (orbit.interning.store_texts)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Orbit Text"
+        verbose_name_plural = "Orbit Texts"
+
+    def __str__(self):
+        return f"{self.kind} {self.hash[:12]}"
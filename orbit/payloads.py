@@ -0,0 +1,82 @@
+"""
+Django Orbit Payload Storage
+
+Optional compact storage for bulky payload values. With ``PAYLOAD_COMPRESSION`` set,
+the keys listed in ``PAYLOAD_COLD_KEYS`` (request and response headers and bodies,
+tracebacks, command output, HTML mail bodies) are moved out of the ``payload`` JSON
+into ``OrbitEntry.payload_blob``, one compressed JSON document per entry. Everything
+else — the fields lists, filters and JSON lookups use — stays in ``payload``.
+
+Reading is transparent: entries loaded with their blob get the cold keys merged back
+into ``entry.payload`` (``OrbitEntry.from_db``), so the detail panel, exports and MCP
+tools see the full payload. Querysets that skip the blob, such as the feed's
+``.only(...)`` lists, see only the hot keys and never pay for decompression.
+
+Blobs carry a one-byte codec tag, so changing the setting never breaks reading
+older rows. ``"zstd"`` needs the optional ``zstandard`` package and falls back to
+``"zlib"`` without it.
+"""
+
+import json
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+from orbit.conf import get_config
+
+ZLIB = b"Z"
+ZSTD = b"S"
+
+
+def split_payload(payload: Any, config=None) -> Tuple[Any, Dict[str, Any]]:
+    """Return ``(hot, cold)`` for ``payload``; ``cold`` is empty when compression is off."""
+    if config is None:
+        config = get_config()
+    if not config.get("PAYLOAD_COMPRESSION") or not isinstance(payload, dict):
+        return payload, {}
+    cold_keys = config.get("PAYLOAD_COLD_KEYS") or ()
+    cold = {key: payload[key] for key in cold_keys if payload.get(key)}
+    if not cold:
+        return payload, {}
+    hot = {key: value for key, value in payload.items() if key not in cold}
+    return hot, cold
+
+
+def encode_cold(cold: Dict[str, Any], config=None) -> Optional[bytes]:
+    """Compress ``cold`` into a tagged blob, or None when there is nothing to store."""
+    if not cold:
+        return None
+    if config is None:
+        config = get_config()
+    raw = json.dumps(cold, default=str, separators=(",", ":")).encode()
+    if config.get("PAYLOAD_COMPRESSION") == "zstd" and zstandard is not None:
+        return ZSTD + zstandard.ZstdCompressor(level=3).compress(raw)
+    return ZLIB + zlib.compress(raw, 6)
+
+
+def decode_cold(blob) -> Dict[str, Any]:
+    """Return the cold keys stored in ``blob``. Never raises."""
+    try:
+        blob = bytes(blob)
+        tag, data = blob[:1], blob[1:]
+        if tag == ZLIB:
+            return json.loads(zlib.decompress(data))
+        if tag == ZSTD and zstandard is not None:
+            return json.loads(zstandard.ZstdDecompressor().decompress(data))
+    except Exception:
+        pass
+    return {}
+
+
+def merge_payload(hot: Any, blob) -> Any:
+    """Return ``hot`` with the keys from ``blob`` added back. Hot keys win."""
+    if not blob or not isinstance(hot, dict):
+        return hot
+    merged = dict(hot)
+    for key, value in decode_cold(blob).items():
+        merged.setdefault(key, value)
+    return merged
@@ -4,86 +4,115 @@ Django Orbit SQL Recorder
 Intercepts SQL queries using Django's database wrapper mechanism.
 """
 
-import hashlib
-import threading
+import linecache
+import sys
 import time
-import traceback
 from contextlib import contextmanager
+from types import CodeType
 from typing import Any, Dict, List, Optional
 
 from django.db import connection
 
+from orbit import metrics
 from orbit.adapters import unwrap_adapters
 from orbit.conf import get_config
-from orbit.watchers import cachalot_disabled
-
-# Thread-local storage for tracking queries per request
-_local = threading.local()
+from orbit.context import (
+    clear_context,
+    current_family_hash,
+    get_context,
+    set_family_hash,
+)
+from orbit.governor import governor
+from orbit.sql import fingerprint_sql
+from orbit.writer import write_entries
 
 
 def get_current_queries() -> List[Dict[str, Any]]:
-    """Get the list of queries for the current request."""
-    if not hasattr(_local, "queries"):
-        _local.queries = []
-    return _local.queries
+    """Get the list of queries for the current request (empty outside one)."""
+    context = get_context()
+    return context.queries if context is not None else []
 
 
 def get_current_family_hash() -> Optional[str]:
     """Get the family hash for the current request."""
-    return getattr(_local, "family_hash", None)
+    return current_family_hash()
 
 
-def set_current_family_hash(family_hash: str) -> None:
+def set_current_family_hash(family_hash: Optional[str]) -> None:
     """Set the family hash for the current request."""
-    _local.family_hash = family_hash
+    set_family_hash(family_hash)
 
 
 def clear_current_context() -> None:
     """Clear the current request context."""
-    _local.queries = []
-    _local.family_hash = None
+    clear_context()
+
+
+# Frames from these files are never reported as a query's caller
+_CALLER_SKIP_FRAGMENTS = (
+    "django/db",
+    "django/core",
+    "orbit/recorders.py",
+    "orbit/middleware.py",
+)
+
+# code object -> "is this frame skippable". Code objects live as long as their
+# function, so the answer never changes; the cap only guards against code generated
+# at runtime (exec, templates compiled to Python, ...).
+_skip_cache: Dict[CodeType, bool] = {}
+_SKIP_CACHE_MAX = 4096
 
 
-def _get_query_hash(sql: str) -> str:
-    """Generate a hash for a SQL query (for duplicate detection)."""
-    return hashlib.md5(sql.encode()).hexdigest()[:12]
+def _is_skipped_code(code: CodeType) -> bool:
+    skipped = _skip_cache.get(code)
+    if skipped is None:
+        filename = code.co_filename.replace("\\", "/")
+        skipped = any(fragment in filename for fragment in _CALLER_SKIP_FRAGMENTS)
+        if len(_skip_cache) >= _SKIP_CACHE_MAX:
+            _skip_cache.clear()
+        _skip_cache[code] = skipped
+    return skipped
 
 
 def _extract_caller_info() -> Dict[str, Any]:
     """
     Extract information about the code that triggered the query.
 
+    Walks frames with ``sys._getframe`` instead of building a full traceback, and
+    leaves the source line out: it is filled in at write time by
+    ``resolve_caller_line``, off the query's hot path.
+
     Returns:
         Dictionary with filename, line number, and function name
     """
-    # Walk up the stack to find the first non-Django, non-Orbit frame
-    stack = traceback.extract_stack()
-
-    for frame in reversed(stack):
-        filename = frame.filename
-
-        # Skip Django internals and Orbit itself
-        if any(
-            skip in filename
-            for skip in [
-                "django/db",
-                "django/core",
-                "orbit/recorders.py",
-                "orbit/middleware.py",
-            ]
-        ):
-            continue
-
-        return {
-            "filename": filename,
-            "lineno": frame.lineno,
-            "function": frame.name,
-            "line": frame.line,
-        }
-
+    frame = sys._getframe(1)
+    while frame is not None:
+        code = frame.f_code
+        if not _is_skipped_code(code):
+            return {
+                "filename": code.co_filename,
+                "lineno": frame.f_lineno,
+                "function": code.co_name,
+            }
+        frame = frame.f_back
     return {}
 
 
+def resolve_caller_line(payload: Dict[str, Any]) -> None:
+    """Add the source ``line`` to a query payload's caller, if it is missing."""
+    caller = payload.get("caller") if isinstance(payload, dict) else None
+    if not caller or "line" in caller or not caller.get("filename"):
+        return
+    line = linecache.getline(caller["filename"], caller.get("lineno") or 0)
+    caller["line"] = line.strip() or None
+
+
+def _should_capture_caller(mode: str, is_slow: bool, is_duplicate: bool) -> bool:
+    if mode == "slow_or_duplicate":
+        return is_slow or is_duplicate
+    return mode != "never"
+
+
 class OrbitQueryWrapper:
     """
     Database query wrapper that intercepts and records SQL queries.
@@ -98,7 +127,7 @@ class OrbitQueryWrapper:
         # perf_counter() at request start (for waterfall)
         self.request_start = request_start
         self.queries = []
-        self.query_hashes = {}  # For duplicate detection
+        self.query_hashes = {}  # fingerprint -> executions, for duplicate detection
 
     def __call__(self, execute, sql, params, many, context):
         """
@@ -116,6 +145,7 @@ class OrbitQueryWrapper:
         """
         config = get_config()
         slow_threshold = config.get("SLOW_QUERY_THRESHOLD_MS", 500)
+        caller_mode = config.get("QUERY_CALLER_MODE", "always")
 
         start_time = time.perf_counter()
 
@@ -123,15 +153,23 @@ class OrbitQueryWrapper:
             result = execute(sql, params, many, context)
             return result
         finally:
-            duration_ms = (time.perf_counter() - start_time) * 1000
+            finished = time.perf_counter()
+            duration_ms = (finished - start_time) * 1000
 
-            query_hash = _get_query_hash(sql)
+            # Group by normalized shape, so IN-lists of different lengths and
+            # inlined literals still count as the same query
+            query_hash = fingerprint_sql(sql)
             is_duplicate = query_hash in self.query_hashes
             self.query_hashes[query_hash] = self.query_hashes.get(query_hash, 0) + 1
             duplicate_count = self.query_hashes[query_hash]
 
             is_slow = duration_ms > slow_threshold
-            caller = _extract_caller_info()
+            if governor.allows_callers() and _should_capture_caller(
+                caller_mode, is_slow, is_duplicate
+            ):
+                caller = _extract_caller_info()
+            else:
+                caller = {}
 
             query_info = {
                 "sql": sql,
@@ -140,6 +178,7 @@ class OrbitQueryWrapper:
                 "is_slow": is_slow,
                 "is_duplicate": is_duplicate,
                 "duplicate_count": duplicate_count,
+                "fingerprint": query_hash,
                 "database": context.get("alias", "default") if context else "default",
                 "caller": caller,
             }
@@ -151,6 +190,9 @@ class OrbitQueryWrapper:
 
             self.queries.append(query_info)
             get_current_queries().append(query_info)
+            overhead = time.perf_counter() - finished
+            metrics.charge(overhead)
+            metrics.observe("watcher.query", overhead)
 
     def _serialize_params(self, params: Any) -> Any:
         """
@@ -191,6 +233,47 @@ def record_queries(family_hash: Optional[str] = None):
         yield wrapper
 
 
+def context_query_recorder(execute, sql, params, many, context):
+    """
+    Execute wrapper installed on every connection of the default database.
+
+    An async view's ORM calls run on a worker thread through ``sync_to_async``, on a
+    connection the middleware's coroutine can't reach to install its wrapper. This
+    one is always installed and hands each query to the wrapper of the current
+    ``OrbitContext``, which ``sync_to_async`` carries over. Outside such a request it
+    costs one context variable lookup.
+    """
+    orbit_context = get_context()
+    wrapper = orbit_context.query_wrapper if orbit_context is not None else None
+    if wrapper is None:
+        return execute(sql, params, many, context)
+    return wrapper(execute, sql, params, many, context)
+
+
+def install_context_query_recorder(sender=None, connection=None, **kwargs) -> None:
+    """``connection_created`` receiver that installs ``context_query_recorder`` once."""
+    from django.db import DEFAULT_DB_ALIAS
+
+    if connection is None or connection.alias != DEFAULT_DB_ALIAS:
+        return
+    if context_query_recorder not in connection.execute_wrappers:
+        connection.execute_wrappers.append(context_query_recorder)
+
+
+@contextmanager
+def record_context_queries(wrapper: OrbitQueryWrapper):
+    """Send the current context's queries on the default database to ``wrapper``."""
+    context = get_context()
+    if context is None:
+        yield wrapper
+        return
+    previous, context.query_wrapper = context.query_wrapper, wrapper
+    try:
+        yield wrapper
+    finally:
+        context.query_wrapper = previous
+
+
 def save_queries_to_orbit(
     queries: List[Dict[str, Any]], family_hash: Optional[str] = None
 ) -> None:
@@ -208,14 +291,10 @@ def save_queries_to_orbit(
         entry = OrbitEntry(
             type=OrbitEntry.TYPE_QUERY,
             family_hash=family_hash,
-            payload=OrbitEntry.prepare_payload_for_storage(query),
+            fingerprint=query.get("fingerprint", ""),
+            payload=query,
             duration_ms=query.get("duration_ms"),
         )
         entries.append(entry)
 
-    if entries:
-        try:
-            with cachalot_disabled():
-                OrbitEntry.objects.bulk_create(entries)
-        except Exception:
-            pass
+    write_entries(entries)
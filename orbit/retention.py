@@ -0,0 +1,348 @@
+"""
+Django Orbit Retention
+
+Trims stored entries outside the request path. Each pass:
+
+1. asks the storage backend for housekeeping (``maintain()``) and to drop whole
+   partitions that every policy has expired;
+2. deletes entries older than their type's policy — ``RETENTION_POLICIES`` maps an
+   entry type to hours, ``RETENTION_HOURS`` covers the other types;
+3. deletes entries beyond the newest ``STORAGE_LIMIT``;
+4. deletes interned texts no remaining entry refers to (``orbit.interning``).
+
+Deletes run in batches of ``RETENTION_BATCH_SIZE`` rows, oldest first, each batch
+bounded by a ``created_at`` watermark read through the ``created_at``/``type``
+indexes and deleted in its own short transaction (see ``delete_in_batches``).
+
+Passes run from one of:
+
+- the ``RETENTION_SCHEDULER = "thread"`` background thread (default), started by
+  ``OrbitMiddleware`` and repeating every ``RETENTION_INTERVAL`` seconds;
+- ``manage.py orbit_retention --daemon``, or a single pass without ``--daemon``;
+- ``orbit.retention.run_retention()`` wrapped in your own Celery beat task.
+
+Every web worker runs the thread, so each pass first takes a cross-process lock
+(``pass_lock``) and is skipped when another process already holds it.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from orbit.conf import get_config
+
+logger = logging.getLogger(__name__)
+
+# Shared by every process running retention against the same database
+LOCK_ID = 0x0DB17  # PostgreSQL advisory lock key
+LOCK_NAME = "orbit_retention"
+# Lease on the cache fallback; outlives any sane pass and only matters when the
+# holder dies before releasing it
+LOCK_LEASE_SECONDS = 15 * 60
+
+
+def delete_in_batches(
+    queryset, batch_size: int, pause: float = 0, progress=None
+) -> int:
+    """
+    Delete every row in ``queryset`` in ``created_at`` order, about ``batch_size``
+    rows per statement. Returns rows deleted.
+
+    Each batch reads the ``created_at`` of its last row through the index, then
+    deletes the key range up to it with a single ``DELETE ... WHERE`` — no primary
+    keys are loaded (Orbit's own ``post_delete`` receiver would otherwise make Django
+    fetch every row) and each batch commits on its own. The next batch starts after
+    that watermark, so rows the filter keeps are never scanned twice, and an
+    interrupted run resumes where it stopped when started again. ``progress`` is
+    called with the running total after each batch.
+    """
+    from django.db import transaction
+
+    total = 0
+    watermark = None
+    while True:
+        pending = (
+            queryset if watermark is None else queryset.filter(created_at__gt=watermark)
+        )
+        boundary = list(
+            pending.order_by("created_at").values_list("created_at", flat=True)[
+                batch_size - 1 : batch_size
+            ]
+        )
+        batch = pending.filter(created_at__lte=boundary[0]) if boundary else pending
+        with transaction.atomic(using=queryset.db):
+            total += batch.order_by()._raw_delete(queryset.db)
+        if progress is not None:
+            progress(total)
+        if not boundary:
+            return total
+        watermark = boundary[0]
+        if pause:
+            time.sleep(pause)
+
+
+def estimate_count(queryset) -> int:
+    """
+    Row count for ``queryset``: the planner's estimate on PostgreSQL, where an exact
+    ``COUNT`` over a large range is itself slow, otherwise ``count()``.
+    """
+    from django.db import connections
+
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql":
+        try:
+            sql, params = queryset.order_by().query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                import json
+
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception:
+            pass
+    return queryset.count()
+
+
+def cutoffs(now, config) -> Dict[Optional[str], Any]:
+    """
+    Return ``{entry_type: cutoff}`` from the retention settings. The ``None`` key is
+    the cutoff for types without their own policy (absent when they are kept).
+    """
+    result: Dict[Optional[str], Any] = {}
+    for entry_type, hours in (config.get("RETENTION_POLICIES") or {}).items():
+        if hours is not None:
+            result[entry_type] = now - timedelta(hours=hours)
+    default_hours = config.get("RETENTION_HOURS")
+    if default_hours is not None:
+        result[None] = now - timedelta(hours=default_hours)
+    return result
+
+
+@contextmanager
+def pass_lock():
+    """
+    Hold the cross-process retention lock for the duration of the block. Yields
+    False without waiting when another process holds it.
+
+    PostgreSQL takes a session advisory lock and MySQL ``GET_LOCK`` on the storage
+    connection. Other databases fall back to a ``cache.add`` lease in the default
+    cache, which only excludes other processes if that cache is shared.
+    """
+    from django.db import connections
+
+    from orbit.backends import get_storage_db_alias
+
+    connection = connections[get_storage_db_alias()]
+    if connection.vendor == "postgresql":
+        acquire = ("SELECT pg_try_advisory_lock(%s)", [LOCK_ID])
+        release = ("SELECT pg_advisory_unlock(%s)", [LOCK_ID])
+    elif connection.vendor == "mysql":
+        acquire = ("SELECT GET_LOCK(%s, 0)", [LOCK_NAME])
+        release = ("SELECT RELEASE_LOCK(%s)", [LOCK_NAME])
+    else:
+        with _cache_lease() as held:
+            yield held
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(*acquire)
+        held = bool(cursor.fetchone()[0])
+    try:
+        yield held
+    finally:
+        if held:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(*release)
+            except Exception:
+                # A dropped connection releases session locks with it
+                pass
+
+
+@contextmanager
+def _cache_lease():
+    from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+
+    cache = caches[DEFAULT_CACHE_ALIAS]
+    key = f"orbit:{LOCK_NAME}"
+    held = cache.add(key, os.getpid(), timeout=LOCK_LEASE_SECONDS)
+    try:
+        yield held
+    finally:
+        if held:
+            # The class method, so the cache watcher doesn't record Orbit's own lock
+            type(cache).delete(cache, key)
+
+
+def run_retention(config=None) -> Dict[str, Any]:
+    """
+    Run one retention pass and return ``{"deleted", "seconds", "skipped"}``.
+
+    The pass is skipped (``skipped`` is True, nothing deleted) when another process
+    holds ``pass_lock``. Safe to call from a Celery task or cron job. Errors
+    propagate to the caller.
+    """
+    with pass_lock() as held:
+        if not held:
+            return {"deleted": 0, "seconds": 0.0, "skipped": True}
+        return {**_run_pass(config), "skipped": False}
+
+
+def _run_pass(config) -> Dict[str, Any]:
+    from django.utils import timezone
+
+    from orbit.backends import get_backend
+    from orbit.interning import delete_orphans
+    from orbit.models import OrbitEntry
+    from orbit.watchers import cachalot_disabled
+
+    if config is None:
+        config = get_config()
+    batch_size = max(1, int(config.get("RETENTION_BATCH_SIZE", 1000)))
+    started = time.monotonic()
+    deleted = 0
+    backend = get_backend()
+    entries = OrbitEntry.objects.all()
+
+    with cachalot_disabled():
+        backend.maintain()
+        policy_cutoffs = cutoffs(timezone.now(), config)
+        if None in policy_cutoffs:
+            # Every type has a policy, so anything older than all of them can go
+            deleted += backend.drop_partitions_before(min(policy_cutoffs.values()))
+
+        typed = [t for t in policy_cutoffs if t is not None]
+        for entry_type in typed:
+            expired = entries.filter(
+                type=entry_type, created_at__lt=policy_cutoffs[entry_type]
+            )
+            deleted += delete_in_batches(expired, batch_size)
+        if None in policy_cutoffs:
+            expired = entries.filter(created_at__lt=policy_cutoffs[None]).exclude(
+                type__in=typed
+            )
+            deleted += delete_in_batches(expired, batch_size)
+
+        limit = config.get("STORAGE_LIMIT")
+        if limit:
+            watermark = (
+                entries.order_by("-created_at")
+                .values_list("created_at", flat=True)[limit - 1 : limit]
+                .first()
+            )
+            if watermark is not None:
+                deleted += backend.drop_partitions_before(watermark)
+                deleted += delete_in_batches(
+                    entries.filter(created_at__lt=watermark), batch_size
+                )
+
+        # Texts are shared, so they go once nothing points at them; not counted as entries
+        delete_orphans(batch_size)
+
+    return {"deleted": deleted, "seconds": time.monotonic() - started}
+
+
+class RetentionScheduler:
+    """Runs retention passes on a daemon thread and keeps this process's counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        self.runs = 0
+        self.deleted = 0
+        self.seconds = 0.0
+        self.failures = 0
+        self.skipped = 0
+        self.last_run = None
+        self.last_deleted = 0
+        self.last_error: Optional[str] = None
+
+    def ensure_started(self, config=None) -> None:
+        """Start the thread if ``RETENTION_SCHEDULER`` is ``"thread"``. Cheap; never raises."""
+        try:
+            if config is None:
+                config = get_config()
+            if config.get("RETENTION_SCHEDULER", "thread") != "thread":
+                return
+            # A forked worker doesn't inherit the parent's thread
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = None
+            if self._thread is not None and self._thread.is_alive():
+                return
+            with self._lock:
+                if self._thread is not None and self._thread.is_alive():
+                    return
+                self._thread = threading.Thread(
+                    target=self._run, name="orbit-retention", daemon=True
+                )
+                self._thread.start()
+        except Exception:
+            pass
+
+    def _run(self) -> None:
+        while True:
+            config = get_config()
+            time.sleep(max(1.0, float(config.get("RETENTION_INTERVAL", 60))))
+            if config.get("RETENTION_SCHEDULER", "thread") != "thread":
+                return
+            self.run_once(config)
+            self._release_connection()
+
+    def run_once(self, config=None) -> int:
+        """Run one pass and record it. Returns rows deleted; never raises."""
+        from django.utils import timezone
+
+        try:
+            result = run_retention(config)
+        except Exception as exc:
+            self.failures += 1
+            self.last_error = str(exc)
+            logger.debug("Orbit retention failed: %s", exc)
+            return 0
+        if result["skipped"]:
+            self.skipped += 1
+            return 0
+        self.runs += 1
+        self.deleted += result["deleted"]
+        self.seconds += result["seconds"]
+        self.last_deleted = result["deleted"]
+        self.last_run = timezone.now()
+        self.last_error = None
+        return result["deleted"]
+
+    @staticmethod
+    def _release_connection() -> None:
+        try:
+            from django.db import connections
+
+            from orbit.backends import get_storage_db_alias
+
+            connections[get_storage_db_alias()].close()
+        except Exception:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "runs": self.runs,
+            "deleted": self.deleted,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "rows_per_second": (
+                round(self.deleted / self.seconds, 1) if self.seconds else None
+            ),
+            "last_run": self.last_run,
+            "last_deleted": self.last_deleted,
+            "last_error": self.last_error,
+        }
+
+
+scheduler = RetentionScheduler()
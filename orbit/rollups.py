@@ -0,0 +1,507 @@
+"""
+Django Orbit Rollups
+
+Keeps per-minute and per-hour totals for every entry type in ``OrbitRollup`` so the
+stats dashboard reads a few hundred buckets at most instead of scanning raw entries.
+
+Every entry handed to the writer is observed here, as is every request that sampling
+kept out of OrbitEntry. ``observe()`` is a dict update under a lock: totals accumulate
+in memory per minute and are merged into the minute and hour rows every
+``ROLLUP_FLUSH_INTERVAL`` seconds by a daemon thread, never on the recording path.
+Pending totals are also merged when the stats are read and at exit.
+
+A merge takes no row lock. Counters are added with ``F()`` expressions, and the
+sketch is written in the same ``UPDATE`` guarded by the ``count`` that was read, so a
+concurrent merge from another process makes it re-read and retry. Rows that still
+can't be merged (lost races, database errors) are retried on the next flushes and
+only dropped, counted and logged after ``MERGE_FLUSHES`` failed flushes.
+
+Latency is kept as a DDSketch (``orbit.sketch``) per row. Sketches merge by adding
+bucket counts, so hour rows and arbitrary windows cost nothing extra. Apdex and
+percentiles are read from the merged sketch with 1% relative accuracy.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from orbit import metrics
+from orbit.conf import get_config
+from orbit.sketch import DDSketch
+
+logger = logging.getLogger(__name__)
+
+MINUTE = "minute"
+HOUR = "hour"
+
+_COUNTERS = (
+    "count",
+    "error_count",
+    "slow_count",
+    "duplicate_count",
+    "hit_count",
+    "miss_count",
+    "duration_count",
+)
+
+# (positive, negative) outcome values for hit_count / miss_count, per type
+_OUTCOMES = {
+    "cache": ("hit", (True,), (False,)),
+    "gate": ("result", ("granted",), ("denied",)),
+    "job": ("status", ("success",), ("failed", "failure")),
+    "transaction": ("status", ("committed",), ("rolled_back",)),
+}
+
+
+def empty_totals() -> Dict[str, Any]:
+    totals: Dict[str, Any] = dict.fromkeys(_COUNTERS, 0)
+    totals["duration_sum"] = 0.0
+    totals["duration_max"] = 0.0
+    totals["sketch"] = DDSketch()
+    return totals
+
+
+def merge_totals(into: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+    """Add ``other`` (a totals dict or OrbitRollup) into ``into`` and return it."""
+    if isinstance(other, dict):
+        get = other.get
+    else:
+        get = lambda key: getattr(other, key, None)  # noqa: E731
+    for key in _COUNTERS:
+        into[key] += get(key) or 0
+    into["duration_sum"] += get("duration_sum") or 0
+    into["duration_max"] = max(into["duration_max"], get("duration_max") or 0)
+    sketch = get("sketch")
+    if isinstance(sketch, dict):
+        sketch = DDSketch.from_dict(sketch)
+    if sketch:
+        into["sketch"].merge(sketch)
+    return into
+
+
+def _classify(entry_type: str, payload: dict) -> Tuple[bool, bool, int, bool, bool]:
+    """Return ``(error, slow, duplicates, hit, miss)`` for one entry."""
+    error = slow = hit = miss = False
+    duplicates = 0
+    if entry_type == "request":
+        error = (payload.get("status_code") or 200) >= 500
+        duplicates = int(payload.get("duplicate_query_count") or 0)
+    elif entry_type == "query":
+        slow = bool(payload.get("is_slow"))
+        duplicates = 1 if payload.get("is_duplicate") else 0
+    elif entry_type == "exception":
+        error = True
+    elif entry_type == "log":
+        error = payload.get("level") in ("ERROR", "CRITICAL")
+    elif entry_type in _OUTCOMES:
+        key, positive, negative = _OUTCOMES[entry_type]
+        value = payload.get(key)
+        hit = value in positive
+        miss = value in negative
+        error = miss and entry_type == "job"
+    return error, slow, duplicates, hit, miss
+
+
+def _floor(value, resolution: str):
+    if resolution == HOUR:
+        return value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(second=0, microsecond=0)
+
+
+class RollupAccumulator:
+    """In-memory per-minute totals waiting to be merged into ``OrbitRollup``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Serialises flushes so the flusher thread and a reader never merge twice
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[Tuple, Dict[str, Any]] = {}
+        # Row totals whose merge failed, with the number of flushes that failed them
+        self._retry: Dict[Tuple, Tuple[Dict[str, Any], int]] = {}
+        # Method/path pairs given their own rows, per minute; kept across flushes
+        self._endpoints: Dict[Any, set] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        self._last_prune = 0.0
+
+    def observe(
+        self,
+        entry_type: str,
+        payload: Optional[dict] = None,
+        duration_ms: Optional[float] = None,
+        created_at=None,
+        config=None,
+    ) -> None:
+        from django.utils import timezone
+
+        if config is None:
+            config = get_config()
+        payload = payload or {}
+        # Summary entries: their events were observed one by one (orbit.aggregates)
+        if payload.get("aggregate"):
+            return
+        minute = _floor(created_at or timezone.now(), MINUTE)
+        error, slow, duplicates, hit, miss = _classify(entry_type, payload)
+
+        keys = [(minute, entry_type, "", "")]
+        with self._lock:
+            if entry_type == "request" and payload.get("path"):
+                endpoint = ((payload.get("method") or "")[:10], payload["path"][:255])
+                seen = self._endpoints.setdefault(minute, set())
+                if endpoint in seen:
+                    keys.append((minute, entry_type) + endpoint)
+                elif len(seen) < config.get("ROLLUP_MAX_ENDPOINTS", 500):
+                    seen.add(endpoint)
+                    keys.append((minute, entry_type) + endpoint)
+
+            for key in keys:
+                totals = self._pending.get(key)
+                if totals is None:
+                    totals = self._pending[key] = empty_totals()
+                totals["count"] += 1
+                totals["error_count"] += error
+                totals["slow_count"] += slow
+                totals["duplicate_count"] += duplicates
+                totals["hit_count"] += hit
+                totals["miss_count"] += miss
+                if duration_ms is not None:
+                    totals["duration_count"] += 1
+                    totals["duration_sum"] += duration_ms
+                    if duration_ms > totals["duration_max"]:
+                        totals["duration_max"] = duration_ms
+                    totals["sketch"].add(duration_ms)
+
+        self._ensure_thread(config)
+
+    def _ensure_thread(self, config) -> None:
+        """Start the flusher thread unless ``ROLLUP_FLUSH_INTERVAL`` is None."""
+        if config.get("ROLLUP_FLUSH_INTERVAL", 10) is None:
+            return
+        # A forked worker doesn't inherit the parent's thread
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = None
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="orbit-rollups", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            interval = get_config().get("ROLLUP_FLUSH_INTERVAL", 10)
+            if interval is None:
+                return
+            time.sleep(max(0.1, float(interval)))
+            self.flush()
+            self._release_connection()
+
+    @staticmethod
+    def _release_connection() -> None:
+        try:
+            from django.db import connections
+
+            from orbit.backends import get_storage_db_alias
+
+            connections[get_storage_db_alias()].close_if_unusable_or_obsolete()
+        except Exception:
+            pass
+
+    def clear(self) -> None:
+        """Forget everything pending, endpoint caps included (for tests)."""
+        with self._lock:
+            self._pending = {}
+            self._endpoints = {}
+            self._retry = {}
+
+    def flush(self) -> None:
+        """Merge pending totals into the minute and hour rows. Never raises."""
+        from django.utils import timezone
+
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                # Endpoint caps last as long as their minute can still receive entries
+                horizon = _floor(timezone.now(), MINUTE) - timedelta(minutes=10)
+                for minute in [m for m in self._endpoints if m < horizon]:
+                    del self._endpoints[minute]
+            if pending or self._retry:
+                self._merge(pending)
+
+    def _merge(self, pending: Dict[Tuple, Dict[str, Any]]) -> None:
+        rows: Dict[Tuple, Dict[str, Any]] = {}
+        failures: Dict[Tuple, int] = {}
+        for key, (totals, failed) in self._retry.items():
+            rows[key] = totals
+            failures[key] = failed
+        for (minute, entry_type, method, endpoint), totals in pending.items():
+            for resolution in (MINUTE, HOUR):
+                key = (
+                    resolution,
+                    _floor(minute, resolution),
+                    entry_type,
+                    method,
+                    endpoint,
+                )
+                if key in rows:
+                    merge_totals(rows[key], totals)
+                else:
+                    rows[key] = merge_totals(empty_totals(), totals)
+
+        try:
+            from orbit.watchers import cachalot_disabled
+
+            retry = {}
+            with cachalot_disabled():
+                for key, totals in rows.items():
+                    try:
+                        if _merge_row(key, totals):
+                            continue
+                    except Exception as exc:
+                        logger.debug("Orbit rollup merge failed: %s", exc)
+                    failed = failures.get(key, 0) + 1
+                    if failed < MERGE_FLUSHES:
+                        retry[key] = (totals, failed)
+                    else:
+                        self._drop(key, totals)
+                self._retry = retry
+                if time.monotonic() - self._last_prune >= 3600:
+                    self._last_prune = time.monotonic()
+                    prune_rollups()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _drop(key: Tuple, totals: Dict[str, Any]) -> None:
+        metrics.count("dropped", "rollup_merge", totals["count"])
+        resolution, bucket, entry_type, method, endpoint = key
+        logger.warning(
+            "Orbit dropped %s %s rollup totals for %s %s%s after %s failed flushes",
+            totals["count"],
+            resolution,
+            entry_type,
+            bucket.isoformat(),
+            f" ({method} {endpoint})" if endpoint else "",
+            MERGE_FLUSHES,
+        )
+
+
+# A merge that keeps losing the race to other processes gives up after this many reads
+MERGE_ATTEMPTS = 5
+# ...and its totals are dropped after failing this many flushes in a row
+MERGE_FLUSHES = 5
+
+
+def _merge_row(key: Tuple, totals: Dict[str, Any]) -> bool:
+    """Add ``totals`` to the row ``key``; False if it lost every attempt to merge."""
+    from django.db import IntegrityError, transaction
+    from django.db.models import F, FloatField, Value
+    from django.db.models.functions import Greatest
+
+    from orbit.models import OrbitRollup
+
+    resolution, bucket, entry_type, method, endpoint = key
+    rows = OrbitRollup.objects.filter(
+        resolution=resolution,
+        bucket=bucket,
+        type=entry_type,
+        method=method,
+        endpoint=endpoint,
+    )
+    for _ in range(MERGE_ATTEMPTS):
+        current = rows.values_list("count", "sketch").first()
+        if current is None:
+            try:
+                with transaction.atomic(using=rows.db):
+                    OrbitRollup.objects.create(
+                        resolution=resolution,
+                        bucket=bucket,
+                        type=entry_type,
+                        method=method,
+                        endpoint=endpoint,
+                        **_row_values(totals),
+                    )
+                return True
+            except IntegrityError:
+                # Another process created the bucket first
+                continue
+        count, stored = current
+        sketch = DDSketch.from_dict(stored) if stored else DDSketch()
+        sketch.merge(totals["sketch"])
+        # Every flush adds to count, so an unchanged count means nobody merged since
+        updated = rows.filter(count=count).update(
+            **{field: F(field) + totals[field] for field in _COUNTERS},
+            duration_sum=F("duration_sum") + totals["duration_sum"],
+            duration_max=Greatest(
+                "duration_max", Value(totals["duration_max"], output_field=FloatField())
+            ),
+            sketch=sketch.to_dict(),
+        )
+        if updated:
+            return True
+    return False
+
+
+def _row_values(totals: Dict[str, Any]) -> Dict[str, Any]:
+    return {**totals, "sketch": totals["sketch"].to_dict()}
+
+
+def prune_rollups(now=None) -> int:
+    """Delete rollup rows past ``ROLLUP_MINUTE_RETENTION_HOURS`` / ``ROLLUP_HOUR_RETENTION_DAYS``."""
+    from django.db.models import Q
+    from django.utils import timezone
+
+    from orbit.models import OrbitRollup
+
+    config = get_config()
+    now = now or timezone.now()
+    minute_cutoff = now - timedelta(
+        hours=config.get("ROLLUP_MINUTE_RETENTION_HOURS", 48)
+    )
+    hour_cutoff = now - timedelta(days=config.get("ROLLUP_HOUR_RETENTION_DAYS", 90))
+    deleted, _ = OrbitRollup.objects.filter(
+        Q(resolution=MINUTE, bucket__lt=minute_cutoff)
+        | Q(resolution=HOUR, bucket__lt=hour_cutoff)
+    ).delete()
+    return deleted
+
+
+accumulator = RollupAccumulator()
+
+
+def observe_entries(entries: Iterable[Any]) -> None:
+    """Count unsaved OrbitEntry instances that are about to be written. Never raises."""
+    try:
+        config = get_config()
+        for entry in entries:
+            accumulator.observe(
+                entry.type, entry.payload, entry.duration_ms, entry.created_at, config
+            )
+    except Exception:
+        pass
+
+
+def observe_fields(fields: Dict[str, Any]) -> None:
+    """Count one entry given as ``write_entry`` keyword arguments. Never raises."""
+    try:
+        accumulator.observe(
+            fields.get("type"),
+            fields.get("payload"),
+            fields.get("duration_ms"),
+            fields.get("created_at"),
+        )
+    except Exception:
+        pass
+
+
+def observe_request(
+    duration_ms: float, status_code: int, method: str = "", path: str = ""
+) -> None:
+    """Count a request that was not recorded in OrbitEntry. Never raises."""
+    try:
+        accumulator.observe(
+            "request",
+            {"status_code": status_code, "method": method, "path": path},
+            duration_ms,
+        )
+    except Exception:
+        pass
+
+
+atexit.register(accumulator.flush)
+
+
+# =============================================================================
+# Reading
+# =============================================================================
+
+
+def load_rollups(
+    entry_type: str,
+    start,
+    end,
+    resolution: str = MINUTE,
+    method: str = "",
+    endpoint: str = "",
+) -> List[Any]:
+    """
+    Return the ``OrbitRollup`` rows of one type covering ``[start, end]``, oldest first.
+
+    The bucket containing ``start`` is included whole. Totals still pending in this
+    process are flushed first so the result is current.
+    """
+    from orbit.models import OrbitRollup
+
+    accumulator.flush()
+    return list(
+        OrbitRollup.objects.filter(
+            resolution=resolution,
+            type=entry_type,
+            method=method,
+            endpoint=endpoint,
+            bucket__gte=_floor(start, resolution),
+            bucket__lte=end,
+        ).order_by("bucket")
+    )
+
+
+def window_totals(
+    entry_type: str,
+    start,
+    end,
+    method: Optional[str] = "",
+    endpoint: str = "",
+) -> Dict[str, Any]:
+    """
+    Totals of one type over ``[start, end)``, with ``start`` on a minute boundary.
+
+    Whole hours are read from hour rows and the minutes around them from minute rows.
+    ``method=None`` adds up every method's rows for ``endpoint``. Totals still
+    pending in this process are flushed first.
+    """
+    from django.db.models import Q
+
+    from orbit.models import OrbitRollup
+
+    accumulator.flush()
+    first_hour = _floor(start, HOUR)
+    if first_hour < start:
+        first_hour += timedelta(hours=1)
+    last_hour = _floor(end, HOUR)
+    if first_hour < last_hour:
+        buckets = (
+            Q(resolution=HOUR, bucket__gte=first_hour, bucket__lt=last_hour)
+            | Q(resolution=MINUTE, bucket__gte=start, bucket__lt=first_hour)
+            | Q(resolution=MINUTE, bucket__gte=last_hour, bucket__lt=end)
+        )
+    else:
+        buckets = Q(resolution=MINUTE, bucket__gte=start, bucket__lt=end)
+    rows = OrbitRollup.objects.filter(buckets, type=entry_type, endpoint=endpoint)
+    if method is not None:
+        rows = rows.filter(method=method)
+    return sum_rollups(rows)
+
+
+def sum_rollups(rows: Iterable[Any]) -> Dict[str, Any]:
+    totals = empty_totals()
+    for row in rows:
+        merge_totals(totals, row)
+    return totals
+
+
+def count_below(totals: Dict[str, Any], value: float) -> float:
+    """Estimated number of durations below ``value`` (within 1% of ``value``)."""
+    return totals["sketch"].count_below(value)
+
+
+def quantile(totals: Dict[str, Any], q: float) -> float:
+    """Estimate the ``q`` quantile (0-1) of the merged duration sketch."""
+    return totals["sketch"].quantile(q) or 0.0
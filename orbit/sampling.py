@@ -0,0 +1,125 @@
+"""
+Django Orbit Request Sampling
+
+Decides which requests ``OrbitMiddleware`` records in full.
+
+- **Head sampling** runs before the view. A request can be dropped by the global
+  ``SAMPLE_RATE``, a per-path rate (``SAMPLE_PATH_RATES``) or a per-path limit on
+  recorded requests per second (``SAMPLE_PATH_LIMITS``). A dropped request skips
+  header/body extraction and SQL capture entirely, and anything watchers record during
+  it is discarded.
+- **Tail sampling** (``TAIL_SAMPLING``) runs after the view. The request family is
+  already buffered, so Orbit can look at the outcome and keep only requests that were
+  slow, failed, repeated queries or carry a tag listed in ``TAIL_KEEP_TAGS``.
+
+Requests that are sampled out in either phase are still counted in the stats rollups
+(``orbit.rollups``), so dashboard totals, error rate and latency stay accurate.
+"""
+
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+from orbit.conf import get_config
+
+
+def _match_prefix(path: str, mapping: Dict[str, object]) -> Optional[str]:
+    """Return the longest key of ``mapping`` that ``path`` starts with."""
+    best = None
+    for prefix in mapping:
+        if path.startswith(prefix) and (best is None or len(prefix) > len(best)):
+            best = prefix
+    return best
+
+
+class _PathRateLimiter:
+    """Fixed one-second windows counting recorded requests per path prefix."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._windows: Dict[str, List] = {}
+
+    def allow(self, prefix: str, limit: int) -> bool:
+        now = int(time.monotonic())
+        with self._lock:
+            window = self._windows.get(prefix)
+            if window is None or window[0] != now:
+                window = [now, 0]
+                self._windows[prefix] = window
+            if window[1] >= limit:
+                return False
+            window[1] += 1
+            return True
+
+
+_rate_limiter = _PathRateLimiter()
+
+
+def head_sample(path: str, config: Optional[dict] = None) -> bool:
+    """
+    Decide at request start whether to record the request. ``True`` means record.
+    """
+    if config is None:
+        config = get_config()
+
+    rate = config.get("SAMPLE_RATE", 1.0)
+    path_rates = config.get("SAMPLE_PATH_RATES") or {}
+    if path_rates:
+        prefix = _match_prefix(path, path_rates)
+        if prefix is not None:
+            rate = path_rates[prefix]
+    if rate < 1.0 and random.random() >= rate:
+        return False
+
+    path_limits = config.get("SAMPLE_PATH_LIMITS") or {}
+    if path_limits:
+        prefix = _match_prefix(path, path_limits)
+        if prefix is not None and not _rate_limiter.allow(prefix, path_limits[prefix]):
+            return False
+
+    return True
+
+
+def tail_keep(
+    entries: list,
+    status_code: int,
+    duration_ms: float,
+    duplicate_query_count: int,
+    config: Optional[dict] = None,
+) -> bool:
+    """
+    Decide, once the response is known, whether to keep a buffered request family.
+    """
+    from orbit.models import OrbitEntry
+
+    if config is None:
+        config = get_config()
+
+    if status_code >= config.get("TAIL_KEEP_STATUS", 500):
+        return True
+    if duration_ms >= config.get("TAIL_KEEP_SLOWER_THAN_MS", 1000):
+        return True
+    threshold = config.get("TAIL_KEEP_DUPLICATE_QUERIES", 3)
+    if threshold and duplicate_query_count >= threshold:
+        return True
+
+    keep_tags = set(config.get("TAIL_KEEP_TAGS") or [])
+    for entry in entries:
+        if entry.type == OrbitEntry.TYPE_EXCEPTION:
+            return True
+        if keep_tags and entry.type == OrbitEntry.TYPE_REQUEST:
+            if keep_tags.intersection(entry.get_callback_tags(config)):
+                return True
+
+    rate = config.get("TAIL_SAMPLE_RATE", 0.0)
+    return rate > 0 and random.random() < rate
+
+
+def record_sampled_out(
+    duration_ms: float, status_code: int, method: str = "", path: str = ""
+) -> None:
+    """Count a request that Orbit did not record. Never raises."""
+    from orbit.rollups import observe_request
+
+    observe_request(duration_ms, status_code, method, path)
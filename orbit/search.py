@@ -0,0 +1,240 @@
+"""
+Django Orbit Search
+
+Free-text search over entries without casting every JSON payload to text.
+
+Each entry's payload values (and keys), tags and type are flattened into
+``OrbitEntry.search_text`` when the entry is written, after masking, so redacted values
+are never indexed. With ``PAYLOAD_COMPRESSION`` on, only the hot keys are indexed:
+the ``PAYLOAD_COLD_KEYS`` moved into the compressed blob would otherwise be stored a
+second time, uncompressed, so headers and bodies are not searchable. Interned SQL and
+tracebacks are left out too and matched once per distinct text in ``OrbitText``
+instead (``search_q``). Migration ``0013`` adds an index for the database vendor:
+
+- PostgreSQL: a GIN index on ``to_tsvector('simple', search_text)``. Every word of the
+  query must start a word in the entry (``checkout fail`` matches "checkout failed").
+- SQLite: an FTS5 table with the trigram tokenizer, kept in sync by triggers. Matches
+  any substring of three characters or more, like ``icontains``.
+- MySQL/MariaDB: a ``FULLTEXT`` index searched in boolean mode with prefix terms.
+
+Anything else, or a query the index can't express (e.g. too short), falls back to
+``search_text__icontains``, which still avoids the JSON cast.
+"""
+
+import re
+from typing import Any, Iterable, Iterator, Optional
+
+from django.db import connections
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+from orbit.conf import get_config
+from orbit.payloads import split_payload
+
+FTS_TABLE = "orbit_orbitentry_fts"
+PG_INDEX = "orbit_entry_search_gin"
+MYSQL_INDEX = "orbit_entry_search_ft"
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Per-alias cache of whether the SQLite FTS table exists
+_fts_tables = {}
+
+
+# =============================================================================
+# Writing
+# =============================================================================
+
+
+def _flatten(value: Any) -> Iterator[str]:
+    if value is None:
+        return
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield str(key)
+            yield from _flatten(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _flatten(item)
+    elif isinstance(value, bool):
+        yield "true" if value else "false"
+    else:
+        yield str(value)
+
+
+def build_search_text(entry, config=None) -> str:
+    """Return the text indexed for ``entry``, capped at ``SEARCH_TEXT_MAX_CHARS``."""
+    if config is None:
+        config = get_config()
+    limit = config.get("SEARCH_TEXT_MAX_CHARS", 8192)
+    parts = [entry.type or ""]
+    if entry.tags:
+        parts.append(entry.tags.strip(",").replace(",", " "))
+    size = sum(len(part) + 1 for part in parts)
+    hot, _ = split_payload(entry.payload, config)
+    if entry.text_id and isinstance(hot, dict):
+        # Interned text is searched through OrbitText, not copied into every row
+        from orbit.interning import INTERNED_KEYS
+
+        key = INTERNED_KEYS.get(entry.type)
+        hot = {k: v for k, v in hot.items() if k != key}
+    for part in _flatten(hot):
+        if size >= limit:
+            break
+        parts.append(part)
+        size += len(part) + 1
+    return " ".join(parts)[:limit]
+
+
+# =============================================================================
+# Querying
+# =============================================================================
+
+
+def _column(connection) -> str:
+    from orbit.models import OrbitEntry
+
+    qn = connection.ops.quote_name
+    return f"{qn(OrbitEntry._meta.db_table)}.{qn('search_text')}"
+
+
+def _has_fts_table(connection) -> bool:
+    alias = connection.alias
+    if alias not in _fts_tables:
+        try:
+            _fts_tables[alias] = FTS_TABLE in connection.introspection.table_names()
+        except Exception:
+            return False
+    return _fts_tables[alias]
+
+
+def _sqlite_match(connection, query: str) -> Optional[Q]:
+    if len(query) < 3 or not _has_fts_table(connection):
+        return None
+    from orbit.models import OrbitEntry
+
+    qn = connection.ops.quote_name
+    phrase = '"' + query.replace('"', '""') + '"'
+    sql = (
+        f"{qn(OrbitEntry._meta.db_table)}.{qn('id')} IN "
+        f"(SELECT entry_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)"
+    )
+    return Q(RawSQL(sql, [f"search_text : {phrase}"], output_field=BooleanField()))
+
+
+def _postgresql_match(connection, query: str) -> Optional[Q]:
+    words = _WORD_RE.findall(query)
+    if not words:
+        return None
+    tsquery = " & ".join(f"{word}:*" for word in words)
+    sql = f"to_tsvector('simple', {_column(connection)}) @@ to_tsquery('simple', %s)"
+    return Q(RawSQL(sql, [tsquery], output_field=BooleanField()))
+
+
+def _mysql_match(connection, query: str) -> Optional[Q]:
+    words = _WORD_RE.findall(query)
+    # Shorter words are below InnoDB's default ft_min_token_size and never indexed
+    if not words or any(len(word) < 3 for word in words):
+        return None
+    terms = " ".join(f"+{word}*" for word in words)
+    sql = f"MATCH ({_column(connection)}) AGAINST (%s IN BOOLEAN MODE)"
+    return Q(RawSQL(sql, [terms], output_field=BooleanField()))
+
+
+_MATCHERS = {
+    "sqlite": _sqlite_match,
+    "postgresql": _postgresql_match,
+    "mysql": _mysql_match,
+}
+
+
+def search_q(
+    query: str, using: Optional[str] = None, types: Optional[Iterable[str]] = None
+) -> Q:
+    """
+    Return a ``Q`` matching entries whose search text or interned text contains
+    ``query``.
+
+    Interned texts are matched with ``icontains`` on ``OrbitText``, one row per
+    distinct statement or traceback. No index serves that match, so it scans every
+    stored text; ``types`` (the entry types being searched, default all) skips it
+    when none of them is interned. ``using`` is the database alias the queryset reads
+    from (defaults to Orbit's). The result combines with ``&`` / ``|`` like any other
+    ``Q``.
+    """
+    from orbit.interning import INTERNED_KEYS
+    from orbit.models import OrbitEntry, OrbitText
+
+    query = (query or "").strip()
+    connection = connections[using or OrbitEntry.objects.db]
+    matcher = _MATCHERS.get(connection.vendor)
+    condition = None
+    if matcher is not None:
+        try:
+            condition = matcher(connection, query)
+        except Exception:
+            condition = None
+    if condition is None:
+        condition = Q(search_text__icontains=query)
+    interned = set(INTERNED_KEYS)
+    if types is not None:
+        interned &= set(types)
+    if not query or not interned:
+        return condition
+    texts = OrbitText.objects.using(connection.alias).filter(text__icontains=query)
+    return condition | Q(type__in=sorted(interned), text__in=texts.values("hash"))
+
+
+def search(queryset, query: str, types: Optional[Iterable[str]] = None):
+    """Filter an OrbitEntry queryset by free-text ``query`` (see ``search_q``)."""
+    return queryset.filter(search_q(query, queryset.db, types))
+
+
+# =============================================================================
+# SQLite sync triggers (created by migration 0013)
+# =============================================================================
+
+
+def _create_triggers(execute, table: str) -> None:
+    delete = (
+        f"DELETE FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH "
+        f"'entry_id : \"' || old.id || '\"';"
+    )
+    insert = (
+        f"INSERT INTO {FTS_TABLE} (entry_id, search_text) "
+        f"VALUES (new.id, new.search_text);"
+    )
+    # The entry id is matched through the index, so the triggers don't depend on
+    # rowids (which VACUUM may renumber)
+    execute(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {table} "
+        f"BEGIN {insert} END"
+    )
+    execute(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {table} "
+        f"BEGIN {delete} END"
+    )
+    execute(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF search_text "
+        f"ON {table} BEGIN {delete} {insert} END"
+    )
+
+
+def restore_triggers(using="default", **kwargs) -> None:
+    """``post_migrate`` handler: recreate missing SQLite sync triggers. Never raises."""
+    try:
+        from orbit.models import OrbitEntry
+
+        connection = connections[using]
+        if connection.vendor != "sqlite":
+            return
+        _fts_tables.pop(using, None)
+        if not _has_fts_table(connection):
+            return
+        table = connection.ops.quote_name(OrbitEntry._meta.db_table)
+        if table.strip('"') not in connection.introspection.table_names():
+            return
+        with connection.cursor() as cursor:
+            _create_triggers(cursor.execute, table)
+    except Exception:
+        pass
@@ -0,0 +1,155 @@
+"""
+Django Orbit Latency Sketches
+
+A small DDSketch: a mergeable quantile sketch with a relative-error guarantee.
+
+Each value ``x`` is counted in the logarithmic bucket ``ceil(log_gamma(x))`` where
+``gamma = (1 + alpha) / (1 - alpha)``. Any quantile read back is within ``alpha`` (1%
+by default) of the true value, whatever the distribution. Memory grows with the log of
+the value range, not with the number of values. Two sketches with the same ``alpha``
+merge by adding bucket counts. Per-minute sketches therefore combine into hours,
+arbitrary windows or groups of endpoints without revisiting individual values.
+
+``to_dict()`` is plain JSON; it is what ``OrbitRollup.sketch`` stores.
+"""
+
+import math
+from typing import Dict, Iterable, Optional
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+# Past this many buckets the lowest ones are folded together, which only costs
+# accuracy for the smallest values
+MAX_BUCKETS = 2048
+
+# Values at or below this are counted in a dedicated zero bucket
+MIN_INDEXABLE_VALUE = 1e-3
+
+
+class DDSketch:
+    """Mergeable quantile sketch with relative accuracy ``relative_accuracy``."""
+
+    __slots__ = (
+        "relative_accuracy",
+        "_gamma",
+        "_log_gamma",
+        "bins",
+        "zero_count",
+        "count",
+        "min",
+        "max",
+    )
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def add(self, value: float, weight: int = 1) -> None:
+        if value <= MIN_INDEXABLE_VALUE:
+            self.zero_count += weight
+        else:
+            key = self._key(value)
+            self.bins[key] = self.bins.get(key, 0) + weight
+            if len(self.bins) > MAX_BUCKETS:
+                self._collapse()
+        self.count += weight
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def extend(self, values: Iterable[float]) -> "DDSketch":
+        for value in values:
+            if value is not None:
+                self.add(value)
+        return self
+
+    def _collapse(self) -> None:
+        keys = sorted(self.bins)
+        excess = len(keys) - MAX_BUCKETS
+        target = keys[excess]
+        for key in keys[:excess]:
+            self.bins[target] += self.bins.pop(key)
+
+    def merge(self, other: "DDSketch") -> "DDSketch":
+        """Add ``other``'s counts into this sketch and return it."""
+        if not other.count:
+            return self
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        if len(self.bins) > MAX_BUCKETS:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        if self.min is None or other.min < self.min:
+            self.min = other.min
+        if self.max is None or other.max > self.max:
+            self.max = other.max
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the ``q`` quantile (0-1); ``None`` for an empty sketch."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return self.min
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                value = 2 * self._gamma**key / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def count_below(self, value: float) -> int:
+        """Estimated number of values strictly below ``value``."""
+        if not self.count or value <= (self.min or 0):
+            return 0
+        if value > self.max:
+            return self.count
+        if value <= MIN_INDEXABLE_VALUE:
+            return 0
+        limit = self._key(value)
+        return self.zero_count + sum(
+            count for key, count in self.bins.items() if key < limit
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "a": self.relative_accuracy,
+            "n": self.count,
+            "z": self.zero_count,
+            "min": self.min,
+            "max": self.max,
+            "b": {str(key): count for key, count in self.bins.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> "DDSketch":
+        """Rebuild a sketch from ``to_dict()`` output; empty input gives an empty sketch."""
+        if not data:
+            return cls()
+        sketch = cls(data.get("a", DEFAULT_RELATIVE_ACCURACY))
+        sketch.bins = {int(key): count for key, count in (data.get("b") or {}).items()}
+        sketch.zero_count = data.get("z", 0)
+        sketch.count = data.get("n", 0)
+        sketch.min = data.get("min")
+        sketch.max = data.get("max")
+        return sketch
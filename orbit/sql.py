@@ -0,0 +1,75 @@
+"""
+Django Orbit SQL Fingerprinting
+
+Reduces a SQL statement to its *shape* so that executions differing only in literal
+values group together:
+
+    SELECT * FROM "book" WHERE "id" IN (1, 2, 3) AND "title" = 'x'
+    SELECT * FROM "book" WHERE "id" IN (%s, %s) AND "title" = %s
+
+both normalize to::
+
+    SELECT * FROM "book" WHERE "id" IN (?+) AND "title" = ?
+
+String and numeric literals and driver placeholders become ``?``, IN-lists and
+multi-row VALUES collapse regardless of arity, comments are dropped and whitespace is
+collapsed. Quoted identifiers are left alone. The fingerprint is a short hash of the
+normalized text, stored in ``OrbitEntry.fingerprint`` for query rows so N+1 and
+duplicate analysis can ``GROUP BY`` it in the database.
+"""
+
+import hashlib
+import re
+from functools import lru_cache
+
+# One pass over the statement: the alternation order matters, quoted strings and
+# comments must be consumed before anything inside them is mistaken for a literal.
+_TOKEN_RE = re.compile(
+    r"""
+      (?P<comment>--[^\n]*|/\*.*?\*/)
+    | (?P<string>'(?:[^']|'')*')
+    | (?P<ident>"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\])
+    | (?P<placeholder>%s|%\([^)]+\)s|\$\d+|\?|(?<![:\w]):[A-Za-z_]\w*)
+    | (?P<number>(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?(?![\w.]))
+    | (?P<boolean>\b(?:TRUE|FALSE|true|false)\b)
+    | (?P<space>\s+)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+_SPACES_RE = re.compile(r"\s{2,}")
+# "(?, ?, ?)" -> "(?+)"
+_VALUE_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+# "(?+), (?+), (?+)" -> "(?+)" (multi-row VALUES)
+_REPEATED_TUPLES_RE = re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+")
+
+
+def _replace_token(match) -> str:
+    kind = match.lastgroup
+    if kind == "comment":
+        return " "
+    if kind == "space":
+        return " "
+    if kind == "ident":
+        return match.group()
+    return "?"
+
+
+@lru_cache(maxsize=4096)
+def normalize_sql(sql: str) -> str:
+    """Return the literal-free, whitespace-collapsed shape of ``sql``."""
+    if not sql:
+        return ""
+    text = _TOKEN_RE.sub(_replace_token, sql)
+    text = _VALUE_LIST_RE.sub("(?+)", text)
+    text = _REPEATED_TUPLES_RE.sub("(?+)", text)
+    return _SPACES_RE.sub(" ", text).strip()
+
+
+@lru_cache(maxsize=4096)
+def fingerprint_sql(sql: str) -> str:
+    """Stable 16-character fingerprint of a SQL statement's normalized shape."""
+    if not sql:
+        return ""
+    normalized = normalize_sql(sql)
+    return hashlib.md5(normalized.encode("utf-8", "replace")).hexdigest()[:16]
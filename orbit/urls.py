@@ -7,16 +7,18 @@ All Orbit URLs are prefixed with /orbit/ in the main project.
 from django.urls import path
 
 from orbit.views import (
+    OrbitAgentPromptView,
     OrbitClearView,
     OrbitDashboardView,
-    OrbitAgentPromptView,
     OrbitDetailPartial,
+    OrbitExplainView,
     OrbitExportView,
     OrbitFeedPartial,
-    OrbitExplainView,
     OrbitHealthView,
+    OrbitMetricsView,
     OrbitStatsSectionView,
     OrbitStatsView,
+    OrbitStreamView,
 )
 
 app_name = "orbit"
@@ -26,8 +28,13 @@ urlpatterns = [
     path("", OrbitDashboardView.as_view(), name="dashboard"),
     # HTMX partials
     path("feed/", OrbitFeedPartial.as_view(), name="feed"),
+    path("stream/", OrbitStreamView.as_view(), name="stream"),
     path("detail/<uuid:entry_id>/", OrbitDetailPartial.as_view(), name="detail"),
-    path("agent-prompt/<uuid:entry_id>/", OrbitAgentPromptView.as_view(), name="agent_prompt"),
+    path(
+        "agent-prompt/<uuid:entry_id>/",
+        OrbitAgentPromptView.as_view(),
+        name="agent_prompt",
+    ),
     path("explain/<uuid:entry_id>/", OrbitExplainView.as_view(), name="explain"),
     # Actions
     path("clear/", OrbitClearView.as_view(), name="clear"),
@@ -35,6 +42,11 @@ urlpatterns = [
     path("export/<uuid:entry_id>/", OrbitExportView.as_view(), name="export"),
     # Stats & Health
     path("stats/", OrbitStatsView.as_view(), name="stats"),
-    path("stats/section/<str:section>/", OrbitStatsSectionView.as_view(), name="stats_section"),
+    path(
+        "stats/section/<str:section>/",
+        OrbitStatsSectionView.as_view(),
+        name="stats_section",
+    ),
     path("health/", OrbitHealthView.as_view(), name="health"),
+    path("metrics/", OrbitMetricsView.as_view(), name="metrics"),
 ]
@@ -157,8 +157,9 @@ def mask_sensitive_data(data: Any, keys: Optional[List[str]] = None) -> Any:
     if keys is None:
         from orbit.conf import get_config
 
-        keys = get_config().get("MASK_KEYS", [])
-    keys_lower = [k.lower() for k in keys]
+        keys_lower = get_config().mask_keys
+    else:
+        keys_lower = [k.lower() for k in keys]
 
     def _walk(value):
         if isinstance(value, dict):
@@ -215,7 +216,15 @@ def filter_sensitive_data(
         Filtered dictionary with sensitive values masked
     """
     if hide_keys is None:
-        hide_keys = ["Authorization", "Cookie", "X-CSRFToken", "password", "token", "secret", "api_key"]
+        hide_keys = [
+            "Authorization",
+            "Cookie",
+            "X-CSRFToken",
+            "password",
+            "token",
+            "secret",
+            "api_key",
+        ]
 
     hide_keys_lower = [k.lower() for k in hide_keys]
     filtered = {}
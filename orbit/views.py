@@ -5,18 +5,25 @@ Dashboard views for the Orbit interface.
 """
 
 import json
+import time
+import uuid
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from urllib.parse import urlencode
 
-from django.db.models import Window, F, Case, When, BooleanField
+from django.db.models import BooleanField, Case, F, Q, When, Window
 from django.db.models.functions import RowNumber
-from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.template.response import TemplateResponse
+from django.utils import timezone
 from django.views import View
 from django.views.generic import TemplateView
 
 __all__ = [
     "OrbitDashboardView",
     "OrbitFeedPartial",
+    "OrbitStreamView",
     "OrbitDetailPartial",
     "OrbitClearView",
     "OrbitStatsView",
@@ -25,12 +32,13 @@ __all__ = [
     "OrbitExportView",
     "OrbitAgentPromptView",
     "OrbitHealthView",
+    "OrbitMetricsView",
 ]
 
 from orbit import __version__ as ORBIT_VERSION
-from orbit.models import OrbitEntry
+from orbit import metrics
 from orbit.mixins import OrbitProtectedView
-
+from orbit.models import OrbitEntry
 
 # Sidebar navigation, grouped for progressive disclosure (see DESIGN.md › Layout).
 # Each item: (type_key, label). Icons/colors come from OrbitEntry.TYPE_ICONS/TYPE_COLORS.
@@ -92,8 +100,16 @@ def build_nav_groups(counts, current_type="all"):
     for group in NAV_GROUPS:
         items = []
         for type_key, label in group["items"]:
-            icon = "layers" if type_key == "all" else OrbitEntry.TYPE_ICONS.get(type_key, "circle")
-            color = "cyan" if type_key == "all" else OrbitEntry.TYPE_COLORS.get(type_key, "slate")
+            icon = (
+                "layers"
+                if type_key == "all"
+                else OrbitEntry.TYPE_ICONS.get(type_key, "circle")
+            )
+            color = (
+                "cyan"
+                if type_key == "all"
+                else OrbitEntry.TYPE_COLORS.get(type_key, "slate")
+            )
             items.append(
                 {
                     "type": type_key,
@@ -132,43 +148,32 @@ class OrbitDashboardView(OrbitProtectedView, TemplateView):
         # Get entry type from query params (for filtering)
         entry_type = self.request.GET.get("type", "all")
 
+        now = timezone.now()
+        last_hour = now - timedelta(hours=1)
+        last_24h = now - timedelta(hours=24)
+
+        # Sidebar badges and header stats come from a single grouped query
+        summary = OrbitEntry.objects.dashboard_counts(last_hour, last_24h)
+
+        def _sum(field, types=None):
+            return sum(
+                row[field]
+                for entry_type, row in summary.items()
+                if types is None or entry_type in types
+            )
+
+        def _get(entry_type, field):
+            return summary.get(entry_type, {}).get(field) or 0
+
         # Get counts for sidebar badges
-        context["counts"] = {
-            "all": OrbitEntry.objects.count(),
-            "request": OrbitEntry.objects.requests().count(),
-            "query": OrbitEntry.objects.queries().count(),
-            "log": OrbitEntry.objects.logs().count(),
-            "exception": OrbitEntry.objects.exceptions().count(),
-            "job": OrbitEntry.objects.jobs().count(),
-            # Phase 1 types
-            "command": OrbitEntry.objects.commands().count(),
-            "cache": OrbitEntry.objects.cache_ops().count(),
-            "model": OrbitEntry.objects.models().count(),
-            "http_client": OrbitEntry.objects.http_client().count(),
-            "dump": OrbitEntry.objects.dumps().count(),
-            # Phase 2 types (v0.4.0)
-            "mail": OrbitEntry.objects.mails().count(),
-            "signal": OrbitEntry.objects.signals().count(),
-            # Phase 3 types (v0.5.0)
-            "redis": OrbitEntry.objects.redis_ops().count(),
-            "gate": OrbitEntry.objects.gates().count(),
-            # Phase 4 types (v0.6.0)
-            "transaction": OrbitEntry.objects.filter(type=OrbitEntry.TYPE_TRANSACTION).count(),
-            "storage": OrbitEntry.objects.filter(type=OrbitEntry.TYPE_STORAGE).count(),
-            "llm": OrbitEntry.objects.llm_calls().count(),
-        }
+        context["counts"] = {"all": _sum("total")}
+        for entry_type, _label in OrbitEntry.TYPE_CHOICES:
+            context["counts"][entry_type] = _get(entry_type, "total")
 
         # Get error and warning counts for alerts
-        context["error_count"] = (
-            OrbitEntry.objects.filter(type=OrbitEntry.TYPE_EXCEPTION).count()
-            + OrbitEntry.objects.filter(
-                type=OrbitEntry.TYPE_REQUEST, payload__status_code__gte=400
-            ).count()
-        )
+        context["error_count"] = _sum("errors")
 
-        context["slow_query_count"] = OrbitEntry.objects.filter(
-            type=OrbitEntry.TYPE_QUERY, payload__is_slow=True
-        ).count()
+        context["slow_query_count"] = _get(OrbitEntry.TYPE_QUERY, "slow")
 
         context["current_type"] = entry_type
 
@@ -176,99 +181,50 @@ class OrbitDashboardView(OrbitProtectedView, TemplateView):
         context["nav_groups"] = build_nav_groups(context["counts"], entry_type)
         context["orbit_version"] = ORBIT_VERSION
 
-        # Calculate statistics for dashboard
-        from django.db.models import Avg
-        from datetime import timedelta
-        from django.utils import timezone
-
-        now = timezone.now()
-        last_hour = now - timedelta(hours=1)
-        last_24h = now - timedelta(hours=24)
-
-        # Performance stats
-        requests_last_hour = OrbitEntry.objects.filter(
-            type=OrbitEntry.TYPE_REQUEST,
-            created_at__gte=last_hour
-        )
-        
-        queries_last_hour = OrbitEntry.objects.filter(
-            type=OrbitEntry.TYPE_QUERY,
-            created_at__gte=last_hour
-        )
-
         context["stats"] = {
             # Request metrics
-            "requests_per_hour": requests_last_hour.count(),
-            "avg_response_time": requests_last_hour.aggregate(
-                avg=Avg("duration_ms")
-            )["avg"] or 0,
-            
+            "requests_per_hour": _get(OrbitEntry.TYPE_REQUEST, "last_hour"),
+            "avg_response_time": _get(OrbitEntry.TYPE_REQUEST, "last_hour_avg"),
             # Query metrics
-            "queries_per_hour": queries_last_hour.count(),
-            "avg_query_time": queries_last_hour.aggregate(
-                avg=Avg("duration_ms")
-            )["avg"] or 0,
+            "queries_per_hour": _get(OrbitEntry.TYPE_QUERY, "last_hour"),
+            "avg_query_time": _get(OrbitEntry.TYPE_QUERY, "last_hour_avg"),
             "slow_queries_pct": (
                 (context["slow_query_count"] / context["counts"]["query"] * 100)
-                if context["counts"]["query"] > 0 else 0
+                if context["counts"]["query"] > 0
+                else 0
             ),
-            "duplicate_queries": OrbitEntry.objects.filter(
-                type=OrbitEntry.TYPE_QUERY,
-                payload__is_duplicate=True
-            ).count(),
-            
+            "duplicate_queries": _get(OrbitEntry.TYPE_QUERY, "duplicates"),
             # Error metrics
             "error_rate": (
                 (context["error_count"] / context["counts"]["request"] * 100)
-                if context["counts"]["request"] > 0 else 0
+                if context["counts"]["request"] > 0
+                else 0
             ),
-            "exceptions_24h": OrbitEntry.objects.filter(
-                type=OrbitEntry.TYPE_EXCEPTION,
-                created_at__gte=last_24h
-            ).count(),
-            
+            "exceptions_24h": _get(OrbitEntry.TYPE_EXCEPTION, "last_day"),
             # Cache metrics
-            "cache_hits": OrbitEntry.objects.filter(
-                type=OrbitEntry.TYPE_CACHE,
-                payload__hit=True
-            ).count(),
-            "cache_misses": OrbitEntry.objects.filter(
-                type=OrbitEntry.TYPE_CACHE,
-                payload__hit=False
-            ).count(),
-            
+            "cache_hits": _get(OrbitEntry.TYPE_CACHE, "hits"),
+            "cache_misses": _get(OrbitEntry.TYPE_CACHE, "misses"),
             # Permission metrics
-            "permission_denied": OrbitEntry.objects.filter(
-                type=OrbitEntry.TYPE_GATE,
-                payload__result="denied"
-            ).count(),
-            "permission_granted": OrbitEntry.objects.filter(
-                type=OrbitEntry.TYPE_GATE,
-                payload__result="granted"
-            ).count(),
-            
+            "permission_denied": _get(OrbitEntry.TYPE_GATE, "denied"),
+            "permission_granted": _get(OrbitEntry.TYPE_GATE, "granted"),
             # Job metrics
-            "jobs_failed": OrbitEntry.objects.filter(
-                type=OrbitEntry.TYPE_JOB,
-                payload__status="failed"
-            ).count(),
-            "jobs_success": OrbitEntry.objects.filter(
-                type=OrbitEntry.TYPE_JOB,
-                payload__status="success"
-            ).count(),
+            "jobs_failed": _get(OrbitEntry.TYPE_JOB, "failed"),
+            "jobs_success": _get(OrbitEntry.TYPE_JOB, "succeeded"),
         }
-        
+
         # Calculate cache hit rate
         total_cache = context["stats"]["cache_hits"] + context["stats"]["cache_misses"]
         context["stats"]["cache_hit_rate"] = (
             (context["stats"]["cache_hits"] / total_cache * 100)
-            if total_cache > 0 else 0
+            if total_cache > 0
+            else 0
         )
 
         from django.urls import reverse
 
         context["orbit_urls"] = {
             "feed": reverse("orbit:feed"),
+            "stream": reverse("orbit:stream") if _streams(self.request) else "",
             "detail_base": reverse("orbit:dashboard")
             + "detail/",  # Base path for details
             "clear": reverse("orbit:clear"),
@@ -278,12 +234,97 @@ class OrbitDashboardView(OrbitProtectedView, TemplateView):
         return context
 
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _cursor(moment, entry_id) -> str:
+    delta = moment - _EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    return f"{micros}_{entry_id.hex}"
+
+
+def _feed_cursor(entry) -> str:
+    """Opaque keyset cursor for an entry: ``<created_at in µs>_<id hex>``."""
+    return _cursor(entry.created_at, entry.id)
+
+
+def _live_cursor(entry=None, moment=None) -> str:
+    """
+    Live-poll cursor: ``<inserted_at in µs>_<id hex>`` of an entry, or a point in time.
+
+    Deltas follow insert order rather than ``created_at``: a buffered writer inserts
+    rows with a ``created_at`` older than rows the client has already seen.
+    """
+    if entry is not None and entry.inserted_at is not None:
+        return _cursor(entry.inserted_at, entry.id)
+    return _cursor(moment or timezone.now(), uuid.UUID(int=0))
+
+
+def _parse_feed_cursor(value):
+    """Return ``(timestamp, id)`` for a cursor from ``_feed_cursor``, or ``None``."""
+    if not value:
+        return None
+    try:
+        micros, _, hex_id = value.partition("_")
+        return _EPOCH + timedelta(microseconds=int(micros)), uuid.UUID(hex_id)
+    except (ValueError, OverflowError):
+        return None
+
+
+def _newer_than(cursor) -> Q:
+    created_at, entry_id = cursor
+    return Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=entry_id)
+
+
+def _inserted_after(cursor) -> Q:
+    inserted_at, entry_id = cursor
+    return Q(inserted_at__gt=inserted_at) | Q(inserted_at=inserted_at, id__gt=entry_id)
+
+
+def _older_than(cursor) -> Q:
+    created_at, entry_id = cursor
+    return Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=entry_id)
+
+
+def _estimated_count(queryset, filtered: bool):
+    """
+    Return ``(count, is_estimate)`` for the feed footer.
+
+    The unfiltered feed on PostgreSQL uses the planner's row estimate instead of a
+    full ``COUNT(*)``; everything else is counted exactly.
+    """
+    from django.db import connections
+
+    connection = connections[queryset.db]
+    if not filtered and connection.vendor == "postgresql":
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [OrbitEntry._meta.db_table],
+                )
+                row = cursor.fetchone()
+            # -1 until the table has been analyzed
+            if row and row[0] >= 0:
+                return row[0], True
+        except Exception:
+            pass
+    return queryset.count(), False
+
+
 class OrbitFeedPartial(OrbitProtectedView, View):
     """
     Partial view that returns the feed table content.
 
-    This is called by HTMX for polling updates (every 3 seconds)
-    and when filtering by entry type.
+    This is called by HTMX when filtering by entry type and when paging, and by the
+    dashboard's 3-second poll.
+
+    Pages are keyset-paginated on ``(created_at, id)``: ``before=<cursor>`` loads the
+    next older page and ``since=<cursor>`` the next newer one (``page`` offsets are
+    still accepted). Polling sends ``after=<cursor>`` and gets back only the rows
+    inserted since the previous poll, as a fragment to prepend, or ``204`` when nothing
+    changed. The newest page carries an ``X-Orbit-Cursor`` header (an ``inserted_at``
+    cursor, see ``_live_cursor``) that the client uses as its next ``after`` value.
     """
 
     def get(self, request: HttpRequest) -> HttpResponse:
@@ -317,55 +358,131 @@ class OrbitFeedPartial(OrbitProtectedView, View):
         # Exception grouping (B3): on the plain Exceptions view, collapse identical
         # exceptions into one row with a count + first/last seen. Skipped when searching
         # or drilling into a family so those flows still show individual occurrences.
-        if entry_type == OrbitEntry.TYPE_EXCEPTION and not family_hash and not query and not tag:
+        if (
+            entry_type == OrbitEntry.TYPE_EXCEPTION
+            and not family_hash
+            and not query
+            and not tag
+        ):
             return self._exception_groups_response(request, per_page, page)
 
         # Filter by search query "q"
         if query:
-            import uuid
             try:
                 # Try explicit UUID search
                 uuid_obj = uuid.UUID(query)
                 queryset = queryset.filter(id=uuid_obj)
             except ValueError:
-                # Text search on payload using generic "contains"
-                # For SQLite/Postgres JSONField, we can use __icontains
-                # Ideally we cast to text for better compatibility if needed, 
-                # but let's try direct first as it handles some string casting implicitly in Django 4.2+
-                from django.db.models import TextField
-                from django.db.models.functions import Cast
-                
-                # Cast payload to text to search inside keys and values
-                queryset = queryset.annotate(
-                    payload_text=Cast("payload", TextField())
-                ).filter(payload_text__icontains=query)
-
-        # Calculate pagination
-        total_count = queryset.count()
-        total_pages = (total_count + per_page - 1) // per_page  # Ceiling division
-        page = max(1, min(page, total_pages)) if total_pages > 0 else 1
+                # Full-text search over payload keys/values and tags (orbit.search)
+                from orbit.search import search
+
+                types = None if entry_type in (None, "", "all") else [entry_type]
+                queryset = search(queryset, query, types)
+
+        fields = (
+            "id",
+            "type",
+            "payload",
+            "text",
+            "duration_ms",
+            "created_at",
+            "inserted_at",
+        )
 
-        # Get entries for current page - only load necessary fields for performance
-        offset = (page - 1) * per_page
-        entries = queryset.only(
-            'id', 'type', 'payload', 'duration_ms', 'created_at'
-        ).order_by("-created_at")[offset : offset + per_page]
+        # Live polling: only what arrived since the newest row the client has
+        after = _parse_feed_cursor(request.GET.get("after"))
+        if after is not None:
+            return self._delta_response(
+                request, queryset.only(*fields), after, per_page
+            )
+
+        filter_params = {"type": entry_type, "per_page": per_page}
+        for key, value in (
+            ("q", request.GET.get("q")),
+            ("tag", request.GET.get("tag")),
+            ("family", family_hash),
+        ):
+            if value:
+                filter_params[key] = value
+
+        total_count, count_is_estimate = _estimated_count(
+            queryset, filtered=len(filter_params) > 2 or entry_type not in ("", "all")
+        )
+
+        # Rows inserted from here on reach the client through deltas; any that also
+        # make it onto this page are de-duplicated by the client
+        live_from = timezone.now()
+
+        # Get entries for the page - only load necessary fields for performance
+        before = _parse_feed_cursor(request.GET.get("before"))
+        since = _parse_feed_cursor(request.GET.get("since"))
+        newest_first = queryset.only(*fields).order_by("-created_at", "-id")
+        if before is not None:
+            entries = list(newest_first.filter(_older_than(before))[: per_page + 1])
+            has_older = len(entries) > per_page
+            has_newer = True
+            entries = entries[:per_page]
+        elif since is not None:
+            entries = list(
+                queryset.only(*fields)
+                .filter(_newer_than(since))
+                .order_by("created_at", "id")[: per_page + 1]
+            )
+            has_newer = len(entries) > per_page
+            has_older = True
+            entries = entries[:per_page][::-1]
+        else:
+            # Offset pages (``?page=N``) are kept for links from older clients
+            total_pages = (total_count + per_page - 1) // per_page
+            page = max(1, min(page, total_pages)) if total_pages > 0 else 1
+            offset = (page - 1) * per_page
+            entries = list(newest_first[offset : offset + per_page + 1])
+            has_older = len(entries) > per_page
+            has_newer = page > 1
+            entries = entries[:per_page]
 
         # Render partial
-        return TemplateResponse(
+        response = TemplateResponse(
             request,
             "orbit/partials/feed.html",
             {
                 "entries": entries,
                 "current_type": entry_type,
-                "page": page,
                 "per_page": per_page,
-                "total_pages": total_pages,
                 "total_count": total_count,
-                "has_prev": page > 1,
-                "has_next": page < total_pages,
+                "count_is_estimate": count_is_estimate,
+                "has_newer": has_newer,
+                "has_older": has_older,
+                "newest_cursor": _feed_cursor(entries[0]) if entries else "",
+                "oldest_cursor": _feed_cursor(entries[-1]) if entries else "",
+                "filter_query": urlencode(filter_params),
             },
         )
+        response["X-Orbit-Live"] = "0" if has_newer else "1"
+        if not has_newer:
+            response["X-Orbit-Cursor"] = _live_cursor(moment=live_from)
+        return response
+
+    def _delta_response(self, request, queryset, after, per_page):
+        """Rows inserted after ``after``, latest first, as a fragment to prepend."""
+        entries = list(
+            queryset.filter(_inserted_after(after)).order_by("-inserted_at", "-id")[
+                : per_page + 1
+            ]
+        )
+        if not entries:
+            return HttpResponse(status=204)
+        if len(entries) > per_page:
+            # Too much arrived at once: cheaper to reload the page than to stitch
+            response = HttpResponse(status=204)
+            response["X-Orbit-Feed-Reset"] = "1"
+            return response
+        response = TemplateResponse(
+            request, "orbit/partials/feed_rows.html", {"entries": entries}
+        )
+        response["X-Orbit-Live"] = "1"
+        response["X-Orbit-Cursor"] = _live_cursor(entries[0])
+        return response
 
     def _exception_groups_response(self, request, per_page, page):
         """Render the grouped Exceptions feed (B3). Aggregation happens in the DB."""
@@ -410,6 +527,109 @@ class OrbitFeedPartial(OrbitProtectedView, View):
         )
 
 
+def _sse(event: str, data: str = "", event_id: str = "") -> str:
+    """Format one Server-Sent Events message."""
+    lines = [f"id: {event_id}"] if event_id else []
+    lines.append(f"event: {event}")
+    lines.extend(f"data: {line}" for line in (data.splitlines() or [""]))
+    return "\n".join(lines) + "\n\n"
+
+
+def _streams(request: HttpRequest) -> bool:
+    """
+    Whether the live stream is served to ``request``.
+
+    With the default ``LIVE_STREAM = "asgi"`` only ASGI requests stream; under WSGI each
+    open stream would hold a worker, so those dashboards keep polling for deltas.
+    """
+    from django.core.handlers.asgi import ASGIRequest
+
+    from orbit.conf import get_config
+
+    setting = get_config().get("LIVE_STREAM", "asgi")
+    if setting == "asgi":
+        return isinstance(request, ASGIRequest)
+    return bool(setting)
+
+
+class OrbitStreamView(OrbitProtectedView, View):
+    """
+    Server-Sent Events stream of newly recorded entries for the live feed.
+
+    Entries arrive from the in-process broker (``orbit.live``) rather than from a query
+    per client. Each message is an ``entries`` event whose data is the feed rows to
+    prepend, newest first, and whose id is the ``_live_cursor`` of the latest row; a
+    client that fell too far behind gets a ``reset`` event and reloads the feed.
+    ``?type=`` limits the stream to one entry type.
+
+    Under ASGI the stream is an async generator awaiting the broker on the event loop.
+    Under WSGI it occupies a worker thread, so it is only served when ``LIVE_STREAM``
+    is ``True``; responses then end after ``LIVE_STREAM_MAX_DURATION`` seconds and the
+    browser reconnects.
+    """
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        from django.core.handlers.asgi import ASGIRequest
+
+        from orbit.conf import get_config
+
+        if not _streams(request):
+            # EventSource does not reconnect after a 204
+            return HttpResponse(status=204)
+
+        config = get_config()
+        entry_type = request.GET.get("type", "all")
+        heartbeat = float(config.get("LIVE_STREAM_HEARTBEAT", 15))
+        max_duration = float(config.get("LIVE_STREAM_MAX_DURATION", 300))
+        if isinstance(request, ASGIRequest):
+            stream = self._astream(entry_type, heartbeat, max_duration)
+        else:
+            stream = self._stream(entry_type, heartbeat, max_duration)
+
+        response = StreamingHttpResponse(stream, content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def _stream(self, entry_type, heartbeat, max_duration):
+        from orbit.live import broker
+
+        subscription = broker.subscribe(entry_type)
+        try:
+            yield "retry: 3000\n\n"
+            deadline = time.monotonic() + max_duration
+            while time.monotonic() < deadline:
+                yield self._message(subscription, subscription.get(heartbeat))
+        finally:
+            subscription.close()
+
+    async def _astream(self, entry_type, heartbeat, max_duration):
+        from orbit.live import broker
+
+        subscription = broker.subscribe(entry_type)
+        try:
+            yield "retry: 3000\n\n"
+            deadline = time.monotonic() + max_duration
+            while time.monotonic() < deadline:
+                yield self._message(subscription, await subscription.aget(heartbeat))
+        finally:
+            subscription.close()
+
+    @staticmethod
+    def _message(subscription, entries) -> str:
+        from django.template.loader import render_to_string
+
+        if subscription.overflowed:
+            subscription.overflowed = False
+            return _sse("reset")
+        if not entries:
+            return ": keep-alive\n\n"
+        entries = sorted(entries, key=lambda e: (e.created_at, e.id), reverse=True)
+        html = render_to_string("orbit/partials/feed_rows.html", {"entries": entries})
+        latest = max(entries, key=lambda e: (e.inserted_at or e.created_at, e.id))
+        return _sse("entries", html, _live_cursor(latest))
+
+
 class OrbitDetailPartial(OrbitProtectedView, View):
     """
     Partial view that returns the detail panel for a specific entry.
@@ -446,19 +666,25 @@ class OrbitDetailPartial(OrbitProtectedView, View):
                 .order_by("created_at")[:100]
             )
 
-        # Get duplicate queries (same SQL) for query entries
+        # Get duplicate queries (same SQL shape) for query entries
         duplicate_entries = []
-        if entry.type == OrbitEntry.TYPE_QUERY:
-            sql = entry.payload.get("sql", "")
-            if sql and entry.payload.get("is_duplicate"):
-                duplicate_entries = (
-                    OrbitEntry.objects.filter(
-                        type=OrbitEntry.TYPE_QUERY,
-                        payload__sql=sql,
-                    )
-                    .exclude(id=entry.id)
-                    .order_by("-created_at")[:20]
+        if entry.type == OrbitEntry.TYPE_QUERY and entry.payload.get("is_duplicate"):
+            if entry.fingerprint:
+                duplicates = OrbitEntry.objects.filter(
+                    type=OrbitEntry.TYPE_QUERY, fingerprint=entry.fingerprint
+                )
+            elif entry.text_id:
+                duplicates = OrbitEntry.objects.filter(
+                    type=OrbitEntry.TYPE_QUERY, text=entry.text_id
+                )
+            else:
+                duplicates = OrbitEntry.objects.filter(
+                    type=OrbitEntry.TYPE_QUERY,
+                    payload__sql=entry.payload.get("sql", ""),
                 )
+            duplicate_entries = duplicates.exclude(id=entry.id).order_by("-created_at")[
+                :20
+            ]
 
         # Compute duplicate query stats for REQUEST entries
         duplicate_query_stats = None
@@ -475,53 +701,47 @@ class OrbitDetailPartial(OrbitProtectedView, View):
                     "most_duplicated_query_id": None,
                 }
             else:
-                query_entries = OrbitEntry.objects.filter(
-                    family_hash=entry.family_hash, type=OrbitEntry.TYPE_QUERY
-                ).only("payload")
-
-                total_duplicates = 0
-                query_groups = {}
-                query_ids = {}
-
-                for query in query_entries:
-                    sql = query.payload.get("sql")
-                    if not sql:
-                        continue
-                    
-                    duplicate_count = query.payload.get("duplicate_count", 1)
-                    is_duplicate = query.payload.get("is_duplicate", False)
-
-                    # Count total redundant executions
-                    if is_duplicate:
-                        total_duplicates += 1
-
-                    # Track unique duplicated queries (those executed more than once)
-                    if duplicate_count > 1:
-                        # Keep track of the highest execution count and a representative ID
-                        if sql not in query_groups or duplicate_count > query_groups[sql]:
-                            query_groups[sql] = duplicate_count
-                            query_ids[sql] = query.id
+                # Grouped by fingerprint in the database
+                groups = list(
+                    OrbitEntry.objects.duplicate_query_groups(entry.family_hash)
+                )
 
                 # Use precomputed total if available (fallback to calculated for old data)
-                final_total = precomputed_total if precomputed_total is not None else total_duplicates
+                final_total = (
+                    precomputed_total
+                    if precomputed_total is not None
+                    else sum(group["count"] - 1 for group in groups)
+                )
 
                 # Find the most duplicated query
                 most_duplicated_sql = None
                 most_duplicated_count = 0
                 most_duplicated_query_id = None
 
-                if query_groups:
-                    most_duplicated_sql = max(query_groups, key=query_groups.get)
-                    most_duplicated_count = query_groups[most_duplicated_sql]
-                    most_duplicated_query_id = query_ids.get(most_duplicated_sql)
+                if groups:
+                    top = groups[0]
+                    most_duplicated_count = top["count"]
+                    representative = (
+                        OrbitEntry.objects.filter(
+                            family_hash=entry.family_hash,
+                            type=OrbitEntry.TYPE_QUERY,
+                            fingerprint=top["fingerprint"],
+                        )
+                        .only("id", "type", "payload", "text")
+                        .order_by("-created_at")
+                        .first()
+                    )
+                    if representative is not None:
+                        most_duplicated_query_id = representative.id
+                        most_duplicated_sql = representative.payload.get("sql")
 
                     # Truncate SQL for display to keep it readable in the UI
-                    if len(most_duplicated_sql) > 120:
+                    if most_duplicated_sql and len(most_duplicated_sql) > 120:
                         most_duplicated_sql = most_duplicated_sql[:120] + "..."
 
                 duplicate_query_stats = {
                     "total_duplicates": final_total,
-                    "unique_duplicate_queries": len(query_groups),
+                    "unique_duplicate_queries": len(groups),
                     "most_duplicated_sql": most_duplicated_sql,
                     "most_duplicated_count": most_duplicated_count,
                     "most_duplicated_query_id": most_duplicated_query_id,
@@ -658,6 +878,7 @@ class OrbitStatsView(OrbitProtectedView, TemplateView):
     are loaded lazily via OrbitStatsSectionView, which keeps each DB hit small and
     avoids the SQLite lock that the old "compute everything at once" path caused.
     """
+
     template_name = "orbit/stats.html"
 
     def get_context_data(self, **kwargs):
@@ -678,8 +899,9 @@ class OrbitStatsView(OrbitProtectedView, TemplateView):
 
         # Add URLs
         from django.urls import reverse
-        context['dashboard_url'] = reverse('orbit:dashboard')
-        context['orbit_version'] = ORBIT_VERSION
+
+        context["dashboard_url"] = reverse("orbit:dashboard")
+        context["orbit_version"] = ORBIT_VERSION
 
         return context
 
@@ -703,6 +925,7 @@ class OrbitStatsSectionView(OrbitProtectedView, View):
 
     def get(self, request: HttpRequest, section: str) -> HttpResponse:
         from django.http import Http404
+
         from orbit import stats
 
         template = self.SECTIONS.get(section)
@@ -769,7 +992,7 @@ class OrbitExportView(OrbitProtectedView, View):
         # Single Entry Export
         if entry_id:
             entry = get_object_or_404(OrbitEntry, id=entry_id)
-            
+
             data = {
                 "entry": {
                     "id": str(entry.id),
@@ -788,26 +1011,30 @@ class OrbitExportView(OrbitProtectedView, View):
                     .exclude(id=entry.id)
                     .order_by("created_at")
                 )
-                
+
                 for rel in related_qs:
-                    data["related"].append({
-                        "id": str(rel.id),
-                        "type": rel.type,
-                        "created_at": rel.created_at.isoformat(),
-                        "payload": rel.payload,
-                        "duration_ms": rel.duration_ms,
-                    })
-            
+                    data["related"].append(
+                        {
+                            "id": str(rel.id),
+                            "type": rel.type,
+                            "created_at": rel.created_at.isoformat(),
+                            "payload": rel.payload,
+                            "duration_ms": rel.duration_ms,
+                        }
+                    )
+
             response = JsonResponse(data, json_dumps_params={"indent": 2})
-            response["Content-Disposition"] = f'attachment; filename="orbit_entry_{entry.id}.json"'
+            response["Content-Disposition"] = (
+                f'attachment; filename="orbit_entry_{entry.id}.json"'
+            )
             return response
 
         # Bulk Export (Streaming)
         from django.http import StreamingHttpResponse
-        
+
         # 1. Reuse filtering logic from OrbitFeedPartial
         queryset = OrbitEntry.objects.all().order_by("-created_at")
-        
+
         entry_type = request.GET.get("type", "all")
         if entry_type and entry_type != "all":
             queryset = queryset.filter(type=entry_type)
@@ -818,16 +1045,14 @@ class OrbitExportView(OrbitProtectedView, View):
 
         query = request.GET.get("q")
         if query:
-            import uuid
             try:
                 uuid_obj = uuid.UUID(query)
                 queryset = queryset.filter(id=uuid_obj)
             except ValueError:
-                from django.db.models import TextField
-                from django.db.models.functions import Cast
-                queryset = queryset.annotate(
-                    payload_text=Cast("payload", TextField())
-                ).filter(payload_text__icontains=query)
+                from orbit.search import search
+
+                types = None if entry_type in (None, "", "all") else [entry_type]
+                queryset = search(queryset, query, types)
 
         # 2. Generator function
         def stream_generator():
@@ -837,22 +1062,24 @@ class OrbitExportView(OrbitProtectedView, View):
                 if not first:
                     yield ",\n"
                 first = False
-                
+
                 # Manual JSON serialization for speed/simplicity in generator
                 # using json.dumps for the dict is safest
-                yield json.dumps({
-                    "id": str(entry.id),
-                    "type": entry.type,
-                    "created_at": entry.created_at.isoformat(),
-                    "payload": entry.payload,
-                    "duration_ms": entry.duration_ms,
-                    "family_hash": entry.family_hash,
-                }, default=str)
+                yield json.dumps(
+                    {
+                        "id": str(entry.id),
+                        "type": entry.type,
+                        "created_at": entry.created_at.isoformat(),
+                        "payload": entry.payload,
+                        "duration_ms": entry.duration_ms,
+                        "family_hash": entry.family_hash,
+                    },
+                    default=str,
+                )
             yield "\n]"
 
         response = StreamingHttpResponse(
-            stream_generator(), 
-            content_type="application/json"
+            stream_generator(), content_type="application/json"
         )
         response["Content-Disposition"] = 'attachment; filename="orbit_export_all.json"'
         return response
@@ -861,70 +1088,86 @@ class OrbitExportView(OrbitProtectedView, View):
 class OrbitHealthView(OrbitProtectedView, TemplateView):
     """
     Health Dashboard view showing the status of all Orbit modules.
-    
+
     This is the plug-and-play diagnostics page that shows:
     - Which modules are installed and working (green)
     - Which modules failed and why (red)
     - Which modules are disabled via configuration
     """
+
     template_name = "orbit/health.html"
-    
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        
+
         # Get health status from the health module
         try:
             from orbit.health import get_health_status, is_orbit_healthy
+
             health = get_health_status()
-            context['health'] = health
-            context['is_healthy'] = is_orbit_healthy()
+            context["health"] = health
+            context["is_healthy"] = is_orbit_healthy()
         except Exception as e:
-            context['health'] = {
-                'error': str(e),
-                'total': 0,
-                'healthy_count': 0,
-                'failed_count': 0,
-                'modules': [],
+            context["health"] = {
+                "error": str(e),
+                "total": 0,
+                "healthy_count": 0,
+                "failed_count": 0,
+                "modules": [],
             }
-            context['is_healthy'] = False
-        
+            context["is_healthy"] = False
+
         # Also get watcher status from the watchers module
         try:
-            from orbit.watchers import get_watcher_status, get_installed_watchers, get_failed_watchers
+            from orbit.watchers import (
+                get_failed_watchers,
+                get_installed_watchers,
+                get_watcher_status,
+            )
+
             watcher_status = get_watcher_status()
-            
+
             # Convert watcher status to module format for unified display
             watcher_modules = []
             for name, status in watcher_status.items():
-                watcher_modules.append({
-                    'name': name,
-                    'description': f'Watcher: {name}',
-                    'category': 'watcher',
-                    'status': 'healthy' if status.get('installed') else ('disabled' if status.get('disabled') else 'failed'),
-                    'is_healthy': status.get('installed', False),
-                    'is_failed': not status.get('installed') and not status.get('disabled') and status.get('error'),
-                    'is_disabled': status.get('disabled', False),
-                    'error': status.get('error'),
-                    'error_traceback': None,
-                })
-            
-            context['watchers'] = {
-                'modules': watcher_modules,
-                'installed': get_installed_watchers(),
-                'failed': get_failed_watchers(),
-                'total': len(watcher_status),
-                'installed_count': len(get_installed_watchers()),
-                'failed_count': len(get_failed_watchers()),
+                watcher_modules.append(
+                    {
+                        "name": name,
+                        "description": f"Watcher: {name}",
+                        "category": "watcher",
+                        "status": (
+                            "healthy"
+                            if status.get("installed")
+                            else ("disabled" if status.get("disabled") else "failed")
+                        ),
+                        "is_healthy": status.get("installed", False),
+                        "is_failed": not status.get("installed")
+                        and not status.get("disabled")
+                        and status.get("error"),
+                        "is_disabled": status.get("disabled", False),
+                        "error": status.get("error"),
+                        "error_traceback": None,
+                        "overhead": metrics.timing(f"watcher.{name}"),
+                    }
+                )
+
+            context["watchers"] = {
+                "modules": watcher_modules,
+                "installed": get_installed_watchers(),
+                "failed": get_failed_watchers(),
+                "total": len(watcher_status),
+                "installed_count": len(get_installed_watchers()),
+                "failed_count": len(get_failed_watchers()),
             }
         except Exception as e:
-            context['watchers'] = {
-                'error': str(e),
-                'modules': [],
-                'installed': [],
-                'failed': {},
-                'total': 0,
-                'installed_count': 0,
-                'failed_count': 0,
+            context["watchers"] = {
+                "error": str(e),
+                "modules": [],
+                "installed": [],
+                "failed": {},
+                "total": 0,
+                "installed_count": 0,
+                "failed_count": 0,
             }
 
         from orbit.conf import get_config
@@ -941,11 +1184,37 @@ class OrbitHealthView(OrbitProtectedView, TemplateView):
                 config.get("LLM_CAPTURE_TOOL_CALL_ARGUMENTS", False)
             ),
         }
-        
+
+        from orbit.retention import scheduler as retention_scheduler
+
+        context["retention"] = {
+            **retention_scheduler.get_stats(),
+            "scheduler": config.get("RETENTION_SCHEDULER", "thread"),
+        }
+        context["overhead"] = metrics.snapshot()
+
         # Add URLs
         from django.urls import reverse
-        context['dashboard_url'] = reverse('orbit:dashboard')
-        context['stats_url'] = reverse('orbit:stats')
-        context['orbit_version'] = ORBIT_VERSION
+
+        context["dashboard_url"] = reverse("orbit:dashboard")
+        context["stats_url"] = reverse("orbit:stats")
+        context["metrics_url"] = reverse("orbit:metrics")
+        context["orbit_version"] = ORBIT_VERSION
 
         return context
+
+
+class OrbitMetricsView(OrbitProtectedView, View):
+    """
+    Orbit's self-metrics for this process (see ``orbit.metrics``).
+
+    JSON by default; ``?format=prometheus`` returns the Prometheus text format so the
+    endpoint can be scraped directly.
+    """
+
+    def get(self, request: HttpRequest):
+        if request.GET.get("format") == "prometheus":
+            return HttpResponse(
+                metrics.prometheus(), content_type="text/plain; version=0.0.4"
+            )
+        return JsonResponse(metrics.snapshot(), json_dumps_params={"indent": 2})
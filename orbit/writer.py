@@ -0,0 +1,530 @@
+"""
+Django Orbit Write Pipeline
+
+Every OrbitEntry insert made by the middleware, watchers, log handler and helpers goes
+through this module, so *how* entries reach the database is decided in one place.
+Entries are also counted in the stats rollups (``orbit.rollups``) as they are handed
+to the writer, and published to live dashboard streams (``orbit.live``) once inserted.
+
+Two writers ship with Orbit:
+
+- ``SyncWriter`` (default) inserts on the calling thread — the original behaviour.
+- ``BufferedWriter`` appends to an in-process queue and returns immediately. A
+  background thread drains the queue with ``bulk_create`` whenever a batch fills up or
+  the flush interval elapses, applies backpressure when the queue is full, and drains
+  what is left on interpreter shutdown.
+
+Select one with ``ORBIT_CONFIG["WRITER"]`` (a dotted path, like ``STORAGE_BACKEND``).
+Custom writers subclass ``BaseWriter``.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from orbit import metrics
+from orbit.conf import get_config
+
+logger = logging.getLogger(__name__)
+
+
+def _bulk_insert(entries: list) -> None:
+    """Insert already-built OrbitEntry instances with a single ``bulk_create``."""
+    from orbit.interning import store_texts
+    from orbit.live import publish
+    from orbit.models import OrbitEntry
+    from orbit.watchers import cachalot_disabled
+
+    config = get_config()
+    for entry in entries:
+        entry.prepare_for_insert(config)
+
+    batch_size = config.get("BULK_CREATE_BATCH_SIZE")
+    started = time.perf_counter()
+    with cachalot_disabled():
+        try:
+            store_texts(entries)
+        except Exception:
+            # Keep the texts inline rather than point at rows that don't exist
+            for entry in entries:
+                if entry.text_id:
+                    entry.keep_text_inline()
+        OrbitEntry.objects.bulk_create(entries, batch_size=batch_size)
+    metrics.observe("write.insert", time.perf_counter() - started)
+    publish(entries)
+
+
+class BaseWriter:
+    """
+    Abstract base for Orbit writers.
+
+    Subclass this to control how OrbitEntry rows reach storage. ``write`` receives a
+    single entry's field values; ``write_many`` receives unsaved OrbitEntry instances.
+    Neither may raise — recording must never break the host application.
+    """
+
+    def write(self, fields: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def write_many(self, entries: list) -> None:
+        raise NotImplementedError
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Block until everything submitted so far has been written."""
+        pass
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Flush and release any resources (threads, connections)."""
+        self.flush(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return writer counters for diagnostics."""
+        return {"writer": self.__class__.__name__}
+
+
+_async_executor: Optional[ThreadPoolExecutor] = None
+_async_executor_lock = threading.Lock()
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _submit_off_loop(func, *args) -> None:
+    """Run ``func`` on Orbit's single write thread instead of the event loop."""
+    global _async_executor
+    if _async_executor is None:
+        with _async_executor_lock:
+            if _async_executor is None:
+                _async_executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="orbit-async-write"
+                )
+    _async_executor.submit(func, *args)
+
+
+class SyncWriter(BaseWriter):
+    """
+    Default writer. Inserts on the calling thread, exactly as Orbit always has.
+
+    Called from a coroutine (an async view or task outside a buffered request), the
+    insert is handed to a single background thread instead: the ORM can't run on the
+    event loop, and waiting for it there would stall every other request.
+    """
+
+    def write(self, fields: Dict[str, Any]) -> None:
+        if _in_event_loop():
+            _submit_off_loop(self._write, fields)
+            return
+        self._write(fields)
+
+    def _write(self, fields: Dict[str, Any]) -> None:
+        from orbit.live import publish
+        from orbit.models import OrbitEntry
+        from orbit.watchers import cachalot_disabled
+
+        try:
+            started = time.perf_counter()
+            with cachalot_disabled():
+                entry = OrbitEntry.objects.create(**fields)
+            metrics.observe("write.insert", time.perf_counter() - started)
+            publish([entry])
+        except Exception:
+            metrics.count("dropped", "insert_failed")
+
+    def write_many(self, entries: list) -> None:
+        if not entries:
+            return
+        if _in_event_loop():
+            _submit_off_loop(self.write_many, entries)
+            return
+        try:
+            _bulk_insert(entries)
+        except Exception:
+            metrics.count("dropped", "insert_failed", len(entries))
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        if _async_executor is not None:
+            # Runs after everything submitted before it, on the same thread
+            try:
+                _async_executor.submit(lambda: None).result(timeout)
+            except Exception:
+                pass
+
+
+class BufferedWriter(BaseWriter):
+    """
+    Queue entries in memory and insert them from a background thread.
+
+    Recording costs a deque append on the request thread. The flusher wakes when
+    ``batch_size`` entries are pending or every ``flush_interval`` seconds, whichever
+    comes first, and writes up to ``batch_size`` rows per ``bulk_create``.
+
+    When the queue holds ``max_size`` entries the ``overflow`` policy applies:
+
+    - ``"drop_oldest"``: evict the oldest pending entry to make room (default).
+    - ``"sample"``: past 80% full, admit new entries with a probability that falls
+      linearly to zero at capacity; a full queue drops the newcomer.
+
+    Dropped entries are counted in ``get_stats()["dropped"]``.
+    """
+
+    SAMPLE_START = 0.8
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        overflow: Optional[str] = None,
+        start_thread: bool = True,
+    ):
+        config = get_config()
+        self.max_size = max(1, int(max_size or config.get("WRITE_QUEUE_SIZE", 10000)))
+        self.batch_size = max(1, int(batch_size or config.get("WRITE_BATCH_SIZE", 500)))
+        self.flush_interval = float(
+            flush_interval
+            if flush_interval is not None
+            else config.get("WRITE_FLUSH_INTERVAL", 1.0)
+        )
+        self.overflow = overflow or config.get("WRITE_OVERFLOW_POLICY", "drop_oldest")
+        self.start_thread = start_thread
+
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        # Serialises drains so the flusher thread and an explicit flush() never write
+        # the same batch twice.
+        self._drain_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        self._stopping = False
+        # Entries taken off the queue whose insert has not finished yet
+        self._in_flight = 0
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    # -- submission -----------------------------------------------------------
+
+    def write(self, fields: Dict[str, Any]) -> None:
+        from orbit.models import OrbitEntry
+
+        try:
+            self._submit([OrbitEntry(**fields)])
+        except Exception:
+            pass
+
+    def write_many(self, entries: list) -> None:
+        if not entries:
+            return
+        try:
+            self._submit(list(entries))
+        except Exception:
+            pass
+
+    def _submit(self, entries: list) -> None:
+        self._ensure_thread()
+        with self._cond:
+            for entry in entries:
+                if not self._admit():
+                    self.dropped += 1
+                    continue
+                self._queue.append(entry)
+                self.enqueued += 1
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify()
+
+    def _admit(self) -> bool:
+        """Apply the overflow policy for one incoming entry (caller holds the lock)."""
+        depth = len(self._queue)
+        if self.overflow == "sample":
+            start = int(self.max_size * self.SAMPLE_START)
+            if depth >= self.max_size:
+                return False
+            if depth > start:
+                keep_probability = (self.max_size - depth) / (self.max_size - start)
+                return random.random() < keep_probability
+            return True
+        if depth >= self.max_size:
+            self._queue.popleft()
+            self.dropped += 1
+        return True
+
+    # -- flushing -------------------------------------------------------------
+
+    def _ensure_thread(self) -> None:
+        if not self.start_thread:
+            return
+        # After a fork (e.g. gunicorn --preload) the parent's flusher thread does not
+        # exist in the child and its queued entries belong to the parent.
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._queue.clear()
+            self._thread = None
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run, name="orbit-writer", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._stopping and len(self._queue) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                stopping = self._stopping
+            self._drain()
+            if stopping:
+                return
+
+    def _take_batch(self) -> list:
+        with self._cond:
+            batch = []
+            while self._queue and len(batch) < self.batch_size:
+                batch.append(self._queue.popleft())
+            self._in_flight += len(batch)
+            return batch
+
+    def _drain(self) -> None:
+        with self._drain_lock:
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    break
+                try:
+                    _bulk_insert(batch)
+                    self.written += len(batch)
+                    self.batches += 1
+                except Exception as exc:
+                    self.failed += len(batch)
+                    logger.debug(
+                        "Orbit writer failed to insert %d entries: %s", len(batch), exc
+                    )
+                finally:
+                    with self._cond:
+                        self._in_flight -= len(batch)
+                        self._cond.notify_all()
+            self._release_connection()
+
+    @staticmethod
+    def _release_connection() -> None:
+        """Honour CONN_MAX_AGE for the flusher's own connection, as Django does per request."""
+        if threading.current_thread() is threading.main_thread():
+            return
+        try:
+            from django.db import connections
+
+            from orbit.backends import get_storage_db_alias
+
+            connections[get_storage_db_alias()].close_if_unusable_or_obsolete()
+        except Exception:
+            pass
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        Block until everything queued so far has been written.
+
+        Without a ``timeout`` the queue is drained on the calling thread. With one, the
+        flusher thread is woken to do the writing and the caller waits at most
+        ``timeout`` seconds for the queue to empty.
+        """
+        thread = self._thread
+        if timeout is None or thread is None or not thread.is_alive():
+            self._drain()
+            return
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._queue or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                self._cond.wait(remaining)
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Stop the flusher thread after it has written everything still queued."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            self._drain()
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "writer": self.__class__.__name__,
+            "queue_depth": len(self._queue),
+            "max_size": self.max_size,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+            "overflow": self.overflow,
+        }
+
+
+# =============================================================================
+# Module-level API
+# =============================================================================
+
+_writer: Optional[BaseWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> BaseWriter:
+    """
+    Return the configured writer singleton.
+
+    Reads ``ORBIT_CONFIG["WRITER"]`` (defaults to ``"orbit.writer.SyncWriter"``). The
+    instance is cached for the process lifetime; call ``reset_writer()`` after changing
+    the setting at runtime.
+    """
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                from django.utils.module_loading import import_string
+
+                path = get_config().get("WRITER", "orbit.writer.SyncWriter")
+                try:
+                    _writer = import_string(path)()
+                except Exception as exc:
+                    logger.error(
+                        "Django Orbit: could not load WRITER %r (%s); "
+                        "falling back to SyncWriter",
+                        path,
+                        exc,
+                    )
+                    _writer = SyncWriter()
+    return _writer
+
+
+def reset_writer() -> None:
+    """Flush and discard the current writer so the next write re-reads the config."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.shutdown(timeout=get_config().get("WRITE_SHUTDOWN_TIMEOUT", 5.0))
+
+
+def _buffer_entries(entries: List[Any]) -> bool:
+    """
+    Append entries to the active request buffer, if there is one.
+
+    Returns ``False`` when no request is being recorded, in which case the caller
+    writes directly. A buffer that reaches ``REQUEST_BUFFER_MAX_ENTRIES`` is handed to
+    the writer early so very chatty requests do not hold everything in memory.
+    """
+    from orbit.context import get_request_buffer
+
+    buffer = get_request_buffer()
+    if buffer is None:
+        return False
+    for entry in entries:
+        buffer.add(entry)
+    if buffer.is_full():
+        _write_many(buffer.drain_early())
+    return True
+
+
+def _write_many(entries: List[Any]) -> None:
+    from orbit.rollups import observe_entries
+
+    observe_entries(entries)
+    by_type: Dict[str, int] = {}
+    for entry in entries:
+        by_type[entry.type] = by_type.get(entry.type, 0) + 1
+    for entry_type, amount in by_type.items():
+        metrics.count("events", entry_type, amount)
+    get_writer().write_many(entries)
+
+
+def write_entry(**fields) -> None:
+    """
+    Record one OrbitEntry.
+
+    Accepts the same keyword arguments as ``OrbitEntry.objects.create()``. Entries
+    without a ``family_hash`` get the one of the current ``OrbitContext``. Inside a
+    request handled by ``OrbitMiddleware`` the entry joins the request's buffer and is
+    written with the rest of its family. Never raises.
+    """
+    try:
+        from orbit.context import get_context
+
+        context = get_context()
+        if context is not None:
+            if not fields.get("family_hash"):
+                fields["family_hash"] = context.family_hash
+            buffer = context.buffer if context.active else None
+            if buffer is not None:
+                if buffer.discard:
+                    metrics.count("dropped", "sampled")
+                    return
+                from orbit.models import OrbitEntry
+
+                _buffer_entries([OrbitEntry(**fields)])
+                return
+        from orbit.rollups import observe_fields
+
+        observe_fields(fields)
+        metrics.count("events", fields.get("type", ""))
+        get_writer().write(fields)
+    except Exception:
+        pass
+
+
+def write_entries(entries: List[Any]) -> None:
+    """Record several unsaved OrbitEntry instances in as few inserts as possible."""
+    if not entries:
+        return
+    try:
+        from orbit.context import current_family_hash
+
+        family_hash = current_family_hash()
+        if family_hash:
+            for entry in entries:
+                if not entry.family_hash:
+                    entry.family_hash = family_hash
+        if not _buffer_entries(entries):
+            _write_many(entries)
+    except Exception:
+        pass
+
+
+def flush_writes(timeout: Optional[float] = None) -> None:
+    """Block until every entry submitted so far has been written."""
+    if _writer is not None:
+        _writer.flush(timeout)
+
+
+def _shutdown_at_exit() -> None:
+    if _writer is not None:
+        try:
+            _writer.shutdown(timeout=get_config().get("WRITE_SHUTDOWN_TIMEOUT", 5.0))
+        except Exception:
+            pass
+
+
+atexit.register(_shutdown_at_exit)
@@ -8,12 +8,22 @@ def pytest_configure():
     os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
     django.setup()
 
+
 import pytest
+
 from orbit.models import OrbitEntry
 
+
 @pytest.fixture(autouse=True)
 def clean_orbit_entries():
     """Ensure OrbitEntry table is clean before each test."""
+    from orbit import interning
+    from orbit.rollups import accumulator
+
     OrbitEntry.objects.all().delete()
+    accumulator.clear()
+    interning.clear_cache()
     yield
     OrbitEntry.objects.all().delete()
+    accumulator.clear()
+    interning.clear_cache()
@@ -25,6 +25,8 @@ ORBIT_CONFIG = {
     "RECORD_HTTP_CLIENT": True,
     "RECORD_DUMPS": True,
     "RECORD_MAIL": True,
-    "RECORD_SIGNALS": False,      # Disable signals in tests to avoid noise
-    "RECORD_TRANSACTIONS": False, # Transaction watcher intercepts pytest-django's own atomic wrapper
+    "RECORD_SIGNALS": False,  # Disable signals in tests to avoid noise
+    "RECORD_TRANSACTIONS": False,  # Transaction watcher intercepts pytest-django's own atomic wrapper
+    "RETENTION_SCHEDULER": None,  # Tests run retention passes explicitly
+    "ROLLUP_FLUSH_INTERVAL": None,  # Tests flush rollups explicitly
 }
@@ -1,8 +1,9 @@
 import json
 
-import pytest
 from django.test import override_settings
 
+import pytest
+
 from orbit.models import OrbitEntry
 
 pytestmark = pytest.mark.django_db
@@ -407,6 +408,7 @@ def test_investigate_endpoint_summarizes_recent_endpoint_health(
 
 def test_compare_endpoint_windows_detects_regression(db):
     from django.utils import timezone
+
     from orbit.agentic import compare_endpoint_windows
 
     baseline_time = timezone.now() - timezone.timedelta(hours=8)
@@ -463,6 +465,59 @@ def test_compare_endpoint_windows_detects_regression(db):
     assert data["recommendation"].startswith("Investigate")
 
 
+def _timed_requests(durations, when, path="/report/"):
+    from orbit.writer import write_entries
+
+    write_entries(
+        [
+            OrbitEntry(
+                type=OrbitEntry.TYPE_REQUEST,
+                duration_ms=duration,
+                created_at=when,
+                payload={"method": "GET", "path": path, "status_code": 200},
+            )
+            for duration in durations
+        ]
+    )
+
+
+def test_compare_endpoint_windows_reads_p95_from_rollups(db, monkeypatch):
+    from django.utils import timezone
+
+    from orbit import agentic
+
+    now = timezone.now()
+    _timed_requests([100.0] * 19 + [1000.0], now - timezone.timedelta(hours=5))
+    _timed_requests([50.0] * 10, now - timezone.timedelta(minutes=30))
+
+    def no_raw_scan(self, values):
+        raise AssertionError("durations were streamed from raw rows")
+
+    monkeypatch.setattr(agentic.DDSketch, "extend", no_raw_scan)
+    data = agentic.compare_endpoint_windows("/report/", method="GET")
+
+    assert data["baseline"]["request_count"] == 20
+    assert data["baseline"]["p95_duration_ms"] == pytest.approx(100.0, rel=0.02)
+    assert data["current"]["p95_duration_ms"] == pytest.approx(50.0, rel=0.02)
+
+
+def test_compare_endpoint_windows_falls_back_to_raw_durations(db):
+    from django.utils import timezone
+
+    from orbit.agentic import compare_endpoint_windows
+    from orbit.rollups import accumulator
+
+    now = timezone.now()
+    _timed_requests([200.0] * 5, now - timezone.timedelta(minutes=30))
+    # Rollups counted in another process that has not flushed yet
+    accumulator.clear()
+
+    data = compare_endpoint_windows("/report/")
+
+    assert data["current"]["request_count"] == 5
+    assert data["current"]["p95_duration_ms"] == pytest.approx(200.0, rel=0.02)
+
+
 def test_compare_endpoint_windows_handles_insufficient_data(db):
     from orbit.agentic import compare_endpoint_windows
 
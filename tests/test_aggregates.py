@@ -0,0 +1,179 @@
+"""
+Tests for aggregate recording of high-volume event types (orbit.aggregates).
+"""
+
+import threading
+import time
+from unittest import mock
+
+from django.db.models.signals import post_save
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+import pytest
+
+from orbit import aggregates
+from orbit.aggregates import key_prefix
+from orbit.middleware import OrbitMiddleware
+from orbit.models import OrbitEntry
+from orbit.rollups import accumulator
+from orbit.watchers import (
+    record_cache_operation,
+    record_redis_operation,
+    record_signal,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def aggregated(settings):
+    settings.ORBIT_CONFIG = {
+        **settings.ORBIT_CONFIG,
+        "AGGREGATE_EVENTS": ["cache", "redis", "signal"],
+        "AGGREGATE_BUCKET_SECONDS": 3600,
+        "RECORD_SIGNALS": True,
+    }
+    aggregates.bucket.clear()
+    yield
+    aggregates.bucket.clear()
+
+
+def _config(settings, **overrides):
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG, **overrides}
+
+
+def _rollup_count(entry_type):
+    return sum(
+        totals["count"]
+        for (_, rollup_type, _method, _path), totals in accumulator._pending.items()
+        if rollup_type == entry_type
+    )
+
+
+def test_key_prefix():
+    assert key_prefix("user:42:profile") == "user:*"
+    assert key_prefix("views.decorators.cache") == "views.*"
+    assert key_prefix("session123") == "session#"
+    assert key_prefix(None) == ""
+
+
+def test_request_writes_one_summary_per_type():
+    def view(request):
+        for user_id in range(4):
+            record_cache_operation(
+                "get", f"user:{user_id}", hit=user_id > 0, duration_ms=2.0
+            )
+        record_cache_operation("set", "user:0", duration_ms=1.0)
+        record_signal(post_save, OrbitMiddleware)
+        record_signal(post_save, OrbitMiddleware)
+        return HttpResponse("ok")
+
+    OrbitMiddleware(view)(RequestFactory().get("/aggregated/"))
+
+    request = OrbitEntry.objects.get(type=OrbitEntry.TYPE_REQUEST)
+    cache = OrbitEntry.objects.get(type=OrbitEntry.TYPE_CACHE)
+    assert cache.family_hash == request.family_hash
+    assert cache.payload["aggregate"] is True
+    assert cache.payload["operations"] == 5
+    get, set_ = cache.payload["groups"]
+    assert get["group"] == "get user:*"
+    assert (get["count"], get["hits"], get["misses"]) == (4, 3, 1)
+    assert get["duration_ms"]["total"] == 8.0
+    assert get["duration_ms"]["p95"] == pytest.approx(2.0, rel=0.02)
+    assert set_["group"] == "set user:*"
+    assert cache.duration_ms == 9.0
+    assert cache.summary == "5 cache operations in 2 groups"
+
+    signal = OrbitEntry.objects.get(type=OrbitEntry.TYPE_SIGNAL)
+    assert signal.payload["groups"][0]["count"] == 2
+    assert signal.payload["groups"][0]["group"].endswith("OrbitMiddleware")
+
+
+def test_rollups_count_every_event_not_the_summary():
+    def view(request):
+        for hit in (True, True, False):
+            record_cache_operation("get", "k", hit=hit)
+        return HttpResponse("ok")
+
+    OrbitMiddleware(view)(RequestFactory().get("/aggregated/"))
+
+    assert _rollup_count("cache") == 3
+    totals = next(
+        totals
+        for (_, entry_type, method, _path), totals in accumulator._pending.items()
+        if entry_type == "cache" and not method
+    )
+    assert (totals["hit_count"], totals["miss_count"]) == (2, 1)
+
+
+def test_events_outside_requests_are_written_per_bucket():
+    record_redis_operation("get", "a:1", duration_ms=1.0)
+    record_redis_operation("GET", "a:2", duration_ms=3.0)
+    record_redis_operation("set", "a:1", error="READONLY")
+
+    assert not OrbitEntry.objects.exists()
+    assert _rollup_count("redis") == 3
+
+    aggregates.bucket.flush()
+
+    redis = OrbitEntry.objects.get(type=OrbitEntry.TYPE_REDIS)
+    assert redis.payload["operations"] == 3
+    assert [group["group"] for group in redis.payload["groups"]] == ["GET", "SET"]
+    assert redis.payload["groups"][1]["errors"] == 1
+    assert "start" in redis.payload["window"]
+    assert _rollup_count("redis") == 3
+
+
+def test_due_bucket_is_written_by_the_flusher_thread(settings, monkeypatch):
+    _config(settings, AGGREGATE_BUCKET_SECONDS=0)
+    bucket = aggregates.AggregateBucket()
+    written = []
+    done = threading.Event()
+    flush = bucket.flush
+
+    def tracked():
+        written.append(threading.current_thread().name)
+        flush()
+        done.set()
+
+    monkeypatch.setattr(bucket, "flush", tracked)
+    monkeypatch.setattr(aggregates, "bucket", bucket)
+    with mock.patch("orbit.writer.write_entries") as write_entries:
+        record_redis_operation("get", "a:1")
+        assert done.wait(5)
+
+    assert written == ["orbit-aggregates"]
+    [entries] = write_entries.call_args.args
+    assert [entry.type for entry in entries] == [OrbitEntry.TYPE_REDIS]
+    # Nothing is pending any more, so the thread stops
+    deadline = time.monotonic() + 5
+    while bucket._thread is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert bucket._thread is None
+
+
+def test_groups_past_the_limit_are_folded(settings):
+    _config(settings, AGGREGATE_MAX_GROUPS=3)
+    for command in ("get", "get", "get", "set", "set", "del", "hget", "lpush"):
+        record_redis_operation(command, "key")
+
+    aggregates.bucket.flush()
+
+    groups = OrbitEntry.objects.get(type=OrbitEntry.TYPE_REDIS).payload["groups"]
+    assert [(group["group"], group["count"]) for group in groups] == [
+        ("GET", 3),
+        ("SET", 2),
+        ("(other)", 3),
+    ]
+
+
+def test_types_not_listed_are_recorded_per_event(settings):
+    _config(settings, AGGREGATE_EVENTS=["signal"])
+
+    record_cache_operation("get", "user:1", hit=True)
+    record_cache_operation("get", "user:2", hit=False)
+
+    entries = OrbitEntry.objects.filter(type=OrbitEntry.TYPE_CACHE)
+    assert entries.count() == 2
+    assert not any(entry.payload.get("aggregate") for entry in entries)
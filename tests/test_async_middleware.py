@@ -0,0 +1,161 @@
+"""
+Tests for the async path of OrbitMiddleware and async-safe recording.
+"""
+
+import asyncio
+import logging
+import threading
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+
+from orbit.context import orbit_context
+from orbit.handlers import get_current_family_hash
+from orbit.middleware import OrbitMiddleware
+from orbit.models import OrbitEntry
+from orbit.writer import SyncWriter, flush_writes
+
+# The request family is written by the writer's own thread, so rows have to commit
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def _run(view, path="/async/"):
+    middleware = OrbitMiddleware(view)
+    try:
+        return async_to_sync(middleware)(RequestFactory().get(path))
+    finally:
+        flush_writes(timeout=5)
+
+
+def test_async_handler_chain_gets_a_coroutine_middleware():
+    async def view(request):
+        return HttpResponse("ok")
+
+    def sync_view(request):
+        return HttpResponse("ok")
+
+    assert asyncio.iscoroutinefunction(OrbitMiddleware(view))
+    assert not asyncio.iscoroutinefunction(OrbitMiddleware(sync_view))
+
+
+def test_async_request_and_queries_share_a_family():
+    async def view(request):
+        await sync_to_async(lambda: list(OrbitEntry.objects.filter(type="nothing")))()
+        return HttpResponse("ok")
+
+    response = _run(view)
+
+    assert response.status_code == 200
+    request_entry = OrbitEntry.objects.get(type=OrbitEntry.TYPE_REQUEST)
+    assert request_entry.payload["path"] == "/async/"
+    queries = OrbitEntry.objects.filter(type=OrbitEntry.TYPE_QUERY)
+    assert queries.exists()
+    assert {q.family_hash for q in queries} == {request_entry.family_hash}
+
+
+def test_concurrent_async_requests_keep_their_own_context():
+    seen = {}
+
+    async def view(request):
+        family_hash = get_current_family_hash()
+        # Let the other request run on the same loop thread in between
+        await asyncio.sleep(0.01)
+        seen[request.path] = (family_hash, get_current_family_hash())
+        logging.getLogger("app").warning("from %s", request.path)
+        return HttpResponse("ok")
+
+    middleware = OrbitMiddleware(view)
+    factory = RequestFactory()
+
+    async def both():
+        await asyncio.gather(
+            middleware(factory.get("/one/")), middleware(factory.get("/two/"))
+        )
+
+    async_to_sync(both)()
+    flush_writes(timeout=5)
+
+    assert seen["/one/"][0] == seen["/one/"][1]
+    assert seen["/two/"][0] == seen["/two/"][1]
+    assert seen["/one/"][0] != seen["/two/"][0]
+    families = dict(
+        OrbitEntry.objects.filter(type=OrbitEntry.TYPE_REQUEST).values_list(
+            "path", "family_hash"
+        )
+    )
+    assert families == {"/one/": seen["/one/"][0], "/two/": seen["/two/"][0]}
+
+
+def test_async_exception_is_recorded():
+    async def view(request):
+        raise ValueError("async boom")
+
+    with pytest.raises(ValueError):
+        _run(view)
+
+    exception = OrbitEntry.objects.get(type=OrbitEntry.TYPE_EXCEPTION)
+    request_entry = OrbitEntry.objects.get(type=OrbitEntry.TYPE_REQUEST)
+    assert exception.family_hash == request_entry.family_hash
+    assert request_entry.status_code == 500
+    assert get_current_family_hash() is None
+
+
+def test_async_request_keeps_the_outer_context():
+    async def view(request):
+        return HttpResponse("ok")
+
+    middleware = OrbitMiddleware(view)
+
+    async def nested():
+        with orbit_context("outer"):
+            await middleware(RequestFactory().get("/async/"))
+            return get_current_family_hash()
+
+    assert async_to_sync(nested)() == "outer"
+
+
+def test_async_request_is_finished_on_the_event_loop(monkeypatch):
+    threads = {}
+    finish = OrbitMiddleware._finish_capture
+
+    def tracked(self, *args):
+        threads["finish"] = threading.current_thread()
+        return finish(self, *args)
+
+    async def view(request):
+        threads["view"] = threading.current_thread()
+        return HttpResponse("ok")
+
+    monkeypatch.setattr(OrbitMiddleware, "_finish_capture", tracked)
+    _run(view)
+
+    assert threads["finish"] is threads["view"]
+    assert OrbitEntry.objects.filter(type=OrbitEntry.TYPE_REQUEST).exists()
+
+
+def test_sync_writer_hands_off_from_the_event_loop():
+    threads = []
+
+    async def record():
+        SyncWriter().write_many([OrbitEntry(type=OrbitEntry.TYPE_LOG, payload={})])
+
+    with mock.patch(
+        "orbit.writer._bulk_insert",
+        side_effect=lambda entries: threads.append(threading.current_thread().name),
+    ):
+        asyncio.run(record())
+        SyncWriter().flush(timeout=5)
+
+    assert len(threads) == 1
+    assert threads[0].startswith("orbit-async-write")
+
+
+def test_sync_writer_stays_on_the_calling_thread_outside_a_loop():
+    SyncWriter().write_many([OrbitEntry(type=OrbitEntry.TYPE_LOG, payload={})])
+    flush_writes()
+
+    assert OrbitEntry.objects.filter(type=OrbitEntry.TYPE_LOG).count() == 1
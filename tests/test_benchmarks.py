@@ -0,0 +1,67 @@
+"""
+Tests for the overhead benchmark harness (benchmarks.overhead).
+"""
+
+import pytest
+
+from benchmarks.overhead import (
+    Workload,
+    check_regressions,
+    format_table,
+    percentile,
+    run_overhead,
+    scenarios,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def test_scenarios_cover_each_flag_against_requests_only():
+    names = dict(scenarios(("RECORD_CACHE", "RECORD_LOGS")))
+
+    assert list(names) == [
+        "disabled",
+        "default",
+        "requests only",
+        "RECORD_CACHE",
+        "RECORD_LOGS",
+    ]
+    assert not any(names["requests only"].values())
+    assert names["RECORD_CACHE"]["RECORD_CACHE"] is True
+    assert names["RECORD_CACHE"]["RECORD_QUERIES"] is False
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 50) == 0.0
+
+
+def test_small_run_reports_every_metric():
+    workload = Workload(queries=2, cache=2, logs=0, signals=0, saves=1)
+    results = run_overhead(
+        workload, requests=5, warmup=1, alloc_requests=2, flags=("RECORD_QUERIES",)
+    )
+
+    by_name = {row["scenario"]: row for row in results}
+    assert set(by_name) == {"disabled", "default", "requests only", "RECORD_QUERIES"}
+    assert by_name["disabled"]["entries_per_request"] == 0
+    assert by_name["requests only"]["entries_per_request"] == 1
+    assert by_name["RECORD_QUERIES"]["entries_per_request"] > 1
+    assert by_name["default"]["inserts_per_request"] > 0
+    assert by_name["default"]["alloc_kb_per_request"] > 0
+    assert "RECORD_QUERIES" in format_table(results)
+
+
+def test_regressions_beyond_the_margin_are_reported():
+    baseline = [
+        {"scenario": "default", "added_p50_ms": 1.0, "inserts_per_request": 2.0}
+    ]
+    steady = [{"scenario": "default", "added_p50_ms": 1.1, "inserts_per_request": 2.0}]
+    slower = [{"scenario": "default", "added_p50_ms": 1.5, "inserts_per_request": 3.0}]
+
+    assert check_regressions(steady, baseline, max_regression=20) == []
+    failures = check_regressions(slower, baseline, max_regression=20)
+    assert len(failures) == 2
+    assert failures[0].startswith("default: added_p50_ms")
@@ -0,0 +1,107 @@
+"""
+Tests for the read-path benchmark and its data generator (benchmarks.read_path,
+benchmarks.dataset).
+"""
+
+from collections import Counter
+
+from django.utils import timezone
+
+import pytest
+
+from benchmarks.dataset import generate, grow_to, parse_count
+from benchmarks.read_path import (
+    SKIPPED_VIEWS,
+    add_scaling,
+    find_cliffs,
+    format_table,
+    run_read_path,
+)
+from orbit.agentic import HIGH_LEVEL_TOOLS
+from orbit.models import OrbitEntry, OrbitRollup
+from orbit.urls import urlpatterns
+
+pytestmark = pytest.mark.django_db
+
+
+def test_parse_count_accepts_suffixes():
+    assert parse_count("10k") == 10_000
+    assert parse_count("1M") == 1_000_000
+    assert parse_count("2500") == 2500
+
+
+def test_generated_families_look_like_production():
+    written = generate(600, days=2, seed=1)
+
+    assert written == OrbitEntry.objects.count() >= 600
+    types = Counter(OrbitEntry.objects.values_list("type", flat=True))
+    assert {"request", "query", "cache", "job"} <= set(types)
+    assert types["query"] > types["request"]
+    # Children share their request's family
+    request = OrbitEntry.objects.filter(type="request").first()
+    assert OrbitEntry.objects.filter(
+        family_hash=request.family_hash, type="query"
+    ).exists()
+    # Exceptions repeat a small set of fingerprints
+    fingerprints = OrbitEntry.objects.filter(type="exception").values_list(
+        "fingerprint", flat=True
+    )
+    assert len(set(fingerprints)) <= 12
+    assert OrbitRollup.objects.filter(type="request").exists()
+    assert not OrbitEntry.objects.filter(type__in=("model", "signal")).exists()
+
+
+def test_generation_is_seeded():
+    now = timezone.now()
+    generate(200, seed=3, now=now)
+    first = list(OrbitEntry.objects.order_by("created_at").values_list("path", "type"))
+    OrbitEntry.objects.all().delete()
+    generate(200, seed=3, now=now)
+
+    assert (
+        list(OrbitEntry.objects.order_by("created_at").values_list("path", "type"))
+        == first
+    )
+
+
+def test_grow_to_only_adds_the_difference():
+    grow_to(300)
+    held = OrbitEntry.objects.count()
+
+    assert grow_to(300) == 0
+    assert grow_to(held + 200) >= 200
+
+
+def test_small_run_measures_every_target():
+    results = run_read_path([300, 600], days=1, repeat=1, plans=True)
+
+    assert [row for row in results if row.get("error")] == []
+    targets = {row["target"] for row in results}
+    views = {target.split(" ")[0] for target in targets if target.startswith("view:")}
+    assert views == {
+        f"view:{pattern.name}"
+        for pattern in urlpatterns
+        if pattern.name not in SKIPPED_VIEWS
+    }
+    assert {f"tool:{name}" for name in HIGH_LEVEL_TOOLS} <= targets
+    assert "stats:get_summary_stats" in targets
+
+    bigger = [row for row in results if row["rows"] > results[0]["rows"]]
+    assert all(row["scaling"] is not None for row in bigger if row["ms"])
+    summary = next(row for row in bigger if row["target"] == "view:stats range=24h")
+    assert summary["queries"] > 0 and summary["slowest_sql"] and summary["plan"]
+    assert "view:dashboard" in format_table(results)
+
+
+def test_cliffs_are_targets_that_grow_with_storage():
+    results = [
+        {"rows": 1000, "target": "stats:flat", "ms": 60.0},
+        {"rows": 1000, "target": "view:scan", "ms": 60.0},
+        {"rows": 10000, "target": "stats:flat", "ms": 66.0},
+        {"rows": 10000, "target": "view:scan", "ms": 600.0},
+    ]
+    add_scaling(results)
+
+    assert results[2]["scaling"] == 0.04
+    assert results[3]["scaling"] == 1.0
+    assert find_cliffs(results) == ["view:scan: 600.0 ms at 10000 rows (scaling 1.0)"]
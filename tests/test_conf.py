@@ -0,0 +1,81 @@
+"""
+Tests for the cached Orbit configuration (orbit.conf).
+"""
+
+import pytest
+
+from orbit.conf import (
+    OrbitConfig,
+    get_config,
+    reload_config,
+    resolve_callable,
+    should_ignore_path,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def test_config_is_cached_between_calls():
+    assert get_config() is get_config()
+
+
+def test_config_is_read_only():
+    config = get_config()
+    with pytest.raises(TypeError):
+        config["ENABLED"] = False
+    assert config.get("MISSING", "fallback") == "fallback"
+    assert {**config}["ENABLED"] is True
+
+
+def test_setting_change_invalidates_cache(settings):
+    before = get_config()
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG, "SLOW_QUERY_THRESHOLD_MS": 42}
+    after = get_config()
+    assert after is not before
+    assert after["SLOW_QUERY_THRESHOLD_MS"] == 42
+
+
+def test_reload_after_in_place_mutation(settings):
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG}
+    get_config()
+    settings.ORBIT_CONFIG["MCP_MAX_LIMIT"] = 7
+    assert get_config()["MCP_MAX_LIMIT"] != 7
+    assert reload_config()["MCP_MAX_LIMIT"] == 7
+
+
+def test_should_ignore_path_uses_prefixes(settings):
+    settings.ORBIT_CONFIG = {
+        **settings.ORBIT_CONFIG,
+        "IGNORE_PATHS": ["/orbit/", "/static/", "/a.b"],
+    }
+    assert should_ignore_path("/orbit/feed/")
+    assert should_ignore_path("/static/app.css")
+    assert should_ignore_path("/a.b/c")
+    assert not should_ignore_path("/axb/c")  # prefixes are literal, not regex
+    assert not should_ignore_path("/api/orbit/")
+
+
+def test_empty_ignore_paths(settings):
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG, "IGNORE_PATHS": []}
+    assert get_config().ignore_paths_re is None
+    assert not should_ignore_path("/orbit/")
+
+
+def test_derived_structures():
+    config = OrbitConfig(
+        {
+            "MASK_KEYS": ["Password", "API_KEY"],
+            "IGNORE_SIGNALS": ["a.b", "a.b", "c.d"],
+            "TAG_CALLBACK": "orbit.utils.parse_tags",
+        }
+    )
+    assert config.mask_keys == ("password", "api_key")
+    assert config.ignore_signals == frozenset({"a.b", "c.d"})
+    assert config.tag_callback(",x,") == ["x"]
+
+
+def test_resolve_callable():
+    assert resolve_callable(None) is None
+    assert resolve_callable("orbit.nope.missing") is None
+    assert resolve_callable("not-callable") is None
+    assert resolve_callable(len) is len
@@ -0,0 +1,141 @@
+"""
+Tests for the shared recording context (orbit.context).
+"""
+
+import asyncio
+import threading
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from orbit.context import bind, current_family_hash, get_context, orbit_context
+from orbit.handlers import OrbitLogContext
+from orbit.middleware import OrbitMiddleware
+from orbit.models import OrbitEntry
+from orbit.watchers import _table_exists
+from orbit.writer import flush_writes, write_entry
+
+pytestmark = pytest.mark.django_db
+
+
+def _request_family():
+    return OrbitEntry.objects.get(type=OrbitEntry.TYPE_REQUEST).family_hash
+
+
+def test_orbit_context_links_direct_writes():
+    with orbit_context("fam-block") as context:
+        write_entry(type=OrbitEntry.TYPE_CACHE, payload={"operation": "get"})
+        assert context.buffer is None
+
+    assert current_family_hash() is None
+    assert OrbitEntry.objects.get(type=OrbitEntry.TYPE_CACHE).family_hash == "fam-block"
+
+
+def test_unbuffered_request_events_get_the_family(settings):
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG, "BUFFER_REQUEST_EVENTS": False}
+
+    def view(request):
+        write_entry(type=OrbitEntry.TYPE_CACHE, payload={"operation": "get"})
+        return HttpResponse("ok")
+
+    OrbitMiddleware(view)(RequestFactory().get("/ctx/"))
+
+    assert (
+        OrbitEntry.objects.get(type=OrbitEntry.TYPE_CACHE).family_hash
+        == _request_family()
+    )
+
+
+def test_bound_thread_joins_the_request_buffer():
+    def work():
+        write_entry(type=OrbitEntry.TYPE_CACHE, payload={"operation": "get"})
+
+    def view(request):
+        thread = threading.Thread(target=bind(work))
+        thread.start()
+        thread.join()
+        # Buffered with the request, not written yet
+        assert not OrbitEntry.objects.filter(type=OrbitEntry.TYPE_CACHE).exists()
+        return HttpResponse("ok")
+
+    OrbitMiddleware(view)(RequestFactory().get("/ctx/"))
+
+    assert (
+        OrbitEntry.objects.get(type=OrbitEntry.TYPE_CACHE).family_hash
+        == _request_family()
+    )
+
+
+def test_unbound_thread_has_no_context():
+    seen = []
+
+    def view(request):
+        thread = threading.Thread(target=lambda: seen.append(get_context()))
+        thread.start()
+        thread.join()
+        return HttpResponse("ok")
+
+    OrbitMiddleware(view)(RequestFactory().get("/ctx/"))
+    assert seen == [None]
+
+
+# The family is inserted by the writer's thread, so its rows have to commit
+@pytest.mark.django_db(transaction=True)
+def test_asyncio_tasks_share_the_context():
+    leftovers = []
+
+    async def record(operation):
+        write_entry(type=OrbitEntry.TYPE_CACHE, payload={"operation": operation})
+
+    async def late():
+        await asyncio.sleep(0.01)
+        leftovers.append(get_context())
+
+    async def view(request):
+        await asyncio.create_task(record("awaited"))
+        leftovers.append(asyncio.create_task(late()))
+        return HttpResponse("ok")
+
+    async def run():
+        await OrbitMiddleware(view)(RequestFactory().get("/ctx/"))
+        await leftovers[0]
+
+    async_to_sync(run)()
+    flush_writes(timeout=5)
+
+    family_hash = _request_family()
+    assert OrbitEntry.objects.get(type=OrbitEntry.TYPE_CACHE).family_hash == family_hash
+    # A task outliving the request keeps the family hash but no open buffer
+    context = leftovers[1]
+    assert context.family_hash == family_hash and not context.active
+
+
+def test_log_context_keeps_the_request_buffer():
+    def view(request):
+        with OrbitLogContext(family_hash="fam-log"):
+            assert current_family_hash() == "fam-log"
+            write_entry(type=OrbitEntry.TYPE_CACHE, payload={"operation": "get"})
+        assert current_family_hash() != "fam-log"
+        assert not OrbitEntry.objects.filter(type=OrbitEntry.TYPE_CACHE).exists()
+        return HttpResponse("ok")
+
+    OrbitMiddleware(view)(RequestFactory().get("/ctx/"))
+
+    assert OrbitEntry.objects.get(type=OrbitEntry.TYPE_CACHE).family_hash == "fam-log"
+
+
+def test_sampled_out_requests_skip_watchers(settings):
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG, "SAMPLE_RATE": 0.0}
+    seen = []
+
+    def view(request):
+        seen.append((get_context().sampled, _table_exists()))
+        return HttpResponse("ok")
+
+    OrbitMiddleware(view)(RequestFactory().get("/ctx/"))
+
+    assert seen == [(False, False)]
+    assert _table_exists()
@@ -0,0 +1,72 @@
+"""
+Tests for the single-query dashboard counts (OrbitEntryManager.dashboard_counts).
+"""
+
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+import pytest
+
+from orbit.models import OrbitEntry
+
+pytestmark = pytest.mark.django_db
+
+
+def _entries():
+    create = OrbitEntry.objects.create
+    create(type=OrbitEntry.TYPE_REQUEST, payload={"status_code": 200}, duration_ms=10)
+    create(type=OrbitEntry.TYPE_REQUEST, payload={"status_code": 404}, duration_ms=30)
+    create(type=OrbitEntry.TYPE_EXCEPTION, payload={})
+    create(type=OrbitEntry.TYPE_QUERY, payload={"sql": "SELECT 1", "is_slow": True})
+    create(
+        type=OrbitEntry.TYPE_QUERY, payload={"sql": "SELECT 1", "is_duplicate": True}
+    )
+    create(type=OrbitEntry.TYPE_CACHE, payload={"hit": True})
+    create(type=OrbitEntry.TYPE_CACHE, payload={"hit": False})
+    create(type=OrbitEntry.TYPE_GATE, payload={"result": "denied"})
+    create(type=OrbitEntry.TYPE_JOB, payload={"status": "failed"})
+    old = create(type=OrbitEntry.TYPE_EXCEPTION, payload={})
+    OrbitEntry.objects.filter(id=old.id).update(
+        created_at=timezone.now() - timedelta(days=2)
+    )
+
+
+def test_dashboard_counts_in_one_query():
+    _entries()
+    now = timezone.now()
+    with CaptureQueriesContext(connection) as ctx:
+        summary = OrbitEntry.objects.dashboard_counts(
+            now - timedelta(hours=1), now - timedelta(hours=24)
+        )
+    assert len(ctx.captured_queries) == 1
+
+    assert summary["request"]["total"] == 2
+    assert summary["request"]["errors"] == 1
+    assert summary["request"]["last_hour_avg"] == 20
+    assert summary["exception"]["total"] == 2
+    assert summary["exception"]["last_day"] == 1
+    assert summary["query"]["slow"] == 1
+    assert summary["query"]["duplicates"] == 1
+    assert (summary["cache"]["hits"], summary["cache"]["misses"]) == (1, 1)
+    assert summary["gate"]["denied"] == 1
+    assert summary["job"]["failed"] == 1
+    assert "mail" not in summary
+
+
+def test_dashboard_view_uses_grouped_counts(client):
+    _entries()
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(reverse("orbit:dashboard"))
+
+    orbit_queries = [q for q in ctx.captured_queries if "orbit_orbitentry" in q["sql"]]
+    assert len(orbit_queries) == 1
+    context = response.context
+    assert context["counts"]["all"] == 10
+    assert context["counts"]["mail"] == 0
+    assert context["error_count"] == 3
+    assert context["stats"]["cache_hit_rate"] == 50
+    assert context["stats"]["exceptions_24h"] == 1
@@ -0,0 +1,130 @@
+"""
+Tests for the feed's keyset pagination and live-poll deltas.
+"""
+
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+
+import pytest
+
+from orbit.models import OrbitEntry
+from orbit.views import _feed_cursor, _live_cursor, _parse_feed_cursor
+
+pytestmark = pytest.mark.django_db
+
+
+def _logs(count, start=0):
+    base = timezone.now() - timedelta(hours=1)
+    entries = []
+    for n in range(start, start + count):
+        entry = OrbitEntry.objects.create(
+            type=OrbitEntry.TYPE_LOG, payload={"message": f"CursorLog {n:03d}"}
+        )
+        OrbitEntry.objects.filter(id=entry.id).update(
+            created_at=base + timedelta(seconds=n)
+        )
+        entry.refresh_from_db()
+        entries.append(entry)
+    return entries
+
+
+def _feed(client, **params):
+    return client.get(reverse("orbit:feed"), {"type": "log", **params})
+
+
+def test_cursor_round_trips_exactly():
+    entry = _logs(1)[0]
+    assert _parse_feed_cursor(_feed_cursor(entry)) == (entry.created_at, entry.id)
+    assert _parse_feed_cursor("garbage") is None
+
+
+def test_newest_page_carries_live_cursor(client):
+    entries = _logs(3)
+
+    response = _feed(client)
+
+    assert response["X-Orbit-Live"] == "1"
+    inserted_at, _ = _parse_feed_cursor(response["X-Orbit-Cursor"])
+    assert inserted_at >= entries[-1].inserted_at
+    assert _feed(client, after=response["X-Orbit-Cursor"]).status_code == 204
+
+
+def test_delta_returns_only_newer_rows(client):
+    entries = _logs(3)
+    cursor = _live_cursor(entries[-1])
+    _logs(2, start=3)
+
+    response = _feed(client, after=cursor)
+    content = response.content.decode()
+
+    assert response.status_code == 200
+    assert "CursorLog 004" in content and "CursorLog 003" in content
+    assert "CursorLog 002" not in content
+    assert "<table" not in content
+    assert content.index("CursorLog 004") < content.index("CursorLog 003")
+    assert response["X-Orbit-Cursor"] != cursor
+
+
+def test_delta_includes_rows_inserted_late(client):
+    """A buffered writer inserts rows that happened before the client's cursor."""
+    seen = _logs(1, start=5)[0]
+    cursor = _live_cursor(seen)
+    late = _logs(1, start=0)[0]
+    assert late.created_at < seen.created_at
+
+    response = _feed(client, after=cursor)
+
+    assert response.status_code == 200
+    assert "CursorLog 000" in response.content.decode()
+    assert response["X-Orbit-Cursor"] == _live_cursor(late)
+
+
+def test_delta_is_empty_when_nothing_changed(client):
+    entries = _logs(2)
+
+    response = _feed(client, after=_live_cursor(entries[-1]))
+
+    assert response.status_code == 204
+    assert not response.has_header("X-Orbit-Feed-Reset")
+
+
+def test_delta_asks_for_reload_when_too_many_arrived(client):
+    entries = _logs(1)
+    _logs(6, start=1)
+
+    response = _feed(client, after=_live_cursor(entries[0]), per_page=5)
+
+    assert response.status_code == 204
+    assert response["X-Orbit-Feed-Reset"] == "1"
+
+
+def test_keyset_pages_walk_older_and_back(client):
+    entries = _logs(12)
+
+    older = _feed(client, per_page=5, before=_feed_cursor(entries[7]))
+    content = older.content.decode()
+    assert [f"CursorLog {n:03d}" in content for n in (6, 2, 7, 1)] == [
+        True,
+        True,
+        False,
+        False,
+    ]
+    assert older["X-Orbit-Live"] == "0"
+    assert not older.has_header("X-Orbit-Cursor")
+
+    newer = _feed(client, per_page=5, since=_feed_cursor(entries[6]))
+    content = newer.content.decode()
+    assert "CursorLog 011" in content and "CursorLog 007" in content
+    assert "CursorLog 006" not in content
+    assert newer["X-Orbit-Live"] == "1"
+
+
+def test_filters_apply_to_deltas(client):
+    entries = _logs(1)
+    OrbitEntry.objects.create(type=OrbitEntry.TYPE_REQUEST, payload={"path": "/x/"})
+
+    response = _feed(client, after=_live_cursor(entries[0]))
+
+    assert response.status_code == 204
@@ -0,0 +1,193 @@
+"""
+Tests for the overhead governor (orbit.governor).
+"""
+
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+import pytest
+
+from orbit import metrics
+from orbit.governor import (
+    ERRORS_ONLY,
+    FULL,
+    MIN_WINDOW_REQUESTS,
+    NO_CACHE_SIGNALS,
+    NO_CALLERS,
+    RECOVER_WINDOWS,
+    SAMPLED,
+    governor,
+)
+from orbit.middleware import OrbitMiddleware
+from orbit.models import OrbitEntry
+from orbit.recorders import OrbitQueryWrapper
+from orbit.rollups import accumulator
+from orbit.watchers import record_cache_operation, record_redis_operation
+from orbit.writer import write_entry
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def governed(settings):
+    settings.ORBIT_CONFIG = {
+        **settings.ORBIT_CONFIG,
+        "OVERHEAD_GOVERNOR": True,
+        "OVERHEAD_WINDOW": 0,
+    }
+    governor.reset()
+    metrics.reset()
+    yield
+    governor.reset()
+    metrics.reset()
+
+
+def _config(settings, **overrides):
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG, **overrides}
+
+
+def _window(request_seconds, overhead_seconds):
+    for _ in range(MIN_WINDOW_REQUESTS):
+        governor.record_request(request_seconds, overhead_seconds)
+
+
+def _counted_requests():
+    return sum(
+        totals["count"]
+        for (_, entry_type, method, _path), totals in accumulator._pending.items()
+        if entry_type == OrbitEntry.TYPE_REQUEST and not method
+    )
+
+
+def _run(status=200, path="/governed/"):
+    def view(request):
+        write_entry(type=OrbitEntry.TYPE_LOG, payload={"message": "inside"})
+        return HttpResponse("ok", status=status)
+
+    return OrbitMiddleware(view)(RequestFactory().get(path))
+
+
+def test_degrades_one_level_per_window_over_budget():
+    # 5ms of overhead on a 10ms request: far over 2% and over 1ms
+    for level in (NO_CALLERS, NO_CACHE_SIGNALS, SAMPLED, ERRORS_ONLY, ERRORS_ONLY):
+        _window(0.010, 0.005)
+        assert governor.level == level
+
+    stats = governor.get_stats()
+    assert stats["state"] == "errors_only"
+    assert stats["changes"] == 4
+    assert stats["last_window"]["within_budget"] is False
+    assert stats["last_window"]["overhead_percent"] == 50.0
+
+
+def test_small_windows_are_not_judged():
+    for _ in range(MIN_WINDOW_REQUESTS - 1):
+        governor.record_request(0.010, 0.005)
+
+    assert governor.level == FULL
+    assert governor.last_window is None
+
+
+def test_either_budget_allows_the_overhead():
+    # 0.8ms on a 1ms request is 80%, but within 1ms per request
+    _window(0.001, 0.0008)
+    # 5ms on a 1s request is over 1ms, but within 2%
+    _window(1.0, 0.005)
+
+    assert governor.level == FULL
+
+
+def test_recovers_after_calm_windows():
+    _window(0.010, 0.005)
+    _window(0.010, 0.005)
+    assert governor.level == NO_CACHE_SIGNALS
+
+    for _ in range(RECOVER_WINDOWS - 1):
+        _window(0.010, 0.0)
+    assert governor.level == NO_CACHE_SIGNALS
+    _window(0.010, 0.0)
+    assert governor.level == NO_CALLERS
+
+
+def test_disabling_the_governor_restores_full_recording(settings):
+    _window(0.010, 0.005)
+    _config(settings, OVERHEAD_GOVERNOR=False)
+
+    governor.record_request(0.010, 0.005)
+
+    assert governor.level == FULL
+
+
+def test_caller_attribution_is_skipped():
+    governor.level = NO_CALLERS
+    wrapper = OrbitQueryWrapper()
+    with connection.execute_wrapper(wrapper):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+
+    assert wrapper.queries[0]["caller"] == {}
+
+
+def test_cache_and_signal_events_are_shed():
+    governor.level = NO_CACHE_SIGNALS
+
+    record_cache_operation("get", "key", hit=True)
+    record_redis_operation("GET", "key", duration_ms=0.1)
+
+    assert not OrbitEntry.objects.filter(
+        type__in=[OrbitEntry.TYPE_CACHE, OrbitEntry.TYPE_REDIS]
+    ).exists()
+    assert metrics.snapshot()["dropped"]["governor"] == 2
+
+
+def test_sampled_level_drops_requests_but_keeps_stats(settings):
+    _config(settings, OVERHEAD_SAMPLE_RATE=0.0)
+    governor.level = SAMPLED
+
+    _run()
+
+    assert not OrbitEntry.objects.exists()
+    assert _counted_requests() == 1
+
+
+def test_errors_only_saves_exceptions_alone():
+    governor.level = ERRORS_ONLY
+
+    _run()
+    assert not OrbitEntry.objects.exists()
+
+    def failing(request):
+        write_entry(type=OrbitEntry.TYPE_LOG, payload={"message": "inside"})
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        OrbitMiddleware(failing)(RequestFactory().get("/failing/"))
+
+    entry = OrbitEntry.objects.get()
+    assert entry.type == OrbitEntry.TYPE_EXCEPTION
+    assert entry.payload["request_path"] == "/failing/"
+    assert _counted_requests() == 2
+
+
+def test_middleware_reports_overhead(settings):
+    # No budget at all: any measured overhead is too much
+    _config(settings, OVERHEAD_BUDGET_PERCENT=0, OVERHEAD_BUDGET_MS=0)
+
+    for _ in range(MIN_WINDOW_REQUESTS):
+        _run()
+
+    assert governor.last_window["requests"] == MIN_WINDOW_REQUESTS
+    assert governor.last_window["overhead_ms_per_request"] > 0
+    assert governor.level == NO_CALLERS
+
+
+def test_health_page_shows_governor_state(client):
+    governor.level = SAMPLED
+
+    response = client.get(reverse("orbit:health"))
+
+    assert response.context["overhead"]["governor"]["state"] == "sampled"
+    assert "Degraded: sampled" in response.content.decode()
+    assert "orbit_governor_level 3" in metrics.prometheus()
@@ -0,0 +1,163 @@
+"""
+Tests for interned SQL text and tracebacks (orbit.interning).
+"""
+
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.utils import timezone
+
+import pytest
+
+from orbit import interning
+from orbit.models import OrbitEntry, OrbitText
+from orbit.search import search
+from orbit.writer import write_entries
+
+pytestmark = pytest.mark.django_db
+
+SQL = "SELECT * FROM auth_user WHERE id = %s"
+
+
+@pytest.fixture(autouse=True)
+def interned(settings):
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG, "INTERN_TEXT": True}
+
+
+def _stored_payload(entry):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT payload FROM orbit_orbitentry WHERE id = %s", [entry.id.hex]
+        )
+        return cursor.fetchone()[0]
+
+
+def _query(**payload):
+    return OrbitEntry.objects.create(
+        type=OrbitEntry.TYPE_QUERY, payload={"sql": SQL, "params": [1], **payload}
+    )
+
+
+def _age_texts(**age):
+    OrbitText.objects.update(created_at=timezone.now() - timedelta(**age))
+
+
+def test_repeated_sql_is_stored_once():
+    first = _query()
+    second = _query(params=[2])
+
+    assert first.text_id == second.text_id == interning.text_hash(SQL)
+    assert OrbitText.objects.get().text == SQL
+    assert "SELECT" not in _stored_payload(first)
+
+
+def test_payload_is_restored_on_read():
+    entry = _query()
+    interning.clear_cache()
+
+    assert OrbitEntry.objects.get(id=entry.id).payload["sql"] == SQL
+    assert [e.payload["sql"] for e in OrbitEntry.objects.filter(type="query")] == [SQL]
+    deferred = OrbitEntry.objects.only("id", "type", "payload", "text").get(id=entry.id)
+    assert deferred.payload == {"sql": SQL, "params": [1]}
+
+    entry.refresh_from_db()
+    assert entry.payload["sql"] == SQL
+
+
+def test_bulk_writes_intern_exceptions():
+    write_entries(
+        [
+            OrbitEntry(
+                type=OrbitEntry.TYPE_EXCEPTION,
+                payload={"message": "boom", "traceback_string": "Traceback: frame"},
+            )
+            for _ in range(3)
+        ]
+    )
+
+    assert OrbitText.objects.get().kind == "traceback_string"
+    interning.clear_cache()
+    assert {e.payload["traceback_string"] for e in OrbitEntry.objects.all()} == {
+        "Traceback: frame"
+    }
+
+
+def test_off_by_default_keeps_text_inline(settings):
+    settings.ORBIT_CONFIG = {
+        key: value
+        for key, value in settings.ORBIT_CONFIG.items()
+        if key != "INTERN_TEXT"
+    }
+    entry = _query()
+
+    assert entry.text_id is None
+    assert not OrbitText.objects.exists()
+    assert SQL in _stored_payload(entry)
+
+
+def test_failed_text_write_keeps_text_inline():
+    with mock.patch.object(
+        interning, "store_texts", side_effect=RuntimeError("db down")
+    ):
+        entry = _query()
+
+    assert entry.text_id is None
+    assert SQL in _stored_payload(entry)
+    assert "auth_user" in entry.search_text
+
+
+def test_interned_text_is_searched_once_per_text():
+    entry = _query()
+    OrbitEntry.objects.create(type=OrbitEntry.TYPE_LOG, payload={"x": 1})
+
+    assert "auth_user" not in entry.search_text
+    assert list(search(OrbitEntry.objects.all(), "auth_user")) == [entry]
+
+
+def test_search_skips_interned_text_for_other_types():
+    entry = _query()
+    queries = OrbitEntry.objects.filter(type="query")
+    logs = OrbitEntry.objects.filter(type="log")
+
+    assert list(search(queries, "auth_user", types=["query"])) == [entry]
+    assert "orbit_orbittext" not in str(search(logs, "auth_user", ["log"]).query)
+
+
+def test_orphaned_texts_are_deleted():
+    kept = _query()
+    OrbitEntry.objects.create(type=OrbitEntry.TYPE_QUERY, payload={"sql": "SELECT 2"})
+    OrbitEntry.objects.filter(type="query").exclude(id=kept.id)._raw_delete("default")
+    _age_texts(hours=1)
+
+    assert interning.delete_orphans(batch_size=1) == 1
+    assert list(OrbitText.objects.values_list("text", flat=True)) == [SQL]
+
+
+def test_recent_orphans_survive_other_processes_cleanup():
+    _query()
+    OrbitEntry.objects.all()._raw_delete("default")
+
+    # Another process runs retention; this one still has the hash cached as stored
+    known = dict(interning._known)
+    assert interning.delete_orphans() == 0
+    interning._known.update(known)
+
+    entry = _query(params=[2])
+    with mock.patch.dict(interning._texts, clear=True):
+        assert OrbitEntry.objects.get(id=entry.id).payload["sql"] == SQL
+
+
+def test_writing_an_old_text_again_renews_it():
+    _query()
+    OrbitEntry.objects.all()._raw_delete("default")
+    _age_texts(hours=1)
+    interning.clear_cache()
+
+    # Stored again (a conflict, not an insert) just before its entry is written
+    pending = OrbitEntry(type=OrbitEntry.TYPE_QUERY, payload={"sql": SQL})
+    pending.text_id = interning.text_hash(SQL)
+    interning.store_texts([pending])
+
+    assert interning.delete_orphans() == 0
+    assert OrbitText.objects.get().text == SQL
@@ -0,0 +1,186 @@
+"""
+Tests for the live-feed broker (orbit.live) and the SSE stream endpoint.
+"""
+
+import asyncio
+
+from django.urls import reverse
+
+import pytest
+
+from orbit.live import LiveBroker, broker
+from orbit.models import OrbitEntry
+from orbit.writer import write_entry
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def stream_settings(settings):
+    settings.ORBIT_CONFIG = {
+        **settings.ORBIT_CONFIG,
+        "LIVE_STREAM": True,  # the test client is WSGI
+        "LIVE_STREAM_HEARTBEAT": 0.05,
+        "LIVE_STREAM_MAX_DURATION": 0.3,
+        "LIVE_STREAM_POLL_INTERVAL": 0,
+    }
+    return settings
+
+
+def _log(message):
+    return OrbitEntry(type=OrbitEntry.TYPE_LOG, payload={"message": message})
+
+
+def test_publish_fans_out_by_type(stream_settings):
+    live = LiveBroker()
+    everything = live.subscribe()
+    logs_only = live.subscribe(OrbitEntry.TYPE_LOG)
+    request = OrbitEntry(type=OrbitEntry.TYPE_REQUEST, payload={})
+    log = _log("hello")
+
+    live.publish([request, log])
+    live.publish([log])  # already seen
+
+    assert everything.get(0) == [request, log]
+    assert logs_only.get(0) == [log]
+
+
+def test_publish_without_subscribers_keeps_nothing(stream_settings):
+    live = LiveBroker()
+    live.publish([_log("nobody listening")])
+    subscription = live.subscribe()
+    assert subscription.get(0) == []
+
+
+def test_slow_subscriber_overflows(stream_settings):
+    stream_settings.ORBIT_CONFIG = {
+        **stream_settings.ORBIT_CONFIG,
+        "LIVE_STREAM_MAX_PENDING": 2,
+    }
+    live = LiveBroker()
+    subscription = live.subscribe()
+
+    live.publish([_log(str(n)) for n in range(3)])
+
+    assert subscription.overflowed
+    assert len(subscription.get(0)) == 2
+
+
+def test_async_subscription_wakes_on_publish_from_thread(stream_settings):
+    import threading
+
+    live = LiveBroker()
+    log = _log("async")
+
+    async def consume():
+        subscription = live.subscribe()
+        threading.Timer(0.05, live.publish, [[log]]).start()
+        return await subscription.aget(2)
+
+    assert asyncio.run(consume()) == [log]
+
+
+def test_tail_poll_publishes_rows_from_other_writers(stream_settings):
+    live = LiveBroker()
+    subscription = live.subscribe()
+    entry = OrbitEntry.objects.create(
+        type=OrbitEntry.TYPE_LOG, payload={"message": "elsewhere"}
+    )
+
+    assert live.poll_once() == 1
+    assert [e.id for e in subscription.get(0)] == [entry.id]
+    live.poll_once()
+    assert subscription.get(0) == []
+
+
+def test_tail_pages_through_bursts_larger_than_a_page(stream_settings, monkeypatch):
+    from orbit import live as orbit_live
+
+    monkeypatch.setattr(orbit_live, "TAIL_PAGE_SIZE", 2)
+    live = LiveBroker()
+    subscription = live.subscribe()
+    entries = [
+        OrbitEntry.objects.create(type=OrbitEntry.TYPE_LOG, payload={"n": n})
+        for n in range(5)
+    ]
+
+    assert live.poll_once() == 5
+    assert [e.id for e in subscription.get(0)] == [e.id for e in entries]
+    assert live.poll_once() == 0
+
+
+def test_tail_picks_up_rows_inserted_late(stream_settings):
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    live = LiveBroker()
+    subscription = live.subscribe()
+    live.poll_once()
+    # A buffered writer inserts a row captured well before the previous poll
+    late = OrbitEntry.objects.create(
+        type=OrbitEntry.TYPE_LOG,
+        payload={"message": "late"},
+        created_at=timezone.now() - timedelta(minutes=5),
+    )
+
+    assert live.poll_once() == 1
+    assert [e.id for e in subscription.get(0)] == [late.id]
+
+
+def test_stream_pushes_written_entries(client, stream_settings):
+    response = client.get(reverse("orbit:stream"), {"type": "log"})
+    assert response["Content-Type"] == "text/event-stream"
+    chunks = iter(response.streaming_content)
+    assert next(chunks).startswith(b"retry:")  # subscribed from here on
+
+    write_entry(
+        type=OrbitEntry.TYPE_LOG, payload={"level": "INFO", "message": "StreamedLog"}
+    )
+    write_entry(type=OrbitEntry.TYPE_REQUEST, payload={"path": "/skipped/"})
+    message = next(chunks).decode()
+
+    assert message.startswith("id: ")
+    assert "event: entries" in message
+    assert "StreamedLog" in message and "/skipped/" not in message
+    assert b"".join(chunks).count(b"keep-alive") >= 1
+    assert not broker.has_subscribers
+
+
+def test_stream_disabled(client, settings):
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG, "LIVE_STREAM": False}
+    assert client.get(reverse("orbit:stream")).status_code == 204
+
+
+def test_stream_is_asgi_only_by_default(client, settings):
+    settings.ORBIT_CONFIG = {
+        key: value
+        for key, value in settings.ORBIT_CONFIG.items()
+        if key != "LIVE_STREAM"
+    }
+    assert client.get(reverse("orbit:stream")).status_code == 204
+    assert client.get(reverse("orbit:dashboard")).context["orbit_urls"]["stream"] == ""
+
+
+def test_stream_is_async_under_asgi(stream_settings):
+    stream_settings.ORBIT_CONFIG = {
+        **stream_settings.ORBIT_CONFIG,
+        "LIVE_STREAM": "asgi",
+    }
+    from django.test import AsyncClient
+
+    from asgiref.sync import async_to_sync
+
+    async def first_chunks():
+        response = await AsyncClient().get(reverse("orbit:stream"))
+        assert response.is_async
+        chunks = response.streaming_content.__aiter__()
+        opening = await chunks.__anext__()
+        broker.publish([_log("AsyncStreamed")])
+        message = await chunks.__anext__()
+        await chunks.aclose()
+        return opening, message
+
+    opening, message = async_to_sync(first_chunks)()
+    assert opening.startswith(b"retry:")
+    assert b"AsyncStreamed" in message
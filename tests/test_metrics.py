@@ -0,0 +1,176 @@
+"""
+Tests for Orbit's self-metrics (orbit.metrics).
+"""
+
+import threading
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+import pytest
+
+from orbit import metrics
+from orbit.health import ModuleRegistry
+from orbit.middleware import OrbitMiddleware
+from orbit.models import OrbitEntry
+from orbit.watchers import record_cache_operation
+from orbit.writer import write_entry
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def _config(settings, **overrides):
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG, **overrides}
+
+
+def test_timings_are_summarised():
+    for seconds in (0.0001, 0.0002, 0.003):
+        metrics.observe("watcher.cache", seconds)
+
+    timing = metrics.timing("watcher.cache")
+    assert timing["count"] == 3
+    assert timing["max_ms"] == 3.0
+    assert timing["p50_ms"] == 0.25
+    assert timing["p99_ms"] == 3.0
+    assert metrics.timing("watcher.mail") is None
+
+
+def test_counters_from_finished_threads_are_kept():
+    def work():
+        metrics.count("events", "log", 2)
+        metrics.observe("watcher.log", 0.001)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    metrics.count("events", "log")
+
+    snapshot = metrics.snapshot()
+    assert snapshot["events"]["log"]["total"] == 9
+    assert snapshot["timings"]["watcher.log"]["count"] == 4
+
+
+def test_recording_is_measured_end_to_end():
+    def view(request):
+        cache.set("metrics-key", 1)
+        OrbitEntry.objects.count()
+        return HttpResponse("ok")
+
+    OrbitMiddleware(view)(RequestFactory().get("/measured/"))
+
+    snapshot = metrics.snapshot()
+    for name in (
+        "request.extract",
+        "request.finish",
+        "entry.prepare",
+        "write.insert",
+        "watcher.query",
+    ):
+        assert snapshot["timings"][name]["count"] >= 1, name
+    assert snapshot["events"]["request"]["total"] == 1
+    assert snapshot["events"]["query"]["total"] >= 1
+    assert snapshot["events_per_second"] > 0
+
+
+def test_watcher_timing_is_named_after_the_watcher():
+    record_cache_operation("get", "key", hit=True, backend="default")
+
+    assert metrics.timing("watcher.cache")["count"] == 1
+
+
+def test_sampled_out_entries_are_counted_as_dropped(settings):
+    _config(settings, SAMPLE_RATE=0.0)
+
+    def view(request):
+        write_entry(type=OrbitEntry.TYPE_LOG, payload={"message": "inside"})
+        return HttpResponse("ok")
+
+    OrbitMiddleware(view)(RequestFactory().get("/sampled/"))
+
+    snapshot = metrics.snapshot()
+    assert snapshot["dropped"] == {"sampled": 1}
+    assert snapshot["dropped_total"] == 1
+    assert "log" not in snapshot["events"]
+
+
+def test_tail_sampled_families_are_counted_as_dropped(settings):
+    _config(settings, TAIL_SAMPLING=True, TAIL_SAMPLE_RATE=0.0)
+
+    def view(request):
+        write_entry(type=OrbitEntry.TYPE_LOG, payload={"message": "inside"})
+        return HttpResponse("ok")
+
+    OrbitMiddleware(view)(RequestFactory().get("/fast/"))
+
+    assert metrics.snapshot()["dropped"]["tail_sampled"] == 2
+
+
+def test_disabled_metrics_record_nothing(settings):
+    _config(settings, SELF_METRICS=False)
+
+    metrics.observe("watcher.cache", 0.001)
+    write_entry(type=OrbitEntry.TYPE_LOG, payload={"message": "outside"})
+
+    snapshot = metrics.snapshot()
+    assert snapshot["enabled"] is False
+    assert snapshot["timings"] == {} and snapshot["events"] == {}
+
+
+def test_prometheus_exposition():
+    metrics.observe("watcher.cache", 0.0003)
+    metrics.count("events", "cache")
+    metrics.count("dropped", "sampled", 2)
+
+    text = metrics.prometheus()
+
+    assert "# TYPE orbit_overhead_seconds histogram" in text
+    bucket = 'orbit_overhead_seconds_bucket{operation="watcher.cache",le="0.0005"} 1'
+    assert bucket in text
+    assert 'orbit_overhead_seconds_count{operation="watcher.cache"} 1' in text
+    assert 'orbit_events_total{type="cache"} 1' in text
+    assert 'orbit_dropped_events_total{reason="sampled"} 2' in text
+    assert "orbit_write_queue_depth 0" in text
+
+
+def test_metrics_endpoint(client):
+    metrics.count("events", "log")
+
+    response = client.get(reverse("orbit:metrics"))
+    assert response.status_code == 200
+    assert response.json()["events"]["log"]["total"] == 1
+
+    response = client.get(reverse("orbit:metrics"), {"format": "prometheus"})
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert 'orbit_events_total{type="log"} 1' in response.content.decode()
+
+
+def test_health_page_and_registry_show_overhead(client):
+    record_cache_operation("get", "key", hit=True, backend="default")
+
+    response = client.get(reverse("orbit:health"))
+    assert response.status_code == 200
+    assert response.context["overhead"]["timings"]["watcher.cache"]["count"] == 1
+    cache_module = next(
+        module
+        for module in response.context["watchers"]["modules"]
+        if module["name"] == "cache"
+    )
+    assert cache_module["overhead"]["count"] == 1
+    assert "Overhead" in response.content.decode()
+
+    registry = ModuleRegistry()
+    registry.register("cache", description="Cache watcher")(lambda: None)
+    summary = registry.get_status_summary()
+    assert summary["modules"][0]["overhead"]["count"] == 1
+    assert "watcher.cache" in summary["overhead"]["timings"]
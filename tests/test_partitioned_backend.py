@@ -0,0 +1,129 @@
+"""
+Tests for the time-partitioned storage backend (orbit.backends.partitioned).
+
+The test database is SQLite, so these cover the day-by-day fallback, the partition
+naming helpers and the retention wiring; native partitions need PostgreSQL.
+"""
+
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from django.core.management import CommandError, call_command
+from django.db import NotSupportedError, connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+
+import orbit.backends as backends_module
+from orbit.backends.partitioned import (
+    PartitionedBackend,
+    day_bounds,
+    partition_day,
+    partition_name,
+)
+from orbit.models import OrbitEntry
+
+pytestmark = pytest.mark.django_db
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=dt_timezone.utc)
+
+
+@pytest.fixture
+def partitioned(settings):
+    settings.ORBIT_CONFIG = {
+        **settings.ORBIT_CONFIG,
+        "STORAGE_BACKEND": "orbit.backends.partitioned.PartitionedBackend",
+    }
+    old = backends_module._backend
+    backends_module._backend = None
+    yield backends_module.get_backend()
+    backends_module._backend = old
+
+
+def _entry_at(when):
+    entry = OrbitEntry.objects.create(type=OrbitEntry.TYPE_LOG, payload={})
+    OrbitEntry.objects.filter(id=entry.id).update(created_at=when)
+    return entry
+
+
+def test_partition_names_round_trip():
+    name = partition_name("orbit_orbitentry", date(2026, 1, 31))
+    assert name == "orbit_orbitentry_p20260131"
+    assert partition_day("orbit_orbitentry", name) == date(2026, 1, 31)
+    assert partition_day("orbit_orbitentry", "orbit_orbitentry_pdefault") is None
+    assert partition_day("orbit_orbitentry", "other_p20260131") is None
+
+
+def test_day_bounds_are_utc_midnights():
+    start, end = day_bounds(date(2026, 3, 29))
+    assert start == datetime(2026, 3, 29, tzinfo=dt_timezone.utc)
+    assert end - start == timedelta(days=1)
+
+
+def test_drop_expires_only_whole_days_before_cutoff():
+    backend = PartitionedBackend()
+    two_days_ago = _entry_at(NOW - timedelta(days=2))
+    earlier_today = _entry_at(NOW - timedelta(hours=6))
+    recent = _entry_at(NOW)
+
+    assert backend.drop_partitions_before(NOW - timedelta(hours=1)) == 1
+
+    remaining = set(OrbitEntry.objects.values_list("id", flat=True))
+    assert two_days_ago.id not in remaining
+    assert {earlier_today.id, recent.id} <= remaining
+
+
+def test_fallback_deletes_days_in_batches(settings):
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG, "RETENTION_BATCH_SIZE": 2}
+    backend = PartitionedBackend()
+    expired = [_entry_at(NOW - timedelta(days=3, minutes=m)) for m in range(5)]
+    kept = _entry_at(NOW - timedelta(hours=6))
+
+    with CaptureQueriesContext(connection) as queries:
+        assert backend.drop_partitions_before(NOW - timedelta(hours=1)) == len(expired)
+
+    deletes = [q for q in queries.captured_queries if q["sql"].startswith("DELETE")]
+    assert len(deletes) == 3
+    assert list(OrbitEntry.objects.values_list("id", flat=True)) == [kept.id]
+
+
+def test_sqlite_is_not_natively_partitioned():
+    backend = PartitionedBackend()
+    assert not backend.is_partitioned()
+    assert backend.ensure_partitions() == []
+    with pytest.raises(NotSupportedError):
+        backend.partition_table()
+
+
+def test_prune_uses_backend_then_deletes_remainder(partitioned):
+    now = datetime.now(dt_timezone.utc)
+    _entry_at(now - timedelta(days=3))
+    _entry_at(now - timedelta(hours=25))
+    kept = _entry_at(now)
+
+    call_command("orbit_prune", hours=24)
+
+    logs = OrbitEntry.objects.filter(type=OrbitEntry.TYPE_LOG)
+    assert list(logs.values_list("id", flat=True)) == [kept.id]
+
+
+def test_cleanup_old_entries_keeps_the_newest(partitioned):
+    now = datetime.now(dt_timezone.utc)
+    for days in (5, 4, 3):
+        _entry_at(now - timedelta(days=days))
+    newest = [_entry_at(now - timedelta(minutes=m)) for m in (2, 1)]
+
+    assert OrbitEntry.objects.cleanup_old_entries(limit=2) == 3
+    assert set(OrbitEntry.objects.values_list("id", flat=True)) == {
+        e.id for e in newest
+    }
+
+
+def test_partitions_command_requires_partitioned_backend():
+    with pytest.raises(CommandError, match="not partitioned"):
+        call_command("orbit_partitions")
+
+
+def test_partitions_command_reports_fallback(partitioned, capsys):
+    call_command("orbit_partitions")
+    assert "whole days in batched deletes" in capsys.readouterr().out
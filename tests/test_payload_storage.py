@@ -0,0 +1,144 @@
+"""
+Tests for compact payload storage (orbit.payloads).
+"""
+
+from django.db import connection
+
+import pytest
+
+from orbit.models import OrbitEntry
+from orbit.payloads import decode_cold, encode_cold, split_payload
+from orbit.writer import write_entries
+
+pytestmark = pytest.mark.django_db
+
+TRACEBACK = "Traceback (most recent call last):\n" + "  File 'app.py', line 1\n" * 200
+
+
+@pytest.fixture
+def compressed(settings):
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG, "PAYLOAD_COMPRESSION": "zlib"}
+
+
+def _stored_payload(entry):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT payload FROM orbit_orbitentry WHERE id = %s", [entry.id.hex]
+        )
+        return cursor.fetchone()[0]
+
+
+def test_off_by_default_keeps_everything_in_json():
+    entry = OrbitEntry.objects.create(
+        type=OrbitEntry.TYPE_REQUEST, payload={"path": "/a/", "body": "x" * 5000}
+    )
+    entry.refresh_from_db()
+
+    assert entry.payload_blob is None
+    assert "body" in _stored_payload(entry)
+
+
+def test_cold_keys_round_trip_through_the_blob(compressed):
+    payload = {"method": "GET", "path": "/a/", "status_code": 500, "body": "x" * 5000}
+    entry = OrbitEntry.objects.create(type=OrbitEntry.TYPE_REQUEST, payload=payload)
+
+    stored = _stored_payload(entry)
+    assert "body" not in stored and "/a/" in stored
+    assert len(bytes(OrbitEntry.objects.get(id=entry.id).payload_blob)) < 200
+
+    loaded = OrbitEntry.objects.get(id=entry.id)
+    assert loaded.payload == payload
+    assert loaded.status_code == 500
+
+
+def test_bulk_writes_keep_the_full_payload(compressed):
+    write_entries(
+        [
+            OrbitEntry(
+                type=OrbitEntry.TYPE_EXCEPTION,
+                payload={
+                    "message": "boom",
+                    "traceback_string": TRACEBACK + "needle_frame",
+                },
+            )
+        ]
+    )
+
+    entry = OrbitEntry.objects.get()
+    assert entry.payload["traceback_string"].endswith("needle_frame")
+
+
+def _row_size(entry):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT LENGTH(payload) + LENGTH(search_text)"
+            " + COALESCE(LENGTH(payload_blob), 0)"
+            " FROM orbit_orbitentry WHERE id = %s",
+            [entry.id.hex],
+        )
+        return cursor.fetchone()[0]
+
+
+def test_cold_keys_are_not_indexed(compressed, settings):
+    payload = {"method": "POST", "path": "/upload/", "body": "lorem ipsum " * 500}
+    small = OrbitEntry.objects.create(type=OrbitEntry.TYPE_REQUEST, payload=payload)
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG, "PAYLOAD_COMPRESSION": None}
+    plain = OrbitEntry.objects.create(type=OrbitEntry.TYPE_REQUEST, payload=payload)
+
+    assert "/upload/" in small.search_text
+    assert "lorem" not in small.search_text
+    assert "lorem" in plain.search_text
+    assert _row_size(small) * 10 < _row_size(plain)
+
+
+def test_deferred_blob_sees_hot_keys_only(compressed):
+    OrbitEntry.objects.create(
+        type=OrbitEntry.TYPE_REQUEST, payload={"path": "/a/", "headers": {"Host": "x"}}
+    )
+
+    entry = OrbitEntry.objects.only("id", "type", "payload").get()
+    assert entry.payload == {"path": "/a/"}
+
+    # Saving the hot part again must not drop the cold part
+    entry.payload["path"] = "/b/"
+    entry.save(update_fields=["payload"])
+    assert OrbitEntry.objects.get().payload == {"path": "/b/", "headers": {"Host": "x"}}
+
+
+def test_resave_after_disabling_moves_keys_back(compressed, settings):
+    entry = OrbitEntry.objects.create(
+        type=OrbitEntry.TYPE_REQUEST, payload={"path": "/a/", "body": "data"}
+    )
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG, "PAYLOAD_COMPRESSION": None}
+
+    entry = OrbitEntry.objects.get(id=entry.id)
+    entry.save()
+
+    entry.refresh_from_db()
+    assert entry.payload_blob is None
+    assert _stored_payload(entry).count("data") == 1
+
+
+def test_detail_and_export_read_the_full_payload(compressed, client):
+    from django.urls import reverse
+
+    entry = OrbitEntry.objects.create(
+        type=OrbitEntry.TYPE_EXCEPTION,
+        payload={"message": "boom", "traceback_string": "ColdFrameMarker"},
+    )
+
+    detail = client.get(reverse("orbit:detail", args=[entry.id]))
+    export = client.get(reverse("orbit:export", args=[entry.id]))
+
+    assert b"ColdFrameMarker" in detail.content
+    assert b"ColdFrameMarker" in export.content
+
+
+def test_split_ignores_empty_values(compressed):
+    hot, cold = split_payload({"path": "/a/", "body": "", "headers": {"A": "1"}})
+    assert hot == {"path": "/a/", "body": ""}
+    assert decode_cold(encode_cold(cold)) == {"headers": {"A": "1"}}
+
+
+def test_unreadable_blob_decodes_to_nothing():
+    assert decode_cold(b"?garbage") == {}
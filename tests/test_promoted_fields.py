@@ -0,0 +1,77 @@
+"""
+Tests for the payload fields promoted to indexed OrbitEntry columns.
+"""
+
+import pytest
+
+from orbit.models import OrbitEntry, promoted_fields
+from orbit.writer import write_entries
+
+pytestmark = pytest.mark.django_db
+
+
+def test_request_columns_are_filled_on_create():
+    entry = OrbitEntry.objects.create(
+        type=OrbitEntry.TYPE_REQUEST,
+        payload={
+            "method": "POST",
+            "path": "/orders/",
+            "status_code": 502,
+            "duplicate_query_count": 4,
+        },
+    )
+    entry.refresh_from_db()
+
+    assert (entry.method, entry.path, entry.status_code) == ("POST", "/orders/", 502)
+    assert entry.has_error is True
+    assert entry.duplicate_query_count == 4
+    assert entry.cache_hit is None
+
+
+def test_bulk_written_entries_get_columns():
+    write_entries(
+        [
+            OrbitEntry(
+                type=OrbitEntry.TYPE_QUERY, payload={"sql": "SELECT 1", "is_slow": True}
+            ),
+            OrbitEntry(type=OrbitEntry.TYPE_CACHE, payload={"hit": False}),
+            OrbitEntry(type=OrbitEntry.TYPE_GATE, payload={"result": "denied"}),
+            OrbitEntry(type=OrbitEntry.TYPE_JOB, payload={"status": "failed"}),
+        ]
+    )
+
+    assert OrbitEntry.objects.get(is_slow=True).type == OrbitEntry.TYPE_QUERY
+    assert OrbitEntry.objects.get(cache_hit=False).type == OrbitEntry.TYPE_CACHE
+    assert OrbitEntry.objects.get(outcome="denied").type == OrbitEntry.TYPE_GATE
+    assert OrbitEntry.objects.get(outcome="failed").type == OrbitEntry.TYPE_JOB
+
+
+def test_columns_follow_payload_saves():
+    entry = OrbitEntry.objects.create(
+        type=OrbitEntry.TYPE_REQUEST, payload={"path": "/a/", "status_code": 200}
+    )
+    entry.payload["status_code"] = 404
+    entry.save(update_fields=["payload"])
+
+    assert OrbitEntry.objects.filter(status_code=404, has_error=True).count() == 1
+
+
+@pytest.mark.parametrize(
+    "payload, expected",
+    [
+        ({"status_code": "500"}, None),
+        ({"status_code": True}, None),
+        ({"status_code": 99999}, None),
+        ({"status_code": 201}, 201),
+    ],
+)
+def test_status_code_is_only_kept_when_valid(payload, expected):
+    assert promoted_fields(OrbitEntry.TYPE_REQUEST, payload)["status_code"] == expected
+
+
+def test_long_values_are_truncated():
+    values = promoted_fields(
+        OrbitEntry.TYPE_REQUEST, {"path": "/x" * 200, "method": "PROPPATCHX!"}
+    )
+    assert len(values["path"]) == 255
+    assert len(values["method"]) == 10
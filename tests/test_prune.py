@@ -1,67 +1,136 @@
-
-import pytest
 from datetime import timedelta
-from django.utils import timezone
+
 from django.core.management import call_command
+from django.utils import timezone
+
+import pytest
+
 from orbit.models import OrbitEntry
 
+
 @pytest.mark.django_db
 def test_prune_command():
     # Create entries
     now = timezone.now()
-    
+
     # Old entry (should be deleted)
     old = OrbitEntry.objects.create(
         type=OrbitEntry.TYPE_REQUEST,
         payload={"foo": "bar"},
-        created_at=now - timedelta(hours=25)
+        created_at=now - timedelta(hours=25),
     )
     # Hack to force created_at (auto_now_add usually overrides, but we can update)
     OrbitEntry.objects.filter(id=old.id).update(created_at=now - timedelta(hours=25))
-    
+
     # Recent entry (should be kept)
     recent = OrbitEntry.objects.create(
-        type=OrbitEntry.TYPE_REQUEST,
-        payload={"foo": "bar"}
+        type=OrbitEntry.TYPE_REQUEST, payload={"foo": "bar"}
     )
-    
+
     # Run prune (default 24h)
     call_command("orbit_prune")
-    
+
     assert not OrbitEntry.objects.filter(id=old.id).exists()
     assert OrbitEntry.objects.filter(id=recent.id).exists()
 
+
 @pytest.mark.django_db
 def test_prune_keep_important():
     now = timezone.now()
-    
+
     # Old exception (should be kept with flag)
     old_exc = OrbitEntry.objects.create(
         type=OrbitEntry.TYPE_EXCEPTION,
         payload={"message": "Error"},
+        created_at=now - timedelta(hours=48),
+    )
+    OrbitEntry.objects.filter(id=old_exc.id).update(
         created_at=now - timedelta(hours=48)
     )
-    OrbitEntry.objects.filter(id=old_exc.id).update(created_at=now - timedelta(hours=48))
-    
+
     # Old normal Log (should be deleted)
     old_log = OrbitEntry.objects.create(
         type=OrbitEntry.TYPE_LOG,
         payload={"level": "INFO", "message": "Info"},
+        created_at=now - timedelta(hours=48),
+    )
+    OrbitEntry.objects.filter(id=old_log.id).update(
         created_at=now - timedelta(hours=48)
     )
-    OrbitEntry.objects.filter(id=old_log.id).update(created_at=now - timedelta(hours=48))
-    
+
     # Old ERROR Log (should be kept with flag)
     old_error = OrbitEntry.objects.create(
         type=OrbitEntry.TYPE_LOG,
         payload={"level": "ERROR", "message": "Bad"},
+        created_at=now - timedelta(hours=48),
+    )
+    OrbitEntry.objects.filter(id=old_error.id).update(
         created_at=now - timedelta(hours=48)
     )
-    OrbitEntry.objects.filter(id=old_error.id).update(created_at=now - timedelta(hours=48))
-    
+
     # Run prune with flag
     call_command("orbit_prune", hours=24, keep_important=True)
-    
+
     assert OrbitEntry.objects.filter(id=old_exc.id).exists()
     assert not OrbitEntry.objects.filter(id=old_log.id).exists()
     assert OrbitEntry.objects.filter(id=old_error.id).exists()
+
+
+def _aged(entry_type, hours, payload=None):
+    entry = OrbitEntry.objects.create(type=entry_type, payload=payload or {})
+    OrbitEntry.objects.filter(id=entry.id).update(
+        created_at=timezone.now() - timedelta(hours=hours)
+    )
+    return entry
+
+
+@pytest.mark.django_db
+def test_prune_in_small_batches():
+    for _ in range(5):
+        _aged(OrbitEntry.TYPE_LOG, 30)
+    recent = _aged(OrbitEntry.TYPE_LOG, 1)
+
+    call_command("orbit_prune", batch_size=2)
+
+    logs = OrbitEntry.objects.filter(type=OrbitEntry.TYPE_LOG)
+    assert list(logs.values_list("id", flat=True)) == [recent.id]
+
+
+@pytest.mark.django_db
+def test_prune_per_type_policy():
+    old_query = _aged(OrbitEntry.TYPE_QUERY, 2)
+    old_exception = _aged(OrbitEntry.TYPE_EXCEPTION, 48)
+    day_old_log = _aged(OrbitEntry.TYPE_LOG, 23)
+
+    call_command("orbit_prune", policy=["query=1", "exception=720"])
+
+    assert not OrbitEntry.objects.filter(id=old_query.id).exists()
+    assert OrbitEntry.objects.filter(id=old_exception.id).exists()
+    assert OrbitEntry.objects.filter(id=day_old_log.id).exists()
+
+
+@pytest.mark.django_db
+def test_prune_rejects_bad_policy():
+    from django.core.management import CommandError
+
+    with pytest.raises(CommandError, match="TYPE=HOURS"):
+        call_command("orbit_prune", policy=["query"])
+
+
+@pytest.mark.django_db
+def test_prune_dry_run_deletes_nothing(capsys):
+    old = _aged(OrbitEntry.TYPE_LOG, 30)
+
+    call_command("orbit_prune", dry_run=True)
+
+    assert OrbitEntry.objects.filter(id=old.id).exists()
+    assert "~1 Orbit entries would be pruned" in capsys.readouterr().out
+
+
+@pytest.mark.django_db
+def test_prune_reports_throughput(capsys):
+    _aged(OrbitEntry.TYPE_LOG, 30)
+
+    call_command("orbit_prune")
+
+    assert "rows/s" in capsys.readouterr().out
@@ -0,0 +1,65 @@
+"""
+Tests for SQL caller attribution in OrbitQueryWrapper.
+"""
+
+from django.db import connection
+
+import pytest
+
+from orbit import recorders
+from orbit.models import OrbitEntry
+from orbit.recorders import OrbitQueryWrapper, resolve_caller_line
+
+pytestmark = pytest.mark.django_db
+
+
+def _run_queries(*sqls):
+    wrapper = OrbitQueryWrapper()
+    with connection.execute_wrapper(wrapper):
+        with connection.cursor() as cursor:
+            for sql in sqls:
+                cursor.execute(sql)  # caller line
+    return wrapper.queries
+
+
+def test_caller_is_first_frame_outside_django_and_orbit():
+    queries = _run_queries("SELECT 1")
+    caller = queries[0]["caller"]
+    assert caller["filename"] == __file__
+    assert caller["function"] == "_run_queries"
+    assert "line" not in caller  # resolved lazily at write time
+
+
+def test_skip_decision_cached_per_code_object():
+    recorders._skip_cache.clear()
+    _run_queries("SELECT 1")
+    assert recorders._skip_cache[OrbitQueryWrapper.__call__.__code__] is True
+    assert recorders._skip_cache[_run_queries.__code__] is False
+
+
+def test_source_line_resolved_on_insert():
+    query = _run_queries("SELECT 1")[0]
+    entry = OrbitEntry.objects.create(type=OrbitEntry.TYPE_QUERY, payload=query)
+    entry.refresh_from_db()
+    assert entry.payload["caller"]["line"].endswith("# caller line")
+
+
+def test_resolve_caller_line_ignores_missing_caller():
+    payload = {"caller": {}}
+    resolve_caller_line(payload)
+    assert payload == {"caller": {}}
+
+
+def test_caller_mode_slow_or_duplicate(settings):
+    settings.ORBIT_CONFIG = {
+        **settings.ORBIT_CONFIG,
+        "QUERY_CALLER_MODE": "slow_or_duplicate",
+    }
+    first, repeat = _run_queries("SELECT 1", "SELECT 1")
+    assert first["caller"] == {}
+    assert repeat["caller"]["function"] == "_run_queries"
+
+
+def test_caller_mode_never(settings):
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG, "QUERY_CALLER_MODE": "never"}
+    assert all(q["caller"] == {} for q in _run_queries("SELECT 1", "SELECT 1"))
@@ -0,0 +1,115 @@
+"""
+Tests for the per-request event buffer (orbit.context).
+"""
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+import pytest
+
+from orbit import writer as orbit_writer
+from orbit.context import end_request_buffer, get_request_buffer, start_request_buffer
+from orbit.middleware import OrbitMiddleware
+from orbit.models import OrbitEntry
+from orbit.writer import SyncWriter, write_entry
+
+pytestmark = pytest.mark.django_db
+
+
+class CountingWriter(SyncWriter):
+    def __init__(self):
+        self.write_calls = 0
+        self.write_many_calls = 0
+
+    def write(self, fields):
+        self.write_calls += 1
+        super().write(fields)
+
+    def write_many(self, entries):
+        self.write_many_calls += 1
+        super().write_many(entries)
+
+
+@pytest.fixture
+def counting_writer(monkeypatch):
+    w = CountingWriter()
+    monkeypatch.setattr(orbit_writer, "_writer", w)
+    return w
+
+
+def _run(view):
+    request = RequestFactory().get("/buffered/")
+    return OrbitMiddleware(view)(request)
+
+
+def test_request_family_written_in_one_batch(counting_writer):
+    seen_during_request = []
+
+    def view(request):
+        write_entry(type=OrbitEntry.TYPE_CACHE, payload={"operation": "get"})
+        write_entry(type=OrbitEntry.TYPE_LOG, payload={"message": "inside"})
+        seen_during_request.append(OrbitEntry.objects.count())
+        return HttpResponse("ok")
+
+    _run(view)
+
+    assert seen_during_request == [0]
+    assert counting_writer.write_calls == 0
+    assert counting_writer.write_many_calls == 1
+    # The COUNT above is recorded as a query entry of the same family
+    assert set(OrbitEntry.objects.values_list("type", flat=True)) == {
+        OrbitEntry.TYPE_CACHE,
+        OrbitEntry.TYPE_LOG,
+        OrbitEntry.TYPE_QUERY,
+        OrbitEntry.TYPE_REQUEST,
+    }
+    assert OrbitEntry.objects.values("family_hash").distinct().count() == 1
+
+
+def test_buffered_events_inherit_family_hash(counting_writer):
+    def view(request):
+        write_entry(type=OrbitEntry.TYPE_MODEL, payload={"action": "created"})
+        return HttpResponse("ok")
+
+    _run(view)
+
+    request_entry = OrbitEntry.objects.get(type=OrbitEntry.TYPE_REQUEST)
+    model_entry = OrbitEntry.objects.get(type=OrbitEntry.TYPE_MODEL)
+    assert request_entry.family_hash
+    assert model_entry.family_hash == request_entry.family_hash
+
+
+def test_buffer_flushed_when_view_raises(counting_writer):
+    def view(request):
+        write_entry(type=OrbitEntry.TYPE_LOG, payload={"message": "before boom"})
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        _run(view)
+
+    assert get_request_buffer() is None
+    assert OrbitEntry.objects.filter(type=OrbitEntry.TYPE_LOG).count() == 1
+    assert OrbitEntry.objects.filter(type=OrbitEntry.TYPE_EXCEPTION).count() == 1
+
+
+def test_buffer_can_be_disabled(settings, counting_writer):
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG, "BUFFER_REQUEST_EVENTS": False}
+
+    def view(request):
+        write_entry(type=OrbitEntry.TYPE_LOG, payload={"message": "direct"})
+        assert OrbitEntry.objects.count() == 1
+        return HttpResponse("ok")
+
+    _run(view)
+    assert counting_writer.write_calls == 2  # log + request
+
+
+def test_full_buffer_is_handed_over_early(counting_writer):
+    token = start_request_buffer("fam", max_entries=2)
+    for i in range(5):
+        write_entry(type=OrbitEntry.TYPE_LOG, payload={"i": i})
+    remaining = end_request_buffer(token)
+
+    assert counting_writer.write_many_calls == 2
+    assert OrbitEntry.objects.filter(family_hash="fam").count() == 4
+    assert len(remaining) == 1
@@ -0,0 +1,151 @@
+"""
+Tests for the retention scheduler (orbit.retention).
+"""
+
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+import pytest
+
+from orbit.models import OrbitEntry
+from orbit.retention import (
+    RetentionScheduler,
+    delete_in_batches,
+    pass_lock,
+    run_retention,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def _entry(entry_type, age):
+    entry = OrbitEntry.objects.create(type=entry_type, payload={})
+    OrbitEntry.objects.filter(id=entry.id).update(created_at=timezone.now() - age)
+    return entry
+
+
+def _retention(settings, **options):
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG, **options}
+
+
+def test_per_type_policies(settings):
+    _retention(settings, RETENTION_POLICIES={"query": 1, "exception": 24 * 30})
+    old_query = _entry(OrbitEntry.TYPE_QUERY, timedelta(hours=2))
+    new_query = _entry(OrbitEntry.TYPE_QUERY, timedelta(minutes=5))
+    old_exception = _entry(OrbitEntry.TYPE_EXCEPTION, timedelta(days=10))
+    old_log = _entry(OrbitEntry.TYPE_LOG, timedelta(days=60))
+
+    assert run_retention()["deleted"] == 1
+
+    remaining = set(OrbitEntry.objects.values_list("id", flat=True))
+    assert old_query.id not in remaining
+    assert {new_query.id, old_exception.id, old_log.id} <= remaining
+
+
+def test_default_hours_skip_types_with_a_policy(settings):
+    _retention(settings, RETENTION_HOURS=24, RETENTION_POLICIES={"exception": 24 * 30})
+    old_log = _entry(OrbitEntry.TYPE_LOG, timedelta(days=2))
+    old_exception = _entry(OrbitEntry.TYPE_EXCEPTION, timedelta(days=2))
+
+    run_retention()
+
+    assert not OrbitEntry.objects.filter(id=old_log.id).exists()
+    assert OrbitEntry.objects.filter(id=old_exception.id).exists()
+
+
+def test_storage_limit_keeps_the_newest(settings):
+    _retention(settings, STORAGE_LIMIT=2, RETENTION_BATCH_SIZE=2)
+    for minutes in (50, 40, 30):
+        _entry(OrbitEntry.TYPE_LOG, timedelta(minutes=minutes))
+    newest = [_entry(OrbitEntry.TYPE_LOG, timedelta(minutes=m)) for m in (20, 10)]
+
+    assert run_retention()["deleted"] == 3
+    assert set(OrbitEntry.objects.values_list("id", flat=True)) == {
+        e.id for e in newest
+    }
+
+
+def test_delete_in_batches_deletes_everything():
+    for _ in range(5):
+        _entry(OrbitEntry.TYPE_LOG, timedelta(hours=1))
+
+    assert delete_in_batches(OrbitEntry.objects.all(), batch_size=2) == 5
+    assert not OrbitEntry.objects.exists()
+
+
+def test_scheduler_records_throughput_and_failures(settings, monkeypatch):
+    _retention(settings, RETENTION_HOURS=1)
+    _entry(OrbitEntry.TYPE_LOG, timedelta(hours=2))
+    scheduler = RetentionScheduler()
+
+    assert scheduler.run_once() == 1
+    stats = scheduler.get_stats()
+    assert stats["runs"] == 1 and stats["deleted"] == 1
+    assert stats["rows_per_second"] > 0
+
+    def broken(config=None):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr("orbit.retention.run_retention", broken)
+    assert scheduler.run_once() == 0
+    assert scheduler.get_stats()["failures"] == 1
+    assert scheduler.get_stats()["last_error"] == "database is locked"
+
+
+def test_pass_is_skipped_while_another_process_holds_the_lock(settings):
+    _retention(settings, RETENTION_HOURS=1)
+    old = _entry(OrbitEntry.TYPE_LOG, timedelta(hours=2))
+    scheduler = RetentionScheduler()
+
+    with pass_lock() as held:
+        assert held
+        assert run_retention()["skipped"]
+        assert scheduler.run_once() == 0
+        assert OrbitEntry.objects.filter(id=old.id).exists()
+
+    stats = scheduler.get_stats()
+    assert stats["skipped"] == 1 and stats["runs"] == 0
+    result = run_retention()
+    assert result["deleted"] == 1 and not result["skipped"]
+
+
+def test_scheduler_thread_only_when_configured(settings):
+    scheduler = RetentionScheduler()
+    scheduler.ensure_started()
+    assert not scheduler.get_stats()["running"]
+
+    _retention(settings, RETENTION_SCHEDULER="thread", RETENTION_INTERVAL=3600)
+    scheduler.ensure_started()
+    assert scheduler.get_stats()["running"]
+
+
+def test_requests_no_longer_delete_entries(client, settings):
+    _retention(settings, STORAGE_LIMIT=1)
+    for _ in range(3):
+        _entry(OrbitEntry.TYPE_LOG, timedelta(hours=1))
+
+    for _ in range(20):
+        client.get("/")
+
+    assert OrbitEntry.objects.filter(type=OrbitEntry.TYPE_LOG).count() == 3
+
+
+def test_retention_command_runs_one_pass(settings, capsys):
+    _retention(settings, RETENTION_POLICIES={"log": 1})
+    _entry(OrbitEntry.TYPE_LOG, timedelta(hours=3))
+
+    call_command("orbit_retention")
+
+    assert not OrbitEntry.objects.filter(type=OrbitEntry.TYPE_LOG).exists()
+    assert "Deleted 1 Orbit entries" in capsys.readouterr().out
+
+
+def test_health_page_shows_retention(client):
+    response = client.get(reverse("orbit:health"))
+    assert response.status_code == 200
+    content = response.content.decode()
+    assert "Retention" in content
+    assert "per process" in content
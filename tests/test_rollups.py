@@ -0,0 +1,261 @@
+"""
+Tests for the stats rollups (orbit.rollups) and the stats functions that read them.
+"""
+
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.utils import timezone
+
+import pytest
+
+from orbit import rollups
+from orbit.models import OrbitEntry, OrbitRollup
+from orbit.rollups import accumulator, count_below, quantile, sum_rollups
+from orbit.stats import (
+    calculate_apdex,
+    get_cache_metrics,
+    get_database_metrics,
+    get_percentiles,
+    get_summary_stats,
+)
+from orbit.writer import write_entries, write_entry
+
+pytestmark = pytest.mark.django_db
+
+
+def _request(path="/books/", status=200, duration=20.0, method="GET"):
+    write_entry(
+        type=OrbitEntry.TYPE_REQUEST,
+        payload={"path": path, "method": method, "status_code": status},
+        duration_ms=duration,
+    )
+
+
+def test_written_entries_update_minute_and_hour_rows():
+    _request(duration=20)
+    _request(status=503, duration=700)
+    accumulator.flush()
+
+    for resolution in ("minute", "hour"):
+        row = OrbitRollup.objects.get(
+            resolution=resolution, type="request", endpoint=""
+        )
+        assert row.count == 2
+        assert row.error_count == 1
+        assert row.duration_sum == 720
+        assert row.duration_max == 700
+        assert row.sketch["n"] == 2
+    per_path = OrbitRollup.objects.get(
+        resolution="minute", method="GET", endpoint="/books/"
+    )
+    assert per_path.count == 2
+
+
+def test_flushes_merge_into_existing_rows():
+    _request()
+    accumulator.flush()
+    _request()
+    accumulator.flush()
+
+    row = OrbitRollup.objects.get(resolution="hour", type="request", endpoint="")
+    assert row.count == 2
+    assert row.sketch["n"] == 2
+
+
+def test_endpoint_rows_are_capped(settings):
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG, "ROLLUP_MAX_ENDPOINTS": 2}
+    for n in range(5):
+        _request(path=f"/item/{n}/")
+    accumulator.flush()
+
+    assert (
+        OrbitRollup.objects.filter(resolution="minute").exclude(endpoint="").count()
+        == 2
+    )
+    assert OrbitRollup.objects.get(resolution="minute", endpoint="").count == 5
+
+
+def test_endpoint_cap_holds_across_flushes(settings):
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG, "ROLLUP_MAX_ENDPOINTS": 2}
+    _request(path="/a/")
+    _request(path="/b/")
+    accumulator.flush()
+    _request(path="/c/")
+    _request(path="/a/")
+    accumulator.flush()
+
+    endpoints = OrbitRollup.objects.filter(resolution="minute").exclude(endpoint="")
+    assert sorted(endpoints.values_list("endpoint", "count")) == [
+        ("/a/", 2),
+        ("/b/", 1),
+    ]
+
+
+def test_recording_never_flushes_inline(settings):
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG, "ROLLUP_FLUSH_INTERVAL": 3600}
+    _request()
+
+    assert not OrbitRollup.objects.exists()
+    assert accumulator._thread.name == "orbit-rollups"
+    assert accumulator._thread.is_alive()
+
+
+def test_concurrent_merge_is_retried(monkeypatch):
+    _request(duration=10)
+    accumulator.flush()
+    bucket = OrbitRollup.objects.get(resolution="hour", endpoint="").bucket
+    key = ("hour", bucket, "request", "", "")
+    other = rollups.empty_totals()
+    other.update(count=3, duration_count=3, duration_sum=60.0, duration_max=40.0)
+    for duration in (10.0, 10.0, 40.0):
+        other["sketch"].add(duration)
+    from_dict = rollups.DDSketch.from_dict
+    raced = []
+
+    def from_dict_racing(data):
+        # Another process merges between this merge's read and its update
+        if not raced:
+            raced.append(True)
+            rollups._merge_row(key, other)
+        return from_dict(data)
+
+    monkeypatch.setattr(rollups.DDSketch, "from_dict", from_dict_racing)
+    mine = rollups.empty_totals()
+    mine.update(count=1, duration_count=1, duration_sum=5.0, duration_max=5.0)
+    mine["sketch"].add(5.0)
+    rollups._merge_row(key, mine)
+
+    row = OrbitRollup.objects.get(resolution="hour", endpoint="")
+    assert row.count == 5
+    assert row.duration_sum == 75.0
+    assert row.duration_max == 40.0
+    assert row.sketch["n"] == 5
+
+
+def test_failed_merges_are_retried_on_next_flush(monkeypatch):
+    merge_row = rollups._merge_row
+    monkeypatch.setattr(rollups, "_merge_row", lambda key, totals: False)
+    _request(duration=10)
+    accumulator.flush()
+    assert not OrbitRollup.objects.exists()
+
+    monkeypatch.setattr(rollups, "_merge_row", merge_row)
+    _request(duration=30)
+    accumulator.flush()
+
+    row = OrbitRollup.objects.get(resolution="hour", type="request", endpoint="")
+    assert row.count == 2
+    assert row.duration_sum == 40
+    assert not accumulator._retry
+
+
+def test_merges_failing_every_flush_are_counted_as_dropped(monkeypatch, caplog):
+    from orbit import metrics
+
+    def broken(key, totals):
+        raise RuntimeError("database is down")
+
+    metrics.reset()
+    monkeypatch.setattr(rollups, "_merge_row", broken)
+    _request()
+    _request()
+    for _ in range(rollups.MERGE_FLUSHES):
+        accumulator.flush()
+
+    assert not accumulator._retry
+    # Minute, hour and per-path rows of both requests
+    assert metrics.snapshot()["dropped"]["rollup_merge"] == 8
+    assert "Orbit dropped 2 hour rollup totals" in caplog.text
+    metrics.reset()
+
+
+def test_histogram_quantiles_and_apdex_counts():
+    for duration in [1] * 50 + [30] * 40 + [600] * 9 + [3000]:
+        accumulator.observe("request", {}, duration)
+    totals = accumulator._pending.popitem()[1]
+
+    assert count_below(totals, 500) == 90
+    assert count_below(totals, 2000) == 99
+    assert quantile(totals, 0.5) <= 5
+    assert 25 <= quantile(totals, 0.9) <= 50
+    assert quantile(totals, 1.0) == 3000
+
+
+def test_stats_read_rollups():
+    write_entries(
+        [
+            OrbitEntry(
+                type=OrbitEntry.TYPE_REQUEST,
+                payload={"status_code": 200},
+                duration_ms=100,
+            ),
+            OrbitEntry(
+                type=OrbitEntry.TYPE_REQUEST,
+                payload={"status_code": 500},
+                duration_ms=3000,
+            ),
+            OrbitEntry(
+                type=OrbitEntry.TYPE_QUERY,
+                payload={"sql": "SELECT 1", "is_slow": True},
+                duration_ms=150,
+            ),
+            OrbitEntry(
+                type=OrbitEntry.TYPE_QUERY,
+                payload={"sql": "SELECT 1", "is_duplicate": True},
+                duration_ms=50,
+            ),
+            OrbitEntry(type=OrbitEntry.TYPE_CACHE, payload={"hit": True}),
+            OrbitEntry(type=OrbitEntry.TYPE_CACHE, payload={"hit": False}),
+            OrbitEntry(type=OrbitEntry.TYPE_CACHE, payload={"hit": True}),
+        ]
+    )
+
+    summary = get_summary_stats("1h")
+    assert summary["total_requests"] == 2
+    assert summary["error_count"] == 1
+    assert summary["avg_response_time"] == 1550
+    assert calculate_apdex(time_range="1h") == 0.5
+    assert get_percentiles("1h")["p99"] <= 3000
+
+    database = get_database_metrics("24h")
+    assert database["total_queries"] == 2
+    assert database["slow_count"] == 1
+    assert database["duplicate_count"] == 1
+    assert database["max_time"] == 150
+
+    cache = get_cache_metrics("7d")
+    assert (cache["hits"], cache["misses"]) == (2, 1)
+    assert cache["trend"][0]["hit_rate"] == 66.7
+
+
+def test_rebuild_command_rolls_up_stored_entries():
+    OrbitEntry.objects.create(
+        type=OrbitEntry.TYPE_REQUEST, payload={"status_code": 200}, duration_ms=10
+    )
+    old = OrbitEntry.objects.create(
+        type=OrbitEntry.TYPE_REQUEST, payload={"status_code": 200}, duration_ms=10
+    )
+    OrbitEntry.objects.filter(id=old.id).update(
+        created_at=timezone.now() - timedelta(days=30)
+    )
+
+    call_command("orbit_rollup", hours=24)
+
+    rows = OrbitRollup.objects.filter(resolution="hour", type="request", endpoint="")
+    assert sum_rollups(rows)["count"] == 1
+
+
+def test_prune_rollups_uses_retention_per_resolution():
+    now = timezone.now()
+    for resolution, age in (
+        ("minute", timedelta(days=3)),
+        ("hour", timedelta(days=3)),
+        ("hour", timedelta(days=120)),
+    ):
+        OrbitRollup.objects.create(
+            resolution=resolution, bucket=now - age, type="request"
+        )
+
+    assert rollups.prune_rollups(now) == 2
+    assert OrbitRollup.objects.get().resolution == "hour"
@@ -0,0 +1,145 @@
+"""
+Tests for head and tail request sampling (orbit.sampling).
+"""
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+import pytest
+
+from orbit import sampling
+from orbit.middleware import OrbitMiddleware
+from orbit.models import OrbitEntry, OrbitRollup
+from orbit.rollups import accumulator
+from orbit.sampling import head_sample, tail_keep
+from orbit.stats import get_summary_stats, get_throughput_data
+from orbit.writer import write_entry
+
+pytestmark = pytest.mark.django_db
+
+
+def _sampled_requests():
+    return sum(
+        totals["count"]
+        for (_, entry_type, method, _path), totals in accumulator._pending.items()
+        if entry_type == OrbitEntry.TYPE_REQUEST and not method
+    )
+
+
+def _config(settings, **overrides):
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG, **overrides}
+    return settings.ORBIT_CONFIG
+
+
+def _run(view, path="/sampled/"):
+    return OrbitMiddleware(view)(RequestFactory().get(path))
+
+
+def _ok(request):
+    write_entry(type=OrbitEntry.TYPE_LOG, payload={"message": "inside"})
+    return HttpResponse("ok")
+
+
+# ---------------------------------------------------------------------------
+# Head sampling
+# ---------------------------------------------------------------------------
+
+
+def test_head_sample_rate_bounds():
+    assert head_sample("/x/", {"SAMPLE_RATE": 1.0}) is True
+    assert head_sample("/x/", {"SAMPLE_RATE": 0.0}) is False
+
+
+def test_head_sample_longest_path_prefix_wins():
+    config = {
+        "SAMPLE_RATE": 1.0,
+        "SAMPLE_PATH_RATES": {"/api/": 0.0, "/api/orders/": 1.0},
+    }
+    assert head_sample("/api/users/", config) is False
+    assert head_sample("/api/orders/1/", config) is True
+    assert head_sample("/home/", config) is True
+
+
+def test_head_sample_path_limit(monkeypatch):
+    monkeypatch.setattr(sampling, "_rate_limiter", sampling._PathRateLimiter())
+    config = {"SAMPLE_PATH_LIMITS": {"/health/": 2}}
+    decisions = [head_sample("/health/", config) for _ in range(5)]
+    assert decisions[:2] == [True, True]
+    assert not any(decisions[2:])
+
+
+def test_head_sampled_out_request_records_nothing(settings):
+    _config(settings, SAMPLE_RATE=0.0)
+    response = _run(_ok)
+
+    assert response.status_code == 200
+    assert OrbitEntry.objects.count() == 0
+    assert _sampled_requests() == 1
+
+
+def test_sampled_out_counters_reach_stats(settings):
+    _config(settings, SAMPLE_RATE=0.0)
+    for _ in range(3):
+        _run(_ok)
+    accumulator.flush()
+
+    row = OrbitRollup.objects.get(resolution="minute", type="request", endpoint="")
+    assert row.count == 3
+    assert OrbitRollup.objects.get(resolution="minute", endpoint="/sampled/").count == 3
+    summary = get_summary_stats("1h")
+    assert summary["total_requests"] == 3
+    assert sum(b["count"] for b in get_throughput_data("1h")) == 3
+
+
+# ---------------------------------------------------------------------------
+# Tail sampling
+# ---------------------------------------------------------------------------
+
+
+def test_tail_sampling_drops_unremarkable_request(settings):
+    _config(settings, TAIL_SAMPLING=True)
+    _run(_ok)
+
+    assert OrbitEntry.objects.count() == 0
+    assert _sampled_requests() == 1
+
+
+def test_tail_sampling_keeps_server_errors(settings):
+    _config(settings, TAIL_SAMPLING=True)
+
+    def failing(request):
+        write_entry(type=OrbitEntry.TYPE_LOG, payload={"message": "about to fail"})
+        return HttpResponse("nope", status=503)
+
+    _run(failing)
+    assert OrbitEntry.objects.filter(type=OrbitEntry.TYPE_REQUEST).count() == 1
+    assert OrbitEntry.objects.filter(type=OrbitEntry.TYPE_LOG).count() == 1
+
+
+def test_tail_sampling_keeps_exceptions(settings):
+    _config(settings, TAIL_SAMPLING=True)
+
+    def boom(request):
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        _run(boom)
+    assert OrbitEntry.objects.filter(type=OrbitEntry.TYPE_EXCEPTION).count() == 1
+
+
+def test_tail_keep_rules():
+    request_entry = OrbitEntry(type=OrbitEntry.TYPE_REQUEST, payload={})
+    base = {
+        "TAIL_KEEP_STATUS": 500,
+        "TAIL_KEEP_SLOWER_THAN_MS": 1000,
+        "TAIL_KEEP_DUPLICATE_QUERIES": 3,
+        "TAIL_SAMPLE_RATE": 0.0,
+    }
+
+    assert not tail_keep([request_entry], 200, 10, 0, base)
+    assert tail_keep([request_entry], 200, 1500, 0, base)
+    assert tail_keep([request_entry], 200, 10, 3, base)
+    assert tail_keep([request_entry], 500, 10, 0, base)
+
+    tagged = {**base, "TAIL_KEEP_TAGS": ["vip"], "TAG_CALLBACK": lambda e: ["vip"]}
+    assert tail_keep([request_entry], 200, 10, 0, tagged)
@@ -0,0 +1,128 @@
+"""
+Tests for the full-text search index (orbit.search).
+"""
+
+from django.db import connection
+from django.urls import reverse
+
+import pytest
+
+from orbit import search
+from orbit.models import OrbitEntry
+from orbit.writer import write_entries
+
+pytestmark = pytest.mark.django_db
+
+
+def _fts_rows():
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM {search.FTS_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def test_search_text_flattens_payload_and_tags():
+    entry = OrbitEntry.objects.create(
+        type=OrbitEntry.TYPE_REQUEST,
+        payload={
+            "path": "/api/books/",
+            "status_code": 503,
+            "headers": {"X-Tenant": "acme"},
+            "ok": False,
+        },
+        tags=",checkout,slow,",
+    )
+    assert entry.search_text.split() == [
+        "request",
+        "checkout",
+        "slow",
+        "path",
+        "/api/books/",
+        "status_code",
+        "503",
+        "headers",
+        "X-Tenant",
+        "acme",
+        "ok",
+        "false",
+    ]
+
+
+def test_search_text_is_capped_and_masked(settings):
+    settings.ORBIT_CONFIG = {
+        **settings.ORBIT_CONFIG,
+        "SEARCH_TEXT_MAX_CHARS": 50,
+        "MASK_ALL_PAYLOADS": True,
+    }
+    entry = OrbitEntry.objects.create(
+        type=OrbitEntry.TYPE_LOG, payload={"password": "hunter2", "message": "x" * 200}
+    )
+    assert len(entry.search_text) == 50
+    assert "hunter2" not in entry.search_text
+
+
+def test_sqlite_index_matches_substrings():
+    write_entries(
+        [
+            OrbitEntry(
+                type=OrbitEntry.TYPE_REQUEST, payload={"path": "/api/Books/42/"}
+            ),
+            OrbitEntry(type=OrbitEntry.TYPE_REQUEST, payload={"path": "/api/authors/"}),
+        ]
+    )
+    where = str(OrbitEntry.objects.filter(search.search_q("api/boo")).query)
+    assert search.FTS_TABLE in where
+
+    found = search.search(OrbitEntry.objects.all(), "api/boo")
+    assert [e.payload["path"] for e in found] == ["/api/Books/42/"]
+    # Below the trigram length the portable fallback is used
+    assert search.search(OrbitEntry.objects.all(), "42").count() == 1
+
+
+def test_sqlite_index_follows_deletes_and_updates():
+    entry = OrbitEntry.objects.create(
+        type=OrbitEntry.TYPE_LOG, payload={"message": "first"}
+    )
+    assert _fts_rows() == 1
+
+    OrbitEntry.objects.filter(id=entry.id).update(search_text="log message second")
+    assert search.search(OrbitEntry.objects.all(), "second").count() == 1
+    assert search.search(OrbitEntry.objects.all(), "first").count() == 0
+
+    OrbitEntry.objects.all().delete()
+    assert _fts_rows() == 0
+
+
+def test_postgresql_and_mysql_queries():
+    pg = search._postgresql_match(connection, "checkout fail!")
+    assert pg.children[0].params == ["checkout:* & fail:*"]
+
+    mysql = search._mysql_match(connection, "payment declined")
+    assert mysql.children[0].params == ["+payment* +declined*"]
+    assert search._mysql_match(connection, "db is down") is None
+
+
+def test_feed_search_uses_index(client):
+    OrbitEntry.objects.create(
+        type=OrbitEntry.TYPE_LOG, payload={"message": "Card declined for order"}
+    )
+    OrbitEntry.objects.create(
+        type=OrbitEntry.TYPE_LOG, payload={"message": "Order shipped"}
+    )
+
+    content = client.get(reverse("orbit:feed"), {"q": "card decl"}).content.decode()
+
+    assert "Card declined" in content
+    assert "Order shipped" not in content
+
+
+def test_triggers_are_restored_after_table_rebuilds():
+    with connection.cursor() as cursor:
+        for suffix in ("ai", "ad", "au"):
+            cursor.execute(f"DROP TRIGGER {search.FTS_TABLE}_{suffix}")
+
+    search.restore_triggers(using="default")
+    OrbitEntry.objects.create(
+        type=OrbitEntry.TYPE_LOG, payload={"message": "after rebuild"}
+    )
+
+    assert search.search(OrbitEntry.objects.all(), "rebuild").count() == 1
@@ -0,0 +1,71 @@
+"""
+Tests for the mergeable latency sketch (orbit.sketch).
+"""
+
+import random
+
+import pytest
+
+from orbit import sketch as sketch_module
+from orbit.sketch import DDSketch
+
+pytestmark = pytest.mark.django_db
+
+
+def _exact(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+@pytest.mark.parametrize("q", [0.5, 0.75, 0.95, 0.99])
+def test_quantiles_within_relative_accuracy(q):
+    rng = random.Random(7)
+    values = [rng.lognormvariate(4, 1.2) for _ in range(20000)]
+    estimate = DDSketch().extend(values).quantile(q)
+    assert abs(estimate - _exact(values, q)) <= 0.01 * _exact(values, q) + 1e-9
+
+
+def test_merge_matches_single_sketch():
+    rng = random.Random(3)
+    values = [rng.expovariate(1 / 80) for _ in range(5000)]
+    whole = DDSketch().extend(values)
+    merged = DDSketch()
+    for start in range(0, len(values), 500):
+        merged.merge(DDSketch().extend(values[start : start + 500]))
+
+    assert merged.count == whole.count
+    assert merged.bins == whole.bins
+    assert merged.quantile(0.95) == whole.quantile(0.95)
+
+
+def test_round_trip_and_empty():
+    original = DDSketch().extend([0, 1.5, 20, 20, 300])
+    restored = DDSketch.from_dict(original.to_dict())
+
+    assert restored.to_dict() == original.to_dict()
+    assert restored.quantile(0) == 0
+    assert restored.quantile(1) == 300
+    assert DDSketch.from_dict(None).quantile(0.5) is None
+    assert DDSketch.from_dict({}).count == 0
+
+
+def test_count_below():
+    sketch = DDSketch().extend([100] * 3 + [400] * 5 + [2500] * 2)
+    assert sketch.count_below(500) == 8
+    assert sketch.count_below(2000) == 8
+    assert sketch.count_below(50) == 0
+    assert sketch.count_below(10000) == 10
+
+
+def test_bucket_count_is_bounded(monkeypatch):
+    monkeypatch.setattr(sketch_module, "MAX_BUCKETS", 16)
+    sketch = DDSketch().extend(1.05**n for n in range(500))
+
+    assert len(sketch.bins) == 16
+    assert sketch.count == 500
+    assert sketch.quantile(1.0) == pytest.approx(1.05**499)
+
+
+def test_rejects_mismatched_accuracy():
+    with pytest.raises(ValueError):
+        DDSketch(0.01).merge(DDSketch(0.02).extend([1]))
@@ -0,0 +1,91 @@
+"""
+Tests for SQL normalization and query fingerprinting (orbit.sql).
+"""
+
+from django.db import connection
+
+import pytest
+
+from orbit.models import OrbitEntry
+from orbit.recorders import OrbitQueryWrapper
+from orbit.sql import fingerprint_sql, normalize_sql
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.parametrize(
+    "sql, expected",
+    [
+        (
+            'SELECT * FROM "book" WHERE "id" IN (1, 2, 3) AND "title" = \'it\'\'s\'',
+            'SELECT * FROM "book" WHERE "id" IN (?+) AND "title" = ?',
+        ),
+        (
+            'SELECT * FROM "book" WHERE "id" IN (%s) AND "title" = %s',
+            'SELECT * FROM "book" WHERE "id" IN (?+) AND "title" = ?',
+        ),
+        (
+            "INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)",
+            "INSERT INTO t (a, b) VALUES (?+)",
+        ),
+        (
+            "SELECT t1.col2 FROM t1 LIMIT 21 -- page\n  OFFSET 40",
+            "SELECT t1.col2 FROM t1 LIMIT ? OFFSET ?",
+        ),
+        (
+            "SELECT x::text FROM y WHERE z = $1 /* hint */ AND w = -3.5",
+            "SELECT x::text FROM y WHERE z = ? AND w = ?",
+        ),
+        (
+            'SELECT "col1" FROM "t2" WHERE "flag" = TRUE',
+            'SELECT "col1" FROM "t2" WHERE "flag" = ?',
+        ),
+    ],
+)
+def test_normalize_sql(sql, expected):
+    assert normalize_sql(sql) == expected
+
+
+def test_fingerprint_ignores_literals_but_not_structure():
+    a = fingerprint_sql("SELECT * FROM t WHERE id IN (1, 2)")
+    b = fingerprint_sql("SELECT * FROM t WHERE id IN (3, 4, 5, 6)")
+    c = fingerprint_sql("SELECT * FROM t WHERE pk IN (1, 2)")
+    assert a == b
+    assert a != c
+    assert len(a) == 16
+    assert fingerprint_sql("") == ""
+
+
+def test_wrapper_counts_in_lists_of_different_length_as_duplicates():
+    wrapper = OrbitQueryWrapper()
+    with connection.execute_wrapper(wrapper):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 WHERE 1 IN (1, 2)")
+            cursor.execute("SELECT 1 WHERE 1 IN (1, 2, 3)")
+    first, second = wrapper.queries
+    assert first["fingerprint"] == second["fingerprint"]
+    assert second["is_duplicate"] is True
+    assert second["duplicate_count"] == 2
+
+
+def test_query_entry_gets_fingerprint_on_insert():
+    entry = OrbitEntry.objects.create(
+        type=OrbitEntry.TYPE_QUERY, payload={"sql": "SELECT * FROM t WHERE id = 7"}
+    )
+    assert entry.fingerprint == fingerprint_sql("SELECT * FROM t WHERE id = %s")
+
+
+def test_duplicate_query_groups_grouped_in_db():
+    for n in (1, 2, 3):
+        OrbitEntry.objects.create(
+            type=OrbitEntry.TYPE_QUERY,
+            family_hash="fam",
+            payload={"sql": f"SELECT * FROM t WHERE id IN ({', '.join(['%s'] * n)})"},
+        )
+    OrbitEntry.objects.create(
+        type=OrbitEntry.TYPE_QUERY, family_hash="fam", payload={"sql": "SELECT 1"}
+    )
+
+    groups = list(OrbitEntry.objects.duplicate_query_groups("fam"))
+    assert len(groups) == 1
+    assert groups[0]["count"] == 3
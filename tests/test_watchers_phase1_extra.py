@@ -1,10 +1,12 @@
+from unittest.mock import MagicMock, patch
 
 import pytest
 import requests
-from unittest.mock import MagicMock, patch
+
 from example_project.demo.models import Book
 from orbit.models import OrbitEntry
-from orbit.watchers import install_model_watcher, install_http_client_watcher
+from orbit.watchers import install_http_client_watcher, install_model_watcher
+
 
 @pytest.fixture(autouse=True)
 def enable_watchers():
@@ -13,52 +15,66 @@ def enable_watchers():
     install_http_client_watcher()
     yield
 
+
 @pytest.mark.django_db
 def test_model_watcher_lifecycle():
     """Test model creation, update, and deletion."""
     # 1. Create
     book = Book.objects.create(
-        title="Test Book", 
+        title="Test Book",
         author="Test Author",
     )
-    
+
     assert OrbitEntry.objects.filter(type=OrbitEntry.TYPE_MODEL).count() == 1
     entry = OrbitEntry.objects.first()
-    assert entry.payload['action'] == 'created'
-    assert entry.payload['model'] == 'demo.book'
-    assert entry.payload['pk'] == str(book.pk)
-    
+    assert entry.payload["action"] == "created"
+    assert entry.payload["model"] == "demo.book"
+    assert entry.payload["pk"] == str(book.pk)
+
     # 2. Update
     OrbitEntry.objects.all().delete()
     book.title = "Updated Title"
     book.save()
-    
+
     assert OrbitEntry.objects.count() == 1
     entry = OrbitEntry.objects.first()
-    assert entry.payload['action'] == 'updated'
-    assert 'changes' in entry.payload
-    assert entry.payload['changes']['title']['old'] == "Test Book"
-    assert entry.payload['changes']['title']['new'] == "Updated Title"
-    
+    assert entry.payload["action"] == "updated"
+    assert "changes" in entry.payload
+    assert entry.payload["changes"]["title"]["old"] == "Test Book"
+    assert entry.payload["changes"]["title"]["new"] == "Updated Title"
+
     # 3. Delete
     OrbitEntry.objects.all().delete()
     book.delete()
-    
+
     assert OrbitEntry.objects.count() == 1
     entry = OrbitEntry.objects.first()
-    assert entry.payload['action'] == 'deleted'
+    assert entry.payload["action"] == "deleted"
+
+
+@pytest.mark.django_db
+def test_model_watcher_ignores_orbit_models():
+    """Rollup rows Orbit saves itself are not recorded as model events."""
+    from orbit.rollups import RollupAccumulator
+
+    accumulator = RollupAccumulator()
+    accumulator.observe("request", {"path": "/x/", "method": "GET"}, 5.0)
+    accumulator.flush()
+
+    assert not OrbitEntry.objects.filter(type=OrbitEntry.TYPE_MODEL).exists()
+
 
 @pytest.mark.django_db
 def test_http_client_watcher(settings):
     """Test HTTP client request recording via direct function call."""
     from orbit.watchers import record_http_client_request
-    
+
     # Ensure HTTP client recording is enabled
     settings.ORBIT_CONFIG = {
         "ENABLED": True,
         "RECORD_HTTP_CLIENT": True,
     }
-    
+
     # Directly call the record function (simulating what the watcher does)
     record_http_client_request(
         method="POST",
@@ -69,11 +85,11 @@ def test_http_client_watcher(settings):
         response_size=13,
         error=None,
     )
-    
+
     # Verify Orbit entry was created
     entry = OrbitEntry.objects.filter(type=OrbitEntry.TYPE_HTTP_CLIENT).first()
     assert entry is not None, "Expected HTTP_CLIENT entry"
-    assert entry.payload['method'] == 'POST'
-    assert entry.payload['url'] == 'https://api.example.com/users'
-    assert entry.payload['status_code'] == 201
+    assert entry.payload["method"] == "POST"
+    assert entry.payload["url"] == "https://api.example.com/users"
+    assert entry.payload["status_code"] == 201
     assert entry.duration_ms == 150.5
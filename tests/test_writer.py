@@ -0,0 +1,147 @@
+"""
+Tests for the OrbitEntry write pipeline (orbit.writer).
+"""
+
+import threading
+import time
+
+import pytest
+
+from orbit import writer as orbit_writer
+from orbit.models import OrbitEntry
+from orbit.writer import (
+    BufferedWriter,
+    SyncWriter,
+    get_writer,
+    reset_writer,
+    write_entry,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def fresh_writer():
+    reset_writer()
+    yield
+    reset_writer()
+
+
+def test_default_writer_is_sync():
+    assert isinstance(get_writer(), SyncWriter)
+
+
+def test_sync_writer_inserts_immediately():
+    write_entry(type=OrbitEntry.TYPE_LOG, payload={"message": "hi"})
+    assert OrbitEntry.objects.filter(type=OrbitEntry.TYPE_LOG).count() == 1
+
+
+def test_invalid_writer_path_falls_back_to_sync(settings):
+    settings.ORBIT_CONFIG = {**settings.ORBIT_CONFIG, "WRITER": "orbit.nope.Missing"}
+    reset_writer()
+    assert isinstance(get_writer(), SyncWriter)
+
+
+def test_configured_writer_is_loaded(settings):
+    settings.ORBIT_CONFIG = {
+        **settings.ORBIT_CONFIG,
+        "WRITER": "orbit.writer.BufferedWriter",
+    }
+    reset_writer()
+    assert isinstance(get_writer(), BufferedWriter)
+
+
+def test_buffered_writer_defers_until_flush():
+    w = BufferedWriter(start_thread=False)
+    w.write({"type": OrbitEntry.TYPE_LOG, "payload": {"message": "later"}})
+    w.write_many([OrbitEntry(type=OrbitEntry.TYPE_QUERY, payload={"sql": "SELECT 1"})])
+    assert OrbitEntry.objects.count() == 0
+
+    w.flush()
+    assert OrbitEntry.objects.count() == 2
+    stats = w.get_stats()
+    assert stats["written"] == 2
+    assert stats["queue_depth"] == 0
+
+
+def test_buffered_writer_batches_inserts():
+    w = BufferedWriter(batch_size=3, start_thread=False)
+    for i in range(7):
+        w.write({"type": OrbitEntry.TYPE_LOG, "payload": {"i": i}})
+    w.flush()
+    assert OrbitEntry.objects.count() == 7
+    assert w.get_stats()["batches"] == 3
+
+
+def test_drop_oldest_overflow_keeps_newest():
+    w = BufferedWriter(max_size=3, overflow="drop_oldest", start_thread=False)
+    for i in range(5):
+        w.write({"type": OrbitEntry.TYPE_LOG, "payload": {"i": i}})
+    assert w.get_stats()["dropped"] == 2
+    w.flush()
+    kept = sorted(e.payload["i"] for e in OrbitEntry.objects.all())
+    assert kept == [2, 3, 4]
+
+
+def test_sample_overflow_never_exceeds_capacity():
+    w = BufferedWriter(max_size=10, overflow="sample", start_thread=False)
+    for i in range(100):
+        w.write({"type": OrbitEntry.TYPE_LOG, "payload": {"i": i}})
+    stats = w.get_stats()
+    assert stats["queue_depth"] <= 10
+    assert stats["queue_depth"] + stats["dropped"] == 100
+
+
+def test_buffered_writer_applies_tags_and_masking(settings):
+    settings.ORBIT_CONFIG = {
+        **settings.ORBIT_CONFIG,
+        "TAG_CALLBACK": lambda entry: ["buffered"],
+        "MASK_ALL_PAYLOADS": True,
+    }
+    w = BufferedWriter(start_thread=False)
+    w.write({"type": OrbitEntry.TYPE_DUMP, "payload": {"password": "hunter2"}})
+    w.flush()
+    entry = OrbitEntry.objects.get()
+    assert entry.tag_list == ["buffered"]
+    assert entry.payload["password"] != "hunter2"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_background_thread_flushes_on_shutdown():
+    w = BufferedWriter(flush_interval=60)
+    w.write({"type": OrbitEntry.TYPE_LOG, "payload": {"message": "bg"}})
+    w.shutdown(timeout=5)
+    assert OrbitEntry.objects.count() == 1
+
+
+def test_write_entry_never_raises(monkeypatch):
+    class Broken(SyncWriter):
+        def write(self, fields):
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(orbit_writer, "_writer", Broken())
+    write_entry(type=OrbitEntry.TYPE_LOG, payload={})
+
+
+def test_flush_timeout_waits_for_the_flusher_thread(monkeypatch):
+    release = threading.Event()
+    inserted = []
+
+    def slow_insert(batch):
+        release.wait(5)
+        inserted.extend(batch)
+
+    monkeypatch.setattr(orbit_writer, "_bulk_insert", slow_insert)
+    w = BufferedWriter(flush_interval=60)
+    w.write({"type": OrbitEntry.TYPE_LOG, "payload": {"message": "slow"}})
+
+    started = time.monotonic()
+    w.flush(timeout=0.1)
+    assert time.monotonic() - started < 1
+    assert inserted == []
+
+    release.set()
+    w.flush(timeout=5)
+    assert len(inserted) == 1
+    assert w.get_stats()["queue_depth"] == 0
+    w.shutdown(timeout=5)